@@ -11,6 +11,7 @@ from stockpred.config import flatten_tickers, load_configs
 from stockpred.data.yahoo import load_raw
 from stockpred.features.ta import compute_ta_features
 from stockpred.models.predict import load_model_bundle, predict_next_day
+from stockpred.visuals.forecast import build_fan_charts
 
 
 def _safe_ticker_dir_name(ticker: str) -> str:
@@ -37,6 +38,8 @@ def main() -> None:
     parser.add_argument("--models_root", type=str, default="runs/eval_oral")
     parser.add_argument("--out_dir", type=str, default="reports/predictions")
     parser.add_argument("--tickers", type=str, default="", help="Comma-separated tickers (optional)")
+    parser.add_argument("--fan_paths", type=int, default=2000, help="Monte Carlo paths per ticker for fan charts (0 = off)")
+    parser.add_argument("--fan_lookback", type=int, default=250, help="Days of returns bootstrapped for fan charts")
     parser.add_argument("--delete_next_day", action="store_true", help="Remove *_next_day.json after writing multi-horizon file")
     args = parser.parse_args()
 
@@ -52,6 +55,8 @@ def main() -> None:
         tickers = sorted(set(flatten_tickers(cfg["tickers"]).values()))
 
     now = datetime.now().isoformat(timespec="seconds")
+    fan_closes: dict[str, pd.Series] = {}
+    fan_probas: dict[str, dict] = {}
 
     for ticker in tickers:
         df_raw = load_raw(ticker)
@@ -92,6 +97,8 @@ def main() -> None:
         out_path = out_dir / f"{safe}_multi_horizon.json"
         out_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
         print(f"[ok]Saved multi-horizon prediction: {out_path}")
+        fan_closes[ticker] = df_raw["Close"]
+        fan_probas[ticker] = {k: v["proba_up"] for k, v in payload.items()}
 
         if args.delete_next_day:
             next_day_path = out_dir / f"{safe}_next_day.json"
@@ -99,6 +106,17 @@ def main() -> None:
                 next_day_path.unlink()
                 print(f"[ok]Deleted legacy file: {next_day_path}")
 
+    if args.fan_paths > 0 and fan_closes:
+        # One simulation batch for the whole universe, cached next to the predictions.
+        fans = build_fan_charts(fan_closes, fan_probas, lookback_days=args.fan_lookback, n_paths=args.fan_paths)
+        for ticker, by_h in fans.items():
+            fan_payload = {h: fan.to_dict() for h, fan in by_h.items()}
+            for h in fan_payload:
+                fan_payload[h].update({"n_paths": args.fan_paths, "generated_at": now})
+            fan_path = out_dir / f"{_safe_ticker_dir_name(ticker)}_fan.json"
+            fan_path.write_text(json.dumps(fan_payload), encoding="utf-8")
+        print(f"[ok]Saved fan charts for {len(fans)} tickers in {out_dir}")
+
 
 if __name__ == "__main__":
     main()
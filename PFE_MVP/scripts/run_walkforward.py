@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from stockpred.config import flatten_tickers, load_configs, load_yaml
+from stockpred.models.walkforward import WalkForwardConfig, run_walk_forward
+from stockpred.utils.paths import get_paths
+
+
+def _safe_ticker(ticker: str) -> str:
+    return ticker.replace("^", "").replace("=", "_").replace("/", "_")
+
+
+def _resolve_path(value: str) -> Path:
+    path = Path(value)
+    if not path.exists() and not path.is_absolute():
+        path = get_paths().root / path
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Walk-forward train/eval (expanding or rolling windows).")
+    parser.add_argument("--horizons", type=str, default="1,5,10,30,60")
+    parser.add_argument("--ticker", type=str, default=None, help="Single ticker (default: all from config)")
+    parser.add_argument("--config", type=str, default=None, help="Path to model.yaml (default: configs/model.yaml)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--test_size", type=int, default=None, help="Samples per out-of-sample fold")
+    parser.add_argument("--mode", type=str, default="expanding", choices=["expanding", "rolling"])
+    parser.add_argument("--train_size", type=int, default=1000, help="Window length for --mode rolling")
+    parser.add_argument("--gap", type=int, default=None, help="Embargo between train and test (default: horizon)")
+    parser.add_argument("--warm_start", action="store_true", help="Init each fold from the previous fold weights")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = all CPUs)")
+    parser.add_argument("--cache_dir", type=str, default=None, help="Artifact cache (default: data/processed/cache)")
+    parser.add_argument("--out", type=str, default="runs/walkforward")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    cfg = load_configs()
+    base_cfg = load_yaml(_resolve_path(args.config)) if args.config else cfg["model"]
+    tickers = [args.ticker] if args.ticker else sorted(set(flatten_tickers(cfg["tickers"]).values()))
+    horizons = [int(h.strip()) for h in args.horizons.split(",") if h.strip()]
+    cache_dir = Path(args.cache_dir) if args.cache_dir else get_paths().cache
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    wf_cfg = WalkForwardConfig(
+        n_folds=args.folds,
+        test_size=args.test_size,
+        mode=args.mode,
+        train_size=args.train_size,
+        gap=args.gap,
+        warm_start=args.warm_start,
+    )
+
+    out_root = Path(args.out)
+    if not out_root.is_absolute():
+        out_root = get_paths().root / out_root
+
+    for h in horizons:
+        model_cfg = dict(base_cfg)
+        model_cfg["features"] = dict(base_cfg["features"])
+        model_cfg["features"]["horizon"] = h
+
+        results = run_walk_forward(tickers, model_cfg, wf_cfg, cache_dir=cache_dir, workers=workers, seed=args.seed)
+
+        out_dir = out_root / f"h{h}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        summary = {"horizon": h, "walkforward": vars(wf_cfg), "tickers": {}}
+        for ticker, res in results.items():
+            res["predictions"].to_csv(out_dir / f"{_safe_ticker(ticker)}_oos.csv", index_label="Date")
+            summary["tickers"][ticker] = {"metrics": res["metrics"], "folds": res["folds"]}
+        (out_dir / "walkforward.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+        print("\n" + "=" * 60)
+        print(f"WALK-FORWARD J+{h} ({args.mode}, {args.folds} folds)")
+        print("=" * 60)
+        for ticker, res in results.items():
+            m = res["metrics"]
+            print(
+                f"{ticker:<12} n={len(res['predictions']):<5} bal_acc={m['balanced_accuracy']:.4f} "
+                f"auc={m['roc_auc']:.4f} brier={m['brier']:.4f}"
+            )
+        print(f"[ok]Wrote {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
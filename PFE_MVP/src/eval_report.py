@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import os
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
@@ -11,10 +12,10 @@ import torch
 from sklearn.preprocessing import StandardScaler
 
 from stockpred.config import load_configs, load_yaml
-from stockpred.data.yahoo import load_raw
-from stockpred.features.dataset import make_windowed_dataset
-from stockpred.features.ta import compute_ta_features
+from stockpred.features.cached import dataset_key, load_dataset, load_features, model_feature_cols
 from stockpred.models.predict import load_model_bundle
+from stockpred.utils.backtest import BacktestGrid, build_panel, run_backtest_grid
+from stockpred.utils.cache import ArtifactCache, dir_fingerprint, fingerprint
 from stockpred.utils.paths import get_paths
 from stockpred.utils.eval_utils import (
     baseline_always_up,
@@ -26,6 +27,7 @@ from stockpred.utils.eval_utils import (
     sigmoid,
     strategy_stats,
     aggregate_equity_curves,
+    bootstrap_metric_cis,
 )
 
 
@@ -71,22 +73,6 @@ def _format_table(headers: List[str], rows: List[List[object]]) -> str:
         return "\n".join(lines)
 
 
-def _build_features(cfg_model: dict, df_raw: pd.DataFrame) -> pd.DataFrame:
-    df_feat = compute_ta_features(df_raw)
-    df = df_feat.copy()
-    if cfg_model["features"].get("dropna", True):
-        df.dropna(inplace=True)
-    return df
-
-
-def _get_feature_cols(df: pd.DataFrame) -> List[str]:
-    drop_cols = {"Adj Close"}
-    feature_cols = [c for c in df.columns if c not in drop_cols]
-    price_cols = {"Open", "High", "Low", "Close", "Volume"}
-    model_features = [c for c in feature_cols if c not in price_cols]
-    return model_features
-
-
 def _split_all(
     X: np.ndarray,
     y: np.ndarray,
@@ -225,21 +211,6 @@ def _plot_outputs(
     return {"close_signals": p1, "proba": p2, "equity": p3}
 
 
-def _load_model_for_ticker(ticker: str, ckpt: Optional[Path], models_dir: Optional[Path] = None) -> Dict:
-    if ckpt is not None:
-        model_dir = ckpt.parent
-        return load_model_bundle(model_dir)
-
-    if models_dir is not None:
-        model_dir = models_dir / ticker
-    else:
-        paths = get_paths()
-        model_dir = paths.models / ticker
-    if not model_dir.exists():
-        raise FileNotFoundError(f"Missing model directory: {model_dir}")
-    return load_model_bundle(model_dir)
-
-
 def _collect_returns_for_index(
     df_feat: pd.DataFrame, sample_index: pd.DatetimeIndex, horizon: int
 ) -> np.ndarray:
@@ -254,6 +225,441 @@ def _print_section(title: str) -> None:
     print(f"\n{title}\n{line}")
 
 
+@dataclass(frozen=True)
+class EvalTask:
+    """One (horizon, ticker) unit of work. Must stay picklable for the process pool."""
+
+    horizon_key: str
+    ticker: str
+    model_cfg: dict
+    models_dir: Optional[str]
+    ckpt: Optional[str]
+    split: str
+    test_ratio: float
+    threshold: float
+    threshold_metric: str
+    calibration_bins: int
+    bucket: int
+    positioning: str
+    seed: int
+    bootstrap: int
+    block_size: Optional[int]
+    cache_dir: str
+    use_cache: bool
+
+
+def _init_worker(seed: int) -> None:
+    # One BLAS/torch thread per process: parallelism comes from the pool itself.
+    torch.set_num_threads(1)
+    _set_seeds(seed)
+
+
+def _resolve_model_dir(task: EvalTask) -> Path:
+    if task.ckpt is not None:
+        return Path(task.ckpt).parent
+    if task.models_dir is not None:
+        return Path(task.models_dir) / task.ticker
+    return get_paths().models / task.ticker
+
+
+def _evaluate_ticker(task: EvalTask) -> Dict[str, object]:
+    """
+    Evaluate one ticker for one horizon. Runs inside worker processes; returns the
+    JSON entry plus the raw arrays needed for global aggregation and plots.
+    """
+    cache = ArtifactCache(Path(task.cache_dir), enabled=task.use_cache)
+    ticker = task.ticker
+    model_cfg = task.model_cfg
+    lookback = int(model_cfg["features"]["lookback"])
+    horizon = int(model_cfg["features"]["horizon"])
+    valid_ratio = float(model_cfg["train"]["valid_ratio"])
+    min_rows = int(model_cfg["data"]["min_rows"])
+
+    dropna = bool(model_cfg["features"].get("dropna", True))
+    df_feat, n_raw, features_key = load_features(ticker, dropna, cache)
+    if df_feat is None:
+        return {"ticker": ticker, "skipped": f"No cached data for {ticker}. Skipping."}
+    if n_raw < min_rows:
+        return {"ticker": ticker, "skipped": f"Not enough rows for {ticker}: {n_raw}. Skipping."}
+
+    feature_cols = model_feature_cols(df_feat)
+    model_dir = _resolve_model_dir(task)
+    if not model_dir.exists():
+        raise FileNotFoundError(f"Missing model directory: {model_dir}")
+    model_fp = dir_fingerprint(model_dir, ("model.safetensors", "scaler.pkl", "meta.yaml"))
+
+    split_params = (task.split, valid_ratio, task.test_ratio)
+    ds_key = dataset_key(features_key, feature_cols, lookback, horizon)
+    logits_key = fingerprint("logits", ds_key, model_fp, split_params)
+    baseline_key = fingerprint("log_reg", ds_key, split_params)
+
+    cached_logits = cache.load_arrays("logits", logits_key) if model_fp is not None else None
+    cached_log_reg = cache.load_json("baselines", baseline_key)
+    need_X = cached_logits is None or cached_log_reg is None
+
+    arrays = load_dataset(df_feat, feature_cols, lookback, horizon, ds_key, cache, with_X=need_X)
+    y_all = arrays["y"]
+    if len(y_all) == 0:
+        return {"ticker": ticker, "skipped": f"No usable samples for {ticker}. Skipping."}
+
+    index_all = pd.DatetimeIndex(arrays["index"])
+    X_all = arrays["X"] if need_X else np.empty((len(y_all), 0), dtype=np.float32)
+    splits = _split_all(
+        X=X_all,
+        y=y_all,
+        index=index_all,
+        valid_ratio=valid_ratio,
+        test_ratio=task.test_ratio,
+    )
+    split = splits[task.split]
+    train_split = splits["train"]
+
+    if cached_logits is not None:
+        logits = cached_logits["logits"]
+    else:
+        bundle = load_model_bundle(model_dir)
+        scaler = bundle["scaler"]
+        model = bundle["model"]
+        model.eval()
+
+        X_scaled = scaler.transform(split.X)
+        x_t = torch.tensor(X_scaled, dtype=torch.float32)
+        with torch.no_grad():
+            logits = model(x_t).detach().cpu().numpy().reshape(-1)
+        if model_fp is not None:
+            cache.save_arrays("logits", logits_key, logits=logits)
+    probs = sigmoid(logits)
+
+    if len(probs) != len(split.y):
+        raise ValueError("Prediction size mismatch with labels.")
+
+    returns_next = _collect_returns_for_index(df_feat, split.index, horizon=horizon)
+
+    metrics = compute_metrics(logits, probs, split.y, task.threshold)
+    metrics["loss"] = _bce_loss(logits, split.y)
+    threshold_report = optimize_threshold(
+        probs,
+        split.y,
+        metric=task.threshold_metric,
+        min_thr=0.05,
+        max_thr=0.95,
+        step=0.01,
+    )
+    ece, reliability = expected_calibration_error(probs, split.y, n_bins=task.calibration_bins)
+
+    pos_rate_train = float(train_split.y.mean()) if len(train_split.y) else 0.0
+    baseline_metrics = {
+        "always_up": baseline_always_up(split.y),
+        "random_stratified": baseline_random(split.y, pos_rate_train, seed=task.seed),
+    }
+    if cached_log_reg is None:
+        scaler_baseline = StandardScaler()
+        scaler_baseline.fit(train_split.X)
+        X_train_bl = scaler_baseline.transform(train_split.X)
+        X_eval_bl = scaler_baseline.transform(split.X)
+        cached_log_reg = baseline_log_reg(X_train_bl, train_split.y, X_eval_bl, split.y)
+        cache.save_json("baselines", baseline_key, cached_log_reg)
+    baseline_metrics["log_reg"] = cached_log_reg
+
+    pct_above_05 = float((probs >= 0.5).mean()) * 100.0
+    pct_above_thr = float((probs >= task.threshold).mean()) * 100.0
+
+    buckets = _bucket_analysis(probs, returns_next, split.y, buckets=task.bucket)
+    strat = strategy_stats(probs, returns_next, task.threshold, task.positioning)
+    bootstrap_ci = bootstrap_metric_cis(
+        probs,
+        split.y,
+        returns_next,
+        threshold=task.threshold,
+        positioning=task.positioning,
+        n_resamples=task.bootstrap,
+        block_size=task.block_size,
+        seed=task.seed,
+    )
+
+    entry = {
+        "ticker": ticker,
+        "split": split.name,
+        "samples": int(len(split.y)),
+        "period": {
+            "start": _format_date(split.index.min()),
+            "end": _format_date(split.index.max()),
+        },
+        "metrics": {
+            "bce_loss": float(metrics["loss"]),
+            "accuracy": float(metrics["accuracy"]),
+            "balanced_accuracy": float(metrics["balanced_accuracy"]),
+            "precision_pos1": float(metrics["precision"]),
+            "recall_pos1": float(metrics["recall"]),
+            "f1_pos1": float(metrics["f1"]),
+            "roc_auc": float(metrics["roc_auc"]),
+            "brier": float(metrics["brier"]),
+        },
+        "threshold_optimization": {
+            "best_threshold": threshold_report.best_threshold,
+            "balanced_acc_at_0_5": threshold_report.balanced_acc_at_0_5,
+            "balanced_acc_at_best": threshold_report.balanced_acc_at_best,
+            "f1_at_0_5": threshold_report.f1_at_0_5,
+            "f1_at_best": threshold_report.f1_at_best,
+        },
+        "calibration": {
+            "ece": float(ece),
+            "reliability_table": reliability,
+        },
+        "baselines": baseline_metrics,
+        "confusion_matrix": {
+            "tn": int(metrics["cm"][0, 0]),
+            "fp": int(metrics["cm"][0, 1]),
+            "fn": int(metrics["cm"][1, 0]),
+            "tp": int(metrics["cm"][1, 1]),
+        },
+        "proba_stats": {
+            "min": float(probs.min()),
+            "mean": float(probs.mean()),
+            "max": float(probs.max()),
+            "pct_ge_0_5": float(pct_above_05),
+            "pct_ge_threshold": float(pct_above_thr),
+        },
+        "bucket_analysis": buckets,
+        "strategy": {
+            "total_return": float(strat["total_return"]),
+            "annualized_return": float(strat["annualized_return"]),
+            "max_drawdown": float(strat["max_drawdown"]),
+        },
+        "bootstrap_ci": bootstrap_ci,
+        "plots": {},
+    }
+
+    return {
+        "ticker": ticker,
+        "entry": entry,
+        "logits": logits,
+        "probs": probs,
+        "y": split.y,
+        "index": split.index,
+        "returns_next": returns_next,
+        "close": df_feat["Close"].loc[split.index].astype(float),
+        "equity": strat["equity"],
+    }
+
+
+def _print_ticker_report(entry: Dict[str, object], positioning: str) -> None:
+    m = entry["metrics"]
+    thr = entry["threshold_optimization"]
+    bl = entry["baselines"]
+    strat = entry["strategy"]
+
+    _print_section(f"TICKER: {entry['ticker']} | SPLIT: {entry['split'].upper()}")
+    print(
+        f"Samples: {entry['samples']} | "
+        f"Period: {entry['period']['start']} -> {entry['period']['end']}"
+    )
+
+    _print_section("METRICS")
+    rows = [
+        ["BCE Loss", f"{m['bce_loss']:.4f}"],
+        ["Accuracy", f"{m['accuracy']:.4f}"],
+        ["Balanced Acc", f"{m['balanced_accuracy']:.4f}"],
+        ["Precision (class=1)", f"{m['precision_pos1']:.4f}"],
+        ["Recall (class=1)", f"{m['recall_pos1']:.4f}"],
+        ["F1 (class=1)", f"{m['f1_pos1']:.4f}"],
+        ["ROC-AUC", f"{m['roc_auc']:.4f}"],
+        ["Brier", f"{m['brier']:.4f}"],
+        ["ECE", f"{entry['calibration']['ece']:.4f}"],
+    ]
+    print(_format_table(["Metric", "Value"], rows))
+
+    _print_section("THRESHOLD OPTIMIZATION")
+    thr_rows = [
+        ["Best Threshold", f"{thr['best_threshold']:.2f}"],
+        ["BalAcc @ 0.5", f"{thr['balanced_acc_at_0_5']:.4f}"],
+        ["BalAcc @ Best", f"{thr['balanced_acc_at_best']:.4f}"],
+        ["F1 @ 0.5", f"{thr['f1_at_0_5']:.4f}"],
+        ["F1 @ Best", f"{thr['f1_at_best']:.4f}"],
+    ]
+    print(_format_table(["Item", "Value"], thr_rows))
+
+    _print_section("BASELINES")
+    base_rows = [
+        [label, bl[key]["accuracy"], bl[key]["balanced_accuracy"], bl[key]["roc_auc"], bl[key]["brier"]]
+        for label, key in (("Always Up", "always_up"), ("Random (strat)", "random_stratified"), ("LogReg", "log_reg"))
+    ]
+    print(_format_table(["Baseline", "Accuracy", "BalAcc", "ROC-AUC", "Brier"], base_rows))
+
+    _print_section(f"STRATEGY ({positioning.upper()})")
+    strat_rows = [
+        ["Total Return", f"{strat['total_return']:.4f}"],
+        ["Annualized Return", f"{strat['annualized_return']:.4f}"],
+        ["Max Drawdown", f"{strat['max_drawdown']:.4f}"],
+    ]
+    print(_format_table(["Item", "Value"], strat_rows))
+
+    ci = entry.get("bootstrap_ci") or {}
+    if ci:
+        meta = ci["_meta"]
+        level = int(round((1.0 - meta["alpha"]) * 100))
+        _print_section(f"BOOTSTRAP {level}% CI (n={meta['n_resamples']}, block={meta['block_size']})")
+        ci_rows = [
+            [label, f"{ci[key]['point']:.4f}", f"{ci[key]['low']:.4f}", f"{ci[key]['high']:.4f}"]
+            for label, key in (
+                ("ROC-AUC", "roc_auc"),
+                ("Balanced Acc", "balanced_accuracy"),
+                ("Brier", "brier"),
+                ("Total Return", "total_return"),
+            )
+        ]
+        print(_format_table(["Metric", "Point", "Low", "High"], ci_rows))
+
+
+def _global_report(outputs: List[Dict[str, object]], threshold: float) -> Optional[Dict[str, object]]:
+    if len(outputs) <= 1:
+        return None
+
+    g_logits = np.concatenate([o["logits"] for o in outputs])
+    g_probs = np.concatenate([o["probs"] for o in outputs])
+    g_y = np.concatenate([o["y"] for o in outputs])
+    g_metrics = compute_metrics(g_logits, g_probs, g_y, threshold)
+    g_metrics["loss"] = _bce_loss(g_logits, g_y)
+
+    per_symbol_scores = [
+        (
+            o["ticker"],
+            o["entry"]["metrics"]["balanced_accuracy"],
+            o["entry"]["metrics"]["f1_pos1"],
+            o["entry"]["metrics"]["roc_auc"],
+        )
+        for o in outputs
+    ]
+    per_symbol_scores_sorted = sorted(per_symbol_scores, key=lambda x: (x[1], x[2]), reverse=True)
+    best = per_symbol_scores_sorted[:5]
+    worst = list(reversed(per_symbol_scores_sorted[-5:]))
+
+    per_ticker_returns = [o["entry"]["strategy"]["total_return"] for o in outputs]
+    mean_ret = float(np.mean(per_ticker_returns))
+    median_ret = float(np.median(per_ticker_returns))
+    pct_positive = float(np.mean([r > 0 for r in per_ticker_returns])) * 100.0
+    agg = aggregate_equity_curves([(o["index"], o["equity"]) for o in outputs], method="union_ffill")
+
+    return {
+        "metrics": {
+            "bce_loss": float(g_metrics["loss"]),
+            "accuracy": float(g_metrics["accuracy"]),
+            "balanced_accuracy": float(g_metrics["balanced_accuracy"]),
+            "precision_pos1": float(g_metrics["precision"]),
+            "recall_pos1": float(g_metrics["recall"]),
+            "f1_pos1": float(g_metrics["f1"]),
+            "roc_auc": float(g_metrics["roc_auc"]),
+            "brier": float(g_metrics["brier"]),
+        },
+        "strategy": {
+            "total_return": float(agg["total_return"]),
+            "annualized_return": float("nan"),
+            "max_drawdown": float(agg["max_drawdown"]),
+        },
+        "strategy_aggregation": {
+            "mean_return": mean_ret,
+            "median_return": median_ret,
+            "pct_positive": pct_positive,
+            "portfolio_equal_weight_total_return": float(agg["total_return"]),
+            "portfolio_equal_weight_max_drawdown": float(agg["max_drawdown"]),
+            "method": agg["method"],
+        },
+        "top_5": [
+            {"ticker": t, "balanced_accuracy": float(bal), "f1": float(f1), "roc_auc": float(auc)}
+            for t, bal, f1, auc in best
+        ],
+        "bottom_5": [
+            {"ticker": t, "balanced_accuracy": float(bal), "f1": float(f1), "roc_auc": float(auc)}
+            for t, bal, f1, auc in worst
+        ],
+    }
+
+
+def _print_global_report(global_report: Dict[str, object]) -> None:
+    agg = global_report["strategy_aggregation"]
+    _print_section("GLOBAL STRATEGY AGGREGATION")
+    agg_rows = [
+        ["Mean Return", f"{agg['mean_return']:.4f}"],
+        ["Median Return", f"{agg['median_return']:.4f}"],
+        ["% Positive Tickers", f"{agg['pct_positive']:.2f}%"],
+        ["EQ-Weight Total Return", f"{agg['portfolio_equal_weight_total_return']:.4f}"],
+        ["EQ-Weight Max DD", f"{agg['portfolio_equal_weight_max_drawdown']:.4f}"],
+        ["Aggregation Method", str(agg["method"])],
+    ]
+    print(_format_table(["Item", "Value"], agg_rows))
+
+
+def _strategy_grid(
+    outputs_by_horizon: Dict[str, List[Dict[str, object]]],
+    out_dir: Path,
+    top_k: int,
+) -> Optional[Dict[str, object]]:
+    """Search thresholds x positioning x holding x costs over all evaluated tickers/horizons."""
+    probs = {}
+    closes: Dict[str, pd.Series] = {}
+    for key, outs in outputs_by_horizon.items():
+        for o in outs:
+            probs[(o["ticker"], key)] = pd.Series(o["probs"], index=o["index"])
+            prev = closes.get(o["ticker"])
+            closes[o["ticker"]] = o["close"] if prev is None else prev.combine_first(o["close"])
+    if not probs:
+        return None
+
+    dates, tickers, horizon_keys, proba, ret_next = build_panel(probs, closes)
+    grid = BacktestGrid(
+        thresholds=tuple(np.round(np.arange(0.40, 0.601, 0.025), 3)),
+        positionings=("long_only", "long_short"),
+        holding_periods=(1, 5, 10, 20),
+        costs_bps=(0.0, 5.0, 10.0),
+        slippage_bps=(0.0, 5.0),
+    )
+    res = run_backtest_grid(proba, ret_next, grid, dates=dates, tickers=tickers, horizons=horizon_keys, top_k=top_k)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    table_path = out_dir / "backtest_grid.csv"
+    equity_path = out_dir / "backtest_grid_top_equity.csv"
+    res.table.to_csv(table_path, index=False)
+    res.equity.to_csv(equity_path, index_label="Date")
+    return {
+        "n_configs": int(len(res.table)),
+        "table": str(table_path),
+        "top_equity": str(equity_path),
+        "top": res.table.head(top_k).to_dict(orient="records"),
+    }
+
+
+def _discover_horizons(root: Path) -> List[Tuple[str, Path, Path]]:
+    """Find runs/eval_oral/h*/ directories holding a model.yaml (and their models/)."""
+    found = []
+    for d in root.glob("h*"):
+        cfg_path = d / "model.yaml"
+        if d.is_dir() and d.name[1:].isdigit() and cfg_path.is_file():
+            found.append((d.name, cfg_path, d / "models"))
+    return sorted(found, key=lambda x: int(x[0][1:]))
+
+
+def _resolve_path(value: str) -> Path:
+    path = Path(value)
+    if not path.exists() and not path.is_absolute():
+        path = get_paths().root / path
+    return path
+
+
+def _run_tasks(tasks: List[EvalTask], workers: int, seed: int) -> List[Dict[str, object]]:
+    """Run tasks in a process pool, returning outputs in task order."""
+    if workers <= 1 or len(tasks) <= 1:
+        return [_evaluate_ticker(t) for t in tasks]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(tasks)),
+        initializer=_init_worker,
+        initargs=(seed,),
+    ) as executor:
+        return list(executor.map(_evaluate_ticker, tasks))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Eval report for oral justification.")
     parser.add_argument("--config", type=str, default=None, help="Path to model.yaml")
@@ -274,24 +680,23 @@ def main() -> None:
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--json_out", type=str, default="eval_report.json", help="Output JSON file (relative to repo root if not absolute)")
     parser.add_argument("--models_dir", type=str, default=None, help="Override models directory (per-horizon)")
+    parser.add_argument("--bootstrap", type=int, default=1000, help="Block-bootstrap resamples for metric CIs (0 = off)")
+    parser.add_argument("--block_size", type=int, default=None, help="Bootstrap block length (default: n^(1/3))")
+    parser.add_argument("--grid", action="store_true", help="Backtest a threshold/positioning/holding/cost grid on the evaluated signals")
+    parser.add_argument("--grid_top", type=int, default=10, help="Top grid configurations kept in the report")
+    parser.add_argument("--horizons_root", type=str, default=None, help="Evaluate every h*/ (model.yaml + models/) under this dir in one run")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = all CPUs, 1 = sequential)")
+    parser.add_argument("--cache_dir", type=str, default=None, help="Artifact cache (default: data/processed/cache)")
+    parser.add_argument("--no_cache", action="store_true", help="Recompute features, datasets, logits and baselines")
     parser.add_argument("--oral_mode", action="store_true", help="Print detailed diagnostics to terminal")
 
     args = parser.parse_args()
     _set_seeds(args.seed)
 
     cfg = load_configs()
-    model_cfg = cfg["model"]
-    if args.config:
-        cfg_path = Path(args.config)
-        if not cfg_path.is_file():
-            cfg_path = get_paths().root / cfg_path
-        model_cfg = load_yaml(cfg_path)
     tickers_cfg = cfg["tickers"]
     if args.tickers_config:
-        tcfg_path = Path(args.tickers_config)
-        if not tcfg_path.is_file():
-            tcfg_path = get_paths().root / tcfg_path
-        tickers_cfg = load_yaml(tcfg_path)
+        tickers_cfg = load_yaml(_resolve_path(args.tickers_config))
 
     if args.all:
         from stockpred.config import flatten_tickers
@@ -302,317 +707,154 @@ def main() -> None:
     else:
         raise SystemExit("Provide --ticker or --all.")
 
-    lookback = int(model_cfg["features"]["lookback"])
-    horizon = int(model_cfg["features"]["horizon"])
-    valid_ratio = float(model_cfg["train"]["valid_ratio"])
-    min_rows = int(model_cfg["data"]["min_rows"])
-
-    out_dir = Path(args.out_dir)
-    plot_count = 0
-
-    global_logits = []
-    global_probs = []
-    global_y = []
-    per_symbol_scores = []
-    equity_curves = []
-    per_ticker_returns = []
-    results = {
-        "config": {
-            "split": args.split,
-            "threshold": args.threshold,
-            "threshold_metric": args.threshold_metric,
-            "calibration_bins": args.calibration_bins,
-            "bucket": args.bucket,
-            "positioning": args.positioning,
-            "lookback": lookback,
-            "horizon": horizon,
-            "valid_ratio": valid_ratio,
-            "test_ratio": args.test_ratio,
-            "seed": args.seed,
-            "models_dir": args.models_dir,
-        },
-        "tickers": [],
-        "global": None,
-    }
-
-    for ticker in tickers:
-        df_raw = load_raw(ticker)
-        if df_raw.empty:
-            print(f"[warn]No cached data for {ticker}. Skipping.")
-            continue
-
-        if len(df_raw) < min_rows:
-            print(f"[warn]Not enough rows for {ticker}: {len(df_raw)}. Skipping.")
-            continue
-
-        df_feat = _build_features(model_cfg, df_raw)
-        feature_cols = _get_feature_cols(df_feat)
-
-        ds = make_windowed_dataset(
-            df=df_feat,
-            feature_cols=feature_cols,
-            lookback=lookback,
-            horizon=horizon,
-        )
-
-        if len(ds.X) == 0:
-            print(f"[warn]No usable samples for {ticker}. Skipping.")
-            continue
-
-        splits = _split_all(
-            X=ds.X,
-            y=ds.y,
-            index=ds.index,
-            valid_ratio=valid_ratio,
+    # (key, model_cfg, models_dir) per horizon to evaluate.
+    horizons: List[Tuple[str, dict, Optional[str]]] = []
+    if args.horizons_root:
+        for key, cfg_path, models_dir in _discover_horizons(_resolve_path(args.horizons_root)):
+            horizons.append((key, load_yaml(cfg_path), str(models_dir)))
+        if not horizons:
+            raise SystemExit(f"No h*/model.yaml found under {args.horizons_root}.")
+    else:
+        model_cfg = cfg["model"]
+        if args.config:
+            model_cfg = load_yaml(_resolve_path(args.config))
+        horizons.append((f"h{int(model_cfg['features']['horizon'])}", model_cfg, args.models_dir))
+
+    cache_dir = Path(args.cache_dir) if args.cache_dir else get_paths().cache
+    tasks = [
+        EvalTask(
+            horizon_key=key,
+            ticker=ticker,
+            model_cfg=model_cfg,
+            models_dir=models_dir,
+            ckpt=args.ckpt,
+            split=args.split,
             test_ratio=args.test_ratio,
+            threshold=args.threshold,
+            threshold_metric=args.threshold_metric,
+            calibration_bins=args.calibration_bins,
+            bucket=args.bucket,
+            positioning=args.positioning,
+            seed=args.seed,
+            bootstrap=args.bootstrap,
+            block_size=args.block_size,
+            cache_dir=str(cache_dir),
+            use_cache=not args.no_cache,
         )
-        split = splits[args.split]
-        train_split = splits["train"]
-
-        models_dir = Path(args.models_dir) if args.models_dir else None
-        bundle = _load_model_for_ticker(ticker, Path(args.ckpt) if args.ckpt else None, models_dir=models_dir)
-        scaler = bundle["scaler"]
-        model = bundle["model"]
-        model.eval()
-
-        X_scaled = scaler.transform(split.X)
-        x_t = torch.tensor(X_scaled, dtype=torch.float32)
-        with torch.no_grad():
-            logits = model(x_t).detach().cpu().numpy().reshape(-1)
-        probs = sigmoid(logits)
-
-        if len(probs) != len(split.y):
-            raise ValueError("Prediction size mismatch with labels.")
-
-        returns_next = _collect_returns_for_index(df_feat, split.index, horizon=horizon)
-
-        metrics = compute_metrics(logits, probs, split.y, args.threshold)
-        loss = _bce_loss(logits, split.y)
-        metrics["loss"] = loss
-        threshold_report = optimize_threshold(
-            probs,
-            split.y,
-            metric=args.threshold_metric,
-            min_thr=0.05,
-            max_thr=0.95,
-            step=0.01,
-        )
-        ece, reliability = expected_calibration_error(
-            probs, split.y, n_bins=args.calibration_bins
-        )
+        for key, model_cfg, models_dir in horizons
+        for ticker in tickers
+    ]
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    outputs = _run_tasks(tasks, workers=workers, seed=args.seed)
 
-        pos_rate_train = float(train_split.y.mean()) if len(train_split.y) else 0.0
-        baseline_metrics = {
-            "always_up": baseline_always_up(split.y),
-            "random_stratified": baseline_random(split.y, pos_rate_train, seed=args.seed),
+    multi = args.horizons_root is not None
+    out_dir = Path(args.out_dir)
+    horizon_reports: Dict[str, Dict[str, object]] = {}
+    outputs_by_horizon: Dict[str, List[Dict[str, object]]] = {}
+    for key, model_cfg, models_dir in horizons:
+        ok_outputs = []
+        for task, out in zip(tasks, outputs):
+            if task.horizon_key != key:
+                continue
+            if "skipped" in out:
+                print(f"[warn]{out['skipped']}")
+                continue
+            ok_outputs.append(out)
+        outputs_by_horizon[key] = ok_outputs
+
+        results = {
+            "config": {
+                "split": args.split,
+                "threshold": args.threshold,
+                "threshold_metric": args.threshold_metric,
+                "calibration_bins": args.calibration_bins,
+                "bucket": args.bucket,
+                "positioning": args.positioning,
+                "lookback": int(model_cfg["features"]["lookback"]),
+                "horizon": int(model_cfg["features"]["horizon"]),
+                "valid_ratio": float(model_cfg["train"]["valid_ratio"]),
+                "test_ratio": args.test_ratio,
+                "seed": args.seed,
+                "bootstrap": args.bootstrap,
+                "models_dir": models_dir,
+            },
+            "tickers": [],
+            "global": None,
         }
-        scaler_baseline = StandardScaler()
-        scaler_baseline.fit(train_split.X)
-        X_train_bl = scaler_baseline.transform(train_split.X)
-        X_eval_bl = scaler_baseline.transform(split.X)
-        baseline_metrics["log_reg"] = baseline_log_reg(
-            X_train_bl, train_split.y, X_eval_bl, split.y
-        )
-
-        global_logits.append(logits)
-        global_probs.append(probs)
-        global_y.append(split.y)
-        per_symbol_scores.append(
-            (ticker, metrics["balanced_accuracy"], metrics["f1"], metrics["roc_auc"])
-        )
 
-        pct_above_05 = float((probs >= 0.5).mean()) * 100.0
-        pct_above_thr = float((probs >= args.threshold).mean()) * 100.0
-
-        buckets = _bucket_analysis(probs, returns_next, split.y, buckets=args.bucket)
-        strat = strategy_stats(probs, returns_next, args.threshold, args.positioning)
-        equity_curves.append((split.index, strat["equity"]))
-        per_ticker_returns.append(float(strat["total_return"]))
-
-        plot_paths = {}
-        if args.plots and plot_count < args.plot_limit:
-            close = df_feat["Close"].loc[split.index]
-            plot_paths = _plot_outputs(
-                out_dir=out_dir / ticker,
-                ticker=ticker,
-                dates=split.index,
-                close=close,
-                probs=probs,
-                returns_next=returns_next,
-                threshold=args.threshold,
-                positioning=args.positioning,
+        if args.oral_mode and multi:
+            _print_section(f"HORIZON: {key}")
+        for i, out in enumerate(ok_outputs):
+            entry = out["entry"]
+            if args.plots and i < args.plot_limit:
+                plot_dir = out_dir / key if multi else out_dir
+                plot_paths = _plot_outputs(
+                    out_dir=plot_dir / out["ticker"],
+                    ticker=out["ticker"],
+                    dates=out["index"],
+                    close=out["close"],
+                    probs=out["probs"],
+                    returns_next=out["returns_next"],
+                    threshold=args.threshold,
+                    positioning=args.positioning,
+                )
+                entry["plots"] = {k: str(v) for k, v in plot_paths.items()}
+            if args.oral_mode:
+                _print_ticker_report(entry, args.positioning)
+            results["tickers"].append(entry)
+
+        results["global"] = _global_report(ok_outputs, args.threshold)
+        if args.oral_mode and results["global"] is not None:
+            _print_global_report(results["global"])
+        horizon_reports[key] = results
+
+    if multi:
+        summary = []
+        for key, results in horizon_reports.items():
+            g = results["global"]
+            src = g if g is not None else (results["tickers"][0] if results["tickers"] else None)
+            summary.append(
+                {
+                    "horizon": key,
+                    "horizon_days": results["config"]["horizon"],
+                    "n_tickers": len(results["tickers"]),
+                    "balanced_accuracy": src["metrics"]["balanced_accuracy"] if src else float("nan"),
+                    "roc_auc": src["metrics"]["roc_auc"] if src else float("nan"),
+                    "brier": src["metrics"]["brier"] if src else float("nan"),
+                    "total_return": src["strategy"]["total_return"] if src else float("nan"),
+                }
             )
-            plot_count += 1
-
+        report = {
+            "config": {
+                "horizons_root": args.horizons_root,
+                "horizons": list(horizon_reports.keys()),
+                "split": args.split,
+                "threshold": args.threshold,
+                "positioning": args.positioning,
+                "seed": args.seed,
+            },
+            "horizons": horizon_reports,
+            "summary": summary,
+        }
         if args.oral_mode:
-            _print_section(f"TICKER: {ticker} | SPLIT: {split.name.upper()}")
-            print(
-                f"Samples: {len(split.y)} | "
-                f"Period: {_format_date(split.index.min())} -> {_format_date(split.index.max())}"
-            )
-
-            _print_section("METRICS")
+            _print_section("HORIZON SUMMARY")
             rows = [
-                ["BCE Loss", f"{metrics['loss']:.4f}"],
-                ["Accuracy", f"{metrics['accuracy']:.4f}"],
-                ["Balanced Acc", f"{metrics['balanced_accuracy']:.4f}"],
-                ["Precision (class=1)", f"{metrics['precision']:.4f}"],
-                ["Recall (class=1)", f"{metrics['recall']:.4f}"],
-                ["F1 (class=1)", f"{metrics['f1']:.4f}"],
-                ["ROC-AUC", f"{metrics['roc_auc']:.4f}"],
-                ["Brier", f"{metrics['brier']:.4f}"],
-                ["ECE", f"{ece:.4f}"],
-            ]
-            print(_format_table(["Metric", "Value"], rows))
-
-            _print_section("THRESHOLD OPTIMIZATION")
-            thr_rows = [
-                ["Best Threshold", f"{threshold_report.best_threshold:.2f}"],
-                ["BalAcc @ 0.5", f"{threshold_report.balanced_acc_at_0_5:.4f}"],
-                ["BalAcc @ Best", f"{threshold_report.balanced_acc_at_best:.4f}"],
-                ["F1 @ 0.5", f"{threshold_report.f1_at_0_5:.4f}"],
-                ["F1 @ Best", f"{threshold_report.f1_at_best:.4f}"],
-            ]
-            print(_format_table(["Item", "Value"], thr_rows))
-
-            _print_section("BASELINES")
-            base_rows = [
-                ["Always Up", baseline_metrics["always_up"]["accuracy"], baseline_metrics["always_up"]["balanced_accuracy"], baseline_metrics["always_up"]["roc_auc"], baseline_metrics["always_up"]["brier"]],
-                ["Random (strat)", baseline_metrics["random_stratified"]["accuracy"], baseline_metrics["random_stratified"]["balanced_accuracy"], baseline_metrics["random_stratified"]["roc_auc"], baseline_metrics["random_stratified"]["brier"]],
-                ["LogReg", baseline_metrics["log_reg"]["accuracy"], baseline_metrics["log_reg"]["balanced_accuracy"], baseline_metrics["log_reg"]["roc_auc"], baseline_metrics["log_reg"]["brier"]],
+                [s["horizon"], s["n_tickers"], f"{s['balanced_accuracy']:.4f}", f"{s['roc_auc']:.4f}", f"{s['total_return']:.4f}"]
+                for s in summary
             ]
-            print(_format_table(["Baseline", "Accuracy", "BalAcc", "ROC-AUC", "Brier"], base_rows))
-
-            _print_section(f"STRATEGY ({args.positioning.upper()})")
-            strat_rows = [
-                ["Total Return", f"{strat['total_return']:.4f}"],
-                ["Annualized Return", f"{strat['annualized_return']:.4f}"],
-                ["Max Drawdown", f"{strat['max_drawdown']:.4f}"],
-            ]
-            print(_format_table(["Item", "Value"], strat_rows))
-
-        results["tickers"].append(
-            {
-                "ticker": ticker,
-                "split": split.name,
-                "samples": int(len(split.y)),
-                "period": {
-                    "start": _format_date(split.index.min()),
-                    "end": _format_date(split.index.max()),
-                },
-                "metrics": {
-                    "bce_loss": float(metrics["loss"]),
-                    "accuracy": float(metrics["accuracy"]),
-                    "balanced_accuracy": float(metrics["balanced_accuracy"]),
-                    "precision_pos1": float(metrics["precision"]),
-                    "recall_pos1": float(metrics["recall"]),
-                    "f1_pos1": float(metrics["f1"]),
-                    "roc_auc": float(metrics["roc_auc"]),
-                    "brier": float(metrics["brier"]),
-                },
-                "threshold_optimization": {
-                    "best_threshold": threshold_report.best_threshold,
-                    "balanced_acc_at_0_5": threshold_report.balanced_acc_at_0_5,
-                    "balanced_acc_at_best": threshold_report.balanced_acc_at_best,
-                    "f1_at_0_5": threshold_report.f1_at_0_5,
-                    "f1_at_best": threshold_report.f1_at_best,
-                },
-                "calibration": {
-                    "ece": float(ece),
-                    "reliability_table": reliability,
-                },
-                "baselines": baseline_metrics,
-                "confusion_matrix": {
-                    "tn": int(metrics["cm"][0, 0]),
-                    "fp": int(metrics["cm"][0, 1]),
-                    "fn": int(metrics["cm"][1, 0]),
-                    "tp": int(metrics["cm"][1, 1]),
-                },
-                "proba_stats": {
-                    "min": float(probs.min()),
-                    "mean": float(probs.mean()),
-                    "max": float(probs.max()),
-                    "pct_ge_0_5": float(pct_above_05),
-                    "pct_ge_threshold": float(pct_above_thr),
-                },
-                "bucket_analysis": buckets,
-                "strategy": {
-                    "total_return": float(strat["total_return"]),
-                    "annualized_return": float(strat["annualized_return"]),
-                    "max_drawdown": float(strat["max_drawdown"]),
-                },
-                "plots": {k: str(v) for k, v in plot_paths.items()},
-            }
-        )
-
-    if len(global_y) > 1:
-        g_logits = np.concatenate(global_logits)
-        g_probs = np.concatenate(global_probs)
-        g_y = np.concatenate(global_y)
-        g_metrics = compute_metrics(g_logits, g_probs, g_y, args.threshold)
-        g_loss = _bce_loss(g_logits, g_y)
-        g_metrics["loss"] = g_loss
-
-        per_symbol_scores_sorted = sorted(
-            per_symbol_scores, key=lambda x: (x[1], x[2]), reverse=True
-        )
-        best = per_symbol_scores_sorted[:5]
-        worst = list(reversed(per_symbol_scores_sorted[-5:]))
-
-        mean_ret = float(np.mean(per_ticker_returns)) if per_ticker_returns else float("nan")
-        median_ret = float(np.median(per_ticker_returns)) if per_ticker_returns else float("nan")
-        pct_positive = (
-            float(np.mean([r > 0 for r in per_ticker_returns])) * 100.0
-            if per_ticker_returns
-            else float("nan")
-        )
-        agg = aggregate_equity_curves(equity_curves, method="union_ffill")
-
-        results["global"] = {
-            "metrics": {
-                "bce_loss": float(g_metrics["loss"]),
-                "accuracy": float(g_metrics["accuracy"]),
-                "balanced_accuracy": float(g_metrics["balanced_accuracy"]),
-                "precision_pos1": float(g_metrics["precision"]),
-                "recall_pos1": float(g_metrics["recall"]),
-                "f1_pos1": float(g_metrics["f1"]),
-                "roc_auc": float(g_metrics["roc_auc"]),
-                "brier": float(g_metrics["brier"]),
-            },
-            "strategy": {
-                "total_return": float(agg["total_return"]),
-                "annualized_return": float("nan"),
-                "max_drawdown": float(agg["max_drawdown"]),
-            },
-            "strategy_aggregation": {
-                "mean_return": mean_ret,
-                "median_return": median_ret,
-                "pct_positive": pct_positive,
-                "portfolio_equal_weight_total_return": float(agg["total_return"]),
-                "portfolio_equal_weight_max_drawdown": float(agg["max_drawdown"]),
-                "method": agg["method"],
-            },
-            "top_5": [
-                {"ticker": t, "balanced_accuracy": float(bal), "f1": float(f1), "roc_auc": float(auc)}
-                for t, bal, f1, auc in best
-            ],
-            "bottom_5": [
-                {"ticker": t, "balanced_accuracy": float(bal), "f1": float(f1), "roc_auc": float(auc)}
-                for t, bal, f1, auc in worst
-            ],
-        }
+            print(_format_table(["Horizon", "Tickers", "BalAcc", "ROC-AUC", "Total Return"], rows))
+    else:
+        report = next(iter(horizon_reports.values()))
 
-        if args.oral_mode:
-            _print_section("GLOBAL STRATEGY AGGREGATION")
-            agg_rows = [
-                ["Mean Return", f"{mean_ret:.4f}"],
-                ["Median Return", f"{median_ret:.4f}"],
-                ["% Positive Tickers", f"{pct_positive:.2f}%"],
-                ["EQ-Weight Total Return", f"{agg['total_return']:.4f}"],
-                ["EQ-Weight Max DD", f"{agg['max_drawdown']:.4f}"],
-                ["Aggregation Method", str(agg["method"])],
+    if args.grid:
+        report["backtest_grid"] = _strategy_grid(outputs_by_horizon, out_dir, top_k=args.grid_top)
+        if args.oral_mode and report["backtest_grid"]:
+            _print_section("STRATEGY GRID (TOP)")
+            rows = [
+                [r["horizon"], f"{r['threshold']:.3f}", r["positioning"], r["holding"], f"{r['cost_bps']:g}+{r['slippage_bps']:g}", f"{r['total_return']:.4f}", f"{r['sharpe']:.2f}", f"{r['max_drawdown']:.4f}"]
+                for r in report["backtest_grid"]["top"]
             ]
-            print(_format_table(["Item", "Value"], agg_rows))
+            print(_format_table(["Horizon", "Thr", "Positioning", "Hold", "Cost bps", "Total Return", "Sharpe", "Max DD"], rows))
 
     json_path = Path(args.json_out)
     if not json_path.is_absolute():
@@ -620,7 +862,7 @@ def main() -> None:
     json_path.parent.mkdir(parents=True, exist_ok=True)
     import json as _json
 
-    json_path.write_text(_json.dumps(results, indent=2), encoding="utf-8")
+    json_path.write_text(_json.dumps(report, indent=2), encoding="utf-8")
     print(f"[ok]Wrote JSON report: {json_path}")
 
 
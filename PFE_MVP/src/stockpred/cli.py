@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import sys
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
@@ -16,23 +17,96 @@ from stockpred.utils.logging import console
 from stockpred.utils.paths import get_paths
 
 
-def _run_stock_pattern(args: list[str]) -> None:
-    import runpy
-    sp_init = get_paths().root / "stock-pattern" / "src" / "init.py"
-    if not sp_init.exists():
-        console.print(f"[err]stock-pattern not found: {sp_init}[/err]")
-        return
-    sp_src = sp_init.parent
-    prev_argv = sys.argv[:]
-    prev_sys_path = sys.path[:]
-    sys.argv = ["init.py", *args]
-    try:
-        # Ensure stock-pattern/src is importable for "import utils" etc.
+def _stock_pattern_src() -> Path:
+    """Add stock-pattern/src to sys.path, so its modules (scanner, outcomes,
+    loaders) can be imported. They are flat modules, not a package."""
+    sp_src = get_paths().root / "stock-pattern" / "src"
+    if str(sp_src) not in sys.path:
         sys.path.insert(0, str(sp_src))
-        runpy.run_path(str(sp_init), run_name="__main__")
-    finally:
-        sys.argv = prev_argv
-        sys.path = prev_sys_path
+    return sp_src
+
+
+def scan_pattern_frames(
+    frames: dict[str, pd.DataFrame],
+    tf: str = "daily",
+    config: Optional[Path] = None,
+    summary: bool = False,
+    keys: Optional[list[str]] = None,
+) -> list[dict]:
+    """
+    Scan all stock-pattern detectors on DataFrames already in memory.
+
+    Writes the candle and pattern JSON files read by the dashboard, as
+    `stock-pattern/src/init.py --scan-all` does, records the patterns in the
+    state store (see stock-pattern/src/statestore.py) and returns the
+    detected patterns. `tf` may list several timeframes, ex: "daily,weekly,monthly".
+    They are all resampled from the same daily frames, with files per
+    timeframe. `keys` are detector keys or groups, all detectors by default.
+    """
+    import json
+
+    sp_src = _stock_pattern_src()
+
+    import scanner
+    from loaders.FrameLoader import FrameLoader
+    from outcomes import OutcomeStore, get_db_path
+    from statestore import StateStore, get_db_path as get_state_db_path
+
+    cfg_path = config or (get_paths().root / "configs" / "stock-pattern.json")
+    sp_cfg = json.loads(cfg_path.read_text(encoding="utf-8"))
+
+    tfs = tuple(dict.fromkeys(t.strip() for t in tf.split(",") if t.strip()))
+    loader = FrameLoader(sp_cfg, tfs[0], frames=frames)
+
+    out_root = Path(sp_cfg["SAVE_FOLDER"]).expanduser().resolve() if sp_cfg.get("SAVE_FOLDER") else sp_src
+    syms = list(frames)
+    keys = tuple(dict.fromkeys(keys)) if keys else tuple(scanner.DETECTORS)
+
+    found = scanner.scan_timeframes(
+        syms,
+        keys,
+        loader,
+        tfs,
+        sp_cfg,
+        candle_dir=out_root / "candles",
+    )
+
+    db_path = get_db_path(sp_cfg)
+    all_patterns: list[dict] = []
+
+    # Current patterns of each symbol, read by the dashboard. Kept next
+    # to the pattern files, unless the config sets STATE_DB.
+    state_path = (
+        get_state_db_path(sp_cfg)
+        if sp_cfg.get("STATE_DB")
+        else out_root / "state" / "patterns.db"
+    )
+
+    with StateStore(state_path) as state:
+        for t in tfs:
+            patterns = [p for key in keys for p in found[t][key]]
+
+            if patterns and db_path.exists():
+                with OutcomeStore(db_path) as store:
+                    store.annotate(patterns, t)
+
+            meta = {"timeframe": t, "end_date": None, "config": str(cfg_path)}
+            scanner.write_pattern_files(patterns, syms, out_root / "patterns", t, meta)
+
+            # After the pattern files: the dashboard reads the state only if its
+            # last run is as recent as the files
+            state.update(found[t], syms, t, datetime.now().isoformat())
+
+            if summary:
+                if len(tfs) > 1:
+                    console.print(f"[info]{t}[/info]")
+                scanner.print_summary(patterns + [meta] if patterns else [])
+
+            all_patterns.extend(patterns)
+
+    console.print(f"[info]Got {len(all_patterns)} patterns | output={out_root / 'patterns'}[/info]")
+    return all_patterns
+
 
 app = typer.Typer(add_completion=False)
 
@@ -276,26 +350,30 @@ def bootstrap(
 
 @app.command("scan-patterns")
 def scan_patterns(
-    tf: str = typer.Option("daily", "--tf", help="Timeframe: daily/weekly/monthly"),
+    tf: str = typer.Option("daily", "--tf", help="Timeframe: daily/weekly/monthly/quarterly, or a comma separated list"),
     sym: Optional[list[str]] = typer.Option(None, "--sym", help="Space separated list of symbols"),
-    scan_all: bool = typer.Option(True, "--scan-all", help="Scan all patterns"),
+    scan_all: bool = typer.Option(True, "--scan-all/--no-scan-all", help="Scan all patterns, or only --pattern"),
+    pattern: Optional[list[str]] = typer.Option(None, "--pattern", help="Detector key or group to scan with --no-scan-all, ex: vcpu, trng. Repeat for several"),
     summary: bool = typer.Option(True, "--summary", help="Print summary"),
     config: Optional[Path] = typer.Option(None, "--config", help="Path to stock-pattern config"),
 ):
     cfg = load_configs()
     watchlist_path = get_paths().root / "configs" / "watchlist.txt"
     if sym is None:
-        tickers = [_safe_ticker_dir_name(t) for t in _ticker_list(cfg)]
-        watchlist_path.write_text("\n".join(tickers) + "\n", encoding="utf-8")
-    cfg_path = config or (get_paths().root / "configs" / "stock-pattern.json")
-    args: list[str] = ["--tf", tf, "--config", str(cfg_path)]
-    if sym:
-        args.extend(["--sym", *sym])
-    if scan_all:
-        args.append("--scan-all")
-    if summary:
-        args.append("--summary")
-    _run_stock_pattern(args)
+        sym = [_safe_ticker_dir_name(t) for t in _ticker_list(cfg)]
+        watchlist_path.write_text("\n".join(sym) + "\n", encoding="utf-8")
+    if not scan_all and not pattern:
+        raise typer.BadParameter("--no-scan-all requires at least one --pattern")
+
+    frames = {}
+    for t in sym:
+        df = load_raw(t)
+        if df.empty:
+            console.print(f"[warn]No cached data for {t}. Run fetch first.[/warn]")
+        frames[_safe_ticker_dir_name(t)] = df
+
+    keys = None if scan_all else [p.strip().lower() for p in pattern]
+    return scan_pattern_frames(frames, tf=tf, config=config, summary=summary, keys=keys)
 
 
 @app.command("run-all")
@@ -304,7 +382,7 @@ def run_all(
     all_: bool = typer.Option(False, "--all", help="Run for all tickers from configs/tickers.yaml"),
     skip_train: bool = typer.Option(False, "--skip-train", help="Skip training after fetch"),
     skip_predict: bool = typer.Option(False, "--skip-predict", help="Skip predictions after train"),
-    tf: str = typer.Option("daily", "--tf", help="Timeframe: daily/weekly/monthly"),
+    tf: str = typer.Option("daily", "--tf", help="Timeframe: daily/weekly/monthly/quarterly, or a comma separated list"),
     summary: bool = typer.Option(True, "--summary", help="Print pattern scan summary"),
 ):
     bootstrap(ticker=ticker, all_=all_, skip_train=skip_train, skip_predict=skip_predict)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from stockpred.data.yahoo import load_raw, raw_path_for
+from stockpred.features.dataset import make_windowed_dataset
+from stockpred.features.ta import compute_ta_features
+from stockpred.utils.cache import ArtifactCache, file_fingerprint, fingerprint
+
+
+def model_feature_cols(df: pd.DataFrame) -> List[str]:
+    drop_cols = {"Adj Close"}
+    feature_cols = [c for c in df.columns if c not in drop_cols]
+    price_cols = {"Open", "High", "Low", "Close", "Volume"}
+    return [c for c in feature_cols if c not in price_cols]
+
+
+def load_features(ticker: str, dropna: bool, cache: ArtifactCache) -> Tuple[Optional[pd.DataFrame], int, str]:
+    """
+    TA features for a ticker, cached by the raw CSV fingerprint.
+    Returns (df_feat, n_raw_rows, features_key); df_feat is None if raw data is missing.
+    """
+    raw_fp = file_fingerprint(raw_path_for(ticker))
+    if raw_fp is None:
+        return None, 0, ""
+    key = fingerprint("features", ticker, raw_fp, bool(dropna))
+    cached = cache.load_pickle("features", key)
+    if cached is not None:
+        return cached["df_feat"], int(cached["n_raw"]), key
+
+    df_raw = load_raw(ticker)
+    df_feat = compute_ta_features(df_raw).copy()
+    if dropna:
+        df_feat.dropna(inplace=True)
+    cache.save_pickle("features", key, {"df_feat": df_feat, "n_raw": len(df_raw)})
+    return df_feat, len(df_raw), key
+
+
+def dataset_key(features_key: str, feature_cols: List[str], lookback: int, horizon: int) -> str:
+    return fingerprint("dataset", features_key, feature_cols, lookback, horizon)
+
+
+def load_dataset(
+    df_feat: pd.DataFrame,
+    feature_cols: List[str],
+    lookback: int,
+    horizon: int,
+    key: str,
+    cache: ArtifactCache,
+    with_X: bool = True,
+) -> Dict[str, np.ndarray]:
+    """
+    Windowed arrays {X, y, index} for `key` (see dataset_key). With with_X=False only
+    y/index are read back from the cache, which skips the large feature matrix.
+    """
+    cached = cache.load_arrays("dataset", key, keys=None if with_X else ("y", "index"))
+    if cached is not None:
+        return cached
+
+    ds = make_windowed_dataset(df=df_feat, feature_cols=feature_cols, lookback=lookback, horizon=horizon)
+    arrays = {
+        "X": ds.X,
+        "y": ds.y,
+        "index": ds.index.values.astype("datetime64[ns]"),
+    }
+    cache.save_arrays("dataset", key, **arrays)
+    return arrays
@@ -3,7 +3,7 @@ from __future__ import annotations
 import pickle
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -32,48 +32,57 @@ def _train_valid_split(X: np.ndarray, y: np.ndarray, valid_ratio: float) -> Tupl
     return X[:n_train], y[:n_train], X[n_train:], y[n_train:]
 
 
-def train_direction_model(
-    ticker: str,
-    df_feat: pd.DataFrame,
-    feature_cols: List[str],
-    lookback: int,
-    horizon: int,
+@dataclass
+class FitResult:
+    model: MLPDirection
+    scaler: StandardScaler
+    state: Dict[str, torch.Tensor]
+    valid_loss: float
+    pos_weight: float
+    n_pos: int
+    n_neg: int
+    device: torch.device
+
+
+def fit_direction_model(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_valid: np.ndarray,
+    y_valid: np.ndarray,
     hidden_sizes: List[int],
     dropout: float,
     epochs: int,
     batch_size: int,
     lr: float,
     weight_decay: float,
-    valid_ratio: float,
     early_stop_patience: int,
-    out_dir: Path,
-    seed: int = 42,
-) -> TrainArtifacts:
-    torch.manual_seed(seed)
-    np.random.seed(seed)
-
-    ds = make_windowed_dataset(df_feat, feature_cols, lookback=lookback, horizon=horizon)
-    if len(ds.X) < 200:
-        raise ValueError(f"Not enough training samples for {ticker}: {len(ds.X)}")
-
-    X_train, y_train, X_valid, y_valid = _train_valid_split(ds.X, ds.y, valid_ratio=valid_ratio)
-
+    init_state: Optional[Dict[str, torch.Tensor]] = None,
+    verbose: bool = True,
+) -> FitResult:
+    """
+    Fit scaler + MLP on already windowed arrays (no I/O). `init_state` warm-starts
+    the network from previous weights (ex: the previous walk-forward fold).
+    """
     scaler = StandardScaler()
     scaler.fit(X_train)
     X_train = scaler.transform(X_train)
     X_valid = scaler.transform(X_valid)
 
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    console.print(
-        f"[info]Training on {device} | samples train={len(X_train)} valid={len(X_valid)} | scaler fit on train only[/info]"
-    )
+    if verbose:
+        console.print(
+            f"[info]Training on {device} | samples train={len(X_train)} valid={len(X_valid)} | scaler fit on train only[/info]"
+        )
 
     model = MLPDirection(MLPConfig(input_dim=X_train.shape[1], hidden_sizes=hidden_sizes, dropout=dropout)).to(device)
+    if init_state is not None:
+        model.load_state_dict(init_state)
     opt = torch.optim.AdamW(model.parameters(), lr=lr, weight_decay=weight_decay)
     n_pos = int(np.sum(y_train))
     n_neg = int(len(y_train) - n_pos)
     pos_weight = float(n_neg / max(n_pos, 1))
-    console.print(f"[info]Class balance | n_pos={n_pos} n_neg={n_neg} pos_weight={pos_weight:.4f}[/info]")
+    if verbose:
+        console.print(f"[info]Class balance | n_pos={n_pos} n_neg={n_neg} pos_weight={pos_weight:.4f}[/info]")
 
     loss_fn = torch.nn.BCEWithLogitsLoss(
         pos_weight=torch.tensor(pos_weight, dtype=torch.float32, device=device)
@@ -111,7 +120,8 @@ def train_direction_model(
             yv = torch.tensor(y_valid, dtype=torch.float32, device=device)
             val_loss = loss_fn(model(xv), yv).item()
 
-        console.print(f"[dim]epoch {ep:02d} | train={np.mean(tr_losses):.4f} | valid={val_loss:.4f}[/dim]")
+        if verbose:
+            console.print(f"[dim]epoch {ep:02d} | train={np.mean(tr_losses):.4f} | valid={val_loss:.4f}[/dim]")
 
         if val_loss < best_val - 1e-4:
             best_val = val_loss
@@ -120,12 +130,73 @@ def train_direction_model(
         else:
             patience += 1
             if patience >= early_stop_patience:
-                console.print("[warn]Early stopping[/warn]")
+                if verbose:
+                    console.print("[warn]Early stopping[/warn]")
                 break
 
     if best_state is None:
         best_state = {k: v.detach().cpu() for k, v in model.state_dict().items()}
 
+    model.load_state_dict(best_state)
+    model.eval()
+    return FitResult(
+        model=model,
+        scaler=scaler,
+        state=best_state,
+        valid_loss=float(best_val),
+        pos_weight=pos_weight,
+        n_pos=n_pos,
+        n_neg=n_neg,
+        device=device,
+    )
+
+
+def train_direction_model(
+    ticker: str,
+    df_feat: pd.DataFrame,
+    feature_cols: List[str],
+    lookback: int,
+    horizon: int,
+    hidden_sizes: List[int],
+    dropout: float,
+    epochs: int,
+    batch_size: int,
+    lr: float,
+    weight_decay: float,
+    valid_ratio: float,
+    early_stop_patience: int,
+    out_dir: Path,
+    seed: int = 42,
+) -> TrainArtifacts:
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+
+    ds = make_windowed_dataset(df_feat, feature_cols, lookback=lookback, horizon=horizon)
+    if len(ds.X) < 200:
+        raise ValueError(f"Not enough training samples for {ticker}: {len(ds.X)}")
+
+    X_train, y_train, X_valid, y_valid = _train_valid_split(ds.X, ds.y, valid_ratio=valid_ratio)
+    fit = fit_direction_model(
+        X_train,
+        y_train,
+        X_valid,
+        y_valid,
+        hidden_sizes=hidden_sizes,
+        dropout=dropout,
+        epochs=epochs,
+        batch_size=batch_size,
+        lr=lr,
+        weight_decay=weight_decay,
+        early_stop_patience=early_stop_patience,
+    )
+    scaler = fit.scaler
+    best_state = fit.state
+    best_val = fit.valid_loss
+    device = fit.device
+    pos_weight = fit.pos_weight
+    n_pos = fit.n_pos
+    n_neg = fit.n_neg
+
     model_dir = out_dir / ticker
     model_dir.mkdir(parents=True, exist_ok=True)
 
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import torch
+
+from stockpred.features.cached import dataset_key, load_dataset, load_features, model_feature_cols
+from stockpred.models.train import _train_valid_split, fit_direction_model
+from stockpred.utils.cache import ArtifactCache
+from stockpred.utils.eval_utils import compute_metrics, sigmoid
+from stockpred.utils.logging import console
+
+
+@dataclass
+class WalkForwardConfig:
+    n_folds: int = 5
+    test_size: Optional[int] = None  # samples per out-of-sample fold (default: split evenly)
+    mode: str = "expanding"  # expanding | rolling
+    train_size: int = 1000  # rolling window length (samples)
+    min_train: int = 200
+    gap: Optional[int] = None  # embargo between train and test (default: horizon)
+    warm_start: bool = False
+
+
+@dataclass(frozen=True)
+class Fold:
+    fold: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def make_folds(n: int, cfg: WalkForwardConfig, horizon: int) -> List[Fold]:
+    """
+    Chronological folds over n windowed samples. The last n_folds * test_size samples are
+    tiled by test windows; train windows end `gap` samples before each test window so that
+    training labels (which look `horizon` days ahead) never overlap the test period.
+    """
+    gap = horizon if cfg.gap is None else int(cfg.gap)
+    test_size = cfg.test_size or (n - cfg.min_train - gap) // max(cfg.n_folds, 1)
+    if test_size <= 0:
+        return []
+    first_test = n - cfg.n_folds * test_size
+
+    folds = []
+    for k in range(cfg.n_folds):
+        test_start = first_test + k * test_size
+        train_end = test_start - gap
+        train_start = 0 if cfg.mode == "expanding" else max(0, train_end - cfg.train_size)
+        if train_end - train_start < cfg.min_train:
+            continue
+        folds.append(Fold(k, train_start, train_end, test_start, test_start + test_size))
+    return folds
+
+
+@dataclass(frozen=True)
+class _FoldTask:
+    ticker: str
+    dataset_key: str
+    cache_dir: str
+    folds: tuple
+    train_cfg: dict
+    valid_ratio: float
+    seed: int
+
+
+def _init_worker() -> None:
+    torch.set_num_threads(1)
+
+
+def _run_folds(task: _FoldTask) -> List[Dict[str, object]]:
+    """
+    Train/score a sequence of folds of one ticker. Arrays come from the shared cache so
+    folds never rebuild features or windows. Folds in one task are run in order, which is
+    what allows warm-starting each fold from the previous one.
+    """
+    cache = ArtifactCache(Path(task.cache_dir))
+    arrays = cache.load_arrays("dataset", task.dataset_key)
+    if arrays is None:
+        raise FileNotFoundError(f"Missing cached dataset for {task.ticker}: {task.dataset_key}")
+    X, y = arrays["X"], arrays["y"]
+
+    out = []
+    prev_state = None
+    for fold in task.folds:
+        torch.manual_seed(task.seed + fold.fold)
+        np.random.seed(task.seed + fold.fold)
+
+        X_tr, y_tr, X_va, y_va = _train_valid_split(
+            X[fold.train_start : fold.train_end], y[fold.train_start : fold.train_end], task.valid_ratio
+        )
+        fit = fit_direction_model(
+            X_tr,
+            y_tr,
+            X_va,
+            y_va,
+            init_state=prev_state if task.train_cfg.get("warm_start") else None,
+            verbose=False,
+            **{k: v for k, v in task.train_cfg.items() if k != "warm_start"},
+        )
+        prev_state = fit.state
+
+        X_te = fit.scaler.transform(X[fold.test_start : fold.test_end])
+        with torch.no_grad():
+            logits = fit.model(torch.tensor(X_te, dtype=torch.float32, device=fit.device)).cpu().numpy().reshape(-1)
+        out.append({"fold": fold, "logits": logits, "valid_loss": fit.valid_loss})
+    return out
+
+
+def _fold_metrics(logits: np.ndarray, y: np.ndarray, threshold: float) -> Dict[str, float]:
+    probs = sigmoid(logits)
+    m = compute_metrics(logits, probs, y, threshold)
+    return {
+        "accuracy": float(m["accuracy"]),
+        "balanced_accuracy": float(m["balanced_accuracy"]),
+        "f1_pos1": float(m["f1"]),
+        "roc_auc": float(m["roc_auc"]),
+        "brier": float(m["brier"]),
+    }
+
+
+def run_walk_forward(
+    tickers: List[str],
+    model_cfg: dict,
+    wf_cfg: WalkForwardConfig,
+    cache_dir: Path,
+    workers: int = 1,
+    threshold: float = 0.5,
+    seed: int = 42,
+) -> Dict[str, Dict[str, object]]:
+    """
+    Walk-forward train/score for each ticker. Returns, per ticker:
+      - predictions: DataFrame (index=date) with fold, proba_up, y, stitched across folds
+      - folds: per-fold periods, sizes and metrics
+      - metrics: metrics of the stitched out-of-sample series
+    Folds of all tickers run in one process pool (one task per fold, or one task per
+    ticker when warm-starting since each fold then depends on the previous one).
+    """
+    cache = ArtifactCache(cache_dir)
+    lookback = int(model_cfg["features"]["lookback"])
+    horizon = int(model_cfg["features"]["horizon"])
+    dropna = bool(model_cfg["features"].get("dropna", True))
+    min_rows = int(model_cfg["data"]["min_rows"])
+    train_cfg = {
+        "hidden_sizes": list(model_cfg["model"]["hidden_sizes"]),
+        "dropout": float(model_cfg["model"]["dropout"]),
+        "epochs": int(model_cfg["train"]["epochs"]),
+        "batch_size": int(model_cfg["train"]["batch_size"]),
+        "lr": float(model_cfg["train"]["lr"]),
+        "weight_decay": float(model_cfg["train"]["weight_decay"]),
+        "early_stop_patience": int(model_cfg["train"]["early_stop_patience"]),
+        "warm_start": wf_cfg.warm_start,
+    }
+    valid_ratio = float(model_cfg["train"]["valid_ratio"])
+
+    tasks: List[_FoldTask] = []
+    meta: Dict[str, Dict[str, object]] = {}
+    for ticker in tickers:
+        df_feat, n_raw, features_key = load_features(ticker, dropna, cache)
+        if df_feat is None or n_raw < min_rows:
+            console.print(f"[warn]Not enough cached data for {ticker}. Skipping.[/warn]")
+            continue
+        feature_cols = model_feature_cols(df_feat)
+        key = dataset_key(features_key, feature_cols, lookback, horizon)
+        arrays = load_dataset(df_feat, feature_cols, lookback, horizon, key, cache, with_X=False)
+        folds = make_folds(len(arrays["y"]), wf_cfg, horizon)
+        if not folds:
+            console.print(f"[warn]Not enough samples for walk-forward on {ticker}. Skipping.[/warn]")
+            continue
+        meta[ticker] = {"y": arrays["y"], "index": pd.DatetimeIndex(arrays["index"])}
+        groups = [tuple(folds)] if wf_cfg.warm_start else [(f,) for f in folds]
+        for group in groups:
+            tasks.append(_FoldTask(ticker, key, str(cache_dir), group, train_cfg, valid_ratio, seed))
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker) as executor:
+            task_outputs = list(executor.map(_run_folds, tasks))
+    else:
+        task_outputs = [_run_folds(t) for t in tasks]
+
+    per_ticker: Dict[str, List[Dict[str, object]]] = {}
+    for task, outs in zip(tasks, task_outputs):
+        per_ticker.setdefault(task.ticker, []).extend(outs)
+
+    results: Dict[str, Dict[str, object]] = {}
+    for ticker, outs in per_ticker.items():
+        outs = sorted(outs, key=lambda o: o["fold"].fold)
+        y_all, index = meta[ticker]["y"], meta[ticker]["index"]
+        frames = []
+        fold_reports = []
+        for o in outs:
+            fold = o["fold"]
+            y_fold = y_all[fold.test_start : fold.test_end]
+            frames.append(
+                pd.DataFrame(
+                    {"fold": fold.fold, "proba_up": sigmoid(o["logits"]), "y": y_fold},
+                    index=index[fold.test_start : fold.test_end],
+                )
+            )
+            fold_reports.append(
+                {
+                    **asdict(fold),
+                    "train_period": [str(index[fold.train_start].date()), str(index[fold.train_end - 1].date())],
+                    "test_period": [str(index[fold.test_start].date()), str(index[fold.test_end - 1].date())],
+                    "valid_loss": float(o["valid_loss"]),
+                    "metrics": _fold_metrics(o["logits"], y_fold, threshold),
+                }
+            )
+        predictions = pd.concat(frames).sort_index()
+        logits_all = np.concatenate([o["logits"] for o in outs])
+        results[ticker] = {
+            "predictions": predictions,
+            "folds": fold_reports,
+            "metrics": _fold_metrics(logits_all, predictions["y"].to_numpy(), threshold),
+        }
+    return results
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+POSITIONING_SHORT_VALUE = {"long_only": 0.0, "long_short": -1.0}
+
+
+@dataclass
+class BacktestGrid:
+    thresholds: Sequence[float] = (0.5,)
+    positionings: Sequence[str] = ("long_only",)
+    holding_periods: Sequence[int] = (1,)
+    costs_bps: Sequence[float] = (0.0,)
+    slippage_bps: Sequence[float] = (0.0,)
+
+
+@dataclass
+class BacktestResult:
+    table: pd.DataFrame
+    equity: pd.DataFrame
+    dates: pd.DatetimeIndex
+    tickers: List[str] = field(default_factory=list)
+    horizons: List[str] = field(default_factory=list)
+
+
+def build_panel(
+    probs: Dict[Tuple[str, str], pd.Series],
+    close: Dict[str, pd.Series],
+) -> Tuple[pd.DatetimeIndex, List[str], List[str], np.ndarray, np.ndarray]:
+    """
+    Align per (ticker, horizon) probability series and per-ticker closes on one date axis.
+
+    Returns (dates, tickers, horizons, proba[D, T, H], ret_next[D, T]) where ret_next[t]
+    is the close-to-close return from t to the next date. Missing values are NaN.
+    """
+    tickers = sorted({t for t, _ in probs})
+    horizons = sorted({h for _, h in probs}, key=lambda h: (len(h), h))
+    close_df = pd.concat({t: close[t].astype(float) for t in tickers}, axis=1).sort_index()
+    dates = close_df.index
+
+    ret_next = (close_df.shift(-1) / close_df - 1.0).to_numpy(dtype=np.float64)
+    proba = np.full((len(dates), len(tickers), len(horizons)), np.nan)
+    t_pos = {t: i for i, t in enumerate(tickers)}
+    h_pos = {h: i for i, h in enumerate(horizons)}
+    for (t, h), s in probs.items():
+        aligned = s.reindex(dates)
+        proba[:, t_pos[t], h_pos[h]] = aligned.to_numpy(dtype=np.float64)
+    return dates, tickers, horizons, proba, ret_next
+
+
+def _holding_positions(signals: np.ndarray, holding_periods: Sequence[int]) -> np.ndarray:
+    """
+    Overlapping-tranche positions along the date axis (axis=-3 of signals[..., D, T, H]).
+    With holding period k, 1/k of capital enters on each signal and stays for k days,
+    so the position is the trailing k-day mean of signals.
+    """
+    axis = signals.ndim - 3
+    cs = np.cumsum(signals, axis=axis)
+    out = []
+    for k in holding_periods:
+        k = int(max(1, k))
+        lagged = np.zeros_like(cs)
+        if k < cs.shape[axis]:
+            src = [slice(None)] * cs.ndim
+            dst = [slice(None)] * cs.ndim
+            src[axis] = slice(0, cs.shape[axis] - k)
+            dst[axis] = slice(k, None)
+            lagged[tuple(dst)] = cs[tuple(src)]
+        out.append((cs - lagged) / k)
+    return np.stack(out, axis=axis)
+
+
+def run_backtest_grid(
+    proba: np.ndarray,
+    ret_next: np.ndarray,
+    grid: BacktestGrid,
+    dates: Optional[pd.DatetimeIndex] = None,
+    tickers: Optional[List[str]] = None,
+    horizons: Optional[List[str]] = None,
+    top_k: int = 5,
+    rank_by: str = "sharpe",
+    periods_per_year: int = 252,
+) -> BacktestResult:
+    """
+    Evaluate every (threshold, positioning, holding, cost, slippage, horizon) combination
+    as an equal-weight portfolio over tickers, in one broadcasted computation.
+
+    proba: [D, T, H] P(up) (NaN = no signal), ret_next: [D, T] next-day returns.
+    Costs are charged in bps on turnover |pos[t] - pos[t-1]|.
+    """
+    proba = np.asarray(proba, dtype=np.float64)
+    ret_next = np.asarray(ret_next, dtype=np.float64)
+    n_dates, n_tickers, n_horizons = proba.shape
+    dates = dates if dates is not None else pd.RangeIndex(n_dates)
+    tickers = tickers or [str(i) for i in range(n_tickers)]
+    horizons = horizons or [f"h{i}" for i in range(n_horizons)]
+
+    thr = np.asarray(grid.thresholds, dtype=np.float64)
+    short_val = np.asarray([POSITIONING_SHORT_VALUE[p] for p in grid.positionings])
+    cost_pairs = list(product(grid.costs_bps, grid.slippage_bps))
+    cost_rate = np.asarray([(c + s) / 1e4 for c, s in cost_pairs])
+
+    valid = np.isfinite(proba) & np.isfinite(ret_next)[:, :, None]
+    ret = np.where(np.isfinite(ret_next), ret_next, 0.0)[:, :, None]
+
+    # signals: [Th, P, D, T, H]
+    above = proba[None, ...] >= thr[:, None, None, None]
+    signals = np.where(above[:, None], 1.0, short_val[None, :, None, None, None])
+    signals = np.where(valid[None, None], signals, 0.0)
+
+    # positions: [Th, P, K, D, T, H]
+    pos = _holding_positions(signals, grid.holding_periods)
+    prev = np.concatenate([np.zeros_like(pos[..., :1, :, :]), pos[..., :-1, :, :]], axis=-3)
+    turnover = np.abs(pos - prev)
+
+    n_active = np.maximum(valid.sum(axis=1), 1)  # [D, H]
+    gross = (pos * ret * valid).sum(axis=-2) / n_active  # [Th, P, K, D, H]
+    turn = (turnover * valid).sum(axis=-2) / n_active
+    exposure = (np.abs(pos) * valid).sum(axis=-2) / n_active
+
+    # Costs are linear in turnover: broadcast the cost axis last. net: [Th, P, K, C, D, H]
+    net = gross[:, :, :, None] - turn[:, :, :, None] * cost_rate[None, None, None, :, None, None]
+
+    equity = np.cumprod(1.0 + net, axis=-2)
+    total = equity[..., -1, :] - 1.0
+    drawdown = equity / np.maximum.accumulate(equity, axis=-2) - 1.0
+    mean = net.mean(axis=-2)
+    std = net.std(axis=-2, ddof=1) if n_dates > 1 else np.full_like(mean, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), np.nan)
+        ann = np.where(total > -1.0, (1.0 + total) ** (periods_per_year / max(n_dates, 1)) - 1.0, -1.0)
+
+    shape = net.shape[:4] + (n_horizons,)
+    ti, pi, ki, ci, hi = (a.ravel() for a in np.indices(shape))
+    table = pd.DataFrame(
+        {
+            "threshold": thr[ti],
+            "positioning": np.asarray(grid.positionings)[pi],
+            "holding": np.asarray(grid.holding_periods)[ki],
+            "cost_bps": np.asarray([c for c, _ in cost_pairs])[ci],
+            "slippage_bps": np.asarray([s for _, s in cost_pairs])[ci],
+            "horizon": np.asarray(horizons)[hi],
+            "total_return": total.ravel(),
+            "annualized_return": ann.ravel(),
+            "sharpe": sharpe.ravel(),
+            "max_drawdown": drawdown.min(axis=-2).ravel(),
+            "avg_turnover": np.broadcast_to(turn.mean(axis=-2)[:, :, :, None], shape).ravel(),
+            "avg_exposure": np.broadcast_to(exposure.mean(axis=-2)[:, :, :, None], shape).ravel(),
+        }
+    )
+    table = table.sort_values(rank_by, ascending=False, na_position="last").reset_index(drop=True)
+
+    flat_equity = equity.transpose(0, 1, 2, 3, 5, 4).reshape(-1, n_dates)
+    top = table.head(top_k)
+    curves = {}
+    for row in top.itertuples(index=False):
+        flat = np.ravel_multi_index(
+            (
+                int(np.flatnonzero(thr == row.threshold)[0]),
+                list(grid.positionings).index(row.positioning),
+                list(grid.holding_periods).index(row.holding),
+                cost_pairs.index((row.cost_bps, row.slippage_bps)),
+                list(horizons).index(row.horizon),
+            ),
+            shape,
+        )
+        label = (
+            f"{row.horizon}|thr={row.threshold:.2f}|{row.positioning}|hold={row.holding}"
+            f"|cost={row.cost_bps:g}+{row.slippage_bps:g}bps"
+        )
+        curves[label] = flat_equity[flat]
+    equity_df = pd.DataFrame(curves, index=dates)
+
+    return BacktestResult(table=table, equity=equity_df, dates=dates, tickers=list(tickers), horizons=list(horizons))
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+
+def fingerprint(*parts: Any) -> str:
+    """
+    Stable short hash of arbitrary JSON-able parts (str, numbers, lists, dicts).
+    Used to key cached artifacts so they are invalidated when any input changes.
+    """
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()[:20]
+
+
+def file_fingerprint(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:20]
+
+
+def dir_fingerprint(path: Path, names: Iterable[str]) -> Optional[str]:
+    """Fingerprint of selected files in a directory (ex: model bundle)."""
+    parts = []
+    for name in names:
+        fp = file_fingerprint(path / name)
+        if fp is None:
+            return None
+        parts.append((name, fp))
+    return fingerprint(parts)
+
+
+def _atomic_write(path: Path, write_fn) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write_fn(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class ArtifactCache:
+    """
+    Disk cache of intermediate artifacts (features, windowed datasets, logits, ...).
+
+    Layout: <root>/<kind>/<key>.<ext>. Keys are fingerprints, so stale entries are
+    never read; they are simply left behind and can be deleted at any time.
+    Writes are atomic, which makes the cache safe to share between processes.
+    """
+
+    def __init__(self, root: Path, enabled: bool = True):
+        self.root = Path(root)
+        self.enabled = enabled
+
+    def path_for(self, kind: str, key: str, ext: str) -> Path:
+        return self.root / kind / f"{key}.{ext}"
+
+    def load_pickle(self, kind: str, key: str) -> Optional[Any]:
+        path = self.path_for(kind, key, "pkl")
+        if not self.enabled or not path.exists():
+            return None
+        try:
+            with path.open("rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def save_pickle(self, kind: str, key: str, obj: Any) -> None:
+        if self.enabled:
+            _atomic_write(self.path_for(kind, key, "pkl"), lambda f: pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def load_arrays(
+        self, kind: str, key: str, keys: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """Load a .npz entry; `keys` restricts reading to a subset of members."""
+        path = self.path_for(kind, key, "npz")
+        if not self.enabled or not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                names = data.files if keys is None else list(keys)
+                return {k: data[k] for k in names}
+        except Exception:
+            return None
+
+    def save_arrays(self, kind: str, key: str, **arrays: np.ndarray) -> None:
+        if self.enabled:
+            _atomic_write(self.path_for(kind, key, "npz"), lambda f: np.savez(f, **arrays))
+
+    def load_json(self, kind: str, key: str) -> Optional[Any]:
+        path = self.path_for(kind, key, "json")
+        if not self.enabled or not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            return None
+
+    def save_json(self, kind: str, key: str, obj: Any) -> None:
+        if self.enabled:
+            payload = json.dumps(obj).encode("utf-8")
+            _atomic_write(self.path_for(kind, key, "json"), lambda f: f.write(payload))
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -253,18 +253,12 @@ def aggregate_equity_curves(
         s = pd.Series(equity, index=idx).sort_index()
         series_list.append(s)
 
-    if method == "intersection":
-        common = series_list[0].index
-        for s in series_list[1:]:
-            common = common.intersection(s.index)
-        aligned = [s.reindex(common) for s in series_list]
-        eq = pd.concat(aligned, axis=1).mean(axis=1)
-    else:
-        all_idx = series_list[0].index
-        for s in series_list[1:]:
-            all_idx = all_idx.union(s.index)
-        aligned = [s.reindex(all_idx).ffill() for s in series_list]
-        eq = pd.concat(aligned, axis=1).mean(axis=1)
+    # One aligned frame instead of repeated pairwise union/reindex.
+    join = "inner" if method == "intersection" else "outer"
+    aligned = pd.concat(series_list, axis=1, join=join).sort_index()
+    if method != "intersection":
+        aligned = aligned.ffill()
+    eq = aligned.mean(axis=1)
 
     eq = eq.dropna()
     if eq.empty:
@@ -285,3 +279,130 @@ def aggregate_equity_curves(
         "max_drawdown": max_dd,
         "series": eq,
     }
+
+
+def block_bootstrap_indices(
+    n: int,
+    n_resamples: int,
+    block_size: int,
+    seed: int = 42,
+) -> np.ndarray:
+    """
+    Circular block bootstrap index matrix of shape (n_resamples, n).
+    Contiguous blocks keep the short-range time dependence of the series.
+    """
+    block_size = int(max(1, min(block_size, n)))
+    n_blocks = -(-n // block_size)
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, n, size=(n_resamples, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_size)) % n
+    return idx.reshape(n_resamples, -1)[:, :n]
+
+
+def _resample_counts(idx: np.ndarray, n: int) -> np.ndarray:
+    """(B, n) index matrix -> (B, n) matrix of how many times each sample is drawn."""
+    n_resamples = idx.shape[0]
+    offsets = (np.arange(n_resamples) * n)[:, None]
+    counts = np.bincount((idx + offsets).ravel(), minlength=n_resamples * n)
+    return counts.reshape(n_resamples, n).astype(np.float64)
+
+
+def _auc_from_counts(counts: np.ndarray, probs: np.ndarray, y_true: np.ndarray) -> np.ndarray:
+    """Mann-Whitney AUC (ties count 1/2) for every resample, via sorted tie groups."""
+    order = np.argsort(probs, kind="mergesort")
+    sorted_p = probs[order]
+    group_start = np.r_[True, sorted_p[1:] != sorted_p[:-1]]
+    group_id = np.cumsum(group_start) - 1
+    n_groups = int(group_id[-1]) + 1
+
+    c = counts[:, order]
+    is_pos = y_true[order] == 1
+    pos_g = np.zeros((counts.shape[0], n_groups))
+    neg_g = np.zeros((counts.shape[0], n_groups))
+    np.add.at(pos_g.T, group_id[is_pos], c[:, is_pos].T)
+    np.add.at(neg_g.T, group_id[~is_pos], c[:, ~is_pos].T)
+
+    neg_below = np.cumsum(neg_g, axis=1) - neg_g
+    n_pos = pos_g.sum(axis=1)
+    n_neg = neg_g.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        auc = (pos_g * (neg_below + 0.5 * neg_g)).sum(axis=1) / (n_pos * n_neg)
+    return auc
+
+
+def _balanced_accuracy_from_counts(counts: np.ndarray, y_pred: np.ndarray, y_true: np.ndarray) -> np.ndarray:
+    pos = y_true == 1
+    tp = counts @ (pos & (y_pred == 1))
+    tn = counts @ (~pos & (y_pred == 0))
+    n_pos = counts @ pos
+    n_neg = counts @ ~pos
+    with np.errstate(invalid="ignore", divide="ignore"):
+        recalls = np.stack([tp / n_pos, tn / n_neg])
+    # Like sklearn: average over the classes present in the resample.
+    return np.nanmean(recalls, axis=0)
+
+
+def bootstrap_metric_cis(
+    probs: np.ndarray,
+    y_true: np.ndarray,
+    returns_next: np.ndarray,
+    threshold: float,
+    positioning: str,
+    n_resamples: int = 1000,
+    block_size: Optional[int] = None,
+    alpha: float = 0.05,
+    seed: int = 42,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Block-bootstrap confidence intervals for ROC-AUC, balanced accuracy, Brier score
+    and strategy total return. All resamples are scored at once: the index matrix is
+    turned into a count matrix and each metric is a weighted sum over samples.
+    """
+    probs = np.asarray(probs, dtype=np.float64)
+    y_true = np.asarray(y_true).astype(int)
+    returns_next = np.asarray(returns_next, dtype=np.float64)
+    n = len(probs)
+    if n == 0 or n_resamples <= 0:
+        return {}
+
+    if block_size is None:
+        block_size = max(1, int(round(n ** (1.0 / 3.0))))
+    idx = block_bootstrap_indices(n, n_resamples, block_size, seed=seed)
+    counts = np.vstack([np.ones(n), _resample_counts(idx, n)])
+
+    y_pred = (probs >= threshold).astype(int)
+    if positioning == "long_short":
+        position = np.where(y_pred == 1, 1.0, -1.0)
+    else:
+        position = y_pred.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_growth = np.log1p(position * returns_next)
+
+    scores = {
+        "roc_auc": _auc_from_counts(counts, probs, y_true),
+        "balanced_accuracy": _balanced_accuracy_from_counts(counts, y_pred, y_true),
+        "brier": counts @ ((probs - y_true) ** 2) / n,
+        "total_return": np.expm1(counts @ log_growth),
+    }
+
+    out = {}
+    for name, values in scores.items():
+        point, boot = values[0], values[1:]
+        boot = boot[np.isfinite(boot)]
+        if len(boot):
+            low, high = np.quantile(boot, [alpha / 2.0, 1.0 - alpha / 2.0])
+            std = float(boot.std(ddof=1)) if len(boot) > 1 else float("nan")
+        else:
+            low = high = std = float("nan")
+        out[name] = {
+            "point": float(point),
+            "low": float(low),
+            "high": float(high),
+            "std": std,
+        }
+    out["_meta"] = {
+        "n_resamples": int(n_resamples),
+        "block_size": int(block_size),
+        "alpha": float(alpha),
+    }
+    return out
@@ -20,6 +20,10 @@ class ProjectPaths:
     def data_processed(self) -> Path:
         return self.root / "data" / "processed"
 
+    @property
+    def cache(self) -> Path:
+        return self.data_processed / "cache"
+
     @property
     def models(self) -> Path:
         return self.root / "models"
@@ -147,3 +147,153 @@ def save_forecast_plot(
     plt.close(fig)
 
     return result
+
+
+FAN_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+
+
+@dataclass
+class FanChart:
+    ticker: str
+    horizon: str
+    last_date: pd.Timestamp
+    last_close: float
+    proba_up: float
+    dates: pd.DatetimeIndex
+    percentiles: tuple
+    bands: np.ndarray  # [n_percentiles, n_days] price levels
+
+    def to_dict(self) -> dict:
+        return {
+            "ticker": self.ticker,
+            "horizon": self.horizon,
+            "last_date": self.last_date.date().isoformat(),
+            "last_close": self.last_close,
+            "proba_up": self.proba_up,
+            "dates": [d.date().isoformat() for d in self.dates],
+            "bands": {f"p{p:g}": [float(v) for v in row] for p, row in zip(self.percentiles, self.bands)},
+        }
+
+
+def _weighted_percentiles(values: np.ndarray, weights: np.ndarray, qs: np.ndarray) -> np.ndarray:
+    """
+    Weighted percentiles along axis 1 of values[B, N, D] with weights[B, N].
+    Returns [B, len(qs), D].
+    """
+    order = np.argsort(values, axis=1)
+    v_sorted = np.take_along_axis(values, order, axis=1)
+    w_sorted = np.take_along_axis(np.broadcast_to(weights[:, :, None], values.shape), order, axis=1)
+    cw = np.cumsum(w_sorted, axis=1)
+    cw /= cw[:, -1:, :]
+    # first sorted sample whose cumulative weight reaches each quantile
+    pos = (cw[:, None, :, :] < qs[None, :, None, None]).sum(axis=2)
+    pos = np.minimum(pos, values.shape[1] - 1)
+    return np.take_along_axis(v_sorted[:, None, :, :], pos[:, :, None, :], axis=2)[:, :, 0, :]
+
+
+def simulate_fan_bands(
+    hist_returns: np.ndarray,
+    proba_up: np.ndarray,
+    horizons: np.ndarray,
+    n_paths: int = 2000,
+    percentiles: tuple = FAN_PERCENTILES,
+    seed: int = 42,
+) -> list:
+    """
+    Monte Carlo cumulative-return bands for a batch of tickers.
+
+    hist_returns: [B, L] daily returns per ticker (NaN-padded on the left).
+    proba_up: [B, K] model P(up) per ticker for each horizon in `horizons` (NaN = none).
+    Paths are drawn once for the longest horizon by bootstrapping each ticker's history,
+    all tickers/paths/days in one array. For horizon h the paths are then reweighted so
+    that the weighted share of paths ending above the last close after h days equals
+    the model's proba_up (paths themselves are unchanged; only their probability mass).
+
+    Returns a list (len K) of [B, n_percentiles, h] arrays of cumulative gross returns.
+    """
+    hist_returns = np.asarray(hist_returns, dtype=np.float64)
+    proba_up = np.asarray(proba_up, dtype=np.float64)
+    n_batch, n_hist = hist_returns.shape
+    max_h = int(np.max(horizons))
+
+    # Left-pack valid returns so index draws are simply floor(u * n_valid).
+    valid = np.isfinite(hist_returns)
+    n_valid = valid.sum(axis=1)
+    order = np.argsort(~valid, axis=1, kind="stable")
+    packed = np.take_along_axis(np.where(valid, hist_returns, 0.0), order, axis=1)
+
+    rng = np.random.default_rng(seed)
+    u = rng.random((n_batch, n_paths, max_h))
+    draw = np.minimum((u * np.maximum(n_valid, 1)[:, None, None]).astype(np.int64), n_hist - 1)
+    sampled = np.take_along_axis(packed[:, None, :], draw.reshape(n_batch, 1, -1), axis=2).reshape(n_batch, n_paths, max_h)
+    growth = np.cumprod(1.0 + sampled, axis=2)  # [B, N, H]
+
+    qs = np.asarray(percentiles, dtype=np.float64) / 100.0
+    out = []
+    for k, h in enumerate(horizons):
+        h = int(h)
+        up = growth[:, :, h - 1] > 1.0
+        frac_up = up.mean(axis=1, keepdims=True)
+        p = proba_up[:, k : k + 1]
+        p = np.where(np.isfinite(p), p, frac_up)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            w_up = np.where(frac_up > 0, p / frac_up, 0.0)
+            w_down = np.where(frac_up < 1, (1.0 - p) / (1.0 - frac_up), 0.0)
+        weights = np.where(up, w_up, w_down)
+        # Degenerate case (all paths on one side): fall back to equal weights.
+        weights = np.where(weights.sum(axis=1, keepdims=True) > 0, weights, 1.0)
+        out.append(_weighted_percentiles(growth[:, :, :h], weights, qs))
+    return out
+
+
+def build_fan_charts(
+    closes: dict,
+    proba_up: dict,
+    lookback_days: int = 250,
+    n_paths: int = 2000,
+    percentiles: tuple = FAN_PERCENTILES,
+    seed: int = 42,
+) -> dict:
+    """
+    Fan charts for a universe in one simulation batch.
+
+    closes: {ticker: Close series}; proba_up: {ticker: {"h5": 0.58, ...}}.
+    Returns {ticker: {horizon_key: FanChart}}.
+    """
+    tickers = [t for t in closes if proba_up.get(t)]
+    if not tickers:
+        return {}
+    horizon_keys = sorted({h for t in tickers for h in proba_up[t]}, key=lambda h: int(h[1:]))
+    horizons = np.asarray([int(h[1:]) for h in horizon_keys])
+
+    hist = np.full((len(tickers), lookback_days), np.nan)
+    probs = np.full((len(tickers), len(horizon_keys)), np.nan)
+    for i, t in enumerate(tickers):
+        r = closes[t].dropna().pct_change().dropna().to_numpy()[-lookback_days:]
+        hist[i, lookback_days - len(r) :] = r
+        for k, h in enumerate(horizon_keys):
+            if h in proba_up[t]:
+                probs[i, k] = float(proba_up[t][h])
+
+    bands = simulate_fan_bands(hist, probs, horizons, n_paths=n_paths, percentiles=percentiles, seed=seed)
+
+    out: dict = {}
+    for i, t in enumerate(tickers):
+        c = closes[t].dropna()
+        last_date, last_close = c.index[-1], float(c.iloc[-1])
+        out[t] = {}
+        for k, h in enumerate(horizon_keys):
+            if not np.isfinite(probs[i, k]):
+                continue
+            dates = pd.bdate_range(last_date + BDay(1), periods=int(horizons[k]))
+            out[t][h] = FanChart(
+                ticker=t,
+                horizon=h,
+                last_date=last_date,
+                last_close=last_close,
+                proba_up=float(probs[i, k]),
+                dates=dates,
+                percentiles=tuple(percentiles),
+                bands=last_close * bands[k][i],
+            )
+    return out
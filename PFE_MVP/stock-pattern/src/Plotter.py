@@ -2,7 +2,7 @@ import functools
 import itertools
 import sys
 from pathlib import Path
-from typing import Any, Dict, Literal, Optional
+from typing import Any, Dict, Literal, Optional, Sequence, Tuple
 
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
@@ -48,6 +48,43 @@ except AttributeError:
     batched_fn = batched
 
 
+# Per worker Plotters of render_charts, by timeframe, folder and config
+_plotters: Dict[str, "Plotter"] = {}
+
+
+def render_charts(
+    items: Sequence[Tuple[dict, pd.DataFrame]],
+    tf: str,
+    save_folder: Path,
+    config: dict,
+) -> int:
+    """
+    Save the PNG and JSON of each (pattern, DataFrame) pair with the Agg
+    backend. Meant to run in pool workers on the frames returned by the
+    scan, so no data is loaded again.
+
+    The Plotter is built once per worker and settings, and every figure is
+    closed once saved. Returns the number of charts saved.
+    """
+    key = json.dumps([tf, str(save_folder), config], sort_keys=True, default=str)
+
+    if key not in _plotters:
+        _plotters[key] = Plotter(None, None, save_folder, config=config, tf=tf)
+
+    plotter = _plotters[key]
+
+    for dct, df in items:
+        plotter.data = [dct]
+        plotter.frames = {dct["sym"].upper(): df}
+
+        try:
+            plotter.plot(0)
+        finally:
+            plotter.frames = None
+
+    return len(items)
+
+
 class Plotter:
     idx = 0
     idx_str = ""
@@ -56,17 +93,22 @@ class Plotter:
     def __init__(
         self,
         data,
-        loader: AbstractLoader,
+        loader: Optional[AbstractLoader],
         save_folder: Optional[Path] = None,
         mode: Literal["default", "expand"] = "default",
         config: dict = {},
+        frames: Optional[Dict[str, pd.DataFrame]] = None,
+        tf: Optional[str] = None,
     ):
         self.save_folder = save_folder
         self.mode = mode
         self.loader = loader
-        self.timeframe = loader.tf
+        self.timeframe = tf or loader.tf
         self.config = config
 
+        # Data by symbol, used instead of loading it again
+        self.frames = frames
+
         self.line_color = self.config.get("LINE_COLOR", "midnightblue")
 
         self.plot_args: Dict[str, Any] = dict(
@@ -116,7 +158,10 @@ class Plotter:
         else:
             pattern = dct["pattern"]
 
-        df = self.loader.get(sym)
+        if self.frames and sym in self.frames:
+            df = self.frames[sym]
+        else:
+            df = self.loader.get(sym)
 
         if df is None:
             raise ValueError(f"Unable to load data for {sym}")
@@ -194,10 +239,14 @@ class Plotter:
             self._annotate_extra_points(dct["extra_points"], dct["end"])
 
         if self.save_folder:
-
-            return plt.savefig(
-                self.save_folder / f"{sym}_{pattern}_{self.timeframe}.png"
-            )
+            # Close each figure once saved, so memory does not grow with the
+            # number of charts
+            try:
+                return self.fig.savefig(
+                    self.save_folder / f"{sym}_{pattern}_{self.timeframe}.png"
+                )
+            finally:
+                plt.close(self.fig)
 
         stmt = f"{self.idx} of {self.len}"
 
@@ -3,17 +3,19 @@ import concurrent.futures
 import importlib
 import json
 import logging
+import os
 import sys
 from datetime import datetime
+from functools import partial
 from importlib.metadata import metadata
 from pathlib import Path
-from typing import List, Union
+from typing import List, Tuple
 
-import pandas as pd
 from tqdm import tqdm
 
-import utils
+from backtester import DETECTORS, backtest_symbol
 from loaders.AbstractLoader import AbstractLoader
+from outcomes import OutcomeStore, get_db_path
 from Plotter import Plotter
 
 if metadata("fast_csv_loader")["version"] != "2.0.0":
@@ -47,6 +49,25 @@ Scan period is 30 days prior to end date.
 ```python 
 py backtest.py -p trng --date 2023-12-01 --period 60
 ```
+
+# Multiple patterns
+Patterns are evaluated together on each bar. Use `all` for every pattern.
+
+```python 
+py backtest.py -p vcpu dbot hnsu -d 2024-10-20
+```
+
+# Outcome statistics
+Hit rate, median move and median bars to target of the stored backtests.
+
+```python 
+py backtest.py --stats -p vcpu
+```
+
+Each detected pattern includes an `outcome` with its forward returns.
+Outcomes are added to the SQLite store at `state/outcomes.db` (or
+`OUTCOME_DB` in user.json). `init.py` then adds the historical `edge` of
+each pattern found.
 """
 
 
@@ -60,29 +81,7 @@ def uncaught_exception_handler(*args):
 
 
 def parse_cli_args():
-    key_list = (
-        "vcpu",
-        "vcpd",
-        "dbot",
-        "dtop",
-        "hnsu",
-        "hnsd",
-        "trng",
-        "uptl",
-        "dntl",
-        "flagu",
-        "flagd",
-        "abcdu",
-        "abcdd",
-        "batu",
-        "batd",
-        "gartu",
-        "gartd",
-        "crabu",
-        "crabd",
-        "bflyu",
-        "bflyd",
-    )
+    key_list = tuple(DETECTORS.keys())
 
     parser = argparse.ArgumentParser(description="Run backdated pattern scan")
 
@@ -105,9 +104,10 @@ def parse_cli_args():
         "-p",
         "--pattern",
         type=str,
+        nargs="+",
         metavar="str",
-        choices=key_list,
-        help=f"Pattern to test. One of {', '.join(key_list)}",
+        choices=key_list + ("all",),
+        help=f"Patterns to test. One or more of {', '.join(key_list)} or all",
     )
 
     parser.add_argument(
@@ -159,9 +159,15 @@ def parse_cli_args():
         help="Space separated list of stock symbols.",
     )
 
+    group.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print the stored outcome statistics. Filter with -p and --tf",
+    )
+
     args = parser.parse_args()
 
-    if not args.pattern and not args.plot:
+    if not args.pattern and not (args.plot or args.stats):
         raise RuntimeError("Error: the following arguments are required: -p")
 
     return args
@@ -176,167 +182,50 @@ def get_loader_class(config):
     return getattr(loader_module, loader_name)
 
 
-def scan(
-    loader: AbstractLoader,
-    end_dt: Union[datetime, pd.Timestamp],
-    scan_period: int,
-    fn: str,
-    sym: str,
-    look_ahead_period: int,
-    look_back_period: int,
-) -> List[dict]:
-    seen = {}
-    results = []
-
-    fn_dict = {
-        "vcpu": utils.find_bullish_vcp,
-        "vcpd": utils.find_bearish_vcp,
-        "dbot": utils.find_double_bottom,
-        "dtop": utils.find_double_top,
-        "trng": utils.find_triangles,
-        "hnsd": utils.find_hns,
-        "hnsu": utils.find_reverse_hns,
-        "uptl": utils.find_uptrend_line,
-        "dntl": utils.find_downtrend_line,
-        "flagu": utils.find_bullish_flag,
-        "flagd": utils.find_bearish_flag,
-        "abcdu": utils.find_bullish_abcd,
-        "abcdd": utils.find_bearish_abcd,
-        "batu": utils.find_bullish_bat,
-        "batd": utils.find_bearish_bat,
-        "gartu": utils.find_bullish_gartley,
-        "gartd": utils.find_bearish_gartley,
-        "crabu": utils.find_bullish_crab,
-        "crabd": utils.find_bearish_crab,
-        "bflyu": utils.find_bullish_butterfly,
-        "bflyd": utils.find_bearish_butterfly,
-    }
-
-    df = loader.get(sym)
-
-    if df is None or df.empty:
-        return results
-
-    if df.index[0].tzinfo:
-        end_dt = end_dt.replace(tzinfo=df.index[0].tzinfo)
-
-    if end_dt < df.index[0]:
-        return results
-
-    if df.index.has_duplicates:
-        df = df[~df.index.duplicated()]
-
-    if not df.index.is_monotonic_increasing:
-        df = df.sort_index(ascending=True)
-
-    assert isinstance(df, pd.DataFrame)
-    assert isinstance(df.index, pd.DatetimeIndex)
-
-    end_pos = df.index.get_loc(df.index.asof(end_dt))
-
-    if isinstance(end_pos, slice):
-        end_pos = end_pos.start
-
-    scan_period_with_look_ahead = scan_period + look_ahead_period
-
-    # If start date is out of bounds, start at first available date in DataFrame
-    if end_pos > scan_period_with_look_ahead:
-        scan_start_pos = end_pos - scan_period_with_look_ahead
-    else:
-        scan_start_pos = 0
-
-    scan_start_dt = df.index[scan_start_pos]
-
-    if look_ahead_period > end_pos:
-        return results
-
-    scan_end_dt = df.index[end_pos - look_ahead_period]
-
-    assert isinstance(scan_start_dt, pd.Timestamp)
-
-    if fn == "uptl" or fn == "flagu":
-        pivot_type = "low"
-    elif fn == "dntl" or fn == "flagd":
-        pivot_type = "high"
-    else:
-        pivot_type = "both"
-
-    pivots_all = utils.get_max_min(df, pivot_type=pivot_type)
-
-    for i in df.loc[scan_start_dt:scan_end_dt].index:
-        pos = df.index.get_loc(i)
-
-        if isinstance(pos, slice):
-            pos = pos.start
-
-        if look_back_period > pos:
-            start_idx = df.index[0]
-        else:
-            start_idx = df.index[-(pos - look_back_period)]
-
-        dfi = df.loc[start_idx : df.index[pos]]
-
-        if not len(dfi):
-            break
-
-        pivots = pivots_all.loc[dfi.index[0] : dfi.index[-1]]
-
-        if not len(pivots):
-            break
-
-        result = fn_dict[fn](sym, dfi, pivots)
-
-        if result:
-            if sym not in seen:
-                seen[sym] = {}
-
-            pt_start_dt = result["start"].isoformat()
-
-            if pt_start_dt in seen[sym]:
-                continue
-
-            seen[sym][pt_start_dt] = {}
-            results.append(utils.make_serializable(result))
-
-    seen.clear()
-    return results
-
-
 def main(
-    sym_list: tuple[str, ...],
+    sym_list: Tuple[str, ...],
     out_file: Path,
     loader: AbstractLoader,
     end_date: datetime,
+    keys: Tuple[str, ...],
     scan_period: int,
     look_ahead_period: int,
     look_back_period: int,
 ):
     results: List[dict] = []
-    futures = []
+
+    task = partial(
+        backtest_symbol,
+        loader=loader,
+        end_dt=end_date,
+        scan_period=scan_period,
+        keys=keys,
+        look_ahead_period=look_ahead_period,
+        look_back_period=look_back_period,
+        config=config,
+    )
+
+    # Symbols are sent to workers in chunks, so the loader and task
+    # arguments are pickled once per chunk instead of once per symbol
+    workers = os.cpu_count() or 1
+    chunksize = max(1, len(sym_list) // (workers * 4))
 
     with concurrent.futures.ProcessPoolExecutor() as executor:
-        for sym in sym_list:
-            future = executor.submit(
-                scan,
-                loader,
-                args.date,
-                scan_period,
-                args.pattern,
-                sym,
-                look_ahead_period,
-                look_back_period,
-            )
-            futures.append(future)
-
-        for future in tqdm(
-            concurrent.futures.as_completed(futures), total=len(futures)
+        for result in tqdm(
+            executor.map(task, sym_list, chunksize=chunksize), total=len(sym_list)
         ):
-            result = future.result()
             results.extend(result)
 
     if len(results):
+        db_path = get_db_path(config)
+
+        with OutcomeStore(db_path) as store:
+            store.add(results, loader.tf)
+
+        logger.info(f"Stored outcomes in {db_path}")
+
         logger.info(
-            f"Got {len(results)} patterns for {args.pattern.upper()}.\nRun `py backtest.py --plot {out_file.name}` to view results."
+            f"Got {len(results)} patterns for {', '.join(keys).upper()}.\nRun `py backtest.py --plot {out_file.name}` to view results."
         )
 
         results.append(
@@ -385,6 +274,7 @@ if __name__ == "__main__":
         or "--file" in sys.argv
         or "--sym" in sys.argv
         or "--plot" in sys.argv
+        or "--stats" in sys.argv
     )
 
     if not has_required_args_set:
@@ -392,6 +282,14 @@ if __name__ == "__main__":
 
     args = parse_cli_args()
 
+    if args.stats:
+        with OutcomeStore(get_db_path(config)) as store:
+            keys = args.pattern if args.pattern and "all" not in args.pattern else (None,)
+
+            for key in keys:
+                print(store.stats(pattern=key, tf=args.tf).to_string(index=False))
+        exit()
+
     if args.plot:
         meta = args.plot.pop()
 
@@ -440,13 +338,20 @@ if __name__ == "__main__":
             "Error: -f or --file is required. Else define SYM_LIST in user.json"
         )
 
-    output_file = DIR / f"bt_{args.pattern}_{loader.tf}.json"
+    if "all" in args.pattern:
+        keys = tuple(DETECTORS.keys())
+    else:
+        keys = tuple(dict.fromkeys(args.pattern))
+
+    key_name = "all" if len(keys) == len(DETECTORS) else "_".join(keys)
+    output_file = DIR / f"bt_{key_name}_{loader.tf}.json"
 
     result = main(
         sym_list,
         output_file,
         loader,
         args.date,
+        keys,
         args.period,
         look_ahead_period,
         look_back_period,
@@ -0,0 +1,281 @@
+"""
+Sliding window backtest engine.
+
+A backtest replays the scanner over every bar of the scan period, as if the
+data ended on that bar. Pivots are computed once on the full data: a pivot
+only depends on the barsLeft + barsRight bars around it, so the pivots of a
+window are the full pivots that have their whole window inside it. Nothing
+after the window end is ever visible to a detector.
+
+At each end bar, every requested detector runs on the same window and
+pivots, so the detector arrays (kernel.ScanArrays) are built once per pivot
+type and shared. Each detection gets the forward returns that followed it.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+import utils
+from kernel import ScanArrays
+from loaders.AbstractLoader import AbstractLoader
+from scanner import DETECTORS, clean_df, get_pivot_type
+
+logger = logging.getLogger(__name__)
+
+# Expected move of each pattern: 1 up, -1 down, 0 either way
+DIRECTIONS = dict(
+    vcpu=1,
+    vcpd=-1,
+    dbot=1,
+    dtop=-1,
+    hnsu=1,
+    hnsd=-1,
+    trng=0,
+    uptl=1,
+    dntl=-1,
+    flagu=1,
+    flagd=-1,
+    abcdu=1,
+    abcdd=-1,
+    batu=1,
+    batd=-1,
+    gartu=1,
+    gartd=-1,
+    crabu=1,
+    crabd=-1,
+    bflyu=1,
+    bflyd=-1,
+)
+
+# Forward return horizons in bars
+HORIZONS = (5, 10, 20, 60, 120)
+
+
+class SlidingPivots:
+    """
+    Pivots of every window `df.iloc[start:stop]`, from one pivot computation.
+
+    Parameters:
+    :param df: Cleaned DataFrame with High, Low and Volume columns
+    :type df: pd.DataFrame
+    :param barsLeft: Bars to the left of a pivot
+    :type barsLeft: int
+    :param barsRight: Bars to the right of a pivot
+    :type barsRight: int
+    """
+
+    def __init__(self, df: pd.DataFrame, barsLeft=6, barsRight=6):
+        self.df = df
+        self.barsLeft = barsLeft
+        self.barsRight = barsRight
+
+        self.masks = utils.get_pivot_masks(df, barsLeft, barsRight)
+
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.positions: Dict[str, np.ndarray] = {}
+
+        for pivot_type in ("both", "high", "low"):
+            pivots = utils.pivots_from_masks(df, *self.masks, pivot_type)
+
+            self.frames[pivot_type] = pivots
+            self.positions[pivot_type] = df.index.get_indexer(pivots.index)
+
+        # Bars that are both a pivot high and low. Their row order after
+        # sort_index depends on the frame, so windows holding one are rebuilt.
+        self.both_cumsum = np.cumsum(self.masks[0] & self.masks[1])
+
+    def get(self, pivot_type: str, start: int, stop: int) -> pd.DataFrame:
+        """Pivots of df.iloc[start:stop], same as utils.get_max_min on it"""
+        positions = self.positions[pivot_type]
+
+        # A pivot needs barsLeft + 1 bars before and barsRight - 1 after it
+        first = start + self.barsLeft + 1
+        last = stop - self.barsRight
+
+        if (
+            pivot_type == "both"
+            and last >= first
+            and self.both_cumsum[last] > self.both_cumsum[first - 1]
+        ):
+            masks = []
+
+            for mask in self.masks:
+                window_mask = np.zeros(stop - start, dtype=bool)
+                window_mask[first - start : last - start + 1] = mask[first : last + 1]
+                masks.append(window_mask)
+
+            return utils.pivots_from_masks(self.df.iloc[start:stop], *masks, pivot_type)
+
+        lo = np.searchsorted(positions, first, side="left")
+        hi = np.searchsorted(positions, last, side="right")
+
+        return self.frames[pivot_type].iloc[lo:hi]
+
+
+def pattern_height(result: dict) -> float:
+    """Price range of the pattern points, the measured move target"""
+    prices = [point[1] for point in result["points"].values()]
+    return float(max(prices) - min(prices))
+
+
+def forward_returns(
+    df: pd.DataFrame,
+    pos: int,
+    horizons: Sequence[int] = HORIZONS,
+    look_ahead_period: int = 120,
+    direction: int = 0,
+    height: Optional[float] = None,
+) -> dict:
+    """
+    Outcome of a detection on the bar at `pos`, relative to its close.
+
+    `returns` maps each horizon to the close to close return, or None if the
+    data ends before it. `max_up` and `max_down` are the largest moves of
+    High and Low over the next `look_ahead_period` bars.
+
+    If `height` is set, the target is the close plus (or minus, following
+    `direction`) the height, and `bars_to_target` is the number of bars
+    until High (Low) reached it, or None if it was not reached.
+    """
+    close = df["Close"].to_numpy(dtype=float)
+    entry = close[pos]
+
+    returns = {
+        str(h): (float(close[pos + h] / entry - 1) if pos + h < len(close) else None)
+        for h in horizons
+    }
+
+    ahead = slice(pos + 1, pos + 1 + look_ahead_period)
+    high = df["High"].to_numpy(dtype=float)[ahead]
+    low = df["Low"].to_numpy(dtype=float)[ahead]
+
+    bars_to_target = None
+
+    if height:
+        hit = np.zeros(len(high), dtype=bool)
+
+        if direction >= 0:
+            hit |= high >= entry + height
+
+        if direction <= 0:
+            hit |= low <= entry - height
+
+        if hit.any():
+            bars_to_target = int(hit.argmax()) + 1
+
+    return dict(
+        date=df.index[pos].isoformat(),
+        close=float(entry),
+        direction=direction,
+        returns=returns,
+        max_up=float(np.nanmax(high) / entry - 1) if len(high) else None,
+        max_down=float(np.nanmin(low) / entry - 1) if len(low) else None,
+        bars_to_target=bars_to_target,
+    )
+
+
+def backtest_symbol(
+    sym: str,
+    loader: AbstractLoader,
+    end_dt: Union[datetime, pd.Timestamp],
+    scan_period: int,
+    keys: Tuple[str, ...],
+    look_ahead_period: int,
+    look_back_period: int,
+    bars_left=6,
+    bars_right=6,
+    config: Optional[dict] = None,
+    horizons: Sequence[int] = HORIZONS,
+) -> List[dict]:
+    """
+    Run the detectors `keys` on `sym` for every bar of the scan period.
+
+    The scan period is the `scan_period` bars ending `look_ahead_period`
+    bars before `end_dt`. Each scan sees the last `look_back_period` bars up
+    to that bar. A pattern is reported once per detector and start date,
+    with its forward return outcome under `outcome`.
+    """
+    config = config or {}
+    results: List[dict] = []
+
+    df = loader.get(sym)
+
+    if df is None or df.empty:
+        return results
+
+    if df.index[0].tzinfo:
+        end_dt = end_dt.replace(tzinfo=df.index[0].tzinfo)
+
+    if end_dt < df.index[0]:
+        return results
+
+    df = clean_df(df)
+
+    end_pos = df.index.get_loc(df.index.asof(end_dt))
+
+    if look_ahead_period > end_pos:
+        return results
+
+    scan_end_pos = end_pos - look_ahead_period
+    scan_start_pos = max(scan_end_pos - scan_period, 0)
+
+    pivots = SlidingPivots(df, bars_left, bars_right)
+    seen = {key: set() for key in keys}
+
+    # Keys grouped by pivot type. Detectors of a group share the window,
+    # pivots and their kernel.ScanArrays, built once per group and bar
+    groups: Dict[str, List[str]] = {}
+
+    for key in keys:
+        groups.setdefault(get_pivot_type(key), []).append(key)
+
+    for pos in range(scan_start_pos, scan_end_pos + 1):
+        start = max(0, pos + 1 - look_back_period)
+        dfi = df.iloc[start : pos + 1]
+
+        for pivot_type, group in groups.items():
+            pivots_i = pivots.get(pivot_type, start, pos + 1)
+
+            if not len(pivots_i):
+                continue
+
+            arrays = None
+
+            for key in group:
+                try:
+                    if arrays is None:
+                        arrays = ScanArrays(dfi, pivots_i)
+
+                    result = DETECTORS[key](sym, dfi, pivots_i, config, arrays)
+                except Exception as e:
+                    logger.exception(f"SYMBOL name: {sym} - {key}", exc_info=e)
+                    continue
+
+                if not result:
+                    continue
+
+                pt_start_dt = result["start"].isoformat()
+
+                if pt_start_dt in seen[key]:
+                    continue
+
+                seen[key].add(pt_start_dt)
+
+                outcome = forward_returns(
+                    df,
+                    pos,
+                    horizons,
+                    look_ahead_period,
+                    direction=DIRECTIONS[key],
+                    height=pattern_height(result),
+                )
+
+                result = utils.make_serializable(result)
+                result["outcome"] = outcome
+                results.append(result)
+
+    return results
@@ -2,6 +2,7 @@ import concurrent.futures
 import importlib
 import json
 import logging
+import os
 import sys
 from argparse import ArgumentParser
 from datetime import datetime
@@ -9,9 +10,13 @@ from importlib.metadata import metadata
 from pathlib import Path
 from typing import Callable, Dict, List, Optional, Tuple
 
-import utils
+import pandas as pd
+
+import scanner
 from loaders.AbstractLoader import AbstractLoader
-from Plotter import Plotter
+from outcomes import OutcomeStore, get_db_path
+from Plotter import Plotter, render_charts
+from statestore import StateStore, get_db_path as get_state_db_path
 
 try:
     from tqdm import tqdm
@@ -57,359 +62,309 @@ def cleanup(loader: AbstractLoader, futures: List[concurrent.futures.Future]):
             pass
 
 
-def _dt_to_iso(dt):
-    if dt is None:
-        return None
-    if hasattr(dt, "isoformat"):
-        return dt.isoformat()
-    return str(dt)
-
+def get_state_store() -> Optional[StateStore]:
+    """Store of previously detected patterns, if SAVE_STATE is set.
 
-def export_candles_json(
-    sym: str, df, timeframe: str, out_path: Path
-) -> Optional[Path]:
-    if df is None or df.empty:
+    Historical scans (--date) are not recorded."""
+    if not config.get("SAVE_STATE", False) or args.date:
         return None
 
-    if df.index.has_duplicates:
-        df = df.loc[~df.index.duplicated()]
-
-    if not df.index.is_monotonic_increasing:
-        df = df.sort_index(ascending=True)
-
-    payload = {
-        "sym": sym.upper(),
-        "timeframe": timeframe,
-        "df_range": {
-            "start": _dt_to_iso(df.index[0]),
-            "end": _dt_to_iso(df.index[-1]),
-            "rows": int(len(df)),
-        },
-        "candles": [
-            {
-                "t": _dt_to_iso(ts),
-                "open": float(row["Open"]),
-                "high": float(row["High"]),
-                "low": float(row["Low"]),
-                "close": float(row["Close"]),
-                "volume": float(row["Volume"]) if "Volume" in row else None,
-            }
-            for ts, row in df.iterrows()
-        ],
-        "meta": {
-            "saved_at": datetime.now().isoformat(),
-        },
-    }
-
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    return out_path
+    return StateStore(get_state_db_path(config))
 
 
-def scan_pattern(
-    sym: str,
-    pattern: str,
-    fns: Tuple[Callable, ...],
-    loader: AbstractLoader,
-    logger: logging.Logger,
-    config: dict,
-    bars_left=6,
-    bars_right=6,
-):
-    patterns: List[dict] = []
+def get_save_folder() -> Optional[Path]:
+    """Determine the folder to save images to, in case save option is set"""
+    save_folder: Optional[Path] = None
+    image_folder = f"{datetime.now():%d_%b_%y_%H%M}"
 
-    df = loader.get(sym)
+    # Disable any image plotting/saving if --no-plot
+    if not args.no_plot:
+        if "SAVE_FOLDER" in config:
+            save_folder = Path(config["SAVE_FOLDER"]) / image_folder
 
-    if df is None or df.empty:
-        return patterns
+        if args.save:
+            save_folder = args.save / image_folder
 
-    if df.index.has_duplicates:
-        df = df.loc[~df.index.duplicated()]
+        if save_folder and not save_folder.exists():
+            save_folder.mkdir(parents=True)
 
-    if not df.index.is_monotonic_increasing:
-        df = df.sort_index(ascending=True)
+    return save_folder
 
-    if pattern == "uptl" or pattern == "flagu":
-        pivot_type = "low"
-    elif pattern == "dntl" or pattern == "flagd":
-        pivot_type = "high"
-    else:
-        pivot_type = "both"
 
-    pivots = utils.get_max_min(
-        df, barsLeft=bars_left, barsRight=bars_right, pivot_type=pivot_type
-    )
+def get_cache_dir() -> Optional[Path]:
+    """Folder of per symbol scan caches, if incremental scanning is enabled.
 
-    if not len(pivots):
-        return patterns
-
-    for fn in fns:
-        if not callable(fn):
-            raise TypeError(f"Expected callable. Got {type(fn)}")
+    Disabled for historical scans (--date), where the data is not appended to."""
+    if args.date or not (args.incremental or config.get("INCREMENTAL", False)):
+        return None
 
-        try:
-            result = fn(sym, df, pivots, config)
-        except Exception as e:
-            logger.exception(f"SYMBOL name: {sym}", exc_info=e)
-            return patterns
+    return DIR / "state" / "scan_cache"
 
-        if result:
-            patterns.append(utils.make_serializable(result))
 
-    return patterns
+def get_meta(tf: Optional[str] = None) -> dict:
+    return {
+        "timeframe": tf or loader.tf,
+        "end_date": args.date.isoformat() if args.date else None,
+        "config": str(CONFIG_PATH),
+    }
 
 
-def process(
+def scan_keys(
     sym_list: Tuple[str, ...],
-    pattern: str,
-    fns: Tuple[Callable, ...],
+    keys: Tuple[str, ...],
     futures: List[concurrent.futures.Future],
-) -> List[dict]:
+    candle_dir: Optional[Path] = None,
+    tfs: Optional[Tuple[str, ...]] = None,
+    scanned: Optional[Dict[str, Dict[str, List[dict]]]] = None,
+) -> Optional[Dict[str, Dict[str, List[dict]]]]:
     """
-    Process ONE detector key (pattern) with its function tuple (fns).
-    Returns a list of detected patterns + a meta dict as last item (same behavior as before).
+    Scan all detector keys over all symbols with a single process pool.
+
+    Each worker builds its loader and resolves the keys once (see
+    scanner.init_worker), then scans chunks of symbols: every symbol is
+    loaded once (and its candles exported if candle_dir is set), pivots are
+    computed once per pivot type and every key runs on the shared data.
+    If `tfs` is set, every timeframe is scanned from that single load.
+    Patterns get their backtested edge, if backtests were stored. If
+    SAVE_STATE is set, only the patterns not in the state store are output
+    (see statestore.py). All patterns are added to `scanned`, to be
+    recorded with record_state once the pattern files are written. Images are drawn
+    in the same pool, from the data returned by the scan (see
+    Plotter.render_charts).
+
+    Returns a dict of timeframe to dict of key to patterns to output, or
+    None on error.
     """
-    patterns: List[dict] = []
+    save_folder = get_save_folder()
+    cache_dir = get_cache_dir()
+    scan_tfs = tfs or (loader.tf,)
+    found = {tf: {key: [] for key in keys} for tf in scan_tfs}
+
+    workers = os.cpu_count() or 1
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=scanner.init_worker,
+        initargs=(
+            type(loader),
+            dict(tf=loader.tf, end_date=args.date),
+            keys,
+            config,
+            args.left,
+            args.right,
+            candle_dir,
+            cache_dir,
+            tfs,
+            save_folder is not None,
+        ),
+    ) as executor:
+        chunk_sizes: Dict[concurrent.futures.Future, int] = {}
+
+        for chunk in scanner.chunk_symbols(sym_list, workers):
+            future = executor.submit(scanner.scan_chunk, chunk)
+            chunk_sizes[future] = len(chunk)
+            futures.append(future)
 
-    # Load or initialize state dict for storing previously detected patterns
-    state = None
-    state_file = None
-    filtered = None
+        progress = tqdm(total=len(sym_list))
 
-    if config.get("SAVE_STATE", False) and args.file and not args.date:
-        state_file = DIR / f"state/{args.file.stem}_{pattern}.json"
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                progress.close()
+                cleanup(loader, futures)
+                logger.exception("Error in Future - scanning patterns", exc_info=e)
+                return None
 
-        if not state_file.parent.is_dir():
-            state_file.parent.mkdir(parents=True)
+            progress.update(chunk_sizes[future])
 
-        if state_file.exists():
-            state = json.loads(state_file.read_bytes())
-        else:
-            state = {}
+        progress.close()
 
-    # determine the folder to save to in case save option is set
-    save_folder: Optional[Path] = None
-    image_folder = f"{datetime.now():%d_%b_%y_%H%M}"
+        # Data of the symbols with patterns, if images are saved
+        frames: Dict[Tuple[str, str], pd.DataFrame] = {}
 
-    # Disable any image plotting/saving if --no-plot
-    if not args.no_plot:
-        if "SAVE_FOLDER" in config:
-            save_folder = Path(config["SAVE_FOLDER"]) / image_folder
+        # Collect in symbol order, so outputs do not depend on completion order
+        for future in futures:
+            for sym, tf, result, df in future.result():
+                for key, patterns in result.items():
+                    found[tf][key].extend(patterns)
 
-        if args.save:
-            save_folder = args.save / image_folder
+                if df is not None:
+                    frames[(sym.upper(), tf)] = df
 
-        if save_folder and not save_folder.exists():
-            save_folder.mkdir(parents=True)
+        futures.clear()
 
-    # begin scan process
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        for sym in sym_list:
-            future = executor.submit(
-                scan_pattern,
-                sym,
-                pattern,
-                fns,
-                loader,
-                logger,
-                config,
-                bars_left=args.left,
-                bars_right=args.right,
-            )
-            futures.append(future)
+        # Add the backtested edge of each pattern, if backtests were stored
+        db_path = get_db_path(config)
 
-        for future in tqdm(
-            concurrent.futures.as_completed(futures),
-            total=len(futures),
-        ):
-            try:
-                result = future.result()
-            except Exception as e:
-                cleanup(loader, futures)
-                logger.exception("Error in Future - scanning patterns", exc_info=e)
-                return []
+        if db_path.exists():
+            with OutcomeStore(db_path) as outcomes:
+                for tf in scan_tfs:
+                    outcomes.annotate([p for key in keys for p in found[tf][key]], tf)
 
-            patterns.extend(result)
+        if scanned is not None:
+            scanned.update(found)
 
-        futures.clear()
+        output: Dict[str, Dict[str, List[dict]]] = found
+        store = get_state_store()
 
-        if state is not None:
-            filtered = []
-            len_state = len(state)
-            detected = set()
-
-            for dct in patterns:
-                key = f"{dct['sym']}-{dct['pattern']}"
-                detected.add(key)
-
-                if not len_state:
-                    state[key] = dct
-                    filtered.append(dct)
-                    continue
-
-                if key in state:
-                    if dct.get("start") == state[key].get("start"):
-                        continue
-                    state[key] = dct
-                    filtered.append(dct)
-                else:
-                    filtered.append(dct)
-                    state[key] = dct
-
-            invalid_patterns = set(state.keys()) - detected
-            for key in invalid_patterns:
-                state.pop(key)
-
-            if state_file:
-                state_file.write_text(json.dumps(state, indent=2))
-                logger.info(
-                    f"\nTo view all current market patterns, run `py init.py --plot state/{state_file.name}`\n"
-                )
+        if store is not None:
+            # Output only the patterns not detected by the previous scans
+            with store:
+                output = {tf: store.diff(found[tf], sym_list, tf) for tf in scan_tfs}
 
-        patterns_to_output = patterns if state is None else filtered
+        # Save the images if required and not disabled
+        for tf in scan_tfs if save_folder else ():
+            items = [
+                (dct, frames[(dct["sym"].upper(), tf)])
+                for key in keys
+                for dct in output[tf][key]
+            ]
 
-        if not patterns_to_output:
-            return []
+            if not items:
+                continue
 
-        # Save the images if required and not disabled
-        if save_folder:
-            plotter = Plotter(
-                patterns_to_output,
-                loader,
-                save_folder=save_folder,
-                config=config.get("CHART", {}),
-            )
+            logger.info("Saving images")
 
-            for i in range(len(patterns_to_output)):
-                future = executor.submit(plotter.plot, i)
+            # Small batches keep the pool balanced. Workers close every
+            # figure, so memory stays flat over long runs.
+            size = max(1, min(16, len(items) // (workers * 4)))
+
+            for i in range(0, len(items), size):
+                future = executor.submit(
+                    render_charts,
+                    items[i : i + size],
+                    tf,
+                    save_folder,
+                    config.get("CHART", {}),
+                )
+                chunk_sizes[future] = len(items[i : i + size])
                 futures.append(future)
 
-            logger.info("Saving images")
+            progress = tqdm(total=len(items))
 
-            for future in tqdm(
-                concurrent.futures.as_completed(futures), total=len(futures)
-            ):
+            for future in concurrent.futures.as_completed(futures):
                 try:
                     future.result()
                 except Exception as e:
+                    progress.close()
                     cleanup(loader, futures)
                     logger.exception("Error in Futures - Saving images", exc_info=e)
-                    return []
-            futures.clear()
+                    return None
 
-    patterns_to_output.append(
-        {
-            "timeframe": loader.tf,
-            "end_date": args.date.isoformat() if args.date else None,
-            "config": str(CONFIG_PATH),
-        }
-    )
+                progress.update(chunk_sizes[future])
 
-    return patterns_to_output
+            progress.close()
+            futures.clear()
+
+    return output
 
 
-def resolve_fns_from_key(
-    key: str, fn_dict: Dict[str, Callable], config: dict
-) -> Tuple[Callable, ...]:
+def process(
+    sym_list: Tuple[str, ...],
+    pattern: str,
+    futures: List[concurrent.futures.Future],
+    candle_dir: Optional[Path] = None,
+    tfs: Optional[Tuple[str, ...]] = None,
+    scanned: Optional[Dict[str, Dict[str, List[dict]]]] = None,
+) -> Dict[str, List[dict]]:
     """
-    Supports:
-    - custom pattern groups from config["PATTERNS"][key]
-    - single detector key in fn_dict
-    - legacy groups: bull, bear, bull_harm, bear_harm, all
+    Process ONE detector key or group (pattern).
+    Returns, per timeframe, a list of detected patterns + a meta dict as last
+    item (same behavior as before).
     """
-    if "PATTERNS" in config and key in config["PATTERNS"]:
-        custom_list = config["PATTERNS"][key]
-        fns: List[Callable] = []
-        for k in custom_list:
-            if k not in fn_dict:
-                raise KeyError(f"No such pattern defined: {k}")
-            fns.append(fn_dict[k])
-        return tuple(fns)
-
-    if key in fn_dict:
-        return (fn_dict[key],)
-
-    if key == "bull":
-        bull_list = ("vcpu", "hnsu", "dbot", "flagu")
-        return tuple(v for k, v in fn_dict.items() if k in bull_list)
-
-    if key == "bear":
-        bear_list = ("vcpd", "hnsd", "dtop", "flagd")
-        return tuple(v for k, v in fn_dict.items() if k in bear_list)
-
-    if key == "bull_harm":
-        bull_list = ("abcdu", "batu", "gartu", "crabu", "bflyu")
-        return tuple(v for k, v in fn_dict.items() if k in bull_list)
-
-    if key == "bear_harm":
-        bear_list = ("abcdd", "batd", "gartd", "crabd", "bflyd")
-        return tuple(v for k, v in fn_dict.items() if k in bear_list)
-
-    if key == "all":
-        return tuple(
-            fn_dict[k]
-            for k in ("vcpu", "hnsu", "dbot", "flagu", "vcpd", "hnsd", "dtop", "flagd")
-        )
+    output = scan_keys(
+        sym_list, (pattern,), futures, candle_dir=candle_dir, tfs=tfs, scanned=scanned
+    )
 
-    raise KeyError(f"{key} did not match any defined patterns.")
+    if not output:
+        return {}
+
+    return {
+        tf: result[pattern] + [get_meta(tf)] if result[pattern] else []
+        for tf, result in output.items()
+    }
 
 
 def process_many(
     sym_list: Tuple[str, ...],
     pattern_keys: Tuple[str, ...],
-    fn_dict: Dict[str, Callable],
     futures: List[concurrent.futures.Future],
-) -> List[dict]:
+    candle_dir: Optional[Path] = None,
+    tfs: Optional[Tuple[str, ...]] = None,
+    scanned: Optional[Dict[str, Dict[str, List[dict]]]] = None,
+) -> Dict[str, List[dict]]:
     """
-    Scan MANY detector keys and return ONE merged list with ONE meta at the end.
+    Scan MANY detector keys and return, per timeframe, ONE merged list with
+    ONE meta at the end.
+    All keys are scanned in a single pass: one load per symbol.
     (No interactive prompts, no plots.)
     """
-    merged: List[dict] = []
-    meta: Optional[dict] = None
+    output = scan_keys(
+        sym_list, pattern_keys, futures, candle_dir=candle_dir, tfs=tfs, scanned=scanned
+    )
 
-    for key in pattern_keys:
-        fns = resolve_fns_from_key(key, fn_dict, config)
+    if not output:
+        return {}
 
-        out = process(sym_list, key, fns, futures)
-        if not out:
-            continue
+    merged: Dict[str, List[dict]] = {}
 
-        # last item is meta
-        meta = out[-1]
-        merged.extend(out[:-1])
+    for tf, result in output.items():
+        merged[tf] = [p for key in pattern_keys for p in result[key]]
 
-    if meta is None:
-        return []
+        if merged[tf]:
+            merged[tf].append(get_meta(tf))
 
-    merged.append(meta)
     return merged
 
 
-def print_summary(patterns_with_meta: List[dict]):
-    """
-    Print only the list of detectors found + counts (no plots).
-    """
-    if not patterns_with_meta:
-        print("No patterns detected")
-        return
+def save_results(
+    patterns: List[dict], sym_list: Tuple[str, ...], tf: str, output_dir: Path
+):
+    """Write the per symbol pattern files of one timeframe and log a summary"""
+    count = len(patterns)
 
-    data = patterns_with_meta[:-1]  # exclude meta
-    if not data:
-        print("No patterns detected")
-        return
+    # Split meta from patterns if present
+    meta = None
+    data_patterns = patterns
+    if patterns and isinstance(patterns[-1], dict):
+        last = patterns[-1]
+        if "timeframe" in last and "config" in last:
+            meta = last
+            data_patterns = patterns[:-1]
 
-    counts: Dict[str, int] = {}
-    for p in data:
-        k = p.get("pattern", "unknown")
-        counts[k] = counts.get(k, 0) + 1
+    if meta is None:
+        meta = get_meta(tf)
 
-    detectors = sorted(counts.keys())
+    scanner.write_pattern_files(data_patterns, sym_list, output_dir, tf, meta)
 
-    print("\nDetected detectors:")
-    for d in detectors:
-        print(f"- {d}: {counts[d]}")
+    # Summary / next step
+    if args.summary:
+        scanner.print_summary(patterns)
 
-    print("\nTip: you can retrace patterns using their `points` field from the json output.\n")
+    logger.info(
+        f"Got {max(count - 1, 0)} patterns on `{tf}`.\nOutput dir: {output_dir}\n\nUse `py init.py --plot <file>` then `--list` to choose which one to display."
+    )
+
+
+def record_state(scanned: Dict[str, Dict[str, List[dict]]], sym_list: Tuple[str, ...]):
+    """Record the patterns of every timeframe scanned in the state store, if
+    SAVE_STATE is set. Called after the pattern files are written, so readers
+    of both (see statestore.load_active) use the state."""
+    store = get_state_store()
+
+    if store is None or not scanned:
+        return
+
+    at = datetime.now().isoformat()
+
+    with store:
+        for tf, found in scanned.items():
+            store.update(found, sym_list, tf, at)
+
+    logger.info(
+        f"\nTo view all current market patterns, run `py init.py --plot {store.path}`\n"
+    )
 
 
 # START
@@ -429,29 +384,7 @@ if __name__ == "__main__":
     # Load configuration
     DIR = Path(__file__).parent
 
-    fn_dict: Dict[str, Callable] = {
-        "flagu": utils.find_bullish_flag,
-        "flagd": utils.find_bearish_flag,
-        "vcpu": utils.find_bullish_vcp,
-        "dbot": utils.find_double_bottom,
-        "hnsu": utils.find_reverse_hns,
-        "vcpd": utils.find_bearish_vcp,
-        "dtop": utils.find_double_top,
-        "hnsd": utils.find_hns,
-        "trng": utils.find_triangles,
-        "uptl": utils.find_uptrend_line,
-        "dntl": utils.find_downtrend_line,
-        "abcdu": utils.find_bullish_abcd,
-        "abcdd": utils.find_bearish_abcd,
-        "batu": utils.find_bullish_bat,
-        "batd": utils.find_bearish_bat,
-        "gartu": utils.find_bullish_gartley,
-        "gartd": utils.find_bearish_gartley,
-        "crabu": utils.find_bullish_crab,
-        "crabd": utils.find_bearish_crab,
-        "bflyu": utils.find_bullish_butterfly,
-        "bflyd": utils.find_bearish_butterfly,
-    }
+    fn_dict: Dict[str, Callable] = dict(scanner.DETECTORS)
 
     # Parse CLI arguments
     parser = ArgumentParser(
@@ -482,6 +415,20 @@ if __name__ == "__main__":
         help="Timeframe string.",
     )
 
+    parser.add_argument(
+        "--tfs",
+        nargs="+",
+        metavar="str",
+        help="Scan several timeframes from one load of each symbol. Ex: --tfs daily weekly monthly",
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=scanner.parse_shard,
+        metavar="i/n",
+        help="Scan only shard i of n of the symbols. Shards 1/n to n/n split the list without overlap, so their outputs can share a folder.",
+    )
+
     parser.add_argument(
         "-p",
         "--pattern",
@@ -509,6 +456,12 @@ if __name__ == "__main__":
         help="Output json file path. If omitted, uses <pattern>-<tf>.json",
     )
 
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip symbols whose data is unchanged since the last scan. Ignored with --date.",
+    )
+
     parser.add_argument(
         "--summary",
         action="store_true",
@@ -598,7 +551,7 @@ if __name__ == "__main__":
         "--plot",
         type=lambda x: Path(x).expanduser().resolve(),
         default=None,
-        help="Plot results from json file",
+        help="Plot results from json file, or the current patterns of a state database",
     )
 
     if "-c" in sys.argv or "--config" in sys.argv:
@@ -653,7 +606,16 @@ See license: https://www.gnu.org/licenses/gpl-3.0.en.html#license-text
 
     # PLOT MODE
     if args.plot:
-        data = json.loads(args.plot.read_bytes())
+        if args.plot.suffix == ".db":
+            # Patterns currently valid in the state store
+            tf = args.tf or config.get("DEFAULT_TF", "daily")
+
+            with StateStore(args.plot) as store:
+                data = store.active(tf=tf)
+
+            data.append(dict(timeframe=tf, end_date=None, config=str(CONFIG_PATH)))
+        else:
+            data = json.loads(args.plot.read_bytes())
 
         # Last item contains meta data about the timeframe used, end_date etc
         meta = data.pop()
@@ -723,6 +685,23 @@ See license: https://www.gnu.org/licenses/gpl-3.0.en.html#license-text
         logger.exception("", exc_info=e)
         exit()
 
+    tfs: Optional[Tuple[str, ...]] = None
+
+    if args.tfs:
+        tfs = tuple(dict.fromkeys(args.tfs))
+
+        if not hasattr(loader, "get_timeframes"):
+            exit(f"{loader_class.__name__} does not support --tfs")
+
+        try:
+            for tf in tfs:
+                loader.get_loader(tf)
+        except ValueError as e:
+            logger.exception("", exc_info=e)
+            exit()
+
+    tf_label = ", ".join(tfs) if tfs else loader.tf
+
     # If user didn't specify a pattern, default to scan all (no more interactive selection)
     if not args.pattern and not args.scan_all:
         args.scan_all = True
@@ -736,40 +715,47 @@ See license: https://www.gnu.org/licenses/gpl-3.0.en.html#license-text
     else:
         data = tuple(args.sym)
 
+    if args.shard:
+        data = scanner.shard_symbols(data, *args.shard)
+        logger.info(f"Shard {args.shard[0]}/{args.shard[1]}: {len(data)} symbols")
+
     # Always export candle jsons per symbol, even if no patterns are found.
+    # Export happens inside the scan tasks, so each symbol is loaded only once.
     if "SAVE_FOLDER" in config and config["SAVE_FOLDER"]:
         candle_out_dir = Path(config["SAVE_FOLDER"]).expanduser().resolve() / "candles"
     else:
         candle_out_dir = DIR / "candles"
 
-    for sym in data:
-        df = loader.get(sym)
-        if df is None or df.empty:
-            continue
-        export_candles_json(
-            sym,
-            df,
-            loader.tf,
-            candle_out_dir / f"{sym.upper()}_{loader.tf}.json",
-        )
+    # Every pattern scanned, by timeframe and key, for the state store
+    scanned: Dict[str, Dict[str, List[dict]]] = {}
 
     try:
         if args.scan_all:
             pattern_keys = tuple(fn_dict.keys())
             logger.info(
-                f"Scanning ALL detectors ({len(pattern_keys)}) on `{loader.tf}`. Press Ctrl - C to exit"
+                f"Scanning ALL detectors ({len(pattern_keys)}) on `{tf_label}`. Press Ctrl - C to exit"
+            )
+            results = process_many(
+                data,
+                pattern_keys,
+                futures,
+                candle_dir=candle_out_dir,
+                tfs=tfs,
+                scanned=scanned,
             )
-            patterns = process_many(data, pattern_keys, fn_dict, futures)
             key_for_filename = "scan_all"
         else:
             key = args.pattern.strip().lower()
-            fns = resolve_fns_from_key(key, fn_dict, config)
+            # Fail early on an unknown key, before starting the workers
+            scanner.resolve_fns_from_key(key, fn_dict, config)
 
             logger.info(
-                f"Scanning `{key.upper()}` patterns on `{loader.tf}`. Press Ctrl - C to exit"
+                f"Scanning `{key.upper()}` patterns on `{tf_label}`. Press Ctrl - C to exit"
             )
 
-            patterns = process(data, key, fns, futures)
+            results = process(
+                data, key, futures, candle_dir=candle_out_dir, tfs=tfs, scanned=scanned
+            )
             key_for_filename = key
 
     except KeyboardInterrupt:
@@ -777,8 +763,6 @@ See license: https://www.gnu.org/licenses/gpl-3.0.en.html#license-text
         logger.info("User exit")
         exit()
 
-    count = len(patterns)
-
     # Determine output directory for per-symbol pattern jsons
     if args.output:
         output_dir = args.output if args.output.is_dir() else args.output.parent
@@ -789,51 +773,10 @@ See license: https://www.gnu.org/licenses/gpl-3.0.en.html#license-text
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Split meta from patterns if present
-    meta = None
-    data_patterns = patterns
-    if patterns and isinstance(patterns[-1], dict):
-        last = patterns[-1]
-        if "timeframe" in last and "config" in last:
-            meta = last
-            data_patterns = patterns[:-1]
-
-    if meta is None:
-        meta = {
-            "timeframe": loader.tf,
-            "end_date": args.date.isoformat() if args.date else None,
-            "config": str(CONFIG_PATH),
-        }
-
-    # Group patterns by symbol and write one json per symbol
-    patterns_by_sym: Dict[str, List[dict]] = {}
-    for p in data_patterns:
-        sym = str(p.get("sym", "")).upper()
-        if not sym:
-            continue
-        patterns_by_sym.setdefault(sym, []).append(p)
-
-    for sym in data:
-        sym_upper = str(sym).upper()
-        sym_patterns = patterns_by_sym.get(sym_upper, [])
-        payload = {
-            "sym": sym_upper,
-            "timeframe": meta.get("timeframe"),
-            "patterns": sym_patterns,
-            "meta": meta,
-        }
-        if not sym_patterns:
-            payload["message"] = "no patterns detected"
-        out_path = output_dir / f"{sym_upper}_{loader.tf}_patterns.json"
-        out_path.write_text(json.dumps(payload, indent=2))
+    for tf in tfs or (loader.tf,):
+        save_results(results.get(tf, []), data, tf, output_dir)
 
-    # Summary / next step
-    if args.summary:
-        print_summary(patterns)
-
-    logger.info(
-        f"Got {max(count - 1, 0)} patterns.\nOutput dir: {output_dir}\n\nUse `py init.py --plot <file>` then `--list` to choose which one to display."
-    )
+    record_state(scanned, data)
 
     # Disable any automatic plot after scan (especially for scan_all)
     do_post_scan_plot = (
@@ -841,11 +784,12 @@ See license: https://www.gnu.org/licenses/gpl-3.0.en.html#license-text
         and not args.save
         and not args.no_plot
         and not args.scan_all
+        and not tfs
     )
 
     if do_post_scan_plot:
         # last item is meta
-        patterns_no_meta = patterns[:-1]
+        patterns_no_meta = results.get(loader.tf, [])[:-1]
         plotter = Plotter(patterns_no_meta, loader, config=config.get("CHART", {}))
         plotter.plot()
 
@@ -0,0 +1,312 @@
+"""
+Integer position detector kernel.
+
+The find_* functions in utils.py used to walk the pivots with pandas label
+indexing (`pivots.loc[ts:, "P"].idxmax()`, `get_next_index`, `df.loc[a:c]`),
+which is slow in tight loops. `ScanArrays` converts a price DataFrame and its
+pivots to NumPy arrays once. Detectors work on integer positions and only map
+back to timestamps when building the result dict.
+
+Pivot positions follow the label semantics of the original code, including
+duplicate labels (a bar that is both a pivot high and a pivot low):
+
+- a label slice `pivots.loc[t:]` starts at the first row with label `t` and
+  `pivots.loc[:t]` ends after the last one (`label_start`, `label_stop`).
+- `pivots.at[t, "P"]` on a duplicate label is reduced with max or min, as the
+  detectors did with `isinstance(x, pd.Series)` (`pivot_max`, `pivot_min`).
+
+Range extrema ("highest pivot after i", "lowest Low between a and c") are
+answered in O(1) from a `SparseTable`, built lazily once per array.
+
+Callers running several detectors on the same df and pivots
+(scanner.run_detectors, backtester.backtest_symbol) build one ScanArrays
+and pass it as the `arrays` argument, so the conversion, tables and memoized
+legs are shared. A detector called without it builds its own.
+"""
+
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+DAY_NS = 86_400_000_000_000
+
+
+class SparseTable:
+    """
+    Range arg-max or arg-min over a fixed array with O(1) queries.
+
+    Level `j` holds the position of the extremum of every window of length
+    `2**j`. A query over [start, stop) combines the two overlapping windows
+    covering it. Ties resolve to the first position and NaN is skipped, as in
+    `pd.Series.idxmax`.
+
+    Parameters:
+    :param values: 1D array
+    :type values: np.ndarray
+    :param find_max: True for arg-max, False for arg-min
+    :type find_max: bool
+    """
+
+    def __init__(self, values: np.ndarray, find_max: bool):
+        self.values = values
+        self.find_max = find_max
+
+        filled = np.asarray(values, dtype=float)
+
+        if np.isnan(filled).any():
+            filled = np.where(np.isnan(filled), -np.inf if find_max else np.inf, filled)
+
+        # Negate for max, so every level compares with `<`
+        self._key = -filled if find_max else filled
+
+        n = len(values)
+        dtype = np.int32 if n < 2**31 else np.int64
+
+        level = np.arange(n, dtype=dtype)
+        self.levels = [level]
+
+        width = 1
+
+        while width * 2 <= n:
+            left = level[: len(level) - width]
+            right = level[width:]
+
+            # Strictly better on the right, otherwise keep the first position
+            level = np.where(self._key[right] < self._key[left], right, left)
+
+            self.levels.append(level)
+            width *= 2
+
+    def arg(self, start: int, stop: int) -> int:
+        """Position of the extremum in [start, stop)"""
+        if stop <= start:
+            raise ValueError("Empty range")
+
+        j = int(stop - start).bit_length() - 1
+        level = self.levels[j]
+
+        left = level[start]
+        right = level[stop - (1 << j)]
+
+        return int(right if self._key[right] < self._key[left] else left)
+
+    def value(self, start: int, stop: int):
+        """Extremum in [start, stop), NaN for an empty or all NaN range"""
+        if stop <= start:
+            return np.nan
+
+        return self.values[self.arg(start, stop)]
+
+    def args(self, starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+        """Vectorized `arg` over arrays of non empty ranges"""
+        starts = np.asarray(starts, dtype=np.int64)
+        stops = np.asarray(stops, dtype=np.int64)
+
+        lengths = stops - starts
+
+        if (lengths <= 0).any():
+            raise ValueError("Empty range")
+
+        out = np.empty(len(starts), dtype=np.int64)
+
+        # floor(log2(length)) selects the level
+        levels = np.frexp(lengths)[1] - 1
+
+        for j in np.unique(levels):
+            sel = levels == j
+            level = self.levels[j]
+
+            left = level[starts[sel]]
+            right = level[stops[sel] - (1 << int(j))]
+
+            out[sel] = np.where(self._key[right] < self._key[left], right, left)
+
+        return out
+
+    def values_of(self, starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+        """Vectorized `value`. Empty ranges return NaN"""
+        starts = np.asarray(starts, dtype=np.int64)
+        stops = np.asarray(stops, dtype=np.int64)
+
+        out = np.full(len(starts), np.nan)
+        valid = stops > starts
+
+        if valid.any():
+            out[valid] = self.values[self.args(starts[valid], stops[valid])]
+
+        return out
+
+
+class ScanArrays:
+    """
+    NumPy view of a price DataFrame and its pivots.
+
+    Parameters:
+    :param df: DataFrame with Open, High, Low, Close and Volume columns,
+               sorted by a unique DatetimeIndex
+    :type df: pd.DataFrame
+    :param pivots: DataFrame with columns P and V as returned by
+                   utils.get_max_min (sorted, labels present in df)
+    :type pivots: pd.DataFrame
+    """
+
+    def __init__(self, df: pd.DataFrame, pivots: pd.DataFrame):
+        self.index = df.index
+        self.n = len(df)
+
+        self.dates = self.index.asi8
+        self.open = df["Open"].to_numpy()
+        self.high = df["High"].to_numpy()
+        self.low = df["Low"].to_numpy()
+        self.close = df["Close"].to_numpy()
+        self.bar_range = self.high - self.low
+
+        # Position of each bar, the x axis of trend lines
+        self.bars = np.arange(self.n)
+
+        self.pivot_index = pivots.index
+        self.m = len(pivots)
+        self.P = pivots["P"].to_numpy()
+        self.V = pivots["V"].to_numpy()
+
+        labels = self.pivot_index.asi8
+        self.gstart = np.searchsorted(labels, labels, side="left")
+        self.gend = np.searchsorted(labels, labels, side="right")
+        self.has_duplicates = bool(self.m and (self.gend - self.gstart).max() > 1)
+
+        # P reduced over each label group, per pivot position
+        self.group_max = self.P
+        self.group_min = self.P
+
+        if self.has_duplicates:
+            starts = np.unique(self.gstart)
+            group = np.searchsorted(starts, self.gstart)
+
+            self.group_max = np.maximum.reduceat(self.P, starts)[group]
+            self.group_min = np.minimum.reduceat(self.P, starts)[group]
+
+        # Position of each pivot in df
+        self.dpos = self.index.get_indexer(self.pivot_index)
+
+        if self.m and self.dpos.min() < 0:
+            raise KeyError("Pivot dates missing from DataFrame index")
+
+        self._tables = {}
+        self._memo = {}
+
+    def memo(self, name: str, fn: Callable):
+        """Compute `fn()` once per ScanArrays and cache it under `name`"""
+        if name not in self._memo:
+            self._memo[name] = fn()
+
+        return self._memo[name]
+
+    def days(self, start: int, end: int) -> int:
+        """`(index[end] - index[start]).days` for two df positions"""
+        return int((self.dates[end] - self.dates[start]) // DAY_NS)
+
+    # Pivot helpers
+
+    def date(self, pos: int) -> pd.Timestamp:
+        """Timestamp of pivot at `pos`"""
+        return self.pivot_index[pos]
+
+    def label_start(self, pos: int) -> int:
+        """First position of the label at `pos` - start of `pivots.loc[t:]`"""
+        return int(self.gstart[pos])
+
+    def label_stop(self, pos: int) -> int:
+        """Position after the label at `pos` - end of `pivots.loc[:t]`"""
+        return int(self.gend[pos])
+
+    def same_label(self, a: int, b: int) -> bool:
+        return self.gstart[a] == self.gstart[b]
+
+    def next_pos(self, pos: int) -> int:
+        """Equivalent of utils.get_next_index for the label at `pos`"""
+        return int(self.gend[pos])
+
+    def prev_pos(self, pos: int) -> int:
+        """Equivalent of utils.get_prev_index for the label at `pos`.
+
+        A duplicate label returns the position after it, as get_prev_index does."""
+        if self.gend[pos] - self.gstart[pos] > 1:
+            return int(self.gend[pos])
+
+        return pos - 1
+
+    def pivot_argmax(self, start: int, stop: Optional[int] = None) -> int:
+        """Position of the first highest P in [start, stop)"""
+        return self.table(self.P, True).arg(start, self.m if stop is None else stop)
+
+    def pivot_argmin(self, start: int, stop: Optional[int] = None) -> int:
+        """Position of the first lowest P in [start, stop)"""
+        return self.table(self.P, False).arg(start, self.m if stop is None else stop)
+
+    def pivot_max(self, pos: int):
+        """P at the label of `pos`. Duplicate labels return the highest"""
+        return self.group_max[pos]
+
+    def pivot_min(self, pos: int):
+        """P at the label of `pos`. Duplicate labels return the lowest"""
+        return self.group_min[pos]
+
+    def pivot_volume(self, pos: int):
+        """V at the label of `pos`. Duplicate labels return the first"""
+        return self.V[self.gstart[pos]]
+
+    # Price helpers. Ranges are [start, stop) over df positions.
+    # NaN is skipped, as in pandas reductions.
+
+    def table(self, arr: np.ndarray, find_max: bool) -> SparseTable:
+        """SparseTable over `arr`, one of the arrays of this instance"""
+        key = (id(arr), find_max)
+
+        if key not in self._tables:
+            self._tables[key] = SparseTable(arr, find_max)
+
+        return self._tables[key]
+
+    def _stop(self, arr: np.ndarray, stop: Optional[int]) -> int:
+        return len(arr) if stop is None else min(stop, len(arr))
+
+    def range_max(self, arr: np.ndarray, start: int, stop: Optional[int] = None):
+        return self.table(arr, True).value(start, self._stop(arr, stop))
+
+    def range_min(self, arr: np.ndarray, start: int, stop: Optional[int] = None):
+        return self.table(arr, False).value(start, self._stop(arr, stop))
+
+    def ranges_max(
+        self, arr: np.ndarray, starts: np.ndarray, stops: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Vectorized range_max. `stops` defaults to the end of `arr`"""
+        if stops is None:
+            stops = np.full(len(starts), len(arr))
+
+        return self.table(arr, True).values_of(starts, np.minimum(stops, len(arr)))
+
+    def ranges_min(
+        self, arr: np.ndarray, starts: np.ndarray, stops: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Vectorized range_min. `stops` defaults to the end of `arr`"""
+        if stops is None:
+            stops = np.full(len(starts), len(arr))
+
+        return self.table(arr, False).values_of(starts, np.minimum(stops, len(arr)))
+
+    def range_argmax(self, arr: np.ndarray, start: int, stop: Optional[int] = None) -> int:
+        return self.table(arr, True).arg(start, self._stop(arr, stop))
+
+    def range_argmin(self, arr: np.ndarray, start: int, stop: Optional[int] = None) -> int:
+        return self.table(arr, False).arg(start, self._stop(arr, stop))
+
+    def median_bar_range(self, start: int, stop: int):
+        """Median of High - Low over [start, stop)"""
+        values = self.bar_range[start:stop]
+
+        if not len(values):
+            return np.nan
+
+        return np.nanmedian(values)
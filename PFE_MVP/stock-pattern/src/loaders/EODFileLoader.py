@@ -2,7 +2,7 @@ import logging
 from datetime import datetime, timedelta
 from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Sequence
 
 import pandas as pd
 
@@ -45,6 +45,12 @@ class EODFileLoader(AbstractLoader):
         # No need to close method to be called for this Class
         self.closed = True
 
+        # Constructor arguments, for loaders of other timeframes
+        self._config = config
+        self._end_date = end_date
+        self._period = period
+        self._loaders: Dict[str, "EODFileLoader"] = {}
+
         self.default_tf = str(config.get("DEFAULT_TF", "daily"))
 
         if self.default_tf not in self.timeframes:
@@ -131,6 +137,83 @@ class EODFileLoader(AbstractLoader):
 
         return df
 
+    def get_timeframes(
+        self, symbol: str, tfs: Sequence[str]
+    ) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Returns OHLC data for symbol on each timeframe in tfs, from a single
+        read of the file. Each DataFrame has the same rows as `get` on a
+        loader of that timeframe.
+        """
+        loaders = {tf: self.get_loader(tf) for tf in tfs}
+
+        file = self.data_path / f"{symbol.lower()}.csv"
+
+        if not file.exists():
+            logger.warning(f"File not found: {file}")
+            return {}
+
+        try:
+            if self.end_date or any(
+                tf in ("monthly", "quarterly") for tf in loaders
+            ):
+                # End dates differ by timeframe and monthly bars need most
+                # of the file anyway. Read it all and slice per timeframe.
+                df = pd.read_csv(
+                    file,
+                    index_col=[0],
+                    parse_dates=[0],
+                    date_format=self.date_format,
+                )
+            else:
+                df = csv_loader(
+                    file,
+                    period=max(loader.period for loader in loaders.values()),
+                    chunk_size=max(loader.chunk_size for loader in loaders.values()),
+                    date_format=self.date_format,
+                )
+        except IndexError:
+            return {}
+        except Exception as e:
+            # Any other error log it with the symbol name
+            logger.warning(f"{symbol}: Error loading file - {e!r}")
+            return {}
+
+        return {tf: loader.select(df) for tf, loader in loaders.items()}
+
+    def get_loader(self, tf: str) -> "EODFileLoader":
+        """Loader of timeframe tf, with the same config, end date and period"""
+        if tf == self.tf:
+            return self
+
+        if tf not in self._loaders:
+            self._loaders[tf] = EODFileLoader(
+                self._config, tf, end_date=self._end_date, period=self._period
+            )
+
+        return self._loaders[tf]
+
+    def select(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of this timeframe from a DataFrame of default timeframe bars"""
+        if self.end_date:
+            end_date = self.end_date
+
+            if df.index.tz is not None and end_date.tzinfo is None:
+                end_date = end_date.replace(tzinfo=df.index.tz)
+
+            df = df.loc[:end_date]
+
+        df = df.iloc[-self.period :]
+
+        if self.tf == self.default_tf or df.empty:
+            return df
+
+        df = df.resample(self.offset_str).agg(self.ohlc_dict).dropna()
+
+        assert isinstance(df, pd.DataFrame)
+
+        return df
+
     def process_monthly(self, file, end_date) -> pd.DataFrame:
         df = pd.read_csv(
             file,
@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+import pandas as pd
+
+from .AbstractLoader import AbstractLoader
+
+
+class FrameLoader(AbstractLoader):
+    """
+    A class to serve OHLC data from DataFrames already in memory.
+
+    Used with scanner.scan, to scan data loaded by the caller without
+    reading files again. Rows are selected as EODFileLoader does: the last
+    `period` rows up to `end_date`, resampled for higher timeframes.
+
+    Parameters:
+    :param config: User config
+    :type config: dict
+    :param timeframe: daily, weekly, monthly or quarterly
+    :type timeframe: str
+    :param end_date: End date upto which date must be returned
+    :type end_date: Optional[datetime]
+    :param period: Number of lines to return from end_date or end of file
+    :param frames: Daily DataFrames with a DatetimeIndex, by symbol
+    :type frames: Dict[str, pd.DataFrame]
+    """
+
+    timeframes = dict(daily="D", weekly="W-SUN", monthly="MS", quarterly="QE")
+
+    def __init__(
+        self,
+        config: dict,
+        tf: Optional[str] = None,
+        end_date: Optional[datetime] = None,
+        period: int = 160,
+        frames: Optional[Dict[str, pd.DataFrame]] = None,
+    ):
+        # Nothing to close
+        self.closed = True
+
+        if tf is None:
+            tf = str(config.get("DEFAULT_TF", "daily"))
+
+        if tf not in self.timeframes:
+            valid_values = ", ".join(self.timeframes.keys())
+
+            raise ValueError(f"Timeframe must be one of {valid_values}")
+
+        self.tf = tf
+        self.offset_str = self.timeframes[tf]
+        self.end_date = end_date
+
+        self.frames = {sym.upper(): df for sym, df in (frames or {}).items()}
+
+        self._period = period
+        self._loaders: Dict[str, "FrameLoader"] = {}
+
+        self.ohlc_dict = dict(
+            Open="first",
+            High="max",
+            Low="min",
+            Close="last",
+            Volume="sum",
+        )
+
+        if tf == "daily":
+            self.period = period
+        elif tf == "weekly":
+            self.period = 7 * period
+        elif tf == "monthly":
+            self.period = 30 * period
+        else:
+            self.period = 30 * 3 * period
+
+    def get(self, symbol: str) -> Optional[pd.DataFrame]:
+        df = self.frames.get(symbol.upper())
+
+        if df is None or df.empty:
+            return None
+
+        return self.select(df)
+
+    def get_timeframes(
+        self, symbol: str, tfs: Sequence[str]
+    ) -> Dict[str, Optional[pd.DataFrame]]:
+        """Returns OHLC data for symbol on each timeframe in tfs"""
+        df = self.frames.get(symbol.upper())
+
+        if df is None or df.empty:
+            return {}
+
+        return {tf: self.get_loader(tf).select(df) for tf in tfs}
+
+    def get_loader(self, tf: str) -> "FrameLoader":
+        """Loader of timeframe tf, over the same frames, end date and period"""
+        if tf == self.tf:
+            return self
+
+        if tf not in self._loaders:
+            loader = FrameLoader({}, tf, end_date=self.end_date, period=self._period)
+            loader.frames = self.frames
+            self._loaders[tf] = loader
+
+        return self._loaders[tf]
+
+    def select(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Rows of this timeframe from a DataFrame of daily bars"""
+        if self.end_date:
+            end_date = self.end_date
+
+            if df.index.tz is not None and end_date.tzinfo is None:
+                end_date = end_date.replace(tzinfo=df.index.tz)
+
+            df = df.loc[:end_date]
+
+        df = df.iloc[-self.period :]
+
+        if self.tf == "daily" or df.empty:
+            return df
+
+        cols = {col: fn for col, fn in self.ohlc_dict.items() if col in df.columns}
+
+        df = df.resample(self.offset_str).agg(cols).dropna()
+
+        assert isinstance(df, pd.DataFrame)
+
+        return df
+
+    def close(self):
+        """Not required here as nothing to close"""
+        pass
@@ -1,4 +1,5 @@
 import logging
+import pickle
 from datetime import datetime
 from functools import lru_cache
 from pathlib import Path
@@ -17,6 +18,9 @@ logger = logging.getLogger(__name__)
 
 csv_loader = lru_cache(maxsize=6)(csv_loader)
 
+# Used if RESAMPLE_CACHE is true in config, instead of a folder path
+DEFAULT_CACHE_DIR = Path(__file__).parents[1] / "state" / "resample_cache"
+
 
 class IEODFileLoader(AbstractLoader):
     """
@@ -30,6 +34,12 @@ class IEODFileLoader(AbstractLoader):
     :param end_date: End date upto which date must be returned
     :type end_date: Optional[datetime]
     :param period: Number of lines to return from end_date or end of file
+
+    If `RESAMPLE_CACHE` is set in config (true or a folder path), resampled
+    bars are stored on disk per symbol, timeframe and session start. The
+    next `get` only resamples the bars from the session of the last stored
+    bar, as long as the minute data before it is unchanged. Not used with
+    `end_date`.
     """
 
     timeframes = {
@@ -84,6 +94,14 @@ class IEODFileLoader(AbstractLoader):
 
         self.data_path = Path(config["DATA_PATH"]).expanduser()
 
+        self.cache_dir: Optional[Path] = None
+        cache = config.get("RESAMPLE_CACHE", False)
+
+        if cache and end_date is None:
+            self.cache_dir = (
+                DEFAULT_CACHE_DIR if cache is True else Path(cache).expanduser()
+            )
+
         self.ohlc_dict = dict(
             Open="first",
             High="max",
@@ -116,6 +134,16 @@ class IEODFileLoader(AbstractLoader):
         if self.tf == self.default_tf or df.empty:
             return df
 
+        if self.cache_dir is not None:
+            return self._get_cached(symbol, df)
+
+        return self._resample(df)
+
+    def _resample(
+        self, df: pd.DataFrame, origin: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """Resample minute bars to the loader timeframe. 24/7 bars are
+        aligned to `origin`, or the start of the first day."""
         if not self.is_24_7:
             hour, minute = self.start_time.split(":")
             start_ts = df.index[0].replace(hour=int(hour), minute=int(minute))
@@ -123,7 +151,7 @@ class IEODFileLoader(AbstractLoader):
             return self._resample_df(df, self.offset_str, self.ohlc_dict, start_ts)
 
         df = (
-            df.resample(self.offset_str, origin="start_day")
+            df.resample(self.offset_str, origin="start_day" if origin is None else origin)
             .agg(self.ohlc_dict)
             .dropna()
         )
@@ -132,6 +160,116 @@ class IEODFileLoader(AbstractLoader):
 
         return df
 
+    def _cache_path(self, symbol: str) -> Path:
+        session = "24_7" if self.is_24_7 else self.start_time.replace(":", "")
+
+        return self.cache_dir / f"{symbol.lower()}_{self.tf}_{session}.pkl"
+
+    def _get_cached(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Resampled bars of df, reusing the bars stored by the last call.
+
+        The stored bars are kept up to the session (or for 24/7 markets, the
+        bar) holding the last stored bar. From there, minute bars are
+        resampled again, so a bar that was still forming is completed. The
+        result is trimmed to the bars df would give on its own.
+        """
+        path = self._cache_path(symbol)
+        entry = None
+
+        if path.exists():
+            try:
+                entry = pickle.loads(path.read_bytes())
+            except Exception:
+                # A corrupt cache only costs a full resample
+                entry = None
+
+        last = df.index[-1]
+        last_row = tuple(df.iloc[-1])
+
+        unchanged = (
+            entry is not None
+            and entry["last"] == last
+            and entry["last_row"] == last_row
+        )
+
+        if unchanged:
+            bars = entry["bars"]
+            origin = entry["origin"]
+        elif self._is_valid(entry, df):
+            bars = entry["bars"]
+            origin = entry["origin"]
+            tail_start = self._tail_start(bars.index[-1])
+
+            bars = pd.concat(
+                (
+                    bars.loc[bars.index < tail_start],
+                    self._resample(df.loc[tail_start:], origin),
+                )
+            )
+        else:
+            origin = df.index[0].normalize()
+            bars = self._resample(df, origin)
+
+        if not self.is_24_7:
+            hour, minute = self.start_time.split(":")
+            first = df.index[0].replace(hour=int(hour), minute=int(minute))
+
+            # _resample_df skips a first session that is not loaded in full
+            if first < df.index[0]:
+                first += pd.Timedelta(days=1)
+
+            bars = bars.loc[bars.index >= first]
+        else:
+            freq = pd.Timedelta(self.offset_str)
+            first = origin + (df.index[0] - origin) // freq * freq
+
+            # The first bar only holds the minutes loaded, as in _resample
+            bars = pd.concat(
+                (
+                    self._resample(df.loc[: first + freq - pd.Timedelta(1)], origin),
+                    bars.loc[bars.index >= first + freq],
+                )
+            )
+
+        if not unchanged:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(
+                pickle.dumps(
+                    dict(bars=bars, origin=origin, last=last, last_row=last_row),
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            )
+            tmp.replace(path)
+
+        return bars
+
+    def _tail_start(self, last_bar: pd.Timestamp) -> pd.Timestamp:
+        """First minute to resample again, given the last stored bar"""
+        if self.is_24_7:
+            return last_bar
+
+        hour, minute = self.start_time.split(":")
+        return last_bar.replace(hour=int(hour), minute=int(minute))
+
+    def _is_valid(self, entry: Optional[dict], df: pd.DataFrame) -> bool:
+        """True if the stored bars can be extended with df"""
+        if not entry or not len(entry["bars"]):
+            return False
+
+        last = entry["last"]
+        tail_start = self._tail_start(entry["bars"].index[-1])
+
+        # The minutes from tail_start must be loaded and the stored last
+        # minute bar unchanged
+        return (
+            tail_start >= df.index[0]
+            and last in df.index
+            and tuple(df.loc[last]) == entry["last_row"]
+        )
+
     def close(self):
         """Not required as nothing to close"""
         pass
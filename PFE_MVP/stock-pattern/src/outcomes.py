@@ -0,0 +1,281 @@
+"""
+Historical outcome store for backtested patterns.
+
+Backtest detections (see backtester.py) are stored in an SQLite database,
+one row per pattern, symbol, timeframe and start date. Running a backtest
+again over an overlapping period updates the existing rows.
+
+Aggregates are kept in a `stats` table, refreshed for the patterns touched
+by each update. Rows with `sym = '*'` aggregate over all symbols. Looking up
+the historical edge of a live pattern is then a primary key read.
+
+- `hit_rate`: share of occurrences that reached their measured move target
+  within the look ahead period.
+- `median_ret_<h>`: median return after `h` bars, in the pattern direction
+  (a 5% drop after a bearish pattern counts as +5%).
+- `median_bars`: median bars to target, over the occurrences that hit it.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from backtester import HORIZONS
+
+RETURN_COLS = tuple(f"ret_{h}" for h in HORIZONS)
+MEDIAN_COLS = tuple(f"median_ret_{h}" for h in HORIZONS)
+
+OCCURRENCE_COLS = (
+    "pattern",
+    "sym",
+    "tf",
+    "start",
+    "end",
+    "detected",
+    "direction",
+    "close",
+    *RETURN_COLS,
+    "max_up",
+    "max_down",
+    "bars_to_target",
+)
+
+STATS_COLS = ("pattern", "sym", "tf", "n", "hit_rate", "median_bars", *MEDIAN_COLS)
+
+# Used unless the config sets OUTCOME_DB
+DEFAULT_DB = Path(__file__).parent / "state" / "outcomes.db"
+
+
+def get_db_path(config: dict) -> Path:
+    if config.get("OUTCOME_DB"):
+        return Path(config["OUTCOME_DB"]).expanduser().resolve()
+
+    return DEFAULT_DB
+
+
+class OutcomeStore:
+    """
+    SQLite store of backtested pattern occurrences and their statistics.
+
+    Parameters:
+    :param path: Database file. Created if missing.
+    :type path: Path
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path)
+
+        returns = ", ".join(f"{col} REAL" for col in RETURN_COLS)
+        medians = ", ".join(f"{col} REAL" for col in MEDIAN_COLS)
+
+        self.conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS occurrences (
+                pattern TEXT NOT NULL,
+                sym TEXT NOT NULL,
+                tf TEXT NOT NULL,
+                start TEXT NOT NULL,
+                end TEXT,
+                detected TEXT,
+                direction INTEGER,
+                close REAL,
+                {returns},
+                max_up REAL,
+                max_down REAL,
+                bars_to_target INTEGER,
+                PRIMARY KEY (pattern, sym, tf, start)
+            );
+
+            CREATE INDEX IF NOT EXISTS occurrences_sym ON occurrences (sym, tf);
+
+            CREATE TABLE IF NOT EXISTS stats (
+                pattern TEXT NOT NULL,
+                sym TEXT NOT NULL,
+                tf TEXT NOT NULL,
+                n INTEGER,
+                hit_rate REAL,
+                median_bars REAL,
+                {medians},
+                PRIMARY KEY (pattern, sym, tf)
+            );
+            """
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, results: Iterable[dict], tf: str) -> int:
+        """
+        Insert or update backtest results, then refresh the stats of their
+        patterns. Results without an `outcome` are skipped.
+
+        Returns the number of rows written.
+        """
+        rows = []
+
+        for result in results:
+            outcome = result.get("outcome")
+
+            if not outcome:
+                continue
+
+            returns = outcome["returns"]
+
+            rows.append(
+                (
+                    result["pattern"],
+                    result["sym"].upper(),
+                    tf,
+                    result["start"],
+                    result["end"],
+                    outcome["date"],
+                    outcome["direction"],
+                    outcome["close"],
+                    *(returns.get(str(h)) for h in HORIZONS),
+                    outcome["max_up"],
+                    outcome["max_down"],
+                    outcome["bars_to_target"],
+                )
+            )
+
+        if not rows:
+            return 0
+
+        placeholders = ", ".join("?" * len(OCCURRENCE_COLS))
+
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO occurrences ({', '.join(OCCURRENCE_COLS)}) "
+                f"VALUES ({placeholders})",
+                rows,
+            )
+
+        self.refresh({(row[0], row[2]) for row in rows})
+        return len(rows)
+
+    def refresh(self, groups: Iterable[Tuple[str, str]]):
+        """Recompute the stats of each (pattern, timeframe)"""
+        for pattern, tf in groups:
+            df = pd.read_sql_query(
+                "SELECT * FROM occurrences WHERE pattern = ? AND tf = ?",
+                self.conn,
+                params=(pattern, tf),
+            )
+
+            rows = [self._aggregate(pattern, "*", tf, df)]
+
+            for sym, group in df.groupby("sym"):
+                rows.append(self._aggregate(pattern, sym, tf, group))
+
+            with self.conn:
+                self.conn.execute(
+                    "DELETE FROM stats WHERE pattern = ? AND tf = ?", (pattern, tf)
+                )
+                self.conn.executemany(
+                    f"INSERT INTO stats ({', '.join(STATS_COLS)}) "
+                    f"VALUES ({', '.join('?' * len(STATS_COLS))})",
+                    rows,
+                )
+
+    @staticmethod
+    def _aggregate(pattern: str, sym: str, tf: str, df: pd.DataFrame) -> tuple:
+        direction = df["direction"].replace(0, 1).to_numpy(dtype=float)
+        bars = df["bars_to_target"].to_numpy(dtype=float)
+        hits = ~np.isnan(bars)
+
+        medians = []
+
+        for col in RETURN_COLS:
+            moves = df[col].to_numpy(dtype=float) * direction
+            moves = moves[~np.isnan(moves)]
+            medians.append(float(np.median(moves)) if len(moves) else None)
+
+        return (
+            pattern,
+            sym,
+            tf,
+            len(df),
+            float(hits.mean()),
+            float(np.median(bars[hits])) if hits.any() else None,
+            *medians,
+        )
+
+    def stats(
+        self,
+        pattern: Optional[str] = None,
+        tf: Optional[str] = None,
+        sym: Optional[str] = "*",
+    ) -> pd.DataFrame:
+        """Stats table, filtered by pattern and timeframe. sym=None returns all
+        rows, including the per symbol ones"""
+        clauses, params = [], []
+
+        for col, value in (("pattern", pattern), ("tf", tf), ("sym", sym)):
+            if value is not None:
+                clauses.append(f"{col} = ?")
+                params.append(value.upper() if col != "tf" else value)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        return pd.read_sql_query(
+            f"SELECT * FROM stats {where} ORDER BY pattern, sym, tf",
+            self.conn,
+            params=params,
+        )
+
+    def edge(self, pattern: str, sym: str, tf: str, min_samples=10) -> Optional[dict]:
+        """
+        Historical stats for a live pattern. Uses the symbol stats if they
+        have at least `min_samples` occurrences, else the pattern stats over
+        all symbols. None if the pattern was never backtested.
+        """
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(STATS_COLS)} FROM stats "
+            "WHERE pattern = ? AND tf = ? AND sym IN (?, '*')",
+            (pattern.upper(), tf, sym.upper()),
+        )
+
+        found: Dict[str, dict] = {
+            row[1]: dict(zip(STATS_COLS, row)) for row in cursor.fetchall()
+        }
+
+        stats = found.get(sym.upper())
+
+        if stats is None or stats["n"] < min_samples:
+            stats = found.get("*")
+
+        if stats is None:
+            return None
+
+        stats = dict(stats)
+        stats["scope"] = "symbol" if stats.pop("sym") != "*" else "all"
+
+        del stats["pattern"]
+        del stats["tf"]
+
+        return stats
+
+    def annotate(self, patterns: List[dict], tf: str, min_samples=10) -> List[dict]:
+        """Add the historical `edge` of each pattern in place, if known"""
+        for pattern in patterns:
+            if "pattern" not in pattern or "sym" not in pattern:
+                continue
+
+            edge = self.edge(pattern["pattern"], pattern["sym"], tf, min_samples)
+
+            if edge is not None:
+                pattern["edge"] = edge
+
+        return patterns
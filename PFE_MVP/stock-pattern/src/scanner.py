@@ -0,0 +1,887 @@
+"""
+Single pass pattern scan.
+
+Each symbol is loaded once, its pivots are computed once per pivot type
+(`both`, `high`, `low`) and every requested detector runs against those
+shared inputs inside one task.
+
+Several timeframes can be scanned from one load of the symbol: the loader
+derives each timeframe from the same daily bars (see scan_timeframes).
+
+With a scan cache, a symbol whose data has not changed since the last scan
+returns its previous results without running any detector. When bars were
+appended, only the pivots of the unconfirmed tail and new bars are
+recomputed.
+"""
+
+import hashlib
+import json
+import logging
+import pickle
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+import utils
+from kernel import ScanArrays
+from loaders.AbstractLoader import AbstractLoader
+
+# Detector keys scanned on one side only. Everything else uses both.
+PIVOT_TYPES = dict(uptl="low", flagu="low", dntl="high", flagd="high")
+
+KeyFns = Tuple[Tuple[str, Tuple[Callable, ...]], ...]
+
+# Detector key to function. Also the order of keys in scan outputs.
+DETECTORS: Dict[str, Callable] = {
+    "flagu": utils.find_bullish_flag,
+    "flagd": utils.find_bearish_flag,
+    "vcpu": utils.find_bullish_vcp,
+    "dbot": utils.find_double_bottom,
+    "hnsu": utils.find_reverse_hns,
+    "vcpd": utils.find_bearish_vcp,
+    "dtop": utils.find_double_top,
+    "hnsd": utils.find_hns,
+    "trng": utils.find_triangles,
+    "uptl": utils.find_uptrend_line,
+    "dntl": utils.find_downtrend_line,
+    "abcdu": utils.find_bullish_abcd,
+    "abcdd": utils.find_bearish_abcd,
+    "batu": utils.find_bullish_bat,
+    "batd": utils.find_bearish_bat,
+    "gartu": utils.find_bullish_gartley,
+    "gartd": utils.find_bearish_gartley,
+    "crabu": utils.find_bullish_crab,
+    "crabd": utils.find_bearish_crab,
+    "bflyu": utils.find_bullish_butterfly,
+    "bflyd": utils.find_bearish_butterfly,
+}
+
+# Detectors that take the shared kernel.ScanArrays as a fifth argument.
+# Other callables in key_fns are called with (sym, df, pivots, config).
+_ARRAY_DETECTORS = frozenset(DETECTORS.values())
+
+# Bump to invalidate scan caches when detector output changes
+CACHE_VERSION = 1
+
+
+def get_pivot_type(key: str) -> str:
+    return PIVOT_TYPES.get(key, "both")
+
+
+def resolve_fns_from_key(
+    key: str, fn_dict: Dict[str, Callable], config: dict
+) -> Tuple[Callable, ...]:
+    """
+    Supports:
+    - custom pattern groups from config["PATTERNS"][key]
+    - single detector key in fn_dict
+    - legacy groups: bull, bear, bull_harm, bear_harm, all
+    """
+    if "PATTERNS" in config and key in config["PATTERNS"]:
+        custom_list = config["PATTERNS"][key]
+        fns: List[Callable] = []
+        for k in custom_list:
+            if k not in fn_dict:
+                raise KeyError(f"No such pattern defined: {k}")
+            fns.append(fn_dict[k])
+        return tuple(fns)
+
+    if key in fn_dict:
+        return (fn_dict[key],)
+
+    if key == "bull":
+        bull_list = ("vcpu", "hnsu", "dbot", "flagu")
+        return tuple(v for k, v in fn_dict.items() if k in bull_list)
+
+    if key == "bear":
+        bear_list = ("vcpd", "hnsd", "dtop", "flagd")
+        return tuple(v for k, v in fn_dict.items() if k in bear_list)
+
+    if key == "bull_harm":
+        bull_list = ("abcdu", "batu", "gartu", "crabu", "bflyu")
+        return tuple(v for k, v in fn_dict.items() if k in bull_list)
+
+    if key == "bear_harm":
+        bear_list = ("abcdd", "batd", "gartd", "crabd", "bflyd")
+        return tuple(v for k, v in fn_dict.items() if k in bear_list)
+
+    if key == "all":
+        return tuple(
+            fn_dict[k]
+            for k in ("vcpu", "hnsu", "dbot", "flagu", "vcpd", "hnsd", "dtop", "flagd")
+        )
+
+    raise KeyError(f"{key} did not match any defined patterns.")
+
+
+def _dt_to_iso(dt):
+    if dt is None:
+        return None
+    if hasattr(dt, "isoformat"):
+        return dt.isoformat()
+    return str(dt)
+
+
+def _sym_path(folder: Optional[Path], sym: str, tf: str, ext: str) -> Optional[Path]:
+    return folder / f"{sym.upper()}_{tf}.{ext}" if folder else None
+
+
+def clean_df(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop duplicate index entries and sort ascending"""
+    if df.index.has_duplicates:
+        df = df.loc[~df.index.duplicated()]
+
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(ascending=True)
+
+    return df
+
+
+def export_candles_json(
+    sym: str, df, timeframe: str, out_path: Path, indent: Optional[int] = None
+) -> Optional[Path]:
+    """
+    Write the candles of df as columnar JSON: one list per column under
+    `columns` (t, open, high, low, close, volume).
+
+    The file is compact unless `indent` is set, and is replaced atomically.
+    Its first key is a fingerprint of the data, so the write is skipped if
+    the file already holds the same candles.
+    """
+    if df is None or df.empty:
+        return None
+
+    df = clean_df(df)
+
+    fingerprint = data_fingerprint(df)
+    separators = (",", ": ") if indent else (",", ":")
+
+    # The fingerprint is the first key, so the first bytes of the file
+    # are enough to tell if it is current
+    marker = json.dumps(dict(fingerprint=fingerprint), separators=separators)[1:-1]
+
+    if out_path.exists():
+        with out_path.open("rb") as f:
+            if marker.encode() in f.read(len(marker) + 16):
+                return out_path
+
+    if df.index.tz is None:
+        dates = np.datetime_as_string(df.index.to_numpy(), unit="s").tolist()
+    else:
+        dates = [_dt_to_iso(ts) for ts in df.index]
+
+    columns = {"t": dates}
+
+    for col in ("Open", "High", "Low", "Close", "Volume"):
+        if col in df.columns:
+            columns[col.lower()] = df[col].to_numpy(dtype=float).tolist()
+        else:
+            columns[col.lower()] = [None] * len(df)
+
+    payload = {
+        "fingerprint": fingerprint,
+        "sym": sym.upper(),
+        "timeframe": timeframe,
+        "format": "columnar",
+        "df_range": {
+            "start": _dt_to_iso(df.index[0]),
+            "end": _dt_to_iso(df.index[-1]),
+            "rows": int(len(df)),
+        },
+        "columns": columns,
+        "meta": {
+            "saved_at": datetime.now().isoformat(),
+        },
+    }
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = out_path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps(payload, indent=indent, separators=separators), encoding="utf-8"
+    )
+    tmp.replace(out_path)
+    return out_path
+
+
+def load_candles_json(path: Path) -> pd.DataFrame:
+    """Read a candle file written by export_candles_json, or by older
+    versions with a `candles` list of row dicts. Columns are t, open, high,
+    low, close and volume."""
+    data = json.loads(path.read_bytes())
+
+    if "columns" in data:
+        return pd.DataFrame(data["columns"])
+
+    return pd.DataFrame(data.get("candles", []))
+
+
+def run_detectors(
+    sym: str,
+    df: pd.DataFrame,
+    key_fns: KeyFns,
+    logger: logging.Logger,
+    config: dict,
+    bars_left=6,
+    bars_right=6,
+    masks: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Dict[str, List[dict]]:
+    """
+    Run every (key, detector functions) pair on an already cleaned DataFrame.
+
+    Pivots are computed lazily, at most once per pivot type, or built from
+    `masks` (see utils.get_pivot_masks) if provided. Their detector arrays
+    (kernel.ScanArrays) are built once per pivot type and passed to every
+    detector of DETECTORS. An exception in a detector skips the remaining
+    functions of that key only.
+    """
+    pivot_cache: Dict[str, pd.DataFrame] = {}
+    arrays_cache: Dict[str, ScanArrays] = {}
+    results: Dict[str, List[dict]] = {}
+
+    for key, fns in key_fns:
+        patterns: List[dict] = []
+        results[key] = patterns
+
+        pivot_type = get_pivot_type(key)
+
+        if pivot_type not in pivot_cache:
+            if masks is None:
+                pivot_cache[pivot_type] = utils.get_max_min(
+                    df, barsLeft=bars_left, barsRight=bars_right, pivot_type=pivot_type
+                )
+            else:
+                pivot_cache[pivot_type] = utils.pivots_from_masks(
+                    df, *masks, pivot_type=pivot_type
+                )
+
+        pivots = pivot_cache[pivot_type]
+
+        if not len(pivots):
+            continue
+
+        for fn in fns:
+            if not callable(fn):
+                raise TypeError(f"Expected callable. Got {type(fn)}")
+
+            try:
+                if fn in _ARRAY_DETECTORS:
+                    if pivot_type not in arrays_cache:
+                        arrays_cache[pivot_type] = ScanArrays(df, pivots)
+
+                    result = fn(sym, df, pivots, config, arrays_cache[pivot_type])
+                else:
+                    result = fn(sym, df, pivots, config)
+            except Exception as e:
+                logger.exception(f"SYMBOL name: {sym}", exc_info=e)
+                break
+
+            if result:
+                patterns.append(utils.make_serializable(result))
+
+    return results
+
+
+def run_detectors_multi(
+    sym: str,
+    df: pd.DataFrame,
+    key_fns: KeyFns,
+    logger: logging.Logger,
+    config: dict,
+    bars: Sequence[Tuple[int, int]],
+) -> Dict[Tuple[int, int], Dict[str, List[dict]]]:
+    """
+    Run every detector once per (bars_left, bars_right) setting in `bars`.
+
+    The pivot masks of all settings come from one sweep
+    (utils.get_pivot_masks_multi). Each pattern gets a `bars` field with its
+    setting.
+
+    Returns a dict of setting to dict of detector key to patterns.
+    """
+    bars = [(int(left), int(right)) for left, right in bars]
+    masks = utils.get_pivot_masks_multi(df, bars) if df.index.is_unique else {}
+    results = {}
+
+    for setting in bars:
+        result = run_detectors(
+            sym, df, key_fns, logger, config, *setting, masks=masks.get(setting)
+        )
+
+        for patterns in result.values():
+            for pattern in patterns:
+                pattern["bars"] = list(setting)
+
+        results[setting] = result
+
+    return results
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Hash of the index and OHLCV values of df"""
+    digest = hashlib.sha1(np.ascontiguousarray(df.index.asi8).tobytes())
+
+    for col in ("Open", "High", "Low", "Close", "Volume"):
+        if col in df.columns:
+            digest.update(np.ascontiguousarray(df[col].to_numpy(dtype=float)).tobytes())
+
+    return digest.hexdigest()
+
+
+def load_scan_cache(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+
+    try:
+        return pickle.loads(path.read_bytes())
+    except Exception:
+        # A corrupt or outdated cache only costs a full scan
+        return None
+
+
+def save_scan_cache(path: Path, entry: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+    tmp.replace(path)
+
+
+def scan_symbol(
+    sym: str,
+    key_fns: KeyFns,
+    loader: AbstractLoader,
+    logger: logging.Logger,
+    config: dict,
+    bars_left=6,
+    bars_right=6,
+    candle_path: Optional[Path] = None,
+    cache_path: Optional[Path] = None,
+) -> Dict[str, List[dict]]:
+    """
+    Load `sym` once, optionally export its candles and run all detectors.
+
+    Returns a dict of detector key to list of detected patterns.
+    """
+    return scan_frame(
+        sym,
+        loader.get(sym),
+        loader.tf,
+        key_fns,
+        logger,
+        config,
+        bars_left=bars_left,
+        bars_right=bars_right,
+        candle_path=candle_path,
+        cache_path=cache_path,
+    )
+
+
+def scan_symbol_timeframes(
+    sym: str,
+    tfs: Sequence[str],
+    key_fns: KeyFns,
+    loader: AbstractLoader,
+    logger: logging.Logger,
+    config: dict,
+    bars_left=6,
+    bars_right=6,
+    candle_dir: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+) -> Dict[str, Dict[str, List[dict]]]:
+    """
+    Load `sym` once and run all detectors on each timeframe in `tfs`.
+
+    The loader must implement `get_timeframes` (EODFileLoader, FrameLoader).
+    Candles and caches are stored per timeframe, as for single timeframe
+    scans.
+
+    Returns a dict of timeframe to dict of detector key to patterns.
+    """
+    frames = get_timeframes(loader, sym, tfs)
+
+    return {
+        tf: scan_frame(
+            sym,
+            frames.get(tf),
+            tf,
+            key_fns,
+            logger,
+            config,
+            bars_left=bars_left,
+            bars_right=bars_right,
+            candle_path=_sym_path(candle_dir, sym, tf, "json"),
+            cache_path=_sym_path(cache_dir, sym, tf, "pkl"),
+        )
+        for tf in tfs
+    }
+
+
+def get_timeframes(
+    loader: AbstractLoader, sym: str, tfs: Sequence[str]
+) -> Dict[str, Optional[pd.DataFrame]]:
+    get_fn = getattr(loader, "get_timeframes", None)
+
+    if get_fn is None:
+        raise ValueError(
+            f"{type(loader).__name__} does not support multi timeframe scans"
+        )
+
+    return get_fn(sym, tfs)
+
+
+def scan_frame(
+    sym: str,
+    df: Optional[pd.DataFrame],
+    tf: str,
+    key_fns: KeyFns,
+    logger: logging.Logger,
+    config: dict,
+    bars_left=6,
+    bars_right=6,
+    candle_path: Optional[Path] = None,
+    cache_path: Optional[Path] = None,
+) -> Dict[str, List[dict]]:
+    """
+    Optionally export the candles of `df` and run all detectors on it.
+
+    If `cache_path` is set, the data fingerprint, last bar, pivot masks and
+    results are stored there. The next scan returns the stored results if
+    the data is unchanged and only updates the tail pivots if bars were
+    appended. Every detector reads the last bar, so they all run again on
+    any change.
+
+    Returns a dict of detector key to list of detected patterns.
+    """
+    if df is None or df.empty:
+        return {}
+
+    if candle_path is not None:
+        export_candles_json(
+            sym, df, tf, candle_path, indent=config.get("CANDLE_JSON_INDENT")
+        )
+
+    df = clean_df(df)
+
+    if cache_path is None:
+        return run_detectors(
+            sym,
+            df,
+            key_fns,
+            logger,
+            config,
+            bars_left=bars_left,
+            bars_right=bars_right,
+        )
+
+    params = dict(
+        version=CACHE_VERSION,
+        keys=tuple((key, tuple(fn.__name__ for fn in fns)) for key, fns in key_fns),
+        bars=(bars_left, bars_right),
+        config=json.dumps(config, sort_keys=True, default=str),
+    )
+
+    fingerprint = data_fingerprint(df)
+    entry = load_scan_cache(cache_path)
+
+    if entry and entry["params"] == params and entry["fingerprint"] == fingerprint:
+        return entry["results"]
+
+    masks = None
+
+    if entry and entry["params"]["bars"] == params["bars"]:
+        masks = utils.update_pivot_masks(
+            entry["df"], entry["masks"], df, bars_left, bars_right
+        )
+
+    if masks is None and df.index.is_unique:
+        masks = utils.get_pivot_masks(df, bars_left, bars_right)
+
+    results = run_detectors(
+        sym,
+        df,
+        key_fns,
+        logger,
+        config,
+        bars_left=bars_left,
+        bars_right=bars_right,
+        masks=masks,
+    )
+
+    save_scan_cache(
+        cache_path,
+        dict(
+            params=params,
+            fingerprint=fingerprint,
+            last_bar=df.index[-1],
+            df=df[["High", "Low", "Volume"]],
+            masks=masks,
+            results=results,
+        ),
+    )
+
+    return results
+
+
+# Per worker process state, set once by init_worker
+_worker: dict = {}
+
+
+def init_worker(
+    loader_class: Type[AbstractLoader],
+    loader_kwargs: dict,
+    keys: Tuple[str, ...],
+    config: dict,
+    bars_left=6,
+    bars_right=6,
+    candle_dir: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+    tfs: Optional[Tuple[str, ...]] = None,
+    keep_frames=False,
+):
+    """
+    ProcessPoolExecutor initializer. Builds the loader and resolves the
+    detector keys once per worker, so tasks only carry symbol names. The
+    loader, and any cache it keeps, lives as long as the worker.
+
+    If `tfs` is set, each symbol is scanned on all of these timeframes. If
+    `keep_frames` is set, scan_chunk returns the data of the symbols with
+    patterns, so their charts are drawn without loading them again.
+    """
+    _worker.update(
+        loader=loader_class(config, **loader_kwargs),
+        key_fns=tuple(
+            (key, resolve_fns_from_key(key, DETECTORS, config)) for key in keys
+        ),
+        config=config,
+        bars_left=bars_left,
+        bars_right=bars_right,
+        candle_dir=candle_dir,
+        cache_dir=cache_dir,
+        tfs=tfs,
+        keep_frames=keep_frames,
+        logger=logging.getLogger(__name__),
+    )
+
+
+def scan_chunk(
+    sym_list: Tuple[str, ...]
+) -> List[Tuple[str, str, Dict[str, List[dict]], Optional[pd.DataFrame]]]:
+    """
+    Scan a chunk of symbols in a worker set up by init_worker.
+
+    Returns (sym, tf, {key: patterns}, df) for the symbols and timeframes
+    with patterns only, and only their non empty keys. df is the cleaned
+    data scanned, or None unless the worker keeps frames.
+    """
+    loader = _worker["loader"]
+    candle_dir = _worker["candle_dir"]
+    cache_dir = _worker["cache_dir"]
+    tfs = _worker["tfs"]
+
+    found = []
+
+    for sym in sym_list:
+        if tfs:
+            frames = get_timeframes(loader, sym, tfs)
+        else:
+            frames = {loader.tf: loader.get(sym)}
+
+        for tf, df in frames.items():
+            result = scan_frame(
+                sym,
+                df,
+                tf,
+                _worker["key_fns"],
+                _worker["logger"],
+                _worker["config"],
+                bars_left=_worker["bars_left"],
+                bars_right=_worker["bars_right"],
+                candle_path=_sym_path(candle_dir, sym, tf, "json"),
+                cache_path=_sym_path(cache_dir, sym, tf, "pkl"),
+            )
+
+            result = {key: patterns for key, patterns in result.items() if patterns}
+
+            if result:
+                frame = clean_df(df) if _worker["keep_frames"] else None
+                found.append((sym, tf, result, frame))
+
+    return found
+
+
+def chunk_symbols(
+    sym_list: Sequence[str], workers: int, max_chunk=64
+) -> List[Tuple[str, ...]]:
+    """
+    Split symbols into chunks for scan_chunk.
+
+    About 4 chunks per worker, so the pool stays balanced when some
+    symbols are slower than others, and at most `max_chunk` symbols per
+    chunk so the progress bar moves.
+    """
+    size = max(1, min(max_chunk, len(sym_list) // (workers * 4)))
+
+    return [tuple(sym_list[i : i + size]) for i in range(0, len(sym_list), size)]
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse a shard spec `i/n`, with 1 <= i <= n"""
+    try:
+        index, count = (int(x) for x in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must be of the form i/n. Got {spec!r}")
+
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}. Got {index}")
+
+    return index, count
+
+
+def shard_symbols(sym_list: Sequence[str], index: int, count: int) -> Tuple[str, ...]:
+    """
+    Symbols of shard `index` out of `count`, in list order.
+
+    Symbols are assigned by a hash of their upper case name, so processes or
+    hosts running shards 1/n to n/n scan disjoint sets that cover the list,
+    whatever its order, and adding symbols does not move the others.
+    """
+    return tuple(
+        sym
+        for sym in sym_list
+        if zlib.crc32(str(sym).upper().encode()) % count == index - 1
+    )
+
+
+def scan(
+    sym_list: Sequence[str],
+    keys: Sequence[str],
+    loader: AbstractLoader,
+    config: Optional[dict] = None,
+    bars_left=6,
+    bars_right=6,
+    candle_dir: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+    logger: Optional[logging.Logger] = None,
+) -> Dict[str, List[dict]]:
+    """
+    Scan symbols in the current process and return the results in memory.
+
+    `keys` are detector keys or groups accepted by resolve_fns_from_key.
+    Data comes from `loader`. Use loaders.FrameLoader to scan DataFrames
+    already loaded by the caller.
+
+    If `candle_dir` is set, candles are exported as in init.py. If
+    `cache_dir` is set, unchanged symbols return their cached results (see
+    scan_symbol).
+
+    Returns a dict of detector key to list of detected patterns, in symbol
+    order.
+    """
+    config = config or {}
+    logger = logger or logging.getLogger(__name__)
+
+    key_fns = tuple(
+        (key, resolve_fns_from_key(key, DETECTORS, config)) for key in keys
+    )
+
+    found: Dict[str, List[dict]] = {key: [] for key in keys}
+
+    for sym in sym_list:
+        result = scan_symbol(
+            sym,
+            key_fns,
+            loader,
+            logger,
+            config,
+            bars_left=bars_left,
+            bars_right=bars_right,
+            candle_path=_sym_path(candle_dir, sym, loader.tf, "json"),
+            cache_path=_sym_path(cache_dir, sym, loader.tf, "pkl"),
+        )
+
+        for key, patterns in result.items():
+            found[key].extend(patterns)
+
+    return found
+
+
+def scan_timeframes(
+    sym_list: Sequence[str],
+    keys: Sequence[str],
+    loader: AbstractLoader,
+    tfs: Sequence[str],
+    config: Optional[dict] = None,
+    bars_left=6,
+    bars_right=6,
+    candle_dir: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+    logger: Optional[logging.Logger] = None,
+) -> Dict[str, Dict[str, List[dict]]]:
+    """
+    Same as scan, on every timeframe in `tfs`. Each symbol is loaded once
+    and its higher timeframes are resampled from the same bars.
+
+    Returns a dict of timeframe to dict of detector key to patterns.
+    """
+    config = config or {}
+    logger = logger or logging.getLogger(__name__)
+
+    key_fns = tuple(
+        (key, resolve_fns_from_key(key, DETECTORS, config)) for key in keys
+    )
+
+    found = {tf: {key: [] for key in keys} for tf in tfs}
+
+    for sym in sym_list:
+        results = scan_symbol_timeframes(
+            sym,
+            tfs,
+            key_fns,
+            loader,
+            logger,
+            config,
+            bars_left=bars_left,
+            bars_right=bars_right,
+            candle_dir=candle_dir,
+            cache_dir=cache_dir,
+        )
+
+        for tf, result in results.items():
+            for key, patterns in result.items():
+                found[tf][key].extend(patterns)
+
+    return found
+
+
+def parse_bars(spec: str) -> Tuple[int, int]:
+    """Parse a 'left,right' pivot setting, such as '6,6'"""
+    try:
+        left, right = (int(x) for x in spec.split(","))
+    except ValueError:
+        raise ValueError(f"Expected left,right, for example 6,6. Got {spec!r}")
+
+    if left < 1 or right < 1:
+        raise ValueError(f"Pivot bars must be at least 1. Got {spec!r}")
+
+    return left, right
+
+
+def scan_bars(
+    sym_list: Sequence[str],
+    keys: Sequence[str],
+    loader: AbstractLoader,
+    bars: Sequence[Tuple[int, int]],
+    config: Optional[dict] = None,
+    logger: Optional[logging.Logger] = None,
+) -> Dict[Tuple[int, int], Dict[str, List[dict]]]:
+    """
+    Same as scan, for every (bars_left, bars_right) setting in `bars`.
+
+    Each symbol is loaded and cleaned once, and the pivots of all settings
+    are computed in one sweep (see run_detectors_multi). Patterns carry a
+    `bars` field with their setting, so results of different settings can
+    be merged and compared.
+
+    Returns a dict of setting to dict of detector key to patterns.
+    """
+    config = config or {}
+    logger = logger or logging.getLogger(__name__)
+    bars = [(int(left), int(right)) for left, right in bars]
+
+    key_fns = tuple(
+        (key, resolve_fns_from_key(key, DETECTORS, config)) for key in keys
+    )
+
+    found = {setting: {key: [] for key in keys} for setting in bars}
+
+    for sym in sym_list:
+        df = loader.get(sym)
+
+        if df is None or df.empty:
+            continue
+
+        results = run_detectors_multi(
+            sym, clean_df(df), key_fns, logger, config, bars
+        )
+
+        for setting, result in results.items():
+            for key, patterns in result.items():
+                found[setting][key].extend(patterns)
+
+    return found
+
+
+def write_pattern_files(
+    patterns: List[dict],
+    sym_list: Sequence[str],
+    output_dir: Path,
+    tf: str,
+    meta: dict,
+):
+    """Write one `{SYM}_{tf}_patterns.json` per symbol, including symbols
+    without patterns"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    patterns_by_sym: Dict[str, List[dict]] = {}
+    for p in patterns:
+        sym = str(p.get("sym", "")).upper()
+        if not sym:
+            continue
+        patterns_by_sym.setdefault(sym, []).append(p)
+
+    for sym in sym_list:
+        sym_upper = str(sym).upper()
+        sym_patterns = patterns_by_sym.get(sym_upper, [])
+        payload = {
+            "sym": sym_upper,
+            "timeframe": meta.get("timeframe"),
+            "patterns": sym_patterns,
+            "meta": meta,
+        }
+        if not sym_patterns:
+            payload["message"] = "no patterns detected"
+        out_path = output_dir / f"{sym_upper}_{tf}_patterns.json"
+        out_path.write_text(json.dumps(payload, indent=2))
+
+
+def print_summary(patterns_with_meta: List[dict]):
+    """
+    Print only the list of detectors found + counts (no plots).
+    """
+    if not patterns_with_meta:
+        print("No patterns detected")
+        return
+
+    data = patterns_with_meta[:-1]  # exclude meta
+    if not data:
+        print("No patterns detected")
+        return
+
+    counts: Dict[str, int] = {}
+    for p in data:
+        k = p.get("pattern", "unknown")
+        counts[k] = counts.get(k, 0) + 1
+
+    detectors = sorted(counts.keys())
+
+    # Historical stats over all symbols, where the pattern was backtested
+    edges: Dict[str, dict] = {}
+    for p in data:
+        edge = p.get("edge")
+        if edge and edge.get("scope") == "all":
+            edges.setdefault(p.get("pattern", "unknown"), edge)
+
+    print("\nDetected detectors:")
+    for d in detectors:
+        line = f"- {d}: {counts[d]}"
+        if d in edges:
+            edge = edges[d]
+            line += f" (hit rate {edge['hit_rate']:.0%} over {edge['n']} backtested)"
+        print(line)
+
+    print("\nTip: you can retrace patterns using their `points` field from the json output.\n")
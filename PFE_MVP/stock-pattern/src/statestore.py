@@ -0,0 +1,332 @@
+"""
+State store of detected patterns.
+
+Every scan of the current data upserts its patterns in an SQLite database,
+one row per symbol, timeframe, pattern and start date. A row is valid from
+the scan that detected it (`valid_from`) until the first scan of the same
+symbol and detector key that no longer does (`valid_to`). Patterns still
+valid have `valid_to` NULL.
+
+Only the symbols and detector keys of a scan are invalidated, so scans of
+different symbol lists or keys share the same database.
+
+- `new`: patterns that became valid since a given time, by default in the
+  last scan.
+- `invalidated`: patterns no longer detected since a given time.
+- `active`: patterns currently valid, by symbol and timeframe.
+
+`load_active` reads the active patterns of a symbol for readers such as
+the dashboard, unless the pattern files are more recent.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Used unless the config sets STATE_DB
+DEFAULT_DB = Path(__file__).parent / "state" / "patterns.db"
+
+
+def get_db_path(config: dict) -> Path:
+    if config.get("STATE_DB"):
+        return Path(config["STATE_DB"]).expanduser().resolve()
+
+    return DEFAULT_DB
+
+
+def _parse_time(at: str) -> datetime:
+    """Naive local time of an ISO `at` value"""
+    dt = datetime.fromisoformat(at)
+
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+
+    return dt
+
+
+def load_active(
+    path: Union[str, Path],
+    sym: str,
+    tf: str,
+    newer_than: Optional[float] = None,
+) -> Optional[List[dict]]:
+    """
+    Active patterns of `sym` on `tf`, read without writing to the database.
+
+    Scans without state (init.py without SAVE_STATE or with --date) write
+    the pattern files but not the database. Pass the modification time of
+    the pattern file as `newer_than`: the database is only used if its last
+    scan of `tf` is at least as recent.
+
+    Returns None if the database is missing, unreadable or older than
+    `newer_than`, or has no active pattern for `sym`.
+    """
+    path = Path(path)
+
+    if not path.exists():
+        return None
+
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+        try:
+            last_run = conn.execute(
+                "SELECT MAX(at) FROM runs WHERE tf = ?", (tf,)
+            ).fetchone()[0]
+
+            if last_run is None or (
+                newer_than is not None
+                and _parse_time(last_run) < datetime.fromtimestamp(newer_than)
+            ):
+                return None
+
+            rows = conn.execute(
+                "SELECT data FROM patterns "
+                "WHERE sym = ? AND tf = ? AND valid_to IS NULL "
+                "ORDER BY start, pattern",
+                (str(sym).upper(), tf),
+            ).fetchall()
+        finally:
+            conn.close()
+    except (sqlite3.Error, ValueError):
+        return None
+
+    if not rows:
+        return None
+
+    return [json.loads(row[0]) for row in rows]
+
+
+class StateStore:
+    """
+    SQLite store of detected patterns and their validity.
+
+    Parameters:
+    :param path: Database file. Created if missing.
+    :type path: Path
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path)
+
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS patterns (
+                sym TEXT NOT NULL,
+                tf TEXT NOT NULL,
+                pattern TEXT NOT NULL,
+                start TEXT NOT NULL,
+                key TEXT NOT NULL,
+                data TEXT NOT NULL,
+                valid_from TEXT NOT NULL,
+                valid_to TEXT,
+                last_seen TEXT NOT NULL,
+                PRIMARY KEY (sym, tf, pattern, start)
+            );
+
+            CREATE INDEX IF NOT EXISTS patterns_active ON patterns (tf, valid_to, sym);
+            CREATE INDEX IF NOT EXISTS patterns_from ON patterns (valid_from);
+            CREATE INDEX IF NOT EXISTS patterns_to ON patterns (valid_to);
+
+            CREATE TABLE IF NOT EXISTS runs (
+                at TEXT NOT NULL,
+                tf TEXT NOT NULL,
+                symbols INTEGER NOT NULL
+            );
+            """
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def update(
+        self,
+        found: Dict[str, List[dict]],
+        syms: Iterable[str],
+        tf: str,
+        at: Optional[str] = None,
+    ) -> Dict[str, List[dict]]:
+        """
+        Record one scan of `syms` on `tf`. `found` maps each detector key
+        scanned to its patterns.
+
+        Patterns not valid before are inserted or made valid again, patterns
+        still detected are refreshed, and valid patterns of the scanned
+        symbols and keys that were not detected are invalidated.
+
+        Returns, by key, the patterns that were not valid before the scan.
+        """
+        at = at or datetime.now().isoformat()
+        syms = sorted({str(sym).upper() for sym in syms})
+
+        with self.conn:
+            active = self._active_keys(syms, tf)
+            new, detected = self._diff(found, active)
+
+            self.conn.executemany(
+                "INSERT INTO patterns "
+                "(sym, pattern, start, tf, key, data, valid_from, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (sym, tf, pattern, start) DO UPDATE SET "
+                "key = excluded.key, data = excluded.data, "
+                "last_seen = excluded.last_seen, "
+                "valid_from = CASE WHEN valid_to IS NULL "
+                "THEN valid_from ELSE excluded.valid_from END, "
+                "valid_to = NULL",
+                (
+                    (*pid, tf, key, json.dumps(dct), at, at)
+                    for pid, (key, dct) in detected.items()
+                ),
+            )
+
+            self.conn.executemany(
+                "UPDATE patterns SET valid_to = ? "
+                "WHERE sym = ? AND tf = ? AND pattern = ? AND start = ?",
+                (
+                    (at, sym, tf, pattern, start)
+                    for (sym, pattern, start), key in active.items()
+                    if key in found and (sym, pattern, start) not in detected
+                ),
+            )
+
+            self.conn.execute(
+                "INSERT INTO runs (at, tf, symbols) VALUES (?, ?, ?)",
+                (at, tf, len(syms)),
+            )
+
+        return new
+
+    def diff(
+        self, found: Dict[str, List[dict]], syms: Iterable[str], tf: str
+    ) -> Dict[str, List[dict]]:
+        """The patterns `update` would return as new, without recording the
+        scan"""
+        syms = sorted({str(sym).upper() for sym in syms})
+
+        with self.conn:
+            return self._diff(found, self._active_keys(syms, tf))[0]
+
+    def _active_keys(self, syms: List[str], tf: str) -> Dict[tuple, str]:
+        """Valid patterns of `syms` on `tf`, (sym, pattern, start) to their
+        detector key"""
+        self.conn.execute("DROP TABLE IF EXISTS temp.scanned")
+        self.conn.execute("CREATE TEMP TABLE scanned (sym TEXT PRIMARY KEY)")
+        self.conn.executemany(
+            "INSERT INTO scanned VALUES (?)", ((sym,) for sym in syms)
+        )
+
+        active = {
+            row[:3]: row[3]
+            for row in self.conn.execute(
+                "SELECT sym, pattern, start, key FROM patterns "
+                "WHERE tf = ? AND valid_to IS NULL "
+                "AND sym IN (SELECT sym FROM scanned)",
+                (tf,),
+            )
+        }
+
+        self.conn.execute("DROP TABLE temp.scanned")
+        return active
+
+    @staticmethod
+    def _diff(
+        found: Dict[str, List[dict]], active: Dict[tuple, str]
+    ) -> Tuple[Dict[str, List[dict]], Dict[tuple, Tuple[str, dict]]]:
+        """Return the new patterns by key, and every detected pattern by
+        (sym, pattern, start), with its key. The first key of a duplicate
+        pattern wins."""
+        new: Dict[str, List[dict]] = {key: [] for key in found}
+        detected: Dict[tuple, Tuple[str, dict]] = {}
+
+        for key, patterns in found.items():
+            for dct in patterns:
+                pid = (dct["sym"].upper(), dct["pattern"], dct["start"])
+
+                if pid in detected:
+                    continue
+
+                detected[pid] = (key, dct)
+
+                if pid not in active:
+                    new[key].append(dct)
+
+        return new, detected
+
+    def last_run(self, tf: Optional[str] = None) -> Optional[str]:
+        """Time of the last scan, on `tf` if set"""
+        if tf is None:
+            cursor = self.conn.execute("SELECT MAX(at) FROM runs")
+        else:
+            cursor = self.conn.execute("SELECT MAX(at) FROM runs WHERE tf = ?", (tf,))
+
+        return cursor.fetchone()[0]
+
+    def active(
+        self, sym: Optional[str] = None, tf: Optional[str] = None
+    ) -> List[dict]:
+        """Patterns currently valid, filtered by symbol and timeframe"""
+        return self._select("valid_to IS NULL", sym=sym, tf=tf)
+
+    def new(
+        self,
+        since: Optional[str] = None,
+        sym: Optional[str] = None,
+        tf: Optional[str] = None,
+    ) -> List[dict]:
+        """Patterns valid since `since`, by default the last scan, and still
+        valid"""
+        since = since or self.last_run(tf)
+
+        if since is None:
+            return []
+
+        return self._select(
+            "valid_to IS NULL AND valid_from >= ?", (since,), sym=sym, tf=tf
+        )
+
+    def invalidated(
+        self,
+        since: Optional[str] = None,
+        sym: Optional[str] = None,
+        tf: Optional[str] = None,
+    ) -> List[dict]:
+        """Patterns no longer detected since `since`, by default the last scan"""
+        since = since or self.last_run(tf)
+
+        if since is None:
+            return []
+
+        return self._select("valid_to >= ?", (since,), sym=sym, tf=tf)
+
+    def _select(
+        self,
+        where: str,
+        params: tuple = (),
+        sym: Optional[str] = None,
+        tf: Optional[str] = None,
+    ) -> List[dict]:
+        clauses, values = [where], list(params)
+
+        for col, value in (("sym", sym), ("tf", tf)):
+            if value is not None:
+                clauses.append(f"{col} = ?")
+                values.append(value.upper() if col == "sym" else value)
+
+        cursor = self.conn.execute(
+            f"SELECT data FROM patterns WHERE {' AND '.join(clauses)} "
+            "ORDER BY sym, tf, start, pattern",
+            values,
+        )
+
+        return [json.loads(row[0]) for row in cursor]
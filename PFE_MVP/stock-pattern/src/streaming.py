@@ -0,0 +1,197 @@
+"""
+Streaming pattern detection, one bar at a time.
+
+A StreamScanner keeps, per symbol, the last `period` bars and their pivot
+masks. When a bar arrives, only the pivots of the unconfirmed tail and the
+new bar are recomputed (utils.update_pivot_masks), the detectors run on the
+shared window and pivots (scanner.run_detectors) and the results are
+compared with those of the previous bar.
+
+Each update returns events:
+
+- `formed`: a pattern not detected on the previous bar.
+- `invalidated`: a pattern detected on the previous bar and no longer.
+
+A pattern is identified by its detector key, name and start date, so a
+pattern whose last point moves with the close is not reported again.
+
+The detectors read the whole window, so every bar runs them all. Their
+output on a window is the same as scanner.scan on the same bars.
+
+```python
+stream = StreamScanner(keys=("vcpu", "trng"))
+stream.seed("AAPL", df)
+
+for event in stream.update("AAPL", ts, dict(Open=o, High=h, Low=l, Close=c, Volume=v)):
+    print(event["event"], event["key"], event["pattern"]["start"])
+```
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import utils
+from scanner import DETECTORS, clean_df, resolve_fns_from_key, run_detectors
+
+COLUMNS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class StreamScanner:
+    """
+    Online pattern detection over bars received one at a time.
+
+    Parameters:
+    :param keys: Detector keys or groups accepted by
+                 scanner.resolve_fns_from_key. Default is every detector.
+    :type keys: Optional[Sequence[str]]
+    :param config: User config, passed to the detectors
+    :type config: Optional[dict]
+    :param period: Number of bars in the window scanned
+    :type period: int
+    :param bars_left: Bars to the left of a pivot
+    :type bars_left: int
+    :param bars_right: Bars to the right of a pivot
+    :type bars_right: int
+    """
+
+    def __init__(
+        self,
+        keys: Optional[Sequence[str]] = None,
+        config: Optional[dict] = None,
+        period: int = 160,
+        bars_left=6,
+        bars_right=6,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.config = config or {}
+        self.period = period
+        self.bars_left = bars_left
+        self.bars_right = bars_right
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.key_fns = tuple(
+            (key, resolve_fns_from_key(key, DETECTORS, self.config))
+            for key in (keys or tuple(DETECTORS))
+        )
+
+        self.frames: Dict[str, pd.DataFrame] = {}
+        self.masks: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.results: Dict[str, Dict[str, List[dict]]] = {}
+
+    def seed(self, sym: str, df: pd.DataFrame) -> List[dict]:
+        """
+        Start or restart the stream of `sym` with historical bars. Only the
+        last `period` bars are kept. Returns a `formed` event for each
+        pattern detected on them.
+        """
+        df = clean_df(df).iloc[-self.period :]
+        df = df[[col for col in COLUMNS if col in df.columns]]
+
+        self.frames.pop(sym, None)
+        self.masks.pop(sym, None)
+        self.results.pop(sym, None)
+
+        return self._scan(sym, df)
+
+    def update(self, sym: str, ts, bar: dict) -> List[dict]:
+        """
+        Add the bar at `ts` to `sym` and return the formed and invalidated
+        patterns.
+
+        `bar` maps Open, High, Low, Close and Volume to values. A bar with
+        the timestamp of the last bar replaces it, as when a forming bar is
+        updated. Older bars are ignored.
+        """
+        df = self.frames.get(sym)
+        ts = pd.Timestamp(ts)
+
+        row = pd.DataFrame(
+            {col: [float(bar[col])] for col in COLUMNS if col in bar},
+            index=pd.DatetimeIndex([ts]),
+        )
+
+        if df is None or df.empty:
+            return self._scan(sym, row)
+
+        if df.index.tz is not None and ts.tzinfo is None:
+            row.index = row.index.tz_localize(df.index.tz)
+            ts = row.index[0]
+
+        if ts < df.index[-1]:
+            return []
+
+        if ts == df.index[-1]:
+            df = df.iloc[:-1]
+
+        row.index.name = df.index.name
+        df = pd.concat((df, row[df.columns])).iloc[-self.period :]
+
+        return self._scan(sym, df)
+
+    def patterns(self, sym: str) -> Dict[str, List[dict]]:
+        """Patterns detected on the last bar of `sym`, by detector key"""
+        return self.results.get(sym, {})
+
+    def _scan(self, sym: str, df: pd.DataFrame) -> List[dict]:
+        masks = None
+        prev_df = self.frames.get(sym)
+
+        if prev_df is not None:
+            masks = utils.update_pivot_masks(
+                prev_df, self.masks[sym], df, self.bars_left, self.bars_right
+            )
+
+        if masks is None:
+            masks = utils.get_pivot_masks(df, self.bars_left, self.bars_right)
+
+        results = run_detectors(
+            sym,
+            df,
+            self.key_fns,
+            self.logger,
+            self.config,
+            bars_left=self.bars_left,
+            bars_right=self.bars_right,
+            masks=masks,
+        )
+
+        prev = self.results.get(sym, {})
+
+        self.frames[sym] = df
+        self.masks[sym] = masks
+        self.results[sym] = results
+
+        return diff_results(prev, results)
+
+
+def pattern_id(key: str, pattern: dict) -> tuple:
+    return (key, pattern["pattern"], pattern["start"])
+
+
+def diff_results(
+    prev: Dict[str, List[dict]], results: Dict[str, List[dict]]
+) -> List[dict]:
+    """`formed` and `invalidated` events between two detector results"""
+    before = {
+        pattern_id(key, p): (key, p) for key, patterns in prev.items() for p in patterns
+    }
+    after = {
+        pattern_id(key, p): (key, p) for key, patterns in results.items() for p in patterns
+    }
+
+    events = [
+        dict(event="invalidated", key=key, pattern=p)
+        for pid, (key, p) in before.items()
+        if pid not in after
+    ]
+
+    events.extend(
+        dict(event="formed", key=key, pattern=p)
+        for pid, (key, p) in after.items()
+        if pid not in before
+    )
+
+    return events
@@ -1,9 +1,11 @@
 import logging
-from typing import Any, NamedTuple, Optional, TypeVar
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple, TypeVar
 
 import numpy as np
 import pandas as pd
 
+from kernel import ScanArrays
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,6 +32,7 @@ is_silent = None
 ascii_upper = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
 fib_ser = pd.Series((0.236, 0.382, 0.5, 0.618, 0.707, 0.786, 0.886, 1))
+fib_arr = fib_ser.to_numpy()
 
 
 def get_relative_clusters(levels, reference_key) -> dict:
@@ -158,6 +161,20 @@ def is_triangle(
     return None
 
 
+def may_be_triangle(b, c, d, e, f):
+    """
+    Price order that is_triangle requires of B to F, whatever A and the bar
+    length. False means no triangle, so callers can skip the bar length.
+
+    Works on scalars and, element wise, on arrays.
+    """
+    ascending = (b < d) & (d < f) & (f < e)
+    descending = (c > e) & (e > f) & (f >= d)
+    symmetric = (c > e) & (b < d) & (d < f) & (e > f)
+
+    return ascending | descending | symmetric
+
+
 def is_hns(
     a: float,
     b: float,
@@ -334,9 +351,51 @@ def is_bullish_vcp(
     )
 
 
-def get_max_min(
+def _pivot_mask(values: np.ndarray, barsLeft: int, barsRight: int, find_max: bool) -> np.ndarray:
+    """
+    Boolean mask of pivot bars, matching the rolling-window rule of get_max_min.
+
+    A window of barsLeft + 1 + barsRight bars has its candidate at offset barsLeft + 1.
+    It is a pivot when it is the first occurrence of the window max (min):
+    strictly greater (lower) than the barsLeft + 1 bars before it, and greater
+    (lower) or equal to the barsRight - 1 bars after it. NaN never wins.
+    """
+    n = len(values)
+    mask = np.zeros(n, dtype=bool)
+    left_len, right_len = barsLeft + 1, barsRight - 1
+    first, last = left_len, n - barsRight  # candidate positions with a full window
+
+    if last < first:
+        return mask
+
+    fill = -np.inf if find_max else np.inf
+    v = np.where(np.isnan(values), fill, values)
+    reduce = np.max if find_max else np.min
+
+    centers = v[first : last + 1]
+    left = reduce(np.lib.stride_tricks.sliding_window_view(v, left_len), axis=1)
+    left = left[: len(centers)]
+
+    if right_len > 0:
+        right = reduce(np.lib.stride_tricks.sliding_window_view(v[first + 1 :], right_len), axis=1)
+        right = right[: len(centers)]
+    else:
+        right = np.full(len(centers), fill)
+
+    if find_max:
+        hit = (centers > left) & (centers >= right)
+    else:
+        hit = (centers < left) & (centers <= right)
+
+    mask[first : last + 1] = hit & ~np.isnan(values[first : last + 1])
+    return mask
+
+
+def _get_max_min_rolling(
     df: pd.DataFrame, barsLeft=6, barsRight=6, pivot_type="both"
 ) -> pd.DataFrame:
+    """Reference implementation of get_max_min (one DataFrame per window).
+    Used for indexes with duplicate labels, where idxmax compares labels."""
     window = barsLeft + 1 + barsRight
 
     local_max_dt = []
@@ -370,6 +429,233 @@ def get_max_min(
     return pd.concat([maxima, minima], axis=0).sort_index()
 
 
+def get_pivot_masks(
+    df: pd.DataFrame, barsLeft=6, barsRight=6
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (max_mask, min_mask), the pivot high and pivot low bars of df"""
+    return (
+        _pivot_mask(df["High"].to_numpy(dtype=float), barsLeft, barsRight, True),
+        _pivot_mask(df["Low"].to_numpy(dtype=float), barsLeft, barsRight, False),
+    )
+
+
+def _pivot_reach(
+    values: np.ndarray, max_left: int, max_right: int, find_max: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For every bar, the distance to the nearest bar before it that is higher
+    (lower) or equal, and to the nearest bar after it that is strictly higher
+    (lower). Distances are capped at max_left + 1 and max_right + 1.
+
+    A bar with a full window is a pivot for (barsLeft, barsRight) when
+    left > barsLeft + 1 and right >= barsRight, the rule of _pivot_mask.
+    """
+    n = len(values)
+    v = np.where(np.isnan(values), -np.inf, values if find_max else -values)
+
+    # Window k of the padded values ends on bar k, with max_left bars before it
+    win = np.lib.stride_tricks.sliding_window_view(
+        np.concatenate((np.full(max_left, -np.inf), v)), max_left + 1
+    )
+    blocked = win[:, -2::-1] >= win[:, -1:]  # nearest bar first
+    left = np.where(blocked.any(axis=1), blocked.argmax(axis=1) + 1, max_left + 1)
+
+    if max_right == 0:
+        return left, np.ones(n, dtype=int)
+
+    win = np.lib.stride_tricks.sliding_window_view(
+        np.concatenate((v, np.full(max_right, -np.inf))), max_right + 1
+    )
+    blocked = win[:, 1:] > win[:, :1]
+    right = np.where(blocked.any(axis=1), blocked.argmax(axis=1) + 1, max_right + 1)
+
+    return left, right
+
+
+def get_pivot_masks_multi(
+    df: pd.DataFrame, bars: Sequence[Tuple[int, int]]
+) -> Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]]:
+    """
+    Pivot masks for several (barsLeft, barsRight) settings in one sweep.
+
+    The distance each bar dominates to its left and right is computed once,
+    for the widest setting. The masks of each setting are then two
+    comparisons, equal to get_pivot_masks(df, barsLeft, barsRight).
+
+    Returns a dict of (barsLeft, barsRight) to (max_mask, min_mask).
+    """
+    bars = [(int(left), int(right)) for left, right in bars]
+
+    if not bars:
+        return {}
+
+    if min(min(setting) for setting in bars) < 1:
+        raise ValueError(f"Pivot bars must be at least 1. Got {bars}")
+
+    n = len(df)
+
+    if n == 0:
+        return {setting: (np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)) for setting in bars}
+
+    pos = np.arange(n)
+    max_left = max(left for left, _ in bars) + 1
+    max_right = max(right for _, right in bars) - 1
+
+    reach = []
+
+    for col, find_max in (("High", True), ("Low", False)):
+        values = df[col].to_numpy(dtype=float)
+        reach.append((*_pivot_reach(values, max_left, max_right, find_max), ~np.isnan(values)))
+
+    masks = {}
+
+    for barsLeft, barsRight in bars:
+        window = (pos > barsLeft) & (pos <= n - barsRight)
+
+        masks[(barsLeft, barsRight)] = tuple(
+            window & valid & (left > barsLeft + 1) & (right >= barsRight)
+            for left, right, valid in reach
+        )
+
+    return masks
+
+
+def update_pivot_masks(
+    prev_df: pd.DataFrame,
+    prev_masks: Tuple[np.ndarray, np.ndarray],
+    df: pd.DataFrame,
+    barsLeft=6,
+    barsRight=6,
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Pivot masks of df, reusing prev_masks computed on prev_df.
+
+    df must continue prev_df: bars may be dropped from the start and
+    appended at the end, but the overlapping bars must be unchanged. Only the
+    tail that could not be confirmed in prev_df (the last `barsRight` bars)
+    and the new bars are recomputed.
+
+    Returns None if df does not continue prev_df.
+    """
+    if not (prev_df.index.is_unique and df.index.is_unique) or df.empty:
+        return None
+
+    offset = prev_df.index.searchsorted(df.index[0])
+    overlap = len(prev_df) - offset
+
+    if overlap <= 0 or overlap > len(df):
+        return None
+
+    for col in ("High", "Low", "Volume"):
+        if not np.array_equal(
+            prev_df[col].to_numpy(dtype=float)[offset:],
+            df[col].to_numpy(dtype=float)[:overlap],
+            equal_nan=True,
+        ):
+            return None
+
+    if not prev_df.index[offset:].equals(df.index[:overlap]):
+        return None
+
+    # Bars whose pivot window lies entirely inside the overlap keep their state
+    first = barsLeft + 1
+    keep_stop = max(overlap - barsRight + 1, first)
+    tail = keep_stop - first
+
+    masks = []
+
+    for prev_mask, col, find_max in zip(
+        prev_masks, ("High", "Low"), (True, False)
+    ):
+        mask = np.zeros(len(df), dtype=bool)
+        mask[first:keep_stop] = prev_mask[offset + first : offset + keep_stop]
+
+        # Recompute from keep_stop, with barsLeft + 1 bars of history before it
+        values = df[col].to_numpy(dtype=float)[tail:]
+        mask[tail:] |= _pivot_mask(values, barsLeft, barsRight, find_max)
+
+        masks.append(mask)
+
+    return masks[0], masks[1]
+
+
+def pivots_from_masks(
+    df: pd.DataFrame,
+    max_mask: Optional[np.ndarray],
+    min_mask: Optional[np.ndarray],
+    pivot_type="both",
+) -> pd.DataFrame:
+    """Pivot DataFrame with columns P and V, as returned by get_max_min.
+
+    df must have a unique index. Rows are taken with the masks, which is much
+    faster than a label lookup of the pivot dates."""
+    maxima = minima = None
+    volume = df["Volume"].to_numpy()
+
+    def index_of(mask):
+        # Without freq, as the rows are not evenly spaced
+        index = df.index[mask]
+
+        if isinstance(index, pd.DatetimeIndex):
+            return pd.DatetimeIndex(index, freq=None)
+
+        return index
+
+    if pivot_type != "low":
+        maxima = pd.DataFrame(
+            dict(P=df["High"].to_numpy()[max_mask], V=volume[max_mask]),
+            index=index_of(max_mask),
+        )
+
+        if pivot_type == "high":
+            return maxima
+
+    if pivot_type != "high":
+        minima = pd.DataFrame(
+            dict(P=df["Low"].to_numpy()[min_mask], V=volume[min_mask]),
+            index=index_of(min_mask),
+        )
+
+        if pivot_type == "low":
+            return minima
+
+    return pd.concat([maxima, minima], axis=0).sort_index()
+
+
+def get_max_min(
+    df: pd.DataFrame, barsLeft=6, barsRight=6, pivot_type="both"
+) -> pd.DataFrame:
+    if not df.index.is_unique:
+        return _get_max_min_rolling(df, barsLeft, barsRight, pivot_type)
+
+    max_mask = min_mask = None
+
+    if pivot_type != "low":
+        max_mask = _pivot_mask(df["High"].to_numpy(dtype=float), barsLeft, barsRight, True)
+
+    if pivot_type != "high":
+        min_mask = _pivot_mask(df["Low"].to_numpy(dtype=float), barsLeft, barsRight, False)
+
+    return pivots_from_masks(df, max_mask, min_mask, pivot_type)
+
+
+def get_max_min_multi(
+    df: pd.DataFrame, bars: Sequence[Tuple[int, int]], pivot_type="both"
+) -> Dict[Tuple[int, int], pd.DataFrame]:
+    """get_max_min for every (barsLeft, barsRight) setting in `bars`, with
+    the masks of all settings from one sweep (get_pivot_masks_multi)"""
+    if not df.index.is_unique:
+        return {
+            (left, right): _get_max_min_rolling(df, left, right, pivot_type)
+            for left, right in bars
+        }
+
+    return {
+        setting: pivots_from_masks(df, *masks, pivot_type=pivot_type)
+        for setting, masks in get_pivot_masks_multi(df, bars).items()
+    }
+
+
 def get_next_index(index: pd.DatetimeIndex, idx: pd.Timestamp) -> int:
     pos = index.get_loc(idx)
 
@@ -441,8 +727,144 @@ def generate_trend_line(
     )
 
 
+def trend_line(k: ScanArrays, values: np.ndarray, pos1: int, pos2: int) -> Line:
+    """generate_trend_line for two df positions in `values`"""
+    pos1, pos2 = int(pos1), int(pos2)
+
+    p1 = float(values[pos1])
+    p2 = float(values[pos2])
+
+    lastIdxPos = k.n - 1
+
+    m = (p2 - p1) / (pos2 - pos1)
+
+    yintercept = p1 - m * pos1
+
+    return Line(
+        line=Coordinate(
+            start=Point(x=k.index[pos1], y=m * pos1 + yintercept),
+            end=Point(x=k.index[lastIdxPos], y=m * lastIdxPos + yintercept),
+        ),
+        slope=m,
+        y_int=yintercept,
+    )
+
+
+def trend_line_chain(k: ScanArrays, find_max: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Candidate (A, B) pivot positions of the trendline detectors.
+
+    A starts at the highest (or lowest) pivot, B is the highest (or lowest)
+    pivot after A and the next A is B.
+    """
+    find_next = k.pivot_argmax if find_max else k.pivot_argmin
+
+    rows = []
+    a_pos = find_next(0)
+
+    while True:
+        pos_after_a = k.next_pos(a_pos)
+
+        if pos_after_a >= k.m:
+            break
+
+        b_pos = find_next(k.label_start(pos_after_a))
+        rows.append((a_pos, b_pos))
+        a_pos = b_pos
+
+    pos = np.array(rows, dtype=np.int64).reshape(-1, 2)
+
+    return pos[:, 0], pos[:, 1]
+
+
+def score_trend_lines(
+    k: ScanArrays,
+    values: np.ndarray,
+    a_pos: np.ndarray,
+    b_pos: np.ndarray,
+    threshold: float,
+    above: bool,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Score every candidate line through values at pivots A and B at once.
+
+    `above` is True for a downtrend line, which prices must stay below.
+
+    Returns (y_close, touch_count, candidates). A line is a candidate if the
+    last close is on the right side and within 10% of it, more than 2 pivots
+    from A onwards lie within `threshold` of it, and no close from A onwards
+    breached it.
+    """
+    da = k.dpos[a_pos]
+    db = k.dpos[b_pos]
+
+    p1 = values[da].astype(float)
+    p2 = values[db].astype(float)
+
+    last_pos = k.n - 1
+    close = k.close[last_pos]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (p2 - p1) / (db - da)
+        y_int = p1 - slope * da
+
+        y_close = getY(slope, y_int, last_pos)
+        pct_close = (close - y_close) / y_close * 100
+
+    if above:
+        candidates = ~((close > y_close) | (pct_close < -10))
+    else:
+        candidates = ~((close < y_close) | (pct_close > 10))
+
+    touch_count = np.zeros(len(a_pos), dtype=np.int64)
+
+    pivot_rank = np.arange(k.m)
+    bars = k.bars
+    start = k.gstart[a_pos]
+
+    # Limit the size of the (lines x points) matrices
+    chunk = max(1, 2**22 // max(k.m, k.n, 1))
+
+    todo = np.flatnonzero(candidates)
+
+    for i in range(0, len(todo), chunk):
+        rows = todo[i : i + chunk]
+
+        y_values = getY(slope[rows, None], y_int[rows, None], k.dpos[None, :])
+
+        touches = (np.abs(k.P[None, :] - y_values) <= threshold) & (
+            pivot_rank[None, :] >= start[rows, None]
+        )
+
+        touch_count[rows] = touches.sum(axis=1)
+
+    candidates &= touch_count > 2
+
+    todo = np.flatnonzero(candidates)
+
+    for i in range(0, len(todo), chunk):
+        rows = todo[i : i + chunk]
+
+        y_values = getY(slope[rows, None], y_int[rows, None], bars[None, :])
+
+        if above:
+            breached = k.close[None, :] > y_values
+        else:
+            breached = k.close[None, :] < y_values
+
+        breached &= bars[None, :] >= da[rows, None]
+
+        candidates[rows] = ~breached.any(axis=1)
+
+    return y_close, touch_count, candidates
+
+
 def find_bullish_flag(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Find Bullish High Pole and Flag pattern.
@@ -453,57 +875,45 @@ def find_bullish_flag(
     if len(df) < 50:
         return
 
-    lastIdx = df.index[-1]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    last = k.n - 1
+    lastIdx = k.index[last]
 
-    recent_high_idx = df.High.iloc[-7:].idxmax()
+    recent_high_pos = k.range_argmax(k.high, k.n - 7)
 
     # Last candle is the weekly high
-    if recent_high_idx == lastIdx or len(df.loc[recent_high_idx:]) < config.get(
+    if recent_high_pos == last or k.n - recent_high_pos < config.get(
         "FLAG_MAX_BARS", 5
     ):
         return
 
-    monthly_high = df.High.iloc[-30:].max()
-    three_month_high = df.High.iloc[-90:].max()
+    monthly_high = k.range_max(k.high, max(k.n - 30, 0))
+    three_month_high = k.range_max(k.high, max(k.n - 90, 0))
 
-    recent_high = df.at[recent_high_idx, "High"]
-    recent_low = df.loc[recent_high_idx:, "Low"].min()
+    recent_high = k.high[recent_high_pos]
+    recent_low = k.range_min(k.low, recent_high_pos)
 
     # A new high formed in the last 7 days exeeds the 30 and 90 day high
     if recent_high >= monthly_high and recent_high >= three_month_high:
-        sma20_ser = df.Close.rolling(20).mean()
-        sma50_ser = df.Close.rolling(50).mean()
-
-        close = df.at[df.index[-1], "Close"]
-        sma20 = sma20_ser.iloc[-1]
-        sma50 = sma50_ser.iloc[-1]
-
-        last_pivot_idx = pivots.index[-1]
-        last_pivot = pivots.at[last_pivot_idx, "P"]
-
-        if isinstance(last_pivot, pd.Series):
-            last_pivot = last_pivot.max()
+        close = k.close[last]
+        sma20 = k.close[-20:].mean()
+        sma50 = k.close[-50:].mean()
 
+        last_pivot = k.pivot_max(k.m - 1)
         fib_50 = last_pivot + (recent_high - last_pivot) / 2
 
-        flag_df = df.loc[recent_high_idx:, ["High", "Low"]]
-        flag_df["RANGE"] = flag_df.High - flag_df.Low
-
-        # flag_start_range = flag_df.RANGE.iloc[1]
-        # flag_max_range = flag_df.RANGE.iloc[2:].max()
-
-        if (
-            sma20 < sma50 * 1.08 or recent_low < fib_50
-            # or flag_max_range > flag_start_range
-        ):
+        if sma20 < sma50 * 1.08 or recent_low < fib_50:
             return
 
+        last_pivot_idx = k.date(k.m - 1)
+        recent_high_idx = k.index[recent_high_pos]
+
         return dict(
             sym=sym,
             pattern="FLAGU",
             start=last_pivot_idx,
             end=lastIdx,
-            df_start=df.index[0],
+            df_start=k.index[0],
             df_end=lastIdx,
             points=dict(
                 A=(last_pivot_idx, last_pivot),
@@ -515,7 +925,11 @@ def find_bullish_flag(
 
 
 def find_bearish_flag(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Find Bearish High Pole and Flag pattern.
@@ -526,57 +940,44 @@ def find_bearish_flag(
     if len(df) < 50:
         return
 
-    lastIdx = df.index[-1]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    last = k.n - 1
+    lastIdx = k.index[last]
 
-    recent_low_idx = df.Low.iloc[-7:].idxmin()
+    recent_low_pos = k.range_argmin(k.low, k.n - 7)
 
-    if recent_low_idx == lastIdx or len(df.loc[recent_low_idx:]) < config.get(
+    if recent_low_pos == last or k.n - recent_low_pos < config.get(
         "FLAG_MAX_BARS", 5
     ):
         return
 
-    monthly_low = df.Low.iloc[-30:].min()
-    three_month_low = df.Low.iloc[-90:].min()
+    monthly_low = k.range_min(k.low, max(k.n - 30, 0))
+    three_month_low = k.range_min(k.low, max(k.n - 90, 0))
 
-    recent_low = df.at[recent_low_idx, "Low"]
-    recent_high = df.loc[recent_low_idx:, "High"].max()
+    recent_low = k.low[recent_low_pos]
+    recent_high = k.range_max(k.high, recent_low_pos)
 
     # A new Low formed in the last 7 days exeeds the 30 and 90 day Low
     if recent_low <= monthly_low and recent_low <= three_month_low:
-        sma20_ser = df.Close.rolling(20).mean()
-        sma50_ser = df.Close.rolling(50).mean()
-
-        close = df.at[df.index[-1], "Close"]
-
-        sma20 = sma20_ser.iloc[-1]
-        sma50 = sma50_ser.iloc[-1]
-
-        last_pivot_idx = pivots.index[-1]
-        last_pivot = pivots.at[last_pivot_idx, "P"]
-
-        if isinstance(last_pivot, pd.Series):
-            last_pivot = last_pivot.min()
+        close = k.close[last]
+        sma20 = k.close[-20:].mean()
+        sma50 = k.close[-50:].mean()
 
+        last_pivot = k.pivot_min(k.m - 1)
         fib_50 = last_pivot - (last_pivot - recent_low) / 2
 
-        flag_df = df.loc[recent_low_idx:, ["High", "Low"]]
-        flag_df["RANGE"] = flag_df.High - flag_df.Low
-
-        # flag_start_range = flag_df.RANGE.iloc[1]
-        # flag_max_range = flag_df.RANGE.iloc[2:].max()
-
-        if (
-            sma20 > sma50 * 0.92 or recent_high > fib_50
-            # or flag_max_range > flag_start_range
-        ):
+        if sma20 > sma50 * 0.92 or recent_high > fib_50:
             return
 
+        last_pivot_idx = k.date(k.m - 1)
+        recent_low_idx = k.index[recent_low_pos]
+
         return dict(
             sym=sym,
             pattern="FLAGD",
             start=last_pivot_idx,
             end=lastIdx,
-            df_start=df.index[0],
+            df_start=k.index[0],
             df_end=lastIdx,
             points=dict(
                 A=(last_pivot_idx, last_pivot),
@@ -588,7 +989,11 @@ def find_bearish_flag(
 
 
 def find_bullish_vcp(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """Find Volatilty Contraction Pattern Bullish.
 
@@ -599,77 +1004,65 @@ def find_bullish_vcp(
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    pivot_len = pivots.shape[0]
-    a_idx = pivots["P"].idxmax()
-
-    a = pivots.at[a_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    pivot_len = k.m
 
-    assert isinstance(a_idx, pd.Timestamp)
+    a_pos = k.pivot_argmax(0)
+    a = k.pivot_max(a_pos)
 
-    e_idx = df.index[-1]
-    e = df.at[e_idx, "Close"]
+    e = k.close[-1]
 
     while True:
-        pos_after_a = get_next_index(pivots.index, a_idx)
+        pos_after_a = k.next_pos(a_pos)
 
         if pos_after_a >= pivot_len:
             break
 
-        b_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmin()
+        b_pos = k.pivot_argmin(k.label_start(pos_after_a))
+        b = k.pivot_min(b_pos)
 
-        b = pivots.at[b_idx, "P"]
-
-        pos_after_b = get_next_index(pivots.index, b_idx)
+        pos_after_b = k.next_pos(b_pos)
 
         if pos_after_b >= pivot_len:
             break
 
-        d_idx = pivots.loc[pivots.index[pos_after_b] :, "P"].idxmin()
-        d = pivots.at[d_idx, "P"]
-
-        c_idx = pivots.loc[b_idx:d_idx, "P"].idxmax()
-        c = pivots.at[c_idx, "P"]
-
-        df_slice = df.loc[a_idx:c_idx]
-        avgBarLength = (df_slice["High"] - df_slice["Low"]).median()
+        d_pos = k.pivot_argmin(k.label_start(pos_after_b))
+        d = k.pivot_min(d_pos)
 
-        if pivots.index.has_duplicates:
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].max()
+        c_pos = k.pivot_argmax(k.label_start(b_pos), k.label_stop(d_pos))
+        c = k.pivot_max(c_pos)
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].min()
+        dc, dd = k.dpos[c_pos], k.dpos[d_pos]
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].max()
-
-            if isinstance(d, pd.Series):
-                d = pivots.at[d_idx, "P"].min()
+        avgBarLength = k.median_bar_range(k.dpos[a_pos], dc + 1)
 
         if is_bullish_vcp(a, b, c, d, e, avgBarLength):
             # check if Level C has been breached after it was formed
             if (
-                c_idx != df.loc[c_idx:, "Close"].idxmax()
-                or d_idx != df.loc[d_idx:, "Close"].idxmin()
+                dc != k.range_argmax(k.close, dc)
+                or dd != k.range_argmin(k.close, dd)
             ):
                 # Level C is breached, current pattern is not valid
                 # check if C is the last pivot formed
-                if pivots.index[-1] == c_idx or pivots.index[-1] == d_idx:
+                if k.same_label(-1, c_pos) or k.same_label(-1, d_pos):
                     break
 
                 # continue search for patterns
-                a_idx, a = c_idx, c
+                a_pos, a = c_pos, c
                 continue
 
             logger.debug(f"{sym} - VCPU")
 
+            a_idx, b_idx, c_idx, d_idx = map(k.date, (a_pos, b_pos, c_pos, d_pos))
+            e_idx = k.index[-1]
+
             return dict(
                 sym=sym,
                 pattern="VCPU",
                 start=a_idx,
                 end=e_idx,
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 points=dict(
                     A=(a_idx, a),
                     B=(b_idx, b),
@@ -680,11 +1073,15 @@ def find_bullish_vcp(
                 extra_points=dict(direction=(c_idx, c)),
             )
 
-        a_idx, a = c_idx, c
+        a_pos, a = c_pos, c
 
 
 def find_bearish_vcp(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """Find Volatilty Contraction Pattern Bearish.
 
@@ -695,73 +1092,62 @@ def find_bearish_vcp(
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    pivot_len = pivots.shape[0]
-    a_idx = pivots["P"].idxmin()
-    a = pivots.at[a_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    pivot_len = k.m
 
-    assert isinstance(a_idx, pd.Timestamp)
+    a_pos = k.pivot_argmin(0)
+    a = k.pivot_min(a_pos)
 
-    e_idx = df.index[-1]
-    e = df.at[e_idx, "Close"]
+    e = k.close[-1]
 
     while True:
-        pos_after_a = get_next_index(pivots.index, a_idx)
+        pos_after_a = k.next_pos(a_pos)
 
         if pos_after_a >= pivot_len:
             break
 
-        b_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmax()
-
-        b = pivots.at[b_idx, "P"]
+        b_pos = k.pivot_argmax(k.label_start(pos_after_a))
+        b = k.pivot_max(b_pos)
 
-        pos_after_b = get_next_index(pivots.index, b_idx)
+        pos_after_b = k.next_pos(b_pos)
 
         if pos_after_b >= pivot_len:
             break
 
-        d_idx = pivots.loc[pivots.index[pos_after_b] :, "P"].idxmax()
-        d = pivots.at[d_idx, "P"]
-
-        c_idx = pivots.loc[b_idx:d_idx, "P"].idxmin()
-        c = pivots.at[c_idx, "P"]
-
-        df_slice = df.loc[a_idx:c_idx]
-        avgBarLength = (df_slice["High"] - df_slice["Low"]).median()
+        d_pos = k.pivot_argmax(k.label_start(pos_after_b))
+        d = k.pivot_max(d_pos)
 
-        if pivots.index.has_duplicates:
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].min()
+        c_pos = k.pivot_argmin(k.label_start(b_pos), k.label_stop(d_pos))
+        c = k.pivot_min(c_pos)
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].max()
+        dc, dd = k.dpos[c_pos], k.dpos[d_pos]
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].min()
-
-            if isinstance(d, pd.Series):
-                d = pivots.at[d_idx, "P"].max()
+        avgBarLength = k.median_bar_range(k.dpos[a_pos], dc + 1)
 
         if is_bearish_vcp(a, b, c, d, e, avgBarLength):
             if (
-                d_idx != df.loc[d_idx:, "Close"].idxmax()
-                or c_idx != df.loc[c_idx:, "Close"].idxmin()
+                dd != k.range_argmax(k.close, dd)
+                or dc != k.range_argmin(k.close, dc)
             ):
                 # check that the pattern is well formed
-                if pivots.index[-1] == d_idx or pivots.index[-1] == c_idx:
+                if k.same_label(-1, d_pos) or k.same_label(-1, c_pos):
                     break
 
-                a_idx, a = c_idx, c
+                a_pos, a = c_pos, c
                 continue
 
             logger.debug(f"{sym} - VCPD")
 
+            a_idx, b_idx, c_idx, d_idx = map(k.date, (a_pos, b_pos, c_pos, d_pos))
+            e_idx = k.index[-1]
+
             return dict(
                 sym=sym,
                 pattern="VCPD",
                 start=a_idx,
                 end=e_idx,
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 points=dict(
                     A=(a_idx, a),
                     B=(b_idx, b),
@@ -774,11 +1160,15 @@ def find_bearish_vcp(
 
         # We assign pivot level C to be the new A
         # This may not be the lowest pivot, so additional checks are required.
-        a_idx, a = c_idx, c
+        a_pos, a = c_pos, c
 
 
 def find_double_bottom(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """Find Double bottom.
 
@@ -789,93 +1179,76 @@ def find_double_bottom(
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    pivot_len = pivots.shape[0]
-
-    a_idx = pivots["P"].idxmin()
-    a = pivots.loc[a_idx, "P"]
-    aVol = pivots.loc[a_idx, "V"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    pivot_len = k.m
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    a_pos = k.pivot_argmin(0)
+    a = k.pivot_min(a_pos)
+    aVol = k.pivot_volume(a_pos)
 
-    atr_ser = get_atr(df.High, df.Low, df.Close)
+    d = k.close[-1]
 
-    assert isinstance(a_idx, pd.Timestamp)
+    atr_arr = k.memo("atr", lambda: get_atr(df.High, df.Low, df.Close).to_numpy())
 
     while True:
-        pos_after_a = get_next_index(pivots.index, a_idx)
+        pos_after_a = k.next_pos(a_pos)
 
         if pos_after_a >= pivot_len:
             break
 
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmin()
-        c = pivots.at[c_idx, "P"]
-        cVol = pivots.at[c_idx, "V"]
-
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmax()
-        b = pivots.at[b_idx, "P"]
-
-        atr = atr_ser.at[c_idx]
-
-        if pivots.index.has_duplicates:
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].min()
+        c_pos = k.pivot_argmin(k.label_start(pos_after_a))
+        c = k.pivot_min(c_pos)
+        cVol = k.pivot_volume(c_pos)
 
-            if isinstance(aVol, pd.Series):
-                aVol = pivots.at[a_idx, "V"].iloc[0]
+        b_pos = k.pivot_argmax(k.label_start(a_pos), k.label_stop(c_pos))
+        b = k.pivot_max(b_pos)
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].max()
+        da, db, dc = k.dpos[a_pos], k.dpos[b_pos], k.dpos[c_pos]
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].min()
+        atr = atr_arr[dc]
 
-            if isinstance(cVol, pd.Series):
-                cVol = pivots.at[c_idx, "V"].iloc[0]
-
-        df_slice = df.loc[a_idx:c_idx]
-        avgBarLength = (df_slice["High"] - df_slice["Low"]).median()
+        avgBarLength = k.median_bar_range(da, dc + 1)
 
         if is_double_bottom(a, b, c, d, aVol, cVol, avgBarLength, atr):
-            if (
-                a == df.at[a_idx, "High"]
-                or b == df.at[b_idx, "Low"]
-                or c == df.at[c_idx, "High"]
-            ):
+            if a == k.high[da] or b == k.low[db] or c == k.high[dc]:
                 # check that the pattern is well formed
-                a_idx, a, aVol = c_idx, c, cVol
+                a_pos, a, aVol = c_pos, c, cVol
                 continue
 
             # check if Level C has been breached after it was formed
-            if (
-                c_idx != df.loc[c_idx:, "Close"].idxmin()
-                or b_idx != df.loc[b_idx:, "Close"].idxmax()
-            ):
-                a_idx, a, aVol = c_idx, c, cVol
+            if dc != k.range_argmin(k.close, dc) or db != k.range_argmax(k.close, db):
+                a_pos, a, aVol = c_pos, c, cVol
                 continue
 
-            if df.loc[c_idx:, "Close"].max() > b:
-                a_idx, a, aVol = c_idx, c, cVol
+            if k.range_max(k.close, dc) > b:
+                a_pos, a, aVol = c_pos, c, cVol
                 continue
 
             logger.debug(f"{sym} - DBOT")
 
+            a_idx, b_idx, c_idx = map(k.date, (a_pos, b_pos, c_pos))
+            d_idx = k.index[-1]
+
             return dict(
                 sym=sym,
                 pattern="DBOT",
                 start=a_idx,
                 end=d_idx,
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 points=dict(A=(a_idx, a), B=(b_idx, b), C=(c_idx, c), D=(d_idx, d)),
                 extra_points=dict(direction=(b_idx, b)),
             )
 
-        a_idx, a, aVol = c_idx, c, cVol
+        a_pos, a, aVol = c_pos, c, cVol
 
 
 def find_double_top(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """Find Double Top.
 
@@ -886,89 +1259,72 @@ def find_double_top(
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    pivot_len = pivots.shape[0]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    pivot_len = k.m
 
-    a_idx = pivots["P"].idxmax()
-    a = pivots.loc[a_idx, "P"]
-    aVol = pivots.loc[a_idx, "V"]
+    a_pos = k.pivot_argmax(0)
+    a = k.pivot_max(a_pos)
+    aVol = k.pivot_volume(a_pos)
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    d = k.close[-1]
 
-    atr_ser = get_atr(df.High, df.Low, df.Close)
-
-    assert isinstance(a_idx, pd.Timestamp)
+    atr_arr = k.memo("atr", lambda: get_atr(df.High, df.Low, df.Close).to_numpy())
 
     while True:
-        idx = get_next_index(pivots.index, a_idx)
+        idx = k.next_pos(a_pos)
 
         if idx >= pivot_len:
             break
 
-        c_idx = pivots.loc[pivots.index[idx] :, "P"].idxmax()
-        c = pivots.loc[c_idx, "P"]
-        cVol = pivots.loc[c_idx, "V"]
-
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmin()
-        b = pivots.at[b_idx, "P"]
-
-        atr = atr_ser.at[c_idx]
+        c_pos = k.pivot_argmax(k.label_start(idx))
+        c = k.pivot_max(c_pos)
+        cVol = k.pivot_volume(c_pos)
 
-        if pivots.index.has_duplicates:
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].max()
+        b_pos = k.pivot_argmin(k.label_start(a_pos), k.label_stop(c_pos))
+        b = k.pivot_min(b_pos)
 
-            if isinstance(aVol, pd.Series):
-                aVol = pivots.at[a_idx, "V"].iloc[0]
+        da, db, dc = k.dpos[a_pos], k.dpos[b_pos], k.dpos[c_pos]
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].min()
+        atr = atr_arr[dc]
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].max()
-
-            if isinstance(cVol, pd.Series):
-                cVol = pivots.at[c_idx, "V"].iloc[0]
-
-        df_slice = df.loc[a_idx:c_idx]
-        avgBarLength = (df_slice["High"] - df_slice["Low"]).median()
+        avgBarLength = k.median_bar_range(da, dc + 1)
 
         if is_double_top(a, b, c, d, aVol, cVol, avgBarLength, atr):
-            if (
-                a == df.at[a_idx, "Low"]
-                or b == df.at[b_idx, "High"]
-                or c == df.at[c_idx, "Low"]
-            ):
-                a_idx, a, aVol = c_idx, c, cVol
+            if a == k.low[da] or b == k.high[db] or c == k.low[dc]:
+                a_pos, a, aVol = c_pos, c, cVol
                 continue
 
             # check if Level C has been breached after it was formed
-            if (
-                c_idx != df.loc[c_idx:, "Close"].idxmax()
-                or b_idx != df.loc[b_idx:, "Close"].idxmin()
-            ):
+            if dc != k.range_argmax(k.close, dc) or db != k.range_argmin(k.close, db):
                 # Level C is breached, current pattern is not valid
-                a_idx, a, aVol = c_idx, c, cVol
+                a_pos, a, aVol = c_pos, c, cVol
                 continue
 
             logger.debug(f"{sym} - DTOP")
 
+            a_idx, b_idx, c_idx = map(k.date, (a_pos, b_pos, c_pos))
+            d_idx = k.index[-1]
+
             return dict(
                 sym=sym,
                 pattern="DTOP",
                 start=a_idx,
                 end=d_idx,
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 points=dict(A=(a_idx, a), B=(b_idx, b), C=(c_idx, c), D=(d_idx, d)),
                 extra_points=dict(direction=(b_idx, b)),
             )
 
-        a_idx, a, aVol = c_idx, c, cVol
+        a_pos, a, aVol = c_pos, c, cVol
 
 
 def find_triangles(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """Find Triangles - Symmetric, Ascending, Descending.
 
@@ -979,89 +1335,79 @@ def find_triangles(
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    pivot_len = pivots.shape[0]
-    a_idx = pivots["P"].idxmax()
-    a = pivots.loc[a_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    pivot_len = k.m
 
-    f_idx = df.index[-1]
-    f = df.at[f_idx, "Close"]
+    a_pos = k.pivot_argmax(0)
+    a = k.pivot_max(a_pos)
 
-    while True:
-        b_idx = pivots.loc[a_idx:, "P"].idxmin()
-        b = pivots.at[b_idx, "P"]
+    f_pos = k.n - 1
+    f = k.close[f_pos]
 
-        assert isinstance(a_idx, pd.Timestamp)
+    while True:
+        b_pos = k.pivot_argmin(k.label_start(a_pos))
+        b = k.pivot_min(b_pos)
 
-        pos_after_a = get_next_index(pivots.index, a_idx)
+        pos_after_a = k.next_pos(a_pos)
 
         if pos_after_a >= pivot_len:
             break
 
         # A is already the lowest point
-        if a_idx == b_idx:
-            a_idx = pivots.index[pos_after_a]
-            a = pivots.at[a_idx, "P"]
+        if k.same_label(a_pos, b_pos):
+            a_pos = pos_after_a
+            a = k.pivot_max(a_pos)
             continue
 
-        pos_after_b = get_next_index(pivots.index, b_idx)
+        pos_after_b = k.next_pos(b_pos)
 
         if pos_after_b >= pivot_len:
             break
 
-        c_idx = pivots.loc[pivots.index[pos_after_b] :, "P"].idxmax()
-        c = pivots.at[c_idx, "P"]
+        c_pos = k.pivot_argmax(k.label_start(pos_after_b))
+        c = k.pivot_max(c_pos)
 
-        pos_after_c = get_next_index(pivots.index, c_idx)
+        pos_after_c = k.next_pos(c_pos)
 
         if pos_after_c >= pivot_len:
             break
 
-        d_idx = pivots.loc[pivots.index[pos_after_c] :, "P"].idxmin()
-        d = pivots.at[d_idx, "P"]
+        d_pos = k.pivot_argmin(k.label_start(pos_after_c))
+        d = k.pivot_min(d_pos)
 
-        pos_after_d = get_next_index(pivots.index, d_idx)
+        pos_after_d = k.next_pos(d_pos)
 
         if pos_after_d >= pivot_len:
             break
 
-        e_idx = pivots.loc[pivots.index[pos_after_d] :, "P"].idxmax()
-        e = pivots.at[e_idx, "P"]
-
-        if pivots.index.has_duplicates:
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].max()
-
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].min()
+        e_pos = k.pivot_argmax(k.label_start(pos_after_d))
+        e = k.pivot_max(e_pos)
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].max()
-
-            if isinstance(d, pd.Series):
-                d = pivots.at[d_idx, "P"].min()
+        # Most candidates fail on the order of B to F alone
+        if not may_be_triangle(b, c, d, e, f):
+            a_pos = c_pos
+            continue
 
-            if isinstance(e, pd.Series):
-                e = pivots.at[e_idx, "P"].max()
+        da, db, dc, dd, de = k.dpos[[a_pos, b_pos, c_pos, d_pos, e_pos]]
 
-        df_slice = df.loc[a_idx:d_idx]
-        avgBarLength = (df_slice["High"] - df_slice["Low"]).median()
+        avgBarLength = k.median_bar_range(da, dd + 1)
 
         triangle = is_triangle(a, b, c, d, e, f, avgBarLength)
 
         if triangle is not None:
             # Check if A is indeed the pivot high
             if (
-                a == df.at[a_idx, "Low"]
-                or b == df.at[b_idx, "High"]
-                or c == df.at[c_idx, "Low"]
-                or d == df.at[d_idx, "High"]
-                or e == df.at[e_idx, "Low"]
+                a == k.low[da]
+                or b == k.high[db]
+                or c == k.low[dc]
+                or d == k.high[dd]
+                or e == k.low[de]
             ):
-                a_idx, a = c_idx, c
+                a_pos, a = c_pos, c
                 continue
 
-            upper_duration = (f_idx - a_idx).days
-            lower_duration = (f_idx - b_idx).days
+            upper_duration = k.days(da, f_pos)
+            lower_duration = k.days(db, f_pos)
 
             if (
                 max(upper_duration, lower_duration)
@@ -1069,11 +1415,11 @@ def find_triangles(
                 > 1.8
             ):
                 # Ensure a 2:1 ratio in start duration of upper and lower lines
-                a_idx, a = c_idx, c
+                a_pos, a = c_pos, c
                 continue
 
-            upper = generate_trend_line(df.High, a_idx, c_idx)
-            lower = generate_trend_line(df.Low, b_idx, d_idx)
+            upper = trend_line(k, k.high, da, dc)
+            lower = trend_line(k, k.low, db, dd)
 
             # If trendlines have intersected, pattern has played out
             if upper.line.end.y < lower.line.end.y:
@@ -1089,26 +1435,29 @@ def find_triangles(
                 break
 
             # Check if trendlines have been breached
-            pos = df.reset_index().index
-
             # calculate the y-axis price for every point on the slope
-            upper_slope = upper.slope * pos + upper.y_int
-            lower_slope = lower.slope * pos + lower.y_int
+            upper_slope = upper.slope * k.bars + upper.y_int
+            lower_slope = lower.slope * k.bars + lower.y_int
 
             # Check if close has violated the upper or lower trendline
-            if (df.Close > upper_slope).any() or (df.Close < lower_slope).any():
+            if (k.close > upper_slope).any() or (k.close < lower_slope).any():
                 break
 
             logger.debug(f"{sym} - {triangle}")
 
+            a_idx, b_idx, c_idx, d_idx, e_idx = map(
+                k.date, (a_pos, b_pos, c_pos, d_pos, e_pos)
+            )
+            f_idx = k.index[f_pos]
+
             return dict(
                 sym=sym,
                 pattern="TRNG",
                 alt_name=triangle,
                 start=a_idx,
                 end=f_idx,
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 slope_upper=upper.slope,
                 slope_lower=lower.slope,
                 points=dict(
@@ -1127,11 +1476,16 @@ def find_triangles(
                 ),
             )
 
-        a_idx, c = c_idx, c
+        # A keeps its price level here, only the position moves to C
+        a_pos, c = c_pos, c
 
 
 def find_hns(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """Find Head and Shoulders - Bearish
 
@@ -1142,112 +1496,93 @@ def find_hns(
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    pivot_len = pivots.shape[0]
-    f_idx = df.index[-1]
-    f = df.at[f_idx, "Close"]
-
-    c_idx = pivots["P"].idxmax()
-    c = pivots.at[c_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    pivot_len = k.m
+    f_pos = k.n - 1
+    f = k.close[f_pos]
 
-    assert isinstance(c_idx, pd.Timestamp)
+    c_pos = k.pivot_argmax(0)
+    c = k.pivot_max(c_pos)
 
     while True:
-        pos = get_prev_index(pivots.index, c_idx)
+        pos = k.prev_pos(c_pos)
 
         if pos >= pivot_len:
             break
 
-        idx_before_c = pivots.index[pos]
+        a_pos = k.pivot_argmax(0, k.label_stop(pos))
+        a = k.pivot_max(a_pos)
 
-        a_idx = pivots.loc[:idx_before_c, "P"].idxmax()
-        a = pivots.at[a_idx, "P"]
+        b_pos = k.pivot_argmin(k.label_start(a_pos), k.label_stop(c_pos))
+        b = k.pivot_min(b_pos)
 
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmin()
-        b = pivots.at[b_idx, "P"]
-
-        pos = get_next_index(pivots.index, c_idx)
+        pos = k.next_pos(c_pos)
 
         if pos >= pivot_len:
             break
 
-        idx_after_c = pivots.index[pos]
-
-        e_idx = pivots.loc[idx_after_c:, "P"].idxmax()
-        e = pivots.at[e_idx, "P"]
-
-        d_idx = pivots.loc[c_idx:e_idx, "P"].idxmin()
-        d = pivots.at[d_idx, "P"]
+        e_pos = k.pivot_argmax(k.label_start(pos))
+        e = k.pivot_max(e_pos)
 
-        if pivots.index.has_duplicates:
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].max()
+        d_pos = k.pivot_argmin(k.label_start(c_pos), k.label_stop(e_pos))
+        d = k.pivot_min(d_pos)
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].min()
+        da, db, dc, dd, de = k.dpos[[a_pos, b_pos, c_pos, d_pos, e_pos]]
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].max()
-
-            if isinstance(d, pd.Series):
-                d = pivots.at[d_idx, "P"].min()
-
-            if isinstance(e, pd.Series):
-                e = pivots.at[e_idx, "P"].max()
-
-        df_slice = df.loc[b_idx:d_idx]
-        avgBarLength = (df_slice["High"] - df_slice["Low"]).median()
+        avgBarLength = k.median_bar_range(db, dd + 1)
 
         if is_hns(a, b, c, d, e, f, avgBarLength):
             if (
-                a == df.at[a_idx, "Low"]
-                or b == df.at[b_idx, "High"]
-                or c == df.at[c_idx, "Low"]
-                or d == df.at[d_idx, "High"]
-                or e == df.at[e_idx, "Low"]
+                a == k.low[da]
+                or b == k.high[db]
+                or c == k.low[dc]
+                or d == k.high[dd]
+                or e == k.low[de]
             ):
                 # Make sure pattern is well formed and
                 # pivots are correctly anchored to highs and lows
-                c_idx, c = e_idx, e
+                c_pos, c = e_pos, e
                 continue
 
             neckline_price = min(b, d)
-            lowest_after_e = df.loc[e_idx:, "Low"].min()
+            lowest_after_e = k.range_min(k.low, de)
 
             if (
                 lowest_after_e < neckline_price
                 and abs(lowest_after_e - neckline_price) > avgBarLength
             ):
                 # check if neckline was breached after pattern formation
-                c_idx, c = e_idx, e
+                c_pos, c = e_pos, e
                 continue
 
             # bd is the line coordinate for points B and D
-            tline = generate_trend_line(df.Low, b_idx, d_idx)
+            tline = trend_line(k, k.low, db, dd)
 
             # Get the y coordinate of the trendline at the end of the chart
             # With the given slope(m) and y-intercept(b) as y_int,
             # Get the x coordinate (index position of last date in DataFrame)
             # and calculate value of y coordinate using y = mx + b
-            x = df.index.get_loc(f_idx)
-
-            assert isinstance(x, int)
-
-            y = tline.slope * x + tline.y_int
+            y = tline.slope * f_pos + tline.y_int
 
             # if the close price is below the neckline (trendline), skip
             if f < y:
-                c_idx, c = e_idx, e
+                c_pos, c = e_pos, e
                 continue
 
             logger.debug(f"{sym} - HNSD")
 
+            a_idx, b_idx, c_idx, d_idx, e_idx = map(
+                k.date, (a_pos, b_pos, c_pos, d_pos, e_pos)
+            )
+            f_idx = k.index[f_pos]
+
             return dict(
                 sym=sym,
                 pattern="HNSD",
                 start=a_idx,
                 end=f_idx,
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 slope=tline.slope,
                 y_intercept=tline.y_int,
                 points=dict(
@@ -1261,11 +1596,15 @@ def find_hns(
                 extra_points=dict(direction=(b_idx, b)),
             )
 
-        c_idx, c = e_idx, e
+        c_pos, c = e_pos, e
 
 
 def find_reverse_hns(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """Find Head and Shoulders - Bullish
 
@@ -1276,112 +1615,93 @@ def find_reverse_hns(
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    pivot_len = pivots.shape[0]
-    f_idx = df.index[-1]
-    f = df.at[f_idx, "Close"]
-
-    c_idx = pivots["P"].idxmin()
-    c = pivots.at[c_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    pivot_len = k.m
+    f_pos = k.n - 1
+    f = k.close[f_pos]
 
-    assert isinstance(c_idx, pd.Timestamp)
+    c_pos = k.pivot_argmin(0)
+    c = k.pivot_min(c_pos)
 
     while True:
-        pos = get_prev_index(pivots.index, c_idx)
+        pos = k.prev_pos(c_pos)
 
         if pos >= pivot_len:
             break
 
-        idx_before_c = pivots.index[pos]
-
-        a_idx = pivots.loc[:idx_before_c, "P"].idxmin()
-        a = pivots.at[a_idx, "P"]
+        a_pos = k.pivot_argmin(0, k.label_stop(pos))
+        a = k.pivot_min(a_pos)
 
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmax()
-        b = pivots.at[b_idx, "P"]
+        b_pos = k.pivot_argmax(k.label_start(a_pos), k.label_stop(c_pos))
+        b = k.pivot_max(b_pos)
 
-        pos = get_next_index(pivots.index, c_idx)
+        pos = k.next_pos(c_pos)
 
         if pos >= pivot_len:
             break
 
-        idx_after_c = pivots.index[pos]
-
-        e_idx = pivots.loc[idx_after_c:, "P"].idxmin()
-        e = pivots.at[e_idx, "P"]
-
-        d_idx = pivots.loc[c_idx:e_idx, "P"].idxmax()
-        d = pivots.at[d_idx, "P"]
+        e_pos = k.pivot_argmin(k.label_start(pos))
+        e = k.pivot_min(e_pos)
 
-        if pivots.index.has_duplicates:
-            if isinstance(a, pd.Series):
-                a = pivots.loc[a_idx, "P"].min()
+        d_pos = k.pivot_argmax(k.label_start(c_pos), k.label_stop(e_pos))
+        d = k.pivot_max(d_pos)
 
-            if isinstance(b, pd.Series):
-                b = pivots.loc[b_idx, "P"].max()
+        da, db, dc, dd, de = k.dpos[[a_pos, b_pos, c_pos, d_pos, e_pos]]
 
-            if isinstance(c, pd.Series):
-                c = pivots.loc[c_idx, "P"].min()
-
-            if isinstance(d, pd.Series):
-                d = pivots.loc[d_idx, "P"].max()
-
-            if isinstance(e, pd.Series):
-                e = pivots.loc[e_idx, "P"].min()
-
-        df_slice = df.loc[b_idx:d_idx]
-        avgBarLength = (df_slice["High"] - df_slice["Low"]).median()
+        avgBarLength = k.median_bar_range(db, dd + 1)
 
         if is_reverse_hns(a, b, c, d, e, f, avgBarLength):
             if (
-                a == df.at[a_idx, "High"]
-                or b == df.at[b_idx, "Low"]
-                or c == df.at[c_idx, "High"]
-                or d == df.at[d_idx, "Low"]
-                or e == df.at[e_idx, "High"]
+                a == k.high[da]
+                or b == k.low[db]
+                or c == k.high[dc]
+                or d == k.low[dd]
+                or e == k.high[de]
             ):
                 # Make sure pattern is well formed
-                c_idx, c = e_idx, e
+                c_pos, c = e_pos, e
                 continue
 
             neckline_price = min(b, d)
 
-            highest_after_e = df.loc[e_idx:, "High"].max()
+            highest_after_e = k.range_max(k.high, de)
 
             if (
                 highest_after_e > neckline_price
                 and abs(highest_after_e - neckline_price) > avgBarLength
             ):
                 # check if neckline was breached after pattern formation
-                c_idx, c = e_idx, e
+                c_pos, c = e_pos, e
                 continue
 
             # bd is the trendline coordinates from B to D (neckline)
-            tline = generate_trend_line(df.High, b_idx, d_idx)
+            tline = trend_line(k, k.high, db, dd)
 
             # Get the y coordinate of the trendline at the end of the chart
             # With the given slope(m) and y-intercept(b) as y_int,
             # Get the x coordinate (index position of last date in DataFrame)
             # and calculate value of y coordinate using y = mx + b
-            x = df.index.get_loc(df.index[-1])
-
-            assert isinstance(x, int)
-
-            y = tline.slope * x + tline.y_int
+            y = tline.slope * f_pos + tline.y_int
 
             # if close price is greater than neckline (trendline), skip
             if f > y:
-                c_idx, c = e_idx, e
+                c_pos, c = e_pos, e
                 continue
 
             logger.debug(f"{sym} - HNSU")
 
+            a_idx, b_idx, c_idx, d_idx, e_idx = map(
+                k.date, (a_pos, b_pos, c_pos, d_pos, e_pos)
+            )
+            f_idx = k.index[f_pos]
+
             return dict(
                 sym=sym,
                 pattern="HNSU",
                 start=a_idx,
                 end=f_idx,
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 slope=tline.line,
                 y_intercept=tline.y_int,
                 points=dict(
@@ -1395,11 +1715,15 @@ def find_reverse_hns(
                 extra_points=dict(direction=(b_idx, b)),
             )
 
-        c_idx, c = e_idx, e
+        c_pos, c = e_pos, e
 
 
 def find_downtrend_line(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """Downtrend line detection"""
 
@@ -1410,116 +1734,84 @@ def find_downtrend_line(
     if not pivots_len:
         return
 
-    # Get the highest point in pivots.
-    a_idx = pivots.P.idxmax()
-    a = pivots.at[a_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
 
-    if isinstance(a, pd.Series):
-        a = a.max()
+    # Get the highest point in pivots.
+    a_pos = k.pivot_argmax(0)
+    a = k.pivot_max(a_pos)
 
     threshold = a * 0.001
-    last_idx = df.index[-1]
+    last_pos = k.n - 1
+    last_idx = k.index[last_pos]
 
     # A is the last pivot
-    if a_idx == pivots.index[-1]:
+    if k.same_label(a_pos, -1):
         return None
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
-    assert isinstance(a_idx, pd.Timestamp)
 
-    while True:
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivots_len:
-            break
+    a_chain, b_chain = trend_line_chain(k, find_max=True)
 
-        # Get the next highest point in pivots after A
-        b_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmax()
-        b = pivots.at[b_idx, "P"]
+    # trend_line raises ZeroDivisionError for two points on the same bar
+    if (k.dpos[a_chain] == k.dpos[b_chain]).any():
+        return
 
-        if isinstance(b, pd.Series):
-            b = b.max()
+    # Score every candidate line AB against all pivots and closes at once
+    _, touch_counts, candidates = score_trend_lines(
+        k, k.high, a_chain, b_chain, threshold, above=True
+    )
 
-        # Calculate the slope and y-intercept of the trendline AB.
-        try:
-            tline = generate_trend_line(df.High, a_idx, b_idx)
-        except ZeroDivisionError:
-            return
+    for i in np.flatnonzero(candidates):
+        a_pos = a_chain[i]
+        tline = trend_line(k, k.high, k.dpos[a_pos], k.dpos[b_chain[i]])
 
-        y_close = getY(tline.slope, tline.y_int, len(df) - 1)
+        y_close = getY(tline.slope, tline.y_int, last_pos)
 
-        close = df.at[last_idx, "Close"]
+        start = k.label_start(a_pos)
 
-        pct_close = (close - y_close) / y_close * 100
+        # Distance of each pivot from trendline.
+        diff = np.abs(k.P[start:] - getY(tline.slope, tline.y_int, k.dpos[start:]))
 
-        if close > y_close or pct_close < -10:
-            a_idx, a = b_idx, b
-            continue
+        touches = diff <= threshold
+        touch_count = touch_counts[i]
 
-        line_pivots = pivots.loc[a_idx:, "P"]
+        # Filter the distances for pivots located above the trendline
+        # and use the absolute sum of their distances as the score.
+        # For two lines with equal touch points, the lower score indicates
+        # a better fitting line.
+        # The lowest possible score is 0. Sum of empty Series is 0
+        score = diff[diff < threshold].sum()
 
-        # Calculate y values for trendline at each pivot.
-        y_values = line_pivots.index.map(
-            lambda x: getY(tline.slope, tline.y_int, df.index.get_loc(x))
-        )
-
-        # Get the absolute distance of each pivot from trendline.
-        diff = (line_pivots - y_values).abs()
-
-        # Count pivots with distance from line, within a fixed threshold.
-        touch_count = (diff <= threshold).sum()
-
-        if touch_count > 2:
-            closes = df.loc[a_idx:last_idx, "Close"]
+        # Update if no trendline is detected yet or
+        # if we have higher touch counts.
+        # if touch count is same, check for lower scores
+        if selected is None or (
+            touch_count > selected["touches"]
+            or (touch_count == selected["touches"] and score < selected["score"])
+        ):
+            touch_pos = start + np.flatnonzero(touches)
+            str_keys = ascii_upper[: len(touch_pos)]
 
-            # Calculate price at each point on the trendline
-            y_values = closes.index.map(
-                lambda x: getY(tline.slope, tline.y_int, df.index.get_loc(x))
+            selected = dict(
+                touches=touch_count,
+                start=k.date(a_pos),
+                end=last_idx,
+                slope=tline.slope,
+                y_intercept=tline.y_int,
+                y_close=y_close,
+                points=dict(
+                    zip(str_keys, tuple((k.date(pos), k.P[pos]) for pos in touch_pos))
+                ),
+                extra_points=dict(start=tline.line.start, end=tline.line.end),
+                score=score,
             )
 
-            # Sum up number of times, price closed above the trendline
-            if (closes > y_values).sum() > 0:
-                # skip if trendline was breached
-                a_idx, a = b_idx, b
-                continue
-
-            # Filter the distances for pivots located above the trendline
-            # and use the absolute sum of their distances as the score.
-            # For two lines with equal touch points, the lower score indicates
-            # a better fitting line.
-            # The lowest possible score is 0. Sum of empty Series is 0
-            score = diff[diff < threshold].sum()
-
-            # Update if no trendline is detected yet or
-            # if we have higher touch counts.
-            # if touch count is same, check for lower scores
-            if selected is None or (
-                touch_count > selected["touches"]
-                or (touch_count == selected["touches"] and score < selected["score"])
-            ):
-                touch_points = line_pivots.loc[diff <= threshold]
-                str_keys = ascii_upper[: len(touch_points)]
-
-                selected = dict(
-                    touches=touch_count,
-                    start=a_idx,
-                    end=last_idx,
-                    slope=tline.slope,
-                    y_intercept=tline.y_int,
-                    y_close=y_close,
-                    points=dict(zip(str_keys, tuple(touch_points.items()))),
-                    extra_points=dict(start=tline.line.start, end=tline.line.end),
-                    score=score,
-                )
-
-        a_idx, a = b_idx, b
-
     if selected:
         selected.update(
             dict(
                 sym=sym,
                 pattern="DNTL",
-                df_start=df.index[0],
+                df_start=k.index[0],
                 df_end=last_idx,
             )
         )
@@ -1528,7 +1820,11 @@ def find_downtrend_line(
 
 
 def find_uptrend_line(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """Uptrend line detection"""
 
@@ -1538,118 +1834,84 @@ def find_uptrend_line(
     if not pivots_len:
         return
 
-    # Get the lowest point in pivots.
-    a_idx = pivots.P.idxmin()
-    a = pivots.at[a_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
 
-    if isinstance(a, pd.Series):
-        a = a.min()
+    # Get the lowest point in pivots.
+    a_pos = k.pivot_argmin(0)
+    a = k.pivot_min(a_pos)
 
     threshold = a * 0.001
-    last_idx = df.index[-1]
+    last_pos = k.n - 1
+    last_idx = k.index[last_pos]
 
     # A is the last pivot
-    if a_idx == pivots.index[-1]:
+    if k.same_label(a_pos, -1):
         return
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
-    assert isinstance(a_idx, pd.Timestamp)
 
-    while True:
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivots_len:
-            break
+    a_chain, b_chain = trend_line_chain(k, find_max=False)
 
-        # Get the next lowest point in pivots.
-        b_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmin()
-        b = pivots.at[b_idx, "P"]
-
-        if isinstance(b, pd.Series):
-            b = b.max()
-
-        # Calculate the slope and y-intercept of the trendline AB.
-        try:
-            tline = generate_trend_line(df.Low, a_idx, b_idx)
-        except ZeroDivisionError:
-            return
+    # trend_line raises ZeroDivisionError for two points on the same bar
+    if (k.dpos[a_chain] == k.dpos[b_chain]).any():
+        return
 
-        y_close = getY(tline.slope, tline.y_int, len(df) - 1)
+    # Score every candidate line AB against all pivots and closes at once
+    _, touch_counts, candidates = score_trend_lines(
+        k, k.low, a_chain, b_chain, threshold, above=False
+    )
 
-        close = df.at[last_idx, "Close"]
+    for i in np.flatnonzero(candidates):
+        a_pos = a_chain[i]
+        tline = trend_line(k, k.low, k.dpos[a_pos], k.dpos[b_chain[i]])
 
-        pct_close = (close - y_close) / y_close * 100
-
-        if close < y_close or pct_close > 10:
-            a_idx, a = b_idx, b
-            continue
+        y_close = getY(tline.slope, tline.y_int, last_pos)
 
-        line_pivots = pivots.loc[a_idx:, "P"]
+        start = k.label_start(a_pos)
 
-        # Calculate y values for trendline at each pivot.
-        y_values = line_pivots.index.map(
-            lambda x: getY(tline.slope, tline.y_int, df.index.get_loc(x))
-        )
+        # Distance of each pivot from trendline.
+        diff = np.abs(k.P[start:] - getY(tline.slope, tline.y_int, k.dpos[start:]))
 
-        # Get the distance of each pivot from trendline.
-        diff = (line_pivots - y_values).abs()
+        touches = diff <= threshold
+        touch_count = touch_counts[i]
 
-        # Count pivots, whose absolute distance from line is
-        # within a fixed threshold.
-        touch_count = (diff <= threshold).sum()
+        # Filter the distances for pivots located below the trendline
+        # and use the absolute sum of their distances as the score.
+        # For two lines with equal touch points, the lower score indicates
+        # a better fitting line.
+        # The lowest possible score is 0. Sum of empty Series is 0
+        score = diff[diff < -threshold].sum()
 
-        if touch_count > 2:
-            # Get all closes from line start to last close
-            closes = df.loc[a_idx:last_idx, "Close"]
+        # Update if no trendline is detected yet or
+        # if we have higher touch counts.
+        # if touch count is same, check for lower scores
+        if selected is None or (
+            touch_count > selected["touches"]
+            or (touch_count == selected["touches"] and score < selected["score"])
+        ):
+            touch_pos = start + np.flatnonzero(touches)
+            str_keys = ascii_upper[: len(touch_pos)]
 
-            # Calculate the price on trendline from line start to last close
-            y_values = closes.index.map(
-                lambda x: getY(tline.slope, tline.y_int, df.index.get_loc(x))
+            selected = dict(
+                touches=touch_count,
+                start=k.date(a_pos),
+                end=last_idx,
+                slope=tline.slope,
+                y_intercept=tline.y_int,
+                y_close=y_close,
+                points=dict(
+                    zip(str_keys, tuple((k.date(pos), k.P[pos]) for pos in touch_pos))
+                ),
+                extra_points=dict(start=tline.line.start, end=tline.line.end),
+                score=score,
             )
 
-            # Sum up number of times, price closed below the trendline
-            if (closes < y_values).sum() > 0:
-                # skip if trendline was breached
-                a_idx, a = b_idx, b
-                continue
-
-            # Filter the distances for pivots located below the trendline
-            # and use the absolute sum of their distances as the score.
-            # For two lines with equal touch points, the lower score indicates
-            # a better fitting line.
-            # The lowest possible score is 0. Sum of empty Series is 0
-            score = diff[diff < -threshold].sum()
-
-            # Update if no trendline is detected yet or
-            # if we have higher touch counts.
-            # if touch count is same, check for lower scores
-            if selected is None or (
-                touch_count > selected["touches"]
-                or (touch_count == selected["touches"] and score < selected["score"])
-            ):
-                touch_points = line_pivots.loc[diff <= threshold]
-                str_keys = ascii_upper[: len(touch_points)]
-
-                selected = dict(
-                    touches=touch_count,
-                    start=a_idx,
-                    end=last_idx,
-                    slope=tline.slope,
-                    y_intercept=tline.y_int,
-                    y_close=y_close,
-                    points=dict(zip(str_keys, tuple(touch_points.items()))),
-                    extra_points=dict(start=tline.line.start, end=tline.line.end),
-                    score=score,
-                )
-
-        a_idx, a = b_idx, b
-
     if selected:
         selected.update(
             dict(
                 sym=sym,
                 pattern="UPTL",
-                df_start=df.index[0],
+                df_start=k.index[0],
                 df_end=last_idx,
             )
         )
@@ -1657,75 +1919,263 @@ def find_uptrend_line(
     return selected
 
 
-def find_bullish_abcd(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
-) -> Optional[dict]:
+def snap_fib(ratios) -> np.ndarray:
+    """Snap each ratio to the nearest level in fib_ser.
+
+    Ties go to the lower level. NaN stays NaN and an infinite ratio snaps to
+    the first level, as `(fib_ser - ratio).abs().idxmin()` did."""
+    ratios = np.asarray(ratios, dtype=float)
+
+    pos = np.clip(np.searchsorted(fib_arr, ratios), 1, len(fib_arr) - 1)
+
+    lower = fib_arr[pos - 1]
+    upper = fib_arr[pos]
+
+    snapped = np.where(np.abs(upper - ratios) < np.abs(lower - ratios), upper, lower)
+    snapped[np.isinf(ratios)] = fib_arr[0]
+    snapped[np.isnan(ratios)] = np.nan
+
+    return snapped
+
+
+class HarmonicLegs(NamedTuple):
     """
-    Bullish AB = CD harmonic pattern
+    Candidate X, A, B, C legs of one direction as parallel arrays, in the
+    order the detectors visit them.
+
+    `*_pos` index the pivots and `d*` the DataFrame. `pivots_ok` holds the
+    shape checks shared by all harmonic detectors and `from_b_ok` the check
+    that C is the extreme from B to the last bar. AB=CD legs have no X, and
+    their X fields and `b_retrace` are None.
     """
 
-    alt_name = "Bull AB=CD"
-    pivot_len = pivots.shape[0]
+    x_pos: Optional[np.ndarray]
+    a_pos: np.ndarray
+    b_pos: np.ndarray
+    c_pos: np.ndarray
+    dx: Optional[np.ndarray]
+    da: np.ndarray
+    db: np.ndarray
+    dc: np.ndarray
+    x: Optional[np.ndarray]
+    a: np.ndarray
+    b: np.ndarray
+    c: np.ndarray
+    pivots_ok: np.ndarray
+    from_b_ok: np.ndarray
+    b_retrace: Optional[np.ndarray]
+    c_retrace: np.ndarray
+
+    def retraces(self, well_formed: np.ndarray):
+        """Return (b_retrace, c_retrace).
+
+        Raises KeyError if a well formed leg has an undefined ratio, which is
+        what the nearest Fibonacci lookup on NaN did in the pattern loops."""
+        ratios = [self.c_retrace]
+
+        if self.b_retrace is not None:
+            ratios.append(self.b_retrace)
+
+        for ratio in ratios:
+            if np.isnan(ratio[well_formed]).any():
+                raise KeyError(np.nan)
+
+        return self.b_retrace, self.c_retrace
+
+
+def _harmonic_legs(
+    k: ScanArrays, bullish: bool, rows: list, has_x: bool
+) -> HarmonicLegs:
+    pos = np.array(rows, dtype=np.int64).reshape(-1, 4 if has_x else 3).T
+
+    if has_x:
+        x_pos, a_pos, b_pos, c_pos = pos
+    else:
+        x_pos = None
+        a_pos, b_pos, c_pos = pos
+
+    # Points A and C are highs in a bullish pattern, X and B are lows
+    ac_val, xb_val = (k.group_max, k.group_min) if bullish else (k.group_min, k.group_max)
+    ac_arr, xb_arr = (k.high, k.low) if bullish else (k.low, k.high)
+    ac_ranges, xb_ranges = (
+        (k.ranges_max, k.ranges_min) if bullish else (k.ranges_min, k.ranges_max)
+    )
 
-    a_idx = pivots["P"].idxmax()
-    a = pivots.at[a_idx, "P"]
+    a, b, c = ac_val[a_pos], xb_val[b_pos], ac_val[c_pos]
+    da, db, dc = k.dpos[a_pos], k.dpos[b_pos], k.dpos[c_pos]
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    pivots_ok = (
+        (xb_ranges(xb_arr, da, dc + 1) == b)
+        & (a != xb_arr[da])
+        & (b != ac_arr[db])
+        & (c != xb_arr[dc])
+    )
 
-    assert isinstance(pivots.index, pd.DatetimeIndex)
-    assert isinstance(a_idx, pd.Timestamp)
+    from_b_ok = ac_ranges(ac_arr, db) == c
 
-    selected: Optional[dict] = None
+    sign = 1 if bullish else -1
 
-    while True:
-        pos_after_a = get_next_index(pivots.index, a_idx)
+    ab_diff = (a - b) * sign
+    bc_diff = (c - b) * sign
 
-        if pos_after_a >= pivot_len:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c_retrace = snap_fib(bc_diff / ab_diff)
+
+    dx = x = b_retrace = None
+
+    if has_x:
+        x = xb_val[x_pos]
+        dx = k.dpos[x_pos]
+
+        pivots_ok &= (ac_ranges(ac_arr, dx, db + 1) == a) & (x != ac_arr[dx])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            b_retrace = snap_fib(ab_diff / ((a - x) * sign))
+
+    return HarmonicLegs(
+        x_pos, a_pos, b_pos, c_pos, dx, da, db, dc, x, a, b, c,
+        pivots_ok, from_b_ok, b_retrace, c_retrace,
+    )
+
+
+def get_xabc_legs(k: ScanArrays, bullish: bool, every_x: bool) -> HarmonicLegs:
+    """
+    XABC legs shared by the harmonic detectors. Computed once per ScanArrays.
+
+    For every X, A is the extreme pivot after X, C the extreme pivot after A
+    and B the opposite extreme between A and C.
+
+    With `every_x` False (Bat, Gartley), X walks from the lowest (bullish) or
+    highest (bearish) pivot to the next extreme after it. With `every_x` True
+    (Crab, Butterfly), every pivot is an X, if it is not the opposite extreme
+    of its bar and remains the extreme up to A.
+    """
+    return k.memo(
+        f"xabc-{bullish}-{every_x}",
+        lambda: _harmonic_legs(k, bullish, _walk_xabc(k, bullish, every_x), True),
+    )
+
+
+def _walk_xabc(k: ScanArrays, bullish: bool, every_x: bool) -> list:
+    if bullish:
+        find_x, find_ac, find_b = k.pivot_argmin, k.pivot_argmax, k.pivot_argmin
+        x_val, x_range, x_arr, opposite = k.group_min, k.range_min, k.low, k.high
+    else:
+        find_x, find_ac, find_b = k.pivot_argmax, k.pivot_argmin, k.pivot_argmax
+        x_val, x_range, x_arr, opposite = k.group_max, k.range_max, k.high, k.low
+
+    rows = []
+    x_pos = 0 if every_x or not k.m else find_x(0)
+
+    while x_pos < k.m:
+        if every_x and x_val[x_pos] == opposite[k.dpos[x_pos]]:
+            x_pos += 1
+            continue
+
+        pos_after_x = k.next_pos(x_pos)
+
+        if pos_after_x >= k.m:
             break
 
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmax()
-        c = pivots.at[c_idx, "P"]
+        a_pos = find_ac(k.label_start(pos_after_x))
+
+        if every_x and x_range(x_arr, k.dpos[x_pos], k.dpos[a_pos] + 1) != x_val[x_pos]:
+            x_pos += 1
+            continue
 
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmin()
-        b = pivots.at[b_idx, "P"]
+        pos_after_a = k.next_pos(a_pos)
 
-        if b_idx == c_idx:
+        if pos_after_a >= k.m:
             break
 
-        if pivots.index.has_duplicates:
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].max()
+        c_pos = find_ac(k.label_start(pos_after_a))
+        b_pos = find_b(k.label_start(a_pos), k.label_stop(c_pos))
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].min()
+        rows.append((x_pos, a_pos, b_pos, c_pos))
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].max()
+        x_pos = x_pos + 1 if every_x else find_x(k.label_start(pos_after_x))
 
-        bc_diff = c - b
-        ab_diff = a - b
+    return rows
 
-        lowest_low_ac = df.loc[a_idx:c_idx, "Low"].min()
-        highest_high_from_b = df.loc[b_idx:, "High"].max()
 
-        if (
-            lowest_low_ac != b
-            or highest_high_from_b != c
-            or a == df.at[a_idx, "Low"]
-            or b == df.at[b_idx, "High"]
-            or c == df.at[c_idx, "Low"]
-        ):
-            # Check that the pattern is well formed
-            a, a_idx = c, c_idx
-            continue
+def get_abc_legs(k: ScanArrays, bullish: bool) -> HarmonicLegs:
+    """
+    AB=CD legs. Computed once per ScanArrays.
+
+    A starts at the highest (bullish) or lowest (bearish) pivot, C is the
+    extreme pivot after A, B the opposite extreme between them, and the next A
+    is C. Stops when B and C fall on the same bar.
+    """
+
+    def walk():
+        find_ac, find_b = (
+            (k.pivot_argmax, k.pivot_argmin) if bullish else (k.pivot_argmin, k.pivot_argmax)
+        )
+
+        rows = []
+
+        if not k.m:
+            return rows
+
+        a_pos = find_ac(0)
+
+        while True:
+            pos_after_a = k.next_pos(a_pos)
+
+            if pos_after_a >= k.m:
+                break
+
+            c_pos = find_ac(k.label_start(pos_after_a))
+            b_pos = find_b(k.label_start(a_pos), k.label_stop(c_pos))
+
+            if k.same_label(b_pos, c_pos):
+                break
+
+            rows.append((a_pos, b_pos, c_pos))
+            a_pos = c_pos
+
+        return rows
+
+    return k.memo(f"abc-{bullish}", lambda: _harmonic_legs(k, bullish, walk(), False))
+
+
+def find_bullish_abcd(
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
+) -> Optional[dict]:
+    """
+    Bullish AB = CD harmonic pattern
+    """
+
+    alt_name = "Bull AB=CD"
+
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    legs = get_abc_legs(k, bullish=True)
+
+    d_pos = k.n - 1
+    d = k.close[d_pos]
+
+    selected: Optional[dict] = None
+
+    assert isinstance(pivots.index, pd.DatetimeIndex)
+
+    well_formed = legs.pivots_ok & legs.from_b_ok
+    _, c_retraces = legs.retraces(well_formed)
+
+    candidates = well_formed & ~((c_retraces < 0.382) | (c_retraces > 0.886))
 
-        # Get the FIB ratio nearest to point C
-        c_retrace = fib_ser.loc[(fib_ser - (bc_diff / ab_diff)).abs().idxmin()]
+    for i in np.flatnonzero(candidates):
+        a_pos, b_pos, c_pos = legs.a_pos[i], legs.b_pos[i], legs.c_pos[i]
+        a, b, c = legs.a[i], legs.b[i], legs.c[i]
+        da, db, dc = legs.da[i], legs.db[i], legs.dc[i]
 
-        if c_retrace < 0.382 or c_retrace > 0.886:
-            a, a_idx = c, c_idx
-            continue
+        bc_diff = c - b
+        ab_diff = a - b
+
+        c_retrace = c_retraces[i]
 
         c_fib_inverse = 1 / c_retrace
 
@@ -1735,7 +2185,7 @@ def find_bullish_abcd(
         ab_27_ext = c - ab_diff * 1.27
         ab_618_ext = c - ab_diff * 1.618
 
-        lowest_close_from_c = df.loc[c_idx:, "Close"].min()
+        lowest_close_from_c = k.range_min(k.close, dc)
 
         is_perfect = c_retrace == 0.618 and ab_cd_ext <= bc_618_ext
 
@@ -1748,19 +2198,14 @@ def find_bullish_abcd(
         elif is_alternate:
             terminal_point = ab_618_ext
 
-        lows_after_c = df.loc[c_idx:, "Low"]
+        lows_below_terminal_point = k.low[dc:] < terminal_point
 
-        lows_below_terminal_point = lows_after_c.loc[lows_after_c < terminal_point]
+        has_tested = bool(lows_below_terminal_point.any())
 
-        if lows_below_terminal_point.empty:
-            has_tested = False
-        else:
-            has_tested = True
-
-        closes_below_terminal_point = (df.loc[c_idx:, "Close"] < terminal_point).sum()
+        closes_below_terminal_point = (k.close[dc:] < terminal_point).sum()
 
-        ab_completion = (b_idx - a_idx).days
-        cd_completion = (d_idx - c_idx).days
+        ab_completion = k.days(da, db)
+        cd_completion = k.days(dc, d_pos)
 
         if (
             d < b - (b - terminal_point) * 0.5
@@ -1768,13 +2213,16 @@ def find_bullish_abcd(
             and closes_below_terminal_point < 7
             and (
                 has_tested
-                and (d_idx - lows_below_terminal_point.index[0]).days < 7
+                and k.days(dc + lows_below_terminal_point.argmax(), d_pos) < 7
                 or not has_tested
             )
         ):
+            a_idx, b_idx, c_idx = map(k.date, (a_pos, b_pos, c_pos))
+            d_idx = k.index[d_pos]
+
             selected = dict(
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 start=a_idx,
                 end=d_idx,
                 points={
@@ -1815,7 +2263,6 @@ def find_bullish_abcd(
                     }
                 )
 
-        a, a_idx = c, c_idx
 
     if selected:
         selected.update(
@@ -1830,75 +2277,42 @@ def find_bullish_abcd(
 
 
 def find_bearish_abcd(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Bearish AB = CD harmonic pattern
     """
 
     alt_name = "Bear AB=CD"
-    pivot_len = pivots.shape[0]
-
-    a_idx = pivots["P"].idxmin()
-    a = pivots.at[a_idx, "P"]
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    legs = get_abc_legs(k, bullish=False)
 
-    assert isinstance(pivots.index, pd.DatetimeIndex)
-    assert isinstance(a_idx, pd.Timestamp)
+    d_pos = k.n - 1
+    d = k.close[d_pos]
 
     selected: Optional[dict] = None
 
-    while True:
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivot_len:
-            break
-
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmin()
-
-        c = pivots.at[c_idx, "P"]
-
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmax()
-        b = pivots.at[b_idx, "P"]
-
-        if b_idx == c_idx:
-            break
+    assert isinstance(pivots.index, pd.DatetimeIndex)
 
-        if pivots.index.has_duplicates:
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].min()
+    well_formed = legs.pivots_ok & legs.from_b_ok
+    _, c_retraces = legs.retraces(well_formed)
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].max()
+    candidates = well_formed & ~((c_retraces < 0.382) | (c_retraces > 0.886))
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].min()
+    for i in np.flatnonzero(candidates):
+        a_pos, b_pos, c_pos = legs.a_pos[i], legs.b_pos[i], legs.c_pos[i]
+        a, b, c = legs.a[i], legs.b[i], legs.c[i]
+        da, db, dc = legs.da[i], legs.db[i], legs.dc[i]
 
         bc_diff = b - c
         ab_diff = b - a
 
-        highest_high_ac = df.loc[a_idx:c_idx, "High"].max()
-        lowest_low_from_b = df.loc[b_idx:, "Low"].min()
-
-        if (
-            highest_high_ac != b
-            or lowest_low_from_b != c
-            or a == df.at[a_idx, "High"]
-            or b == df.at[b_idx, "Low"]
-            or c == df.at[c_idx, "High"]
-        ):
-            # Check that the pattern is well formed
-            a, a_idx = c, c_idx
-            continue
-
-        # Get the FIB ratio nearest to point C
-        c_retrace = fib_ser.loc[(fib_ser - (bc_diff / ab_diff)).abs().idxmin()]
-
-        if c_retrace < 0.382 or c_retrace > 0.886:
-            a, a_idx = c, c_idx
-            continue
+        c_retrace = c_retraces[i]
 
         c_fib_inverse = 1 / c_retrace
 
@@ -1908,7 +2322,7 @@ def find_bearish_abcd(
         ab_27_ext = c + ab_diff * 1.27
         ab_618_ext = c + ab_diff * 1.618
 
-        highest_close_after_c = df.loc[c_idx:, "Close"].max()
+        highest_close_after_c = k.range_max(k.close, dc)
 
         is_perfect = c_retrace == 0.618 and ab_cd_ext >= bc_618_ext
         is_alternate = highest_close_after_c > ab_cd_ext
@@ -1920,19 +2334,14 @@ def find_bearish_abcd(
         elif is_alternate:
             terminal_point = ab_618_ext
 
-        highs_after_c = df.loc[c_idx:, "High"]
+        highs_above_terminal_point = k.high[dc:] > terminal_point
 
-        highs_above_terminal_point = highs_after_c[highs_after_c > terminal_point]
-
-        if highs_above_terminal_point.empty:
-            has_tested = False
-        else:
-            has_tested = True
+        has_tested = bool(highs_above_terminal_point.any())
 
-        closes_above_terminal_point = (df.loc[c_idx:, "Close"] > terminal_point).sum()
+        closes_above_terminal_point = (k.close[dc:] > terminal_point).sum()
 
-        ab_completion = (b_idx - a_idx).days
-        cd_completion = (d_idx - c_idx).days
+        ab_completion = k.days(da, db)
+        cd_completion = k.days(dc, d_pos)
 
         if (
             closes_above_terminal_point < 7
@@ -1940,13 +2349,16 @@ def find_bearish_abcd(
             and d > b + (terminal_point - b) * 0.5
             and (
                 has_tested
-                and (d_idx - highs_above_terminal_point.index[0]).days < 7
+                and k.days(dc + highs_above_terminal_point.argmax(), d_pos) < 7
                 or not has_tested
             )
         ):
+            a_idx, b_idx, c_idx = map(k.date, (a_pos, b_pos, c_pos))
+            d_idx = k.index[d_pos]
+
             selected = dict(
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 start=a_idx,
                 end=d_idx,
                 points={
@@ -1987,7 +2399,6 @@ def find_bearish_abcd(
                     }
                 )
 
-        a, a_idx = c, c_idx
 
     if selected:
         selected.update(
@@ -2002,98 +2413,59 @@ def find_bearish_abcd(
 
 
 def find_bullish_bat(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Bullish Bat harmonic pattern
     """
     alt_name = "Bull BAT"
-    pivot_len = pivots.shape[0]
 
-    x_idx = pivots["P"].idxmin()
-    x = pivots.at[x_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    legs = get_xabc_legs(k, bullish=True, every_x=False)
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    d_pos = k.n - 1
+    d = k.close[d_pos]
 
     selected: Optional[dict] = None
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
-    assert isinstance(x_idx, pd.Timestamp)
-
-    while True:
-        pos_after_x = get_next_index(pivots.index, x_idx)
-
-        if pos_after_x >= pivot_len:
-            break
-
-        a_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmax()
-        a = pivots.at[a_idx, "P"]
-
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivot_len:
-            break
-
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmax()
-        c = pivots.at[c_idx, "P"]
-
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmin()
-        b = pivots.at[b_idx, "P"]
 
-        if pivots.index.has_duplicates:
-            if isinstance(x, pd.Series):
-                x = pivots.at[x_idx, "P"].min()
+    well_formed = legs.pivots_ok & legs.from_b_ok
+    b_retraces, c_retraces = legs.retraces(well_formed)
 
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].max()
+    is_alternates = b_retraces == 0.382
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].min()
+    candidates = well_formed & ~(
+        (b_retraces < 0.382)
+        | (b_retraces > 0.5)
+        | (c_retraces < 0.382)
+        | (c_retraces > 0.886)
+        | ~is_alternates & (k.ranges_min(k.close, legs.dc) < legs.x)
+    )
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].max()
+    for i in np.flatnonzero(candidates):
+        x_pos, a_pos, b_pos, c_pos = (
+            legs.x_pos[i],
+            legs.a_pos[i],
+            legs.b_pos[i],
+            legs.c_pos[i],
+        )
+        x, a, b, c = legs.x[i], legs.a[i], legs.b[i], legs.c[i]
+        dc = legs.dc[i]
 
         xa_diff = a - x
         ab_diff = a - b
         bc_diff = c - b
 
-        lowest_low_ac = df.loc[a_idx:c_idx, "Low"].min()
-        highest_high_xb = df.loc[x_idx:b_idx, "High"].max()
-        highest_high_from_b = df.loc[b_idx:, "High"].max()
-
-        if (
-            highest_high_xb != a
-            or lowest_low_ac != b
-            or highest_high_from_b != c
-            or x == df.at[x_idx, "High"]
-            or a == df.at[a_idx, "Low"]
-            or b == df.at[b_idx, "High"]
-            or c == df.at[c_idx, "Low"]
-        ):
-            # Check that the pattern is well formed
-            x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmin()
-            x = pivots.loc[x_idx, "P"]
-            continue
-
-        b_retrace = fib_ser.loc[(fib_ser - (ab_diff / xa_diff)).abs().idxmin()]
-        c_retrace = fib_ser.loc[(fib_ser - (bc_diff / ab_diff)).abs().idxmin()]
+        b_retrace, c_retrace = b_retraces[i], c_retraces[i]
 
         is_perfect = b_retrace == 0.5 and (c_retrace == 0.5 or c_retrace == 0.618)
 
-        is_alternate = b_retrace == 0.382
-
-        if (
-            b_retrace < 0.382
-            or b_retrace > 0.5
-            or c_retrace < 0.382
-            or c_retrace > 0.886
-            or not is_alternate
-            and df.loc[c_idx:, "Close"].min() < x
-        ):
-            x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmin()
-            x = pivots.loc[x_idx, "P"]
-            continue
+        is_alternate = is_alternates[i]
 
         xa_886_retrace = a - xa_diff * 0.886
         xa_13_ext = a - xa_diff * 1.13
@@ -2105,29 +2477,27 @@ def find_bullish_bat(
 
         terminal_point = xa_13_ext if is_alternate else xa_886_retrace
 
-        lows_from_c = df.loc[c_idx:, "Low"]
-
-        lows_below_terminal_point = lows_from_c.loc[lows_from_c < terminal_point]
+        lows_below_terminal_point = k.low[dc:] < terminal_point
 
-        if lows_below_terminal_point.empty:
-            has_tested = False
-        else:
-            has_tested = True
+        has_tested = bool(lows_below_terminal_point.any())
 
-        closes_below_terminal_point = (df.loc[c_idx:, "Close"] < terminal_point).sum()
+        closes_below_terminal_point = (k.close[dc:] < terminal_point).sum()
 
         if (
             closes_below_terminal_point < 7
             and d < b - (b - terminal_point) * 0.5
             and (
                 has_tested
-                and (d_idx - lows_below_terminal_point.index[0]).days < 7
+                and k.days(dc + lows_below_terminal_point.argmax(), d_pos) < 7
                 or not has_tested
             )
         ):
+            x_idx, a_idx, b_idx, c_idx = map(k.date, (x_pos, a_pos, b_pos, c_pos))
+            d_idx = k.index[d_pos]
+
             selected = dict(
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 start=a_idx,
                 end=d_idx,
                 points={
@@ -2198,8 +2568,6 @@ def find_bullish_bat(
                     }
                 )
 
-        x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmin()
-        x = pivots.loc[x_idx, "P"]
 
     if selected:
         selected.update(dict(sym=sym, pattern="BATU", alt_name=alt_name))
@@ -2208,98 +2576,59 @@ def find_bullish_bat(
 
 
 def find_bearish_bat(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Bearish Bat harmonic pattern
     """
     alt_name = "Bear BAT"
-    pivot_len = pivots.shape[0]
 
-    x_idx = pivots["P"].idxmax()
-    x = pivots.at[x_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    legs = get_xabc_legs(k, bullish=False, every_x=False)
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    d_pos = k.n - 1
+    d = k.close[d_pos]
 
     selected: Optional[dict] = None
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
-    assert isinstance(x_idx, pd.Timestamp)
-
-    while True:
-        pos_after_x = get_next_index(pivots.index, x_idx)
-
-        if pos_after_x >= pivot_len:
-            break
-
-        a_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmin()
-        a = pivots.at[a_idx, "P"]
-
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivot_len:
-            break
-
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmin()
-        c = pivots.at[c_idx, "P"]
 
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmax()
-        b = pivots.at[b_idx, "P"]
+    well_formed = legs.pivots_ok & legs.from_b_ok
+    b_retraces, c_retraces = legs.retraces(well_formed)
 
-        if pivots.index.has_duplicates:
-            if isinstance(x, pd.Series):
-                x = pivots.at[x_idx, "P"].max()
+    is_alternates = b_retraces == 0.382
 
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].min()
-
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].max()
+    candidates = well_formed & ~(
+        (b_retraces < 0.382)
+        | (b_retraces > 0.5)
+        | (c_retraces < 0.382)
+        | (c_retraces > 0.886)
+        | ~is_alternates & (k.ranges_max(k.close, legs.dc) > legs.x)
+    )
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].min()
+    for i in np.flatnonzero(candidates):
+        x_pos, a_pos, b_pos, c_pos = (
+            legs.x_pos[i],
+            legs.a_pos[i],
+            legs.b_pos[i],
+            legs.c_pos[i],
+        )
+        x, a, b, c = legs.x[i], legs.a[i], legs.b[i], legs.c[i]
+        dc = legs.dc[i]
 
         xa_diff = x - a
         ab_diff = b - a
         bc_diff = b - c
 
-        lowest_low_from_b = df.loc[b_idx:, "Low"].min()
-        highest_high_ac = df.loc[a_idx:c_idx, "High"].max()
-        lowest_low_xb = df.loc[x_idx:b_idx, "Low"].min()
-
-        if (
-            lowest_low_xb != a
-            or highest_high_ac != b
-            or lowest_low_from_b != c
-            or x == df.at[x_idx, "Low"]
-            or a == df.at[a_idx, "High"]
-            or b == df.at[b_idx, "Low"]
-            or c == df.at[c_idx, "High"]
-        ):
-            # Check that the pattern is well formed
-            x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmax()
-            x = pivots.loc[x_idx, "P"]
-            continue
-
-        b_retrace = fib_ser.loc[(fib_ser - (ab_diff / xa_diff)).abs().idxmin()]
-        c_retrace = fib_ser.loc[(fib_ser - (bc_diff / ab_diff)).abs().idxmin()]
+        b_retrace, c_retrace = b_retraces[i], c_retraces[i]
 
         is_perfect = b_retrace == 0.5 and (c_retrace == 0.5 or c_retrace == 0.618)
 
-        is_alternate = b_retrace == 0.382
-
-        if (
-            b_retrace < 0.382
-            or b_retrace > 0.5
-            or c_retrace < 0.382
-            or c_retrace > 0.886
-            or not is_alternate
-            and df.loc[c_idx:, "Close"].max() > x
-        ):
-            x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmax()
-            x = pivots.loc[x_idx, "P"]
-            continue
+        is_alternate = is_alternates[i]
 
         xa_886_retrace = a + xa_diff * 0.886
         xa_13_ext = a + xa_diff * 1.13
@@ -2311,29 +2640,27 @@ def find_bearish_bat(
 
         terminal_point = xa_13_ext if is_alternate else xa_886_retrace
 
-        highs_from_c = df.loc[c_idx:, "High"]
+        highs_above_terminal_point = k.high[dc:] > terminal_point
 
-        highs_above_terminal_point = highs_from_c.loc[highs_from_c > terminal_point]
+        has_tested = bool(highs_above_terminal_point.any())
 
-        if highs_above_terminal_point.empty:
-            has_tested = False
-        else:
-            has_tested = True
-
-        closes_above_terminal_point = (df.loc[c_idx:, "Close"] > terminal_point).sum()
+        closes_above_terminal_point = (k.close[dc:] > terminal_point).sum()
 
         if (
             closes_above_terminal_point < 7
             and d > b + (terminal_point - b) * 0.5
             and (
                 has_tested
-                and (d_idx - highs_above_terminal_point.index[0]).days < 7
+                and k.days(dc + highs_above_terminal_point.argmax(), d_pos) < 7
                 or not has_tested
             )
         ):
+            x_idx, a_idx, b_idx, c_idx = map(k.date, (x_pos, a_pos, b_pos, c_pos))
+            d_idx = k.index[d_pos]
+
             selected = dict(
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 start=a_idx,
                 end=d_idx,
                 points={
@@ -2403,8 +2730,6 @@ def find_bearish_bat(
                     }
                 )
 
-        x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmax()
-        x = pivots.loc[x_idx, "P"]
 
     if selected:
         selected.update(dict(sym=sym, pattern="BATD", alt_name=alt_name))
@@ -2413,92 +2738,57 @@ def find_bearish_bat(
 
 
 def find_bullish_gartley(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Bullish Gartley harmonic pattern
     """
     alt_name = "Bull Gartley"
-    pivot_len = pivots.shape[0]
 
-    x_idx = pivots["P"].idxmin()
-    x = pivots.at[x_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    legs = get_xabc_legs(k, bullish=True, every_x=False)
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    d_pos = k.n - 1
+    d = k.close[d_pos]
 
     selected: Optional[dict] = None
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
-    assert isinstance(x_idx, pd.Timestamp)
-
-    while True:
-        pos_after_x = get_next_index(pivots.index, x_idx)
-
-        if pos_after_x >= pivot_len:
-            break
-
-        a_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmax()
-        a = pivots.at[a_idx, "P"]
-
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivot_len:
-            break
 
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmax()
-        c = pivots.at[c_idx, "P"]
-
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmin()
-        b = pivots.at[b_idx, "P"]
-
-        if pivots.index.has_duplicates:
-            if isinstance(x, pd.Series):
-                x = pivots.at[x_idx, "P"].min()
+    well_formed = (
+        legs.pivots_ok
+        & legs.from_b_ok
+        & ~(k.ranges_min(k.close, legs.dc) < legs.x)
+    )
 
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].max()
+    b_retraces, c_retraces = legs.retraces(well_formed)
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].min()
+    candidates = well_formed & ~(
+        (b_retraces != 0.618) | (c_retraces < 0.382) | (c_retraces > 0.886)
+    )
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].max()
+    for i in np.flatnonzero(candidates):
+        x_pos, a_pos, b_pos, c_pos = (
+            legs.x_pos[i],
+            legs.a_pos[i],
+            legs.b_pos[i],
+            legs.c_pos[i],
+        )
+        x, a, b, c = legs.x[i], legs.a[i], legs.b[i], legs.c[i]
+        dc = legs.dc[i]
 
         xa_diff = a - x
         ab_diff = a - b
         bc_diff = c - b
 
-        highest_high_xb = df.loc[x_idx:b_idx, "High"].max()
-        lowest_low_ac = df.loc[a_idx:c_idx, "Low"].min()
-        highest_high_from_b = df.loc[b_idx:, "High"].max()
-        lowest_close_from_c = df.loc[c_idx:, "Close"].min()
-
-        if (
-            highest_high_xb != a
-            or lowest_low_ac != b
-            or highest_high_from_b != c
-            or lowest_close_from_c < x
-            or x == df.at[x_idx, "High"]
-            or a == df.at[a_idx, "Low"]
-            or b == df.at[b_idx, "High"]
-            or c == df.at[c_idx, "Low"]
-        ):
-            # Check that the pattern is well formed
-            x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmin()
-            x = pivots.loc[x_idx, "P"]
-            continue
-
-        b_retrace = fib_ser.loc[(fib_ser - (ab_diff / xa_diff)).abs().idxmin()]
-        c_retrace = fib_ser.loc[(fib_ser - (bc_diff / ab_diff)).abs().idxmin()]
+        b_retrace, c_retrace = b_retraces[i], c_retraces[i]
 
         is_perfect = b_retrace == 0.618 and c_retrace == 0.618
 
-        if b_retrace != 0.618 or c_retrace < 0.382 or c_retrace > 0.886:
-            x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmin()
-            x = pivots.loc[x_idx, "P"]
-            continue
-
         c_fib_inverse = round(1 / c_retrace, 3)
 
         xa_786_retrace = a - xa_diff * 0.786
@@ -2509,29 +2799,27 @@ def find_bullish_gartley(
 
         terminal_point = xa_786_retrace
 
-        closes_below_terminal_point = (df.loc[c_idx:, "Close"] < terminal_point).sum()
+        closes_below_terminal_point = (k.close[dc:] < terminal_point).sum()
 
-        lows_after_c = df.loc[c_idx:, "Low"]
+        lows_below_terminal_point = k.low[dc:] < terminal_point
 
-        lows_below_terminal_point = lows_after_c.loc[lows_after_c < terminal_point]
-
-        if lows_below_terminal_point.empty:
-            has_tested = False
-        else:
-            has_tested = True
+        has_tested = bool(lows_below_terminal_point.any())
 
         if (
             d < b
             and closes_below_terminal_point < 7
             and (
                 has_tested
-                and (d_idx - lows_below_terminal_point.index[0]).days < 7
+                and k.days(dc + lows_below_terminal_point.argmax(), d_pos) < 7
                 or not has_tested
             )
         ):
+            x_idx, a_idx, b_idx, c_idx = map(k.date, (x_pos, a_pos, b_pos, c_pos))
+            d_idx = k.index[d_pos]
+
             selected = dict(
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 start=a_idx,
                 end=d_idx,
                 points={
@@ -2584,8 +2872,6 @@ def find_bullish_gartley(
                     }
                 )
 
-        x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmin()
-        x = pivots.loc[x_idx, "P"]
 
     if selected:
         selected.update(dict(sym=sym, pattern="GARTU", alt_name=alt_name))
@@ -2594,92 +2880,57 @@ def find_bullish_gartley(
 
 
 def find_bearish_gartley(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Bearish Gartley harmonic pattern
     """
     alt_name = "Bearish Gartley"
-    pivot_len = pivots.shape[0]
 
-    x_idx = pivots["P"].idxmax()
-    x = pivots.at[x_idx, "P"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    legs = get_xabc_legs(k, bullish=False, every_x=False)
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    d_pos = k.n - 1
+    d = k.close[d_pos]
 
     selected: Optional[dict] = None
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
-    assert isinstance(x_idx, pd.Timestamp)
-
-    while True:
-        pos_after_x = get_next_index(pivots.index, x_idx)
-
-        if pos_after_x >= pivot_len:
-            break
-
-        a_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmin()
-        a = pivots.at[a_idx, "P"]
-
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivot_len:
-            break
 
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmin()
-        c = pivots.at[c_idx, "P"]
-
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmax()
-        b = pivots.at[b_idx, "P"]
-
-        if pivots.index.has_duplicates:
-            if isinstance(x, pd.Series):
-                x = pivots.at[x_idx, "P"].max()
+    well_formed = (
+        legs.pivots_ok
+        & (k.ranges_min(k.low, legs.dc) == legs.c)
+        & ~(k.ranges_max(k.close, legs.dc) > legs.x)
+    )
 
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].min()
+    b_retraces, c_retraces = legs.retraces(well_formed)
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].max()
+    candidates = well_formed & ~(
+        (b_retraces != 0.618) | (c_retraces < 0.382) | (c_retraces > 0.886)
+    )
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].min()
+    for i in np.flatnonzero(candidates):
+        x_pos, a_pos, b_pos, c_pos = (
+            legs.x_pos[i],
+            legs.a_pos[i],
+            legs.b_pos[i],
+            legs.c_pos[i],
+        )
+        x, a, b, c = legs.x[i], legs.a[i], legs.b[i], legs.c[i]
+        dc = legs.dc[i]
 
         xa_diff = x - a
         ab_diff = b - a
         bc_diff = b - c
 
-        lowest_low_xb = df.loc[x_idx:b_idx, "Low"].min()
-        highest_high_ac = df.loc[a_idx:c_idx, "High"].max()
-        lowest_low_from_c = df.loc[c_idx:, "Low"].min()
-        highest_close_from_c = df.loc[c_idx:, "Close"].max()
-
-        if (
-            lowest_low_xb != a
-            or highest_high_ac != b
-            or lowest_low_from_c != c
-            or highest_close_from_c > x
-            or x == df.at[x_idx, "Low"]
-            or a == df.at[a_idx, "High"]
-            or b == df.at[b_idx, "Low"]
-            or c == df.at[c_idx, "High"]
-        ):
-            # Check that the pattern is well formed
-            x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmax()
-            x = pivots.loc[x_idx, "P"]
-            continue
-
-        b_retrace = fib_ser.loc[(fib_ser - (ab_diff / xa_diff)).abs().idxmin()]
-        c_retrace = fib_ser.loc[(fib_ser - (bc_diff / ab_diff)).abs().idxmin()]
+        b_retrace, c_retrace = b_retraces[i], c_retraces[i]
 
         is_perfect = b_retrace == 0.618 and c_retrace == 0.618
 
-        if b_retrace != 0.618 or c_retrace < 0.382 or c_retrace > 0.886:
-            x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmax()
-            x = pivots.loc[x_idx, "P"]
-            continue
-
         c_fib_inverse = round(1 / c_retrace, 3)
 
         xa_786_retrace = a + xa_diff * 0.786
@@ -2690,29 +2941,27 @@ def find_bearish_gartley(
 
         terminal_point = xa_786_retrace
 
-        highs_after_c = df.loc[c_idx:, "High"]
+        highs_above_terminal_point = k.high[dc:] > terminal_point
 
-        highs_above_terminal_point = highs_after_c[highs_after_c > terminal_point]
+        has_tested = bool(highs_above_terminal_point.any())
 
-        if highs_above_terminal_point.empty:
-            has_tested = False
-        else:
-            has_tested = True
-
-        closes_above_terminal_point = (df.loc[c_idx:, "Close"] > terminal_point).sum()
+        closes_above_terminal_point = (k.close[dc:] > terminal_point).sum()
 
         if (
             d > b
             and closes_above_terminal_point < 7
             and (
                 has_tested
-                and (d_idx - highs_above_terminal_point.index[0]).days < 7
+                and k.days(dc + highs_above_terminal_point.argmax(), d_pos) < 7
                 or not has_tested
             )
         ):
+            x_idx, a_idx, b_idx, c_idx = map(k.date, (x_pos, a_pos, b_pos, c_pos))
+            d_idx = k.index[d_pos]
+
             selected = dict(
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 start=a_idx,
                 end=d_idx,
                 points={
@@ -2765,8 +3014,6 @@ def find_bearish_gartley(
                     }
                 )
 
-        x_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmax()
-        x = pivots.loc[x_idx, "P"]
 
     if selected:
         selected.update(dict(sym=sym, pattern="GARTD", alt_name=alt_name))
@@ -2775,86 +3022,51 @@ def find_bearish_gartley(
 
 
 def find_bullish_crab(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Bullish Crab harmonic pattern
     """
     alt_name = "Bull Crab"
-    pivot_len = pivots.shape[0]
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    legs = get_xabc_legs(k, bullish=True, every_x=True)
+
+    d_pos = k.n - 1
+    d = k.close[d_pos]
 
     selected: Optional[dict] = None
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    for x_idx in pivots.index:
-        x = pivots.at[x_idx, "P"]
+    well_formed = legs.pivots_ok & legs.from_b_ok
+    b_retraces, c_retraces = legs.retraces(well_formed)
 
-        if isinstance(x, pd.Series):
-            x = pivots.at[x_idx, "P"].min()
-
-        if x == df.at[x_idx, "High"]:
-            continue
-
-        pos_after_x = get_next_index(pivots.index, x_idx)
-
-        if pos_after_x >= pivot_len:
-            break
-
-        a_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmax()
-        a = pivots.at[a_idx, "P"]
-
-        if df.loc[x_idx:a_idx, "Low"].min() != x:
-            continue
-
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivot_len:
-            break
-
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmax()
-        c = pivots.at[c_idx, "P"]
-
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmin()
-        b = pivots.at[b_idx, "P"]
-
-        if pivots.index.has_duplicates:
-            if isinstance(x, pd.Series):
-                x = pivots.at[x_idx, "P"].min()
-
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].max()
-
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].min()
+    candidates = well_formed & ~(
+        (b_retraces > 0.618) & (b_retraces != 0.886)
+        | (b_retraces < 0.382)
+        | ((c_retraces < 0.382) | (c_retraces > 0.886))
+    )
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].max()
+    for i in np.flatnonzero(candidates):
+        x_pos, a_pos, b_pos, c_pos = (
+            legs.x_pos[i],
+            legs.a_pos[i],
+            legs.b_pos[i],
+            legs.c_pos[i],
+        )
+        x, a, b, c = legs.x[i], legs.a[i], legs.b[i], legs.c[i]
+        dc = legs.dc[i]
 
         xa_diff = a - x
         ab_diff = a - b
         bc_diff = c - b
 
-        highest_high_xb = df.loc[x_idx:b_idx, "High"].max()
-        lowest_low_ac = df.loc[a_idx:c_idx, "Low"].min()
-        highest_high_from_b = df.loc[b_idx:, "High"].max()
-
-        if (
-            highest_high_xb != a
-            or lowest_low_ac != b
-            or highest_high_from_b != c
-            or a == df.at[a_idx, "Low"]
-            or b == df.at[b_idx, "High"]
-            or c == df.at[c_idx, "Low"]
-        ):
-            # Check that the pattern is well formed
-            continue
-
-        b_retrace = fib_ser.loc[(fib_ser - (ab_diff / xa_diff)).abs().idxmin()]
-        c_retrace = fib_ser.loc[(fib_ser - (bc_diff / ab_diff)).abs().idxmin()]
+        b_retrace, c_retrace = b_retraces[i], c_retraces[i]
 
         is_perfect_crab = b_retrace == 0.618 and (
             c_retrace == 0.5 or c_retrace == 0.618
@@ -2862,14 +3074,6 @@ def find_bullish_crab(
 
         is_deep_crab = b_retrace == 0.886
 
-        if (
-            b_retrace > 0.618
-            and not is_deep_crab
-            or b_retrace < 0.382
-            or (c_retrace < 0.382 or c_retrace > 0.886)
-        ):
-            continue
-
         xa_618_ext = a - xa_diff * 1.618
 
         bc_3_14_ext = c - bc_diff * 3.14
@@ -2878,29 +3082,27 @@ def find_bullish_crab(
 
         terminal_point = xa_618_ext
 
-        lows_after_c = df.loc[c_idx:, "Low"]
+        lows_below_terminal_point = k.low[dc:] < terminal_point
 
-        lows_below_terminal_point = lows_after_c.loc[lows_after_c < terminal_point]
+        has_tested = bool(lows_below_terminal_point.any())
 
-        if lows_below_terminal_point.empty:
-            has_tested = False
-        else:
-            has_tested = True
-
-        closes_below_terminal_point = (df.loc[c_idx:, "Close"] < terminal_point).sum()
+        closes_below_terminal_point = (k.close[dc:] < terminal_point).sum()
 
         if (
             d < b - (b - terminal_point) * 0.5
             and closes_below_terminal_point < 7
             and (
                 has_tested
-                and (d_idx - lows_below_terminal_point.index[0]).days < 7
+                and k.days(dc + lows_below_terminal_point.argmax(), d_pos) < 7
                 or not has_tested
             )
         ):
+            x_idx, a_idx, b_idx, c_idx = map(k.date, (x_pos, a_pos, b_pos, c_pos))
+            d_idx = k.index[d_pos]
+
             selected = dict(
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 start=a_idx,
                 end=d_idx,
                 points={
@@ -2948,8 +3150,6 @@ def find_bullish_crab(
                         "2.618BC": c - bc_diff * 2.618,
                         "3.14BC": c - bc_diff * 3.14,
                         "3.618BC": c - bc_diff * 3.618,
-                        "1.27AB": ab_27_ext,
-                        "1.618AB": ab_618_ext,
                     },
                     "1.618XA",
                 )
@@ -2989,86 +3189,51 @@ def find_bullish_crab(
 
 
 def find_bearish_crab(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Bearish Crab harmonic pattern
     """
     alt_name = "Bear Crab"
-    pivot_len = pivots.shape[0]
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    legs = get_xabc_legs(k, bullish=False, every_x=True)
+
+    d_pos = k.n - 1
+    d = k.close[d_pos]
 
     selected: Optional[dict] = None
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    for x_idx in pivots.index:
-        x = pivots.at[x_idx, "P"]
-
-        if isinstance(x, pd.Series):
-            x = pivots.at[x_idx, "P"].max()
-
-        if x == df.at[x_idx, "Low"]:
-            continue
-
-        pos_after_x = get_next_index(pivots.index, x_idx)
-
-        if pos_after_x >= pivot_len:
-            break
-
-        a_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmin()
-        a = pivots.at[a_idx, "P"]
-
-        if df.loc[x_idx:a_idx, "High"].max() != x:
-            continue
-
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivot_len:
-            break
-
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmin()
-        c = pivots.at[c_idx, "P"]
+    well_formed = legs.pivots_ok & legs.from_b_ok
+    b_retraces, c_retraces = legs.retraces(well_formed)
 
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmax()
-        b = pivots.at[b_idx, "P"]
-
-        if pivots.index.has_duplicates:
-            if isinstance(x, pd.Series):
-                x = pivots.at[x_idx, "P"].max()
-
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].min()
-
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].max()
+    candidates = well_formed & ~(
+        (b_retraces > 0.618) & (b_retraces != 0.886)
+        | (b_retraces < 0.382)
+        | ((c_retraces < 0.382) | (c_retraces > 0.886))
+    )
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].min()
+    for i in np.flatnonzero(candidates):
+        x_pos, a_pos, b_pos, c_pos = (
+            legs.x_pos[i],
+            legs.a_pos[i],
+            legs.b_pos[i],
+            legs.c_pos[i],
+        )
+        x, a, b, c = legs.x[i], legs.a[i], legs.b[i], legs.c[i]
+        dc = legs.dc[i]
 
         xa_diff = x - a
         ab_diff = b - a
         bc_diff = b - c
 
-        lowest_low_xb = df.loc[x_idx:b_idx, "Low"].min()
-        highest_high_ac = df.loc[a_idx:c_idx, "High"].max()
-        lowest_low_from_b = df.loc[b_idx:, "Low"].min()
-
-        if (
-            lowest_low_xb != a
-            or highest_high_ac != b
-            or lowest_low_from_b != c
-            or a == df.at[a_idx, "High"]
-            or b == df.at[b_idx, "Low"]
-            or c == df.at[c_idx, "High"]
-        ):
-            # Check that the pattern is well formed
-            continue
-
-        b_retrace = fib_ser.loc[(fib_ser - (ab_diff / xa_diff)).abs().idxmin()]
-        c_retrace = fib_ser.loc[(fib_ser - (bc_diff / ab_diff)).abs().idxmin()]
+        b_retrace, c_retrace = b_retraces[i], c_retraces[i]
 
         is_perfect_crab = b_retrace == 0.618 and (
             c_retrace == 0.5 or c_retrace == 0.618
@@ -3076,14 +3241,6 @@ def find_bearish_crab(
 
         is_deep_crab = b_retrace == 0.886
 
-        if (
-            b_retrace > 0.618
-            and not is_deep_crab
-            or b_retrace < 0.382
-            or (c_retrace < 0.382 or c_retrace > 0.886)
-        ):
-            continue
-
         xa_618_ext = a + xa_diff * 1.618
 
         bc_3_14_ext = c + bc_diff * 3.14
@@ -3092,29 +3249,27 @@ def find_bearish_crab(
 
         terminal_point = xa_618_ext
 
-        highs_after_c = df.loc[c_idx:, "High"]
+        highs_above_terminal_point = k.high[dc:] > terminal_point
 
-        highs_above_terminal_point = highs_after_c[highs_after_c > terminal_point]
-
-        if highs_above_terminal_point.empty:
-            has_tested = False
-        else:
-            has_tested = True
+        has_tested = bool(highs_above_terminal_point.any())
 
-        closes_above_terminal_point = (df.loc[c_idx:, "Close"] > terminal_point).sum()
+        closes_above_terminal_point = (k.close[dc:] > terminal_point).sum()
 
         if (
             closes_above_terminal_point < 7
             and d > b + (terminal_point - b) * 0.5
             and (
                 has_tested
-                and (d_idx - highs_above_terminal_point.index[0]).days < 7
+                and k.days(dc + highs_above_terminal_point.argmax(), d_pos) < 7
                 or not has_tested
             )
         ):
+            x_idx, a_idx, b_idx, c_idx = map(k.date, (x_pos, a_pos, b_pos, c_pos))
+            d_idx = k.index[d_pos]
+
             selected = dict(
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 start=a_idx,
                 end=d_idx,
                 points={
@@ -3139,7 +3294,6 @@ def find_bearish_crab(
                         "1.618XA": xa_618_ext,
                         "1.618AB": ab_618_ext,
                         "1.27AB": ab_27_ext,
-                        "1.618AB": ab_618_ext,
                     },
                     "1.618XA",
                 )
@@ -3203,122 +3357,79 @@ def find_bearish_crab(
 
 
 def find_bullish_butterfly(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Bullish Butterfly harmonic pattern
     """
     alt_name = "Bull Butterfly"
-    pivot_len = pivots.shape[0]
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    legs = get_xabc_legs(k, bullish=True, every_x=True)
+
+    d_pos = k.n - 1
+    d = k.close[d_pos]
 
     selected: Optional[dict] = None
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    for x_idx in pivots.index:
-        x = pivots.at[x_idx, "P"]
-
-        if isinstance(x, pd.Series):
-            x = pivots.at[x_idx, "P"].min()
-
-        if x == df.at[x_idx, "High"]:
-            continue
-
-        pos_after_x = get_next_index(pivots.index, x_idx)
-
-        if pos_after_x >= pivot_len:
-            break
-
-        a_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmax()
-        a = pivots.at[a_idx, "P"]
-
-        if df.loc[x_idx:a_idx, "Low"].min() != x:
-            continue
-
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivot_len:
-            break
-
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmax()
-        c = pivots.at[c_idx, "P"]
-
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmin()
-        b = pivots.at[b_idx, "P"]
-
-        if pivots.index.has_duplicates:
-            if isinstance(x, pd.Series):
-                x = pivots.at[x_idx, "P"].min()
-
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].max()
+    well_formed = legs.pivots_ok & legs.from_b_ok
+    b_retraces, c_retraces = legs.retraces(well_formed)
 
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].min()
+    candidates = well_formed & ~(
+        (b_retraces != 0.786) | (c_retraces < 0.382) | (c_retraces > 0.886)
+    )
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].max()
+    for i in np.flatnonzero(candidates):
+        x_pos, a_pos, b_pos, c_pos = (
+            legs.x_pos[i],
+            legs.a_pos[i],
+            legs.b_pos[i],
+            legs.c_pos[i],
+        )
+        x, a, b, c = legs.x[i], legs.a[i], legs.b[i], legs.c[i]
+        dc = legs.dc[i]
 
         xa_diff = a - x
         ab_diff = a - b
         bc_diff = c - b
 
-        highest_high_xb = df.loc[x_idx:b_idx, "High"].max()
-        lowest_low_ac = df.loc[a_idx:c_idx, "Low"].min()
-        highest_high_from_b = df.loc[b_idx:, "High"].max()
-
-        if (
-            highest_high_xb != a
-            or lowest_low_ac != b
-            or highest_high_from_b != c
-            or a == df.at[a_idx, "Low"]
-            or b == df.at[b_idx, "High"]
-            or c == df.at[c_idx, "Low"]
-        ):
-            # Check that the pattern is well formed
-            continue
-
-        b_retrace = fib_ser.loc[(fib_ser - (ab_diff / xa_diff)).abs().idxmin()]
-        c_retrace = fib_ser.loc[(fib_ser - (bc_diff / ab_diff)).abs().idxmin()]
+        b_retrace, c_retrace = b_retraces[i], c_retraces[i]
 
         is_perfect = b_retrace == 0.786 and (0.5 <= c_retrace <= 0.886)
 
-        if b_retrace != 0.786 or c_retrace < 0.382 or c_retrace > 0.886:
-            continue
-
         xa_27_ext = a - xa_diff * 1.27
         ab_27_ext = c - ab_diff * 1.27
-
         bc_618_ext = c - bc_diff * 1.618
 
         terminal_point = xa_27_ext
 
-        lows_below_c = df.loc[c_idx:, "Low"]
+        lows_below_terminal_point = k.low[dc:] < terminal_point
 
-        lows_below_terminal_point = lows_below_c.loc[lows_below_c < terminal_point]
-
-        if lows_below_terminal_point.empty:
-            has_tested = False
-        else:
-            has_tested = True
+        has_tested = bool(lows_below_terminal_point.any())
 
-        closes_below_terminal_point = (df.loc[c_idx:, "Close"] < terminal_point).sum()
+        closes_below_terminal_point = (k.close[dc:] < terminal_point).sum()
 
         if (
             closes_below_terminal_point < 7
             and d < b - (b - terminal_point) * 0.5
             and (
                 has_tested
-                and (d_idx - lows_below_terminal_point.index[0]).days < 7
+                and k.days(dc + lows_below_terminal_point.argmax(), d_pos) < 7
                 or not has_tested
             )
         ):
+            x_idx, a_idx, b_idx, c_idx = map(k.date, (x_pos, a_pos, b_pos, c_pos))
+            d_idx = k.index[d_pos]
+
             selected = dict(
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 start=a_idx,
                 end=d_idx,
                 points={
@@ -3381,122 +3492,80 @@ def find_bullish_butterfly(
 
 
 def find_bearish_butterfly(
-    sym: str, df: pd.DataFrame, pivots: pd.DataFrame, config
+    sym: str,
+    df: pd.DataFrame,
+    pivots: pd.DataFrame,
+    config,
+    arrays: Optional[ScanArrays] = None,
 ) -> Optional[dict]:
     """
     Bearish Butterfly harmonic pattern
     """
     alt_name = "Bear Butterfly"
-    pivot_len = pivots.shape[0]
 
-    d_idx = df.index[-1]
-    d = df.at[d_idx, "Close"]
+    k = ScanArrays(df, pivots) if arrays is None else arrays
+    legs = get_xabc_legs(k, bullish=False, every_x=True)
+
+    d_pos = k.n - 1
+    d = k.close[d_pos]
 
     selected: Optional[dict] = None
 
     assert isinstance(pivots.index, pd.DatetimeIndex)
 
-    for x_idx in pivots.index:
-        x = pivots.at[x_idx, "P"]
-
-        if isinstance(x, pd.Series):
-            x = pivots.at[x_idx, "P"].max()
-
-        if x == df.at[x_idx, "Low"]:
-            continue
-
-        pos_after_x = get_next_index(pivots.index, x_idx)
-
-        if pos_after_x >= pivot_len:
-            break
-
-        a_idx = pivots.loc[pivots.index[pos_after_x] :, "P"].idxmin()
-        a = pivots.at[a_idx, "P"]
-
-        if df.loc[x_idx:a_idx, "High"].max() != x:
-            continue
-
-        pos_after_a = get_next_index(pivots.index, a_idx)
-
-        if pos_after_a >= pivot_len:
-            break
-
-        c_idx = pivots.loc[pivots.index[pos_after_a] :, "P"].idxmin()
-        c = pivots.at[c_idx, "P"]
+    well_formed = legs.pivots_ok & legs.from_b_ok
+    b_retraces, c_retraces = legs.retraces(well_formed)
 
-        b_idx = pivots.loc[a_idx:c_idx, "P"].idxmax()
-        b = pivots.at[b_idx, "P"]
-
-        if pivots.index.has_duplicates:
-            if isinstance(x, pd.Series):
-                x = pivots.at[x_idx, "P"].max()
-
-            if isinstance(a, pd.Series):
-                a = pivots.at[a_idx, "P"].min()
-
-            if isinstance(b, pd.Series):
-                b = pivots.at[b_idx, "P"].max()
+    candidates = well_formed & ~(
+        (b_retraces != 0.786) | (c_retraces < 0.382) | (c_retraces > 0.886)
+    )
 
-            if isinstance(c, pd.Series):
-                c = pivots.at[c_idx, "P"].min()
+    for i in np.flatnonzero(candidates):
+        x_pos, a_pos, b_pos, c_pos = (
+            legs.x_pos[i],
+            legs.a_pos[i],
+            legs.b_pos[i],
+            legs.c_pos[i],
+        )
+        x, a, b, c = legs.x[i], legs.a[i], legs.b[i], legs.c[i]
+        dc = legs.dc[i]
 
         xa_diff = x - a
         ab_diff = b - a
         bc_diff = b - c
 
-        lowest_low_xb = df.loc[x_idx:b_idx, "Low"].min()
-        highest_high_ac = df.loc[a_idx:c_idx, "High"].max()
-        lowest_low_from_b = df.loc[b_idx:, "Low"].min()
-
-        if (
-            lowest_low_xb != a
-            or highest_high_ac != b
-            or lowest_low_from_b != c
-            or a == df.at[a_idx, "High"]
-            or b == df.at[b_idx, "Low"]
-            or c == df.at[c_idx, "High"]
-        ):
-            # Check that the pattern is well formed
-            continue
-
-        b_retrace = fib_ser.loc[(fib_ser - (ab_diff / xa_diff)).abs().idxmin()]
-        c_retrace = fib_ser.loc[(fib_ser - (bc_diff / ab_diff)).abs().idxmin()]
+        b_retrace, c_retrace = b_retraces[i], c_retraces[i]
 
         is_perfect = b_retrace == 0.786 and (0.5 <= c_retrace <= 0.886)
 
-        if b_retrace != 0.786 or c_retrace < 0.382 or c_retrace > 0.886:
-            continue
-
         xa_27_ext = a + xa_diff * 1.27
         ab_27_ext = c + ab_diff * 1.27
-
         bc_618_ext = c + bc_diff * 1.618
 
         terminal_point = xa_27_ext
 
-        highs_after_c = df.loc[c_idx:, "Low"]
-
-        highs_above_terminal_point = highs_after_c.loc[highs_after_c > terminal_point]
+        # Tested against the lows after C, as in the original implementation
+        highs_above_terminal_point = k.low[dc:] > terminal_point
 
-        if highs_above_terminal_point.empty:
-            has_tested = False
-        else:
-            has_tested = True
+        has_tested = bool(highs_above_terminal_point.any())
 
-        closes_above_terminal_point = (df.loc[c_idx:, "Close"] > terminal_point).sum()
+        closes_above_terminal_point = (k.close[dc:] > terminal_point).sum()
 
         if (
             closes_above_terminal_point < 7
             and d > b + (terminal_point - b) * 0.5
             and (
                 has_tested
-                and (d_idx - highs_above_terminal_point.index[0]).days < 7
+                and k.days(dc + highs_above_terminal_point.argmax(), d_pos) < 7
                 or not has_tested
             )
         ):
+            x_idx, a_idx, b_idx, c_idx = map(k.date, (x_pos, a_pos, b_pos, c_pos))
+            d_idx = k.index[d_pos]
+
             selected = dict(
-                df_start=df.index[0],
-                df_end=df.index[-1],
+                df_start=k.index[0],
+                df_end=k.index[-1],
                 start=a_idx,
                 end=d_idx,
                 points={
@@ -0,0 +1,69 @@
+"""
+Benchmark utils.get_max_min against the rolling-window reference.
+
+Usage: python tests/bench_get_max_min.py [--repeat 3]
+
+Series lengths: 10 years of daily bars and intraday histories
+(1 year of 5 minute bars, ~5 years of 15 minute bars).
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from context import utils
+
+SIZES = {
+    "daily 10y": (2_520, "B"),
+    "5min 1y": (18_750, "5min"),
+    "15min 5y": (31_250, "15min"),
+}
+
+
+def make_ohlcv(n: int, freq: str, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+
+    return pd.DataFrame(
+        dict(
+            Open=close,
+            High=np.round(close + spread, 2),
+            Low=np.round(close - spread, 2),
+            Close=close,
+            Volume=rng.integers(1_000, 10_000, n),
+        ),
+        index=pd.date_range("2015-01-01", periods=n, freq=freq),
+    )
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark get_max_min")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'series':<12} {'bars':>8} {'rolling (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+
+    for name, (n, freq) in SIZES.items():
+        df = make_ohlcv(n, freq)
+
+        ref = best_of(lambda: utils._get_max_min_rolling(df), 1)
+        new = best_of(lambda: utils.get_max_min(df), args.repeat)
+
+        pd.testing.assert_frame_equal(
+            utils.get_max_min(df), utils._get_max_min_rolling(df)
+        )
+
+        print(f"{name:<12} {n:>8} {ref:>12.3f} {new:>15.4f} {ref / new:>7.0f}x")
@@ -0,0 +1,319 @@
+"""
+Scaling benchmark of the pattern scan over a synthetic universe.
+
+Writes `--symbols` random walk OHLCV files (detector_corpus.make_ohlc) and
+scans them with every detector, as the scan workers do, timing each stage:
+
+- load: EODFileLoader.get and clean_df
+- pivots: pivot masks, the pivots of each pivot type and their detector
+  arrays (kernel.ScanArrays)
+- detect: every detector, also reported separately
+- serialize: make_serializable and JSON encoding of the results
+
+Stage and detector times are CPU seconds (time.process_time) summed over
+workers, so they exclude I/O waits and time lost to oversubscribed
+workers. Wall time is that of the whole scan. Peak memory is the peak
+resident size of the largest process (not reported on Windows).
+
+Usage:
+
+    py bench_universe.py --symbols 2000 --workers 8
+
+    # One shard per process or host, then merge their reports
+    py bench_universe.py --symbols 2000 --shard 1/4 --out shard1.json
+    py bench_universe.py --merge shard*.json
+
+    # Several pivot settings, from one pivot sweep (robustness analysis)
+    py bench_universe.py --symbols 2000 --pivot-bars 3,3 6,6 9,9
+
+Symbols are split with scanner.shard_symbols, so shards 1/n to n/n scan
+the universe once. Each shard only writes the files of its symbols. Files
+are kept in `--data` (a temporary folder by default) and reused.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from context import scanner, utils
+from detector_corpus import make_ohlc
+from kernel import ScanArrays
+from loaders.EODFileLoader import EODFileLoader
+
+STAGES = ("load", "pivots", "detect", "serialize")
+
+# Per worker process state, set once by init_worker
+_worker: dict = {}
+
+
+def universe(n: int) -> List[str]:
+    return [f"SYN{i:05d}" for i in range(n)]
+
+
+def write_universe(folder: Path, sym_list: Sequence[str], bars: int):
+    """Write the csv of each symbol, if missing. The seed is the symbol number."""
+    folder.mkdir(parents=True, exist_ok=True)
+
+    for sym in sym_list:
+        path = folder / f"{sym.lower()}.csv"
+
+        if not path.exists():
+            make_ohlc(int(sym[3:]), bars).to_csv(path, index_label="Date")
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ModuleNotFoundError:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # bytes on macOS, kilobytes elsewhere
+    return rss / 1024 ** (2 if sys.platform == "darwin" else 1)
+
+
+def init_worker(data_path: Path, period: int, bars: Sequence[Tuple[int, int]]):
+    config = dict(DATA_PATH=str(data_path))
+
+    key_fns = tuple(
+        (key, scanner.resolve_fns_from_key(key, scanner.DETECTORS, config))
+        for key in scanner.DETECTORS
+    )
+
+    _worker.update(
+        loader=EODFileLoader(config, period=period),
+        config=config,
+        key_fns=key_fns,
+        pivot_types=sorted({scanner.get_pivot_type(key) for key, _ in key_fns}),
+        bars=bars,
+    )
+
+
+def scan_chunk(sym_list: Sequence[str]) -> dict:
+    """Scan symbols in a worker set up by init_worker and time each stage"""
+    loader = _worker["loader"]
+    config = _worker["config"]
+
+    stages = dict.fromkeys(STAGES, 0.0)
+    detectors = {key: 0.0 for key, _ in _worker["key_fns"]}
+    counts = {key: 0 for key, _ in _worker["key_fns"]}
+    patterns = []
+    scanned = 0
+
+    for sym in sym_list:
+        start = time.process_time()
+
+        df = loader.get(sym)
+
+        if df is None or df.empty:
+            continue
+
+        df = scanner.clean_df(df)
+        scanned += 1
+
+        pivots_start = time.process_time()
+
+        masks = utils.get_pivot_masks_multi(df, _worker["bars"])
+
+        pivots = {}
+
+        for setting in _worker["bars"]:
+            for pivot_type in _worker["pivot_types"]:
+                frame = utils.pivots_from_masks(df, *masks[setting], pivot_type=pivot_type)
+                pivots[setting, pivot_type] = frame, ScanArrays(df, frame)
+
+        detect_start = time.process_time()
+        found = []
+
+        for setting in _worker["bars"]:
+            for key, fns in _worker["key_fns"]:
+                key_start = time.process_time()
+                key_pivots, arrays = pivots[setting, scanner.get_pivot_type(key)]
+
+                if len(key_pivots):
+                    for fn in fns:
+                        result = fn(sym, df, key_pivots, config, arrays)
+
+                        if result:
+                            result["bars"] = list(setting)
+                            found.append(result)
+                            counts[key] += 1
+
+                detectors[key] += time.process_time() - key_start
+
+        serialize_start = time.process_time()
+
+        found = [utils.make_serializable(result) for result in found]
+        json.dumps(found)
+
+        end = time.process_time()
+
+        stages["load"] += pivots_start - start
+        stages["pivots"] += detect_start - pivots_start
+        stages["detect"] += serialize_start - detect_start
+        stages["serialize"] += end - serialize_start
+
+        patterns.extend(found)
+
+    return dict(
+        scanned=scanned,
+        stages=stages,
+        detectors=detectors,
+        counts=counts,
+        patterns=patterns,
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+def merge(reports: Sequence[dict]) -> dict:
+    """Add up chunk or shard reports. Wall time and memory are the largest."""
+    merged = dict(reports[0])
+
+    for field in ("stages", "detectors", "counts"):
+        merged[field] = {
+            key: sum(report[field][key] for report in reports)
+            for key in reports[0][field]
+        }
+
+    merged["scanned"] = sum(report["scanned"] for report in reports)
+    merged["patterns"] = sorted(
+        (p for report in reports for p in report["patterns"]),
+        key=lambda p: (p["sym"], p["pattern"], p["start"], p["bars"]),
+    )
+
+    rss = [report["peak_rss_mb"] for report in reports if report["peak_rss_mb"]]
+    merged["peak_rss_mb"] = max(rss) if rss else None
+
+    if "wall" in merged:
+        merged["wall"] = max(report["wall"] for report in reports)
+        merged["shards"] = sorted({s for report in reports for s in report["shards"]})
+
+    return merged
+
+
+def run(args: argparse.Namespace) -> dict:
+    sym_list = universe(args.symbols)
+
+    if args.shard:
+        sym_list = list(scanner.shard_symbols(sym_list, *args.shard))
+
+    data_path = args.data / f"bars_{args.bars}"
+
+    start = time.perf_counter()
+    write_universe(data_path, sym_list, args.bars)
+    print(f"Universe ready in {time.perf_counter() - start:.1f}s: {data_path}")
+
+    initargs = (data_path, args.period, args.pivot_bars or [(args.left, args.right)])
+    chunks = scanner.chunk_symbols(sym_list, args.workers)
+
+    start = time.perf_counter()
+
+    if args.workers == 1 or not chunks:
+        init_worker(*initargs)
+        reports = [scan_chunk(chunk) for chunk in chunks or [()]]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=args.workers, initializer=init_worker, initargs=initargs
+        ) as executor:
+            reports = list(executor.map(scan_chunk, chunks))
+
+    report = merge(reports)
+
+    report.update(
+        shards=[f"{args.shard[0]}/{args.shard[1]}" if args.shard else "1/1"],
+        symbols=args.symbols,
+        bars=args.bars,
+        period=args.period,
+        pivot_bars=args.pivot_bars or [(args.left, args.right)],
+        workers=args.workers,
+        wall=time.perf_counter() - start,
+    )
+
+    return report
+
+
+def check_shards(report: dict):
+    counts = {int(shard.split("/")[1]) for shard in report["shards"]}
+    expected = {f"{i}/{n}" for n in counts for i in range(1, n + 1)}
+
+    if len(counts) != 1 or set(report["shards"]) != expected:
+        print(f"Warning: incomplete or mixed shards {report['shards']}")
+
+
+def print_report(report: dict):
+    scanned = report["scanned"]
+
+    def row(name: str, seconds: float) -> str:
+        ms = seconds / scanned * 1000 if scanned else 0
+        rate = scanned / seconds if seconds else 0
+        return f"{name:<12} {seconds:>10.2f} {ms:>10.3f} {rate:>12.0f}"
+
+    print(
+        f"\nScanned {scanned} of {report['symbols']} symbols, shards "
+        f"{', '.join(report['shards'])}, {report['bars']} bars, window "
+        f"{report['period']}, {report['workers']} workers per shard, pivot "
+        f"bars {' '.join(f'{left},{right}' for left, right in report['pivot_bars'])}"
+    )
+    print(
+        f"Wall time {report['wall']:.2f}s, "
+        f"{scanned / report['wall'] if report['wall'] else 0:.0f} symbols/s, "
+        f"{len(report['patterns'])} patterns\n"
+    )
+
+    print(f"{'stage':<12} {'cpu (s)':>10} {'ms/symbol':>10} {'symbols/s':>12}")
+
+    for stage, seconds in report["stages"].items():
+        print(row(stage, seconds))
+
+    print(f"{'total':<12} {sum(report['stages'].values()):>10.2f}")
+
+    print(f"\n{'detector':<12} {'cpu (s)':>10} {'ms/symbol':>10} {'symbols/s':>12} {'patterns':>9}")
+
+    for key, seconds in sorted(report["detectors"].items(), key=lambda x: -x[1]):
+        print(f"{row(key, seconds)} {report['counts'][key]:>9}")
+
+    if report["peak_rss_mb"]:
+        print(f"\nPeak memory: {report['peak_rss_mb']:.0f} MB per process")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pattern scan")
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--bars", type=int, default=600, help="Bars per symbol file")
+    parser.add_argument("--period", type=int, default=160, help="Bars scanned")
+    parser.add_argument("-l", "--left", type=int, default=6)
+    parser.add_argument("-r", "--right", type=int, default=6)
+    parser.add_argument(
+        "--pivot-bars",
+        type=scanner.parse_bars,
+        nargs="+",
+        metavar="left,right",
+        help="Pivot settings scanned together. Overrides --left and --right",
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--shard", type=scanner.parse_shard, metavar="i/n")
+    parser.add_argument("--data", type=Path, help="Folder of the universe files")
+    parser.add_argument("--out", type=Path, help="Write the report, with all patterns, to a json file")
+    parser.add_argument("--merge", type=Path, nargs="+", metavar="json", help="Merge shard reports")
+    args = parser.parse_args()
+
+    if args.merge:
+        report = merge([json.loads(path.read_bytes()) for path in args.merge])
+        check_shards(report)
+    elif args.data:
+        report = run(args)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            args.data = Path(tmp)
+            report = run(args)
+
+    print_report(report)
+
+    if args.out:
+        args.out.write_text(json.dumps(report))
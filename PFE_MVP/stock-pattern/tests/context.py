@@ -3,4 +3,8 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
 
+import kernel
 import utils
+import scanner
+import backtester
+import outcomes
@@ -0,0 +1,176 @@
+"""
+Deterministic synthetic corpus for the find_* pattern detectors.
+
+Every case is a (symbol, window, bars) combination over seeded random walks,
+scanned with the pivot type used by scanner.py (and `both` for the one sided
+detectors). The recorded output of every detector is the golden reference
+used by test_detectors_golden.py.
+
+Regenerate (only when a detector is meant to change its output):
+
+    py detector_corpus.py --write
+"""
+
+import gzip
+import json
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from context import utils
+
+GOLDEN_PATH = Path(__file__).parent / "golden" / "detectors.json.gz"
+
+DETECTORS = dict(
+    vcpu=utils.find_bullish_vcp,
+    vcpd=utils.find_bearish_vcp,
+    dbot=utils.find_double_bottom,
+    dtop=utils.find_double_top,
+    hnsd=utils.find_hns,
+    hnsu=utils.find_reverse_hns,
+    trng=utils.find_triangles,
+    uptl=utils.find_uptrend_line,
+    dntl=utils.find_downtrend_line,
+    flagu=utils.find_bullish_flag,
+    flagd=utils.find_bearish_flag,
+    abcdu=utils.find_bullish_abcd,
+    abcdd=utils.find_bearish_abcd,
+    batu=utils.find_bullish_bat,
+    batd=utils.find_bearish_bat,
+    gartu=utils.find_bullish_gartley,
+    gartd=utils.find_bearish_gartley,
+    crabu=utils.find_bullish_crab,
+    crabd=utils.find_bearish_crab,
+    bflyu=utils.find_bullish_butterfly,
+    bflyd=utils.find_bearish_butterfly,
+)
+
+PIVOT_TYPES = dict(uptl="low", flagu="low", dntl="high", flagd="high")
+
+N_SYMBOLS = 12
+N_BARS = 600
+WINDOWS = (160, 400)
+CUTOFFS = range(240, N_BARS + 1, 40)
+BARS = ((6, 6), (3, 3), (2, 2))
+
+
+def make_ohlc(seed: int, n: int = N_BARS) -> pd.DataFrame:
+    """Random walk OHLCV with regime changes, tick rounding and outside bars,
+    so that pivots include ties and bars that are both a high and a low."""
+    rng = np.random.default_rng(seed)
+
+    vol = rng.choice((0.008, 0.015, 0.03)) * rng.uniform(0.5, 1.5, n)
+    drift = np.repeat(rng.normal(0, 0.004, n // 50 + 1), 50)[:n]
+    close = 100 * np.exp(np.cumsum(drift + rng.normal(0, 1, n) * vol))
+
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.003, n))
+    spread = np.abs(rng.normal(0, 1, (2, n))) * vol * close
+
+    # occasional outside bars
+    wide = rng.random(n) < 0.08
+    spread[:, wide] *= 4
+
+    high = np.maximum(open_, close) + spread[0]
+    low = np.minimum(open_, close) - spread[1]
+
+    if seed % 2:
+        tick = 0.05 if seed % 4 == 1 else 0.5
+        open_, high, low, close = (
+            np.round(x / tick) * tick for x in (open_, high, low, close)
+        )
+
+    return pd.DataFrame(
+        dict(
+            Open=open_,
+            High=high,
+            Low=low,
+            Close=close,
+            Volume=rng.integers(10_000, 1_000_000, n).astype(float),
+        ),
+        index=pd.bdate_range("2015-01-01", periods=n, name="Date"),
+    )
+
+
+def iter_cases():
+    """Yield (case_id, key, sym, df, pivots)"""
+    for seed in range(N_SYMBOLS):
+        sym = f"SYN{seed}"
+        full = make_ohlc(seed)
+
+        for end in CUTOFFS:
+            for window in WINDOWS:
+                df = full.iloc[max(0, end - window) : end]
+
+                for left, right in BARS:
+                    pivot_cache = {}
+
+                    for key in DETECTORS:
+                        pivot_types = [PIVOT_TYPES.get(key, "both")]
+
+                        if key in PIVOT_TYPES:
+                            pivot_types.append("both")
+
+                        for pivot_type in pivot_types:
+                            if pivot_type not in pivot_cache:
+                                pivot_cache[pivot_type] = utils.get_max_min(
+                                    df, left, right, pivot_type=pivot_type
+                                )
+
+                            pivots = pivot_cache[pivot_type]
+
+                            if not len(pivots):
+                                continue
+
+                            case_id = f"{sym}|{end}|{window}|{left}-{right}|{key}|{pivot_type}"
+                            yield case_id, key, sym, df, pivots
+
+
+def run_case(key: str, sym: str, df: pd.DataFrame, pivots: pd.DataFrame, arrays=None):
+    """Serialized detector output, or the name of the raised exception"""
+    try:
+        result = DETECTORS[key](sym, df, pivots, {}, arrays)
+    except Exception as e:
+        return {"error": type(e).__name__}
+
+    return json.loads(json.dumps(utils.make_serializable(result)))
+
+
+def build_corpus() -> dict:
+    return {
+        case_id: run_case(key, sym, df, pivots)
+        for case_id, key, sym, df, pivots in iter_cases()
+    }
+
+
+def load_golden() -> dict:
+    return json.loads(gzip.decompress(GOLDEN_PATH.read_bytes()))
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Detector golden corpus")
+    parser.add_argument("--write", action="store_true", help="Rewrite the golden file")
+    args = parser.parse_args()
+
+    corpus = build_corpus()
+
+    found = {}
+    for case_id, out in corpus.items():
+        key = case_id.split("|")[4]
+        label = "error" if out and "error" in out else ("hit" if out else "none")
+        found.setdefault(key, {}).setdefault(label, 0)
+        found[key][label] += 1
+
+    for key, counts in found.items():
+        print(f"{key:<6} {counts}")
+
+    if args.write:
+        GOLDEN_PATH.parent.mkdir(exist_ok=True)
+        GOLDEN_PATH.write_bytes(
+            gzip.compress(json.dumps(corpus, sort_keys=True).encode(), mtime=0)
+        )
+        print(f"Wrote {len(corpus)} cases to {GOLDEN_PATH}")
+    elif not GOLDEN_PATH.exists():
+        sys.exit("Golden file missing. Run with --write")
@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from context import backtester, utils
+from detector_corpus import make_ohlc
+
+
+class FakeLoader:
+    tf = "daily"
+
+    def __init__(self, df):
+        self.df = df
+
+    def get(self, sym):
+        return self.df
+
+
+class TestSlidingPivots(unittest.TestCase):
+
+    def test_windows_match_get_max_min(self):
+        for seed in (0, 1):
+            df = make_ohlc(seed, 400)
+
+            for left, right in ((6, 6), (3, 3), (2, 5)):
+                pivots = backtester.SlidingPivots(df, left, right)
+
+                for stop in range(1, 401, 29):
+                    for start in (0, max(0, stop - 160), max(0, stop - 30)):
+                        window = df.iloc[start:stop]
+
+                        for pivot_type in ("both", "high", "low"):
+                            expected = utils.get_max_min(window, left, right, pivot_type)
+                            result = pivots.get(pivot_type, start, stop)
+
+                            self.assertTrue(result.index.equals(expected.index))
+                            np.testing.assert_array_equal(
+                                result.to_numpy(), expected.to_numpy()
+                            )
+
+
+class TestBacktestSymbol(unittest.TestCase):
+
+    def setUp(self):
+        self.df = make_ohlc(1, 500)
+        self.keys = tuple(backtester.DETECTORS)
+
+    def test_matches_per_bar_scan(self):
+        results = backtester.backtest_symbol(
+            "SYN1",
+            FakeLoader(self.df),
+            self.df.index[-1],
+            scan_period=30,
+            keys=self.keys,
+            look_ahead_period=60,
+            look_back_period=160,
+        )
+
+        # One get_max_min and detector call per bar, as the scanner would
+        expected = []
+        seen = set()
+
+        for pos in range(500 - 1 - 60 - 30, 500 - 60):
+            window = self.df.iloc[max(0, pos + 1 - 160) : pos + 1]
+
+            for key in self.keys:
+                pivots = utils.get_max_min(
+                    window, pivot_type=backtester.get_pivot_type(key)
+                )
+                result = backtester.DETECTORS[key]("SYN1", window, pivots, {})
+
+                if result and (key, result["start"]) not in seen:
+                    seen.add((key, result["start"]))
+                    expected.append(utils.make_serializable(result))
+
+        self.assertTrue(expected)
+
+        def sort_key(dct):
+            return dct["pattern"], dct["start"]
+
+        for result in results:
+            outcome = result.pop("outcome")
+            pos = self.df.index.get_loc(pd.Timestamp(outcome["date"]))
+            close = self.df["Close"].iloc[pos]
+
+            self.assertEqual(result["df_end"], outcome["date"])
+            self.assertAlmostEqual(
+                outcome["returns"]["5"], self.df["Close"].iloc[pos + 5] / close - 1
+            )
+
+        self.assertEqual(sorted(results, key=sort_key), sorted(expected, key=sort_key))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from context import scanner
+from detector_corpus import make_ohlc
+
+
+class TestCandleExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "SYN_daily.json"
+        self.df = make_ohlc(1, 200)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertCandlesEqual(self, candles, df):
+        self.assertEqual(candles["t"].tolist(), [ts.isoformat() for ts in df.index])
+
+        for col in ("Open", "High", "Low", "Close", "Volume"):
+            np.testing.assert_array_equal(candles[col.lower()], df[col])
+
+    def test_round_trip(self):
+        scanner.export_candles_json("syn", self.df, "daily", self.path)
+
+        payload = json.loads(self.path.read_bytes())
+
+        self.assertEqual(payload["sym"], "SYN")
+        self.assertEqual(payload["df_range"]["rows"], 200)
+        self.assertCandlesEqual(scanner.load_candles_json(self.path), self.df)
+
+    def test_skip_unchanged(self):
+        for indent in (None, 2):
+            self.path.unlink(missing_ok=True)
+
+            scanner.export_candles_json("SYN", self.df, "daily", self.path, indent)
+            saved_at = json.loads(self.path.read_bytes())["meta"]["saved_at"]
+
+            scanner.export_candles_json("SYN", self.df, "daily", self.path, indent)
+            self.assertEqual(
+                json.loads(self.path.read_bytes())["meta"]["saved_at"], saved_at
+            )
+
+            # Changed data is written
+            df = make_ohlc(1, 201)
+            scanner.export_candles_json("SYN", df, "daily", self.path, indent)
+            self.assertCandlesEqual(scanner.load_candles_json(self.path), df)
+
+    def test_load_row_format(self):
+        rows = [
+            dict(t=ts.isoformat(), open=o, high=h, low=lo, close=c, volume=v)
+            for ts, (o, h, lo, c, v) in zip(self.df.index, self.df.to_numpy())
+        ]
+        self.path.write_text(json.dumps(dict(sym="SYN", candles=rows), indent=2))
+
+        self.assertCandlesEqual(scanner.load_candles_json(self.path), self.df)
+
+        # Replaced by the columnar format on the next export
+        scanner.export_candles_json("SYN", self.df, "daily", self.path)
+        self.assertIn("columns", json.loads(self.path.read_bytes()))
+
+
+if __name__ == "__main__":
+    unittest.main()
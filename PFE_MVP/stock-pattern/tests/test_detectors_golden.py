@@ -0,0 +1,67 @@
+import unittest
+
+import detector_corpus
+from context import utils
+from kernel import ScanArrays
+
+
+class Test_detectors_golden(unittest.TestCase):
+    """Every find_* detector must reproduce the recorded corpus output"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.golden = detector_corpus.load_golden()
+
+    def test_detectors(self):
+        seen = set()
+
+        for case_id, key, sym, df, pivots in detector_corpus.iter_cases():
+            seen.add(case_id)
+
+            with self.subTest(case_id=case_id):
+                self.assertEqual(
+                    detector_corpus.run_case(key, sym, df, pivots),
+                    self.golden.get(case_id),
+                )
+
+        self.assertEqual(seen, set(self.golden))
+
+    def test_shared_arrays(self):
+        # As scanner.run_detectors: one ScanArrays per df and pivots
+        last = None
+
+        for case_id, key, sym, df, pivots in detector_corpus.iter_cases():
+            if last is None or last[0] is not df or last[1] is not pivots:
+                last = (df, pivots, ScanArrays(df, pivots))
+
+            with self.subTest(case_id=case_id):
+                self.assertEqual(
+                    detector_corpus.run_case(key, sym, df, pivots, last[2]),
+                    self.golden.get(case_id),
+                )
+
+    def test_frame_edited_in_place(self):
+        found = 0
+
+        for key in detector_corpus.DETECTORS:
+            df = detector_corpus.make_ohlc(3, 400)
+            pivots = utils.get_max_min(df, 3, 3, detector_corpus.PIVOT_TYPES.get(key, "both"))
+
+            detector_corpus.run_case(key, "SYN", df, pivots)
+
+            # Same objects and lengths, new values. Scaling keeps the pivot bars.
+            df.loc[:, ["Open", "High", "Low", "Close"]] *= 1.3
+            pivots.loc[:, "P"] *= 1.3
+
+            with self.subTest(key=key):
+                result = detector_corpus.run_case(key, "SYN", df, pivots)
+                found += bool(result)
+
+                self.assertEqual(
+                    result, detector_corpus.run_case(key, "SYN", df.copy(), pivots.copy())
+                )
+
+        self.assertTrue(found)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import unittest
 
+import numpy as np
 import pandas as pd
 from context import utils
 
@@ -49,6 +50,79 @@ class TestGetMaxMin(unittest.TestCase):
         self.assertEqual(result.at[result.index[0], "P"], 3)
         self.assertEqual(result.at[result.index[1], "P"], 2)
 
+    def test_matches_rolling_reference(self):
+        # Rounded prices create ties; NaN gaps exercise idxmax/idxmin skipna
+        rng = np.random.default_rng(42)
+
+        for trial in range(60):
+            n = int(rng.integers(5, 120))
+            high = np.round(rng.random(n) * 5, 1)
+            low = high - np.round(rng.random(n) * 2, 1)
+
+            if trial % 3 == 0:
+                high[rng.random(n) < 0.1] = np.nan
+                low[rng.random(n) < 0.1] = np.nan
+
+            df = pd.DataFrame(
+                dict(High=high, Low=low, Volume=rng.integers(1, 100, n)),
+                index=pd.date_range("2023-01-01", periods=n, freq="h"),
+            )
+
+            for bars in ((1, 1), (3, 2), (6, 6), (2, 5)):
+                for pivot_type in ("both", "high", "low"):
+                    with self.subTest(trial=trial, bars=bars, pivot_type=pivot_type):
+                        pd.testing.assert_frame_equal(
+                            utils.get_max_min(df, *bars, pivot_type=pivot_type),
+                            utils._get_max_min_rolling(df, *bars, pivot_type=pivot_type),
+                        )
+
+    def test_multi_matches_single(self):
+        rng = np.random.default_rng(7)
+        bars = [(left, right) for left in (1, 2, 3, 6, 9) for right in (1, 2, 4, 6, 10)]
+
+        for trial in range(40):
+            n = int(rng.integers(3, 150))
+            high = np.round(rng.random(n) * 5, 1)
+            low = high - np.round(rng.random(n) * 2, 1)
+
+            if trial % 3 == 0:
+                high[rng.random(n) < 0.1] = np.nan
+                low[rng.random(n) < 0.1] = np.nan
+
+            df = pd.DataFrame(
+                dict(High=high, Low=low, Volume=rng.integers(1, 100, n)),
+                index=pd.date_range("2023-01-01", periods=n, freq="h"),
+            )
+
+            masks = utils.get_pivot_masks_multi(df, bars)
+            pivots = utils.get_max_min_multi(df, bars, pivot_type="high")
+
+            self.assertEqual(list(masks), bars)
+
+            for setting in bars:
+                with self.subTest(trial=trial, bars=setting):
+                    expected = utils.get_pivot_masks(df, *setting)
+
+                    np.testing.assert_array_equal(masks[setting][0], expected[0])
+                    np.testing.assert_array_equal(masks[setting][1], expected[1])
+
+                    pd.testing.assert_frame_equal(
+                        pivots[setting], utils.get_max_min(df, *setting, "high")
+                    )
+
+        # Empty frame, as get_pivot_masks
+        empty = self.df.iloc[:0]
+
+        for setting, masks in utils.get_pivot_masks_multi(empty, bars).items():
+            expected = utils.get_pivot_masks(empty, *setting)
+
+            self.assertEqual(masks[0].dtype, bool)
+            np.testing.assert_array_equal(masks[0], expected[0])
+            np.testing.assert_array_equal(masks[1], expected[1])
+
+        with self.assertRaises(ValueError):
+            utils.get_pivot_masks_multi(self.df, [(6, 6), (3, 0)])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from context import scanner, utils
+from detector_corpus import make_ohlc
+
+
+class FakeLoader:
+    tf = "daily"
+
+    def __init__(self, df):
+        self.df = df
+
+    def get(self, sym):
+        return self.df
+
+
+class TestUpdatePivotMasks(unittest.TestCase):
+
+    def setUp(self):
+        self.full = make_ohlc(3, 400)
+
+    def assertMasksEqual(self, masks, expected):
+        self.assertIsNotNone(masks)
+        np.testing.assert_array_equal(masks[0], expected[0])
+        np.testing.assert_array_equal(masks[1], expected[1])
+
+    def test_appended_bars(self):
+        for left, right in ((6, 6), (3, 3), (2, 5)):
+            prev = self.full.iloc[100:260]
+            prev_masks = utils.get_pivot_masks(prev, left, right)
+
+            for start, end in ((100, 261), (105, 265), (140, 300), (100, 260)):
+                df = self.full.iloc[start:end]
+
+                self.assertMasksEqual(
+                    utils.update_pivot_masks(prev, prev_masks, df, left, right),
+                    utils.get_pivot_masks(df, left, right),
+                )
+
+    def test_changed_overlap(self):
+        prev = self.full.iloc[100:260]
+        prev_masks = utils.get_pivot_masks(prev, 6, 6)
+
+        df = self.full.iloc[100:265].copy()
+        df.iloc[-10, df.columns.get_loc("High")] += 1
+
+        self.assertIsNone(utils.update_pivot_masks(prev, prev_masks, df, 6, 6))
+
+        # No overlap at all
+        df = self.full.iloc[300:]
+        self.assertIsNone(utils.update_pivot_masks(prev, prev_masks, df, 6, 6))
+
+
+class TestScanCache(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = 0
+
+        def find_count(sym, df, pivots, config):
+            self.calls += 1
+            return dict(sym=sym, end=df.index[-1], pivots=len(pivots))
+
+        self.key_fns = (("dbot", (find_count,)),)
+        self.logger = logging.getLogger(__name__)
+        self.full = make_ohlc(5, 300)
+
+    def scan(self, df, cache_path):
+        return scanner.scan_symbol(
+            "SYN5", self.key_fns, FakeLoader(df), self.logger, {}, 6, 6,
+            cache_path=cache_path,
+        )
+
+    def test_unchanged_data_is_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = Path(tmp) / "SYN5_daily.pkl"
+
+            first = self.scan(self.full.iloc[:200], cache_path)
+            self.assertEqual(self.calls, 1)
+
+            self.assertEqual(self.scan(self.full.iloc[:200], cache_path), first)
+            self.assertEqual(self.calls, 1)
+
+    def test_appended_data_matches_full_scan(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = Path(tmp) / "SYN5_daily.pkl"
+
+            self.scan(self.full.iloc[:200], cache_path)
+            result = self.scan(self.full.iloc[20:230], cache_path)
+
+            self.assertEqual(self.calls, 2)
+            self.assertEqual(result, self.scan(self.full.iloc[20:230], None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+
+import numpy as np
 from context import utils
 
 
@@ -53,6 +55,32 @@ class test_is_triangle(unittest.TestCase):
 
         self.assertEqual(trng, None)
 
+    def test_may_be_triangle(self):
+        # Small integer prices, so ties and equal lines are frequent
+        rng = np.random.default_rng(0)
+        a, b, c, d, e, f = rng.integers(0, 8, (6, 50_000))
+        bar_length = rng.integers(0, 3, 50_000)
+
+        may = utils.may_be_triangle(b, c, d, e, f)
+
+        found = np.array(
+            [
+                utils.is_triangle(*prices) is not None
+                for prices in zip(a, b, c, d, e, f, bar_length)
+            ]
+        )
+
+        # Every triangle passes, most other tuples are rejected
+        self.assertTrue(found.any())
+        self.assertTrue(may[found].all())
+        self.assertLess(may.mean(), 0.25)
+
+        # Same answer on scalars
+        for i in range(100):
+            self.assertEqual(
+                utils.may_be_triangle(b[i], c[i], d[i], e[i], f[i]), may[i]
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,98 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from context import outcomes
+
+
+def make_result(sym, pattern, start, direction, ret_20, bars_to_target):
+    return dict(
+        sym=sym,
+        pattern=pattern,
+        start=start,
+        end=start,
+        outcome=dict(
+            date=start,
+            close=100.0,
+            direction=direction,
+            returns={"5": 0.0, "10": 0.0, "20": ret_20, "60": None, "120": None},
+            max_up=0.1,
+            max_down=-0.1,
+            bars_to_target=bars_to_target,
+        ),
+    )
+
+
+class TestOutcomeStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = outcomes.OutcomeStore(Path(self.tmp.name) / "outcomes.db")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_stats(self):
+        self.store.add(
+            [
+                make_result("AAA", "DTOP", "2024-01-01", -1, -0.04, 10),
+                make_result("AAA", "DTOP", "2024-02-01", -1, 0.02, None),
+                make_result("BBB", "DTOP", "2024-01-01", -1, -0.06, 20),
+            ],
+            "daily",
+        )
+
+        stats = self.store.stats("dtop", "daily").iloc[0]
+
+        self.assertEqual(stats["n"], 3)
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+        self.assertAlmostEqual(stats["median_bars"], 15)
+        # Returns in the pattern direction
+        self.assertAlmostEqual(stats["median_ret_20"], 0.04)
+        self.assertIsNone(stats["median_ret_60"])
+
+        self.assertEqual(len(self.store.stats(sym=None)), 3)
+
+    def test_incremental_update(self):
+        self.store.add([make_result("AAA", "VCPU", "2024-01-01", 1, 0.05, None)], "daily")
+        self.store.add(
+            [
+                make_result("AAA", "VCPU", "2024-01-01", 1, 0.05, 12),
+                make_result("AAA", "VCPU", "2024-03-01", 1, 0.01, 30),
+            ],
+            "daily",
+        )
+
+        stats = self.store.stats("VCPU", "daily", sym="AAA").iloc[0]
+
+        self.assertEqual(stats["n"], 2)
+        self.assertEqual(stats["hit_rate"], 1.0)
+
+    def test_annotate(self):
+        self.store.add(
+            [make_result("AAA", "DBOT", f"2024-01-{i:02}", 1, 0.01, 5) for i in range(1, 4)]
+            + [make_result("BBB", "DBOT", "2024-01-01", 1, 0.01, None)],
+            "daily",
+        )
+
+        live = [
+            dict(sym="AAA", pattern="DBOT"),
+            dict(sym="BBB", pattern="DBOT"),
+            dict(sym="AAA", pattern="HNSU"),
+        ]
+
+        self.store.annotate(live, "daily", min_samples=2)
+
+        self.assertEqual(live[0]["edge"]["scope"], "symbol")
+        self.assertEqual(live[0]["edge"]["hit_rate"], 1.0)
+
+        # Too few samples for BBB, falls back to all symbols
+        self.assertEqual(live[1]["edge"]["scope"], "all")
+        self.assertEqual(live[1]["edge"]["n"], 4)
+
+        self.assertNotIn("edge", live[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+from context import scanner
+from detector_corpus import make_ohlc
+from loaders.FrameLoader import FrameLoader
+from Plotter import render_charts
+
+
+class TestRenderCharts(unittest.TestCase):
+
+    def test_render_charts(self):
+        frames = {f"SYN{seed}": make_ohlc(seed, 300) for seed in range(4)}
+        loader = FrameLoader({}, frames=frames)
+
+        found = scanner.scan(tuple(frames), tuple(scanner.DETECTORS), loader, {}, 3, 3)
+
+        items = [
+            (dct, frames[dct["sym"]].iloc[-160:])
+            for patterns in found.values()
+            for dct in patterns
+        ][:6]
+
+        self.assertTrue(items)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            count = render_charts(items, "daily", Path(tmp), {})
+
+            self.assertEqual(count, len(items))
+            self.assertEqual(len(list(Path(tmp).glob("*.png"))), len(items))
+            self.assertEqual(len(list(Path(tmp).glob("*.json"))), len(items))
+
+        # Headless and no figure left open
+        self.assertEqual(plt.get_backend().lower(), "agg")
+        self.assertEqual(plt.get_fignums(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from context import scanner  # noqa: F401 - sets up sys.path
+from loaders import IEODFileLoader as ieod
+
+
+def make_minutes(days: int, session: bool, seed=0) -> pd.DataFrame:
+    """Minute bars, 09:15 to 15:29 on weekdays or round the clock"""
+    if session:
+        dates = pd.bdate_range("2024-01-01", periods=days)
+        index = pd.DatetimeIndex(
+            [d + pd.Timedelta(minutes=9 * 60 + 15 + m) for d in dates for m in range(375)]
+        )
+    else:
+        index = pd.date_range("2024-01-01", periods=days * 1440, freq="1min")
+
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, len(index)))
+    spread = np.abs(rng.normal(0, 0.05, (2, len(index))))
+
+    return pd.DataFrame(
+        dict(
+            Open=close.round(2),
+            High=(close + spread[0]).round(2),
+            Low=(close - spread[1]).round(2),
+            Close=close.round(2),
+            Volume=rng.integers(100, 1000, len(index)).astype(float),
+        ),
+        index=pd.DatetimeIndex(index, name="Date"),
+    )
+
+
+class TestResampleCache(unittest.TestCase):
+
+    def check(self, config: dict, minutes: pd.DataFrame, tfs, steps):
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / "sym.csv"
+            cache_dir = Path(tmp) / "cache"
+
+            config = dict(config, DATA_PATH=tmp)
+            cached_config = dict(config, RESAMPLE_CACHE=str(cache_dir))
+
+            for stop in steps:
+                minutes.iloc[:stop].to_csv(file)
+                ieod.csv_loader.cache_clear()
+
+                for tf in tfs:
+                    expected = ieod.IEODFileLoader(config, tf, period=30).get("SYM")
+                    df = ieod.IEODFileLoader(cached_config, tf, period=30).get("SYM")
+
+                    pd.testing.assert_frame_equal(df, expected, check_freq=False)
+
+            self.assertEqual(len(list(cache_dir.iterdir())), len(tfs))
+
+    def test_session_bars(self):
+        minutes = make_minutes(12, session=True)
+
+        # Appends of whole sessions, part of a session and nothing
+        steps = (375 * 8, 375 * 9, 375 * 9 + 100, 375 * 9 + 290, 375 * 9 + 290, 375 * 12)
+
+        self.check(
+            dict(DEFAULT_TF="1", EXCHANGE_START_TIME="09:15"),
+            minutes,
+            ("15", "75", "125"),
+            steps,
+        )
+
+    def test_24_7_bars(self):
+        minutes = make_minutes(6, session=False, seed=1)
+        steps = (1440 * 3, 1440 * 3 + 70, 1440 * 4 + 500, 1440 * 6)
+
+        self.check(
+            dict(DEFAULT_TF="1", **{"24_7": True}),
+            minutes,
+            ("5", "60", "4h"),
+            steps,
+        )
+
+    def test_changed_history(self):
+        minutes = make_minutes(4, session=True, seed=2)
+        config = dict(DEFAULT_TF="1", EXCHANGE_START_TIME="09:15")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp) / "sym.csv"
+            config = dict(config, DATA_PATH=tmp)
+            cached_config = dict(config, RESAMPLE_CACHE=str(Path(tmp) / "cache"))
+
+            minutes.iloc[:1000].to_csv(file)
+            ieod.IEODFileLoader(cached_config, "75", period=30).get("SYM")
+
+            # Rewritten data, as after a split adjustment
+            adjusted = minutes.copy()
+            adjusted[["Open", "High", "Low", "Close"]] /= 2
+            adjusted.to_csv(file)
+            ieod.csv_loader.cache_clear()
+
+            expected = ieod.IEODFileLoader(config, "75", period=30).get("SYM")
+            df = ieod.IEODFileLoader(cached_config, "75", period=30).get("SYM")
+
+            pd.testing.assert_frame_equal(df, expected, check_freq=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
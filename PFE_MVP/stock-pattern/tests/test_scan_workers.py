@@ -0,0 +1,138 @@
+import unittest
+
+import pandas as pd
+from context import scanner
+from detector_corpus import make_ohlc
+from loaders.FrameLoader import FrameLoader
+
+
+class TestScanWorkers(unittest.TestCase):
+
+    def test_chunk_symbols(self):
+        syms = [f"S{i}" for i in range(100)]
+
+        for workers in (1, 3, 8, 64):
+            chunks = scanner.chunk_symbols(syms, workers, max_chunk=16)
+
+            self.assertEqual([s for chunk in chunks for s in chunk], syms)
+            self.assertLessEqual(max(map(len, chunks)), 16)
+
+        self.assertEqual(len(scanner.chunk_symbols(syms, 64)), 100)
+        self.assertEqual(scanner.chunk_symbols([], 4), [])
+
+    def test_shard_symbols(self):
+        syms = [f"S{i}" for i in range(500)]
+        shards = [scanner.shard_symbols(syms, i, 4) for i in range(1, 5)]
+
+        # Disjoint, complete and in list order
+        self.assertEqual(sorted(s for shard in shards for s in shard), sorted(syms))
+        self.assertTrue(all(list(shard) == sorted(shard, key=syms.index) for shard in shards))
+        self.assertTrue(all(100 < len(shard) < 150 for shard in shards))
+
+        # Independent of list order, case and other symbols
+        self.assertEqual(
+            set(scanner.shard_symbols(syms[::-1] + ["NEW"], 2, 4)) - {"NEW"},
+            set(shards[1]),
+        )
+        self.assertEqual(
+            scanner.shard_symbols([s.lower() for s in shards[2]], 3, 4),
+            tuple(s.lower() for s in shards[2]),
+        )
+
+        self.assertEqual(scanner.parse_shard("2/4"), (2, 4))
+
+        for spec in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(ValueError):
+                scanner.parse_shard(spec)
+
+    def test_scan_chunk_matches_scan(self):
+        frames = {f"SYN{seed}": make_ohlc(seed, 300 + seed * 7) for seed in range(12)}
+        frames["EMPTY"] = frames["SYN0"].iloc[:0]
+        syms = tuple(frames)
+        keys = tuple(scanner.DETECTORS)
+
+        # Run the initializer in this process, as a worker would
+        scanner.init_worker(FrameLoader, dict(frames=frames), keys, {}, 3, 3)
+
+        found = {key: [] for key in keys}
+
+        for chunk in scanner.chunk_symbols(syms, 2):
+            for sym, tf, result, df in scanner.scan_chunk(chunk):
+                self.assertEqual(tf, "daily")
+                self.assertIsNone(df)
+                self.assertTrue(all(result.values()))
+
+                for key, patterns in result.items():
+                    found[key].extend(patterns)
+
+        expected = scanner.scan(syms, keys, FrameLoader({}, frames=frames), {}, 3, 3)
+
+        self.assertEqual(found, expected)
+        self.assertTrue(any(expected.values()))
+
+    def test_scan_chunk_timeframes(self):
+        frames = {f"SYN{seed}": make_ohlc(seed, 900 + seed * 50) for seed in range(4)}
+        syms = tuple(frames)
+        keys = tuple(scanner.DETECTORS)
+        tfs = ("daily", "weekly")
+
+        scanner.init_worker(
+            FrameLoader,
+            dict(frames=frames, period=100),
+            keys,
+            {},
+            3,
+            3,
+            tfs=tfs,
+            keep_frames=True,
+        )
+
+        found = {tf: {key: [] for key in keys} for tf in tfs}
+
+        for sym, tf, result, df in scanner.scan_chunk(syms):
+            # The frame scanned, for chart rendering
+            pd.testing.assert_frame_equal(
+                df, FrameLoader({}, tf, frames=frames, period=100).get(sym)
+            )
+
+            for key, patterns in result.items():
+                found[tf][key].extend(patterns)
+
+        expected = scanner.scan_timeframes(
+            syms, keys, FrameLoader({}, frames=frames, period=100), tfs, {}, 3, 3
+        )
+
+        self.assertEqual(found, expected)
+        self.assertTrue(any(expected["weekly"].values()))
+
+    def test_scan_bars(self):
+        frames = {f"SYN{seed}": make_ohlc(seed, 400 + seed * 9) for seed in range(5)}
+        loader = FrameLoader({}, frames=frames)
+        syms = tuple(frames)
+        keys = tuple(scanner.DETECTORS)
+        bars = [(3, 3), (6, 6), (2, 5)]
+
+        found = scanner.scan_bars(syms, keys, loader, bars)
+
+        self.assertEqual(list(found), bars)
+
+        for setting in bars:
+            expected = scanner.scan(syms, keys, loader, {}, *setting)
+
+            # Same patterns, labeled by setting
+            for patterns in expected.values():
+                for pattern in patterns:
+                    pattern["bars"] = list(setting)
+
+            self.assertEqual(found[setting], expected)
+
+        self.assertTrue(any(found[(3, 3)].values()))
+        self.assertEqual(scanner.parse_bars("6,4"), (6, 4))
+
+        for spec in ("6", "0,6", "a,b"):
+            with self.assertRaises(ValueError):
+                scanner.parse_bars(spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
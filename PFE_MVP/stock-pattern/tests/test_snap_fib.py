@@ -0,0 +1,33 @@
+import unittest
+
+import numpy as np
+from context import utils
+
+
+class TestSnapFib(unittest.TestCase):
+
+    def test_matches_nearest_lookup(self):
+        ratios = np.linspace(-0.5, 2, 501)
+
+        expected = [
+            utils.fib_ser.loc[(utils.fib_ser - r).abs().idxmin()] for r in ratios
+        ]
+
+        self.assertListEqual(utils.snap_fib(ratios).tolist(), expected)
+
+    def test_tie_goes_to_lower_level(self):
+        # Exactly halfway between two levels in floating point
+        result = utils.snap_fib([0.309, 0.441, 0.6625])
+
+        self.assertListEqual(result.tolist(), [0.236, 0.382, 0.618])
+
+    def test_nan_and_inf(self):
+        result = utils.snap_fib([np.nan, np.inf, -np.inf])
+
+        self.assertTrue(np.isnan(result[0]))
+        self.assertEqual(result[1], utils.fib_ser.iat[0])
+        self.assertEqual(result[2], utils.fib_ser.iat[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
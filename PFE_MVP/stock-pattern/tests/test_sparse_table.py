@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from context import kernel
+
+
+class TestSparseTable(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+
+        # Rounded values so that ties are common
+        self.values = np.round(rng.normal(size=40), 1)
+        self.with_nan = self.values.copy()
+        self.with_nan[[0, 5, 6, 7, 20]] = np.nan
+
+    def assert_matches_pandas(self, values):
+        ser = pd.Series(values)
+        table_max = kernel.SparseTable(values, find_max=True)
+        table_min = kernel.SparseTable(values, find_max=False)
+
+        for start in range(len(values)):
+            for stop in range(start + 1, len(values) + 1):
+                window = ser.iloc[start:stop]
+
+                if window.isna().all():
+                    self.assertTrue(np.isnan(table_max.value(start, stop)))
+                    continue
+
+                self.assertEqual(table_max.arg(start, stop), window.idxmax())
+                self.assertEqual(table_min.arg(start, stop), window.idxmin())
+                self.assertEqual(table_max.value(start, stop), window.max())
+                self.assertEqual(table_min.value(start, stop), window.min())
+
+    def test_matches_pandas(self):
+        self.assert_matches_pandas(self.values)
+
+    def test_matches_pandas_with_nan(self):
+        self.assert_matches_pandas(self.with_nan)
+
+    def test_empty_range(self):
+        table = kernel.SparseTable(self.values, find_max=True)
+
+        self.assertTrue(np.isnan(table.value(5, 5)))
+
+        with self.assertRaises(ValueError):
+            table.arg(5, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from context import scanner  # noqa: F401 - sets up sys.path
+from statestore import StateStore, load_active
+
+
+def make_pattern(sym: str, pattern: str, start: str, **kwargs) -> dict:
+    return dict(sym=sym, pattern=pattern, start=start, end="2024-03-01", **kwargs)
+
+
+class TestStateStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = StateStore(Path(self.tmp.name) / "state" / "patterns.db")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_update(self):
+        vcp = make_pattern("AAA", "VCPU", "2024-01-02")
+        tri = make_pattern("BBB", "Symmetric", "2024-01-10")
+
+        # First scan, every pattern is new
+        new = self.store.update(
+            dict(vcpu=[vcp], trng=[tri]), ("AAA", "BBB"), "daily", "2024-03-01"
+        )
+
+        self.assertEqual(new, dict(vcpu=[vcp], trng=[tri]))
+        self.assertEqual(self.store.new(tf="daily"), [vcp, tri])
+        self.assertEqual(self.store.active(sym="aaa"), [vcp])
+
+        # Detected again with updated data, and a new start date for BBB
+        vcp_moved = dict(vcp, end="2024-03-04")
+        tri_moved = make_pattern("BBB", "Symmetric", "2024-01-20")
+
+        # diff does not record the scan
+        found = dict(vcpu=[vcp_moved], trng=[tri_moved])
+        self.assertEqual(self.store.diff(found, ("AAA", "BBB"), "daily"), dict(vcpu=[], trng=[tri_moved]))
+        self.assertEqual(self.store.last_run(), "2024-03-01")
+
+        new = self.store.update(
+            dict(vcpu=[vcp_moved], trng=[tri_moved]),
+            ("AAA", "BBB"),
+            "daily",
+            "2024-03-04",
+        )
+
+        self.assertEqual(new, dict(vcpu=[], trng=[tri_moved]))
+        self.assertEqual(self.store.new(), [tri_moved])
+        self.assertEqual(self.store.invalidated(), [tri])
+        self.assertEqual(self.store.active(), [vcp_moved, tri_moved])
+
+        # No longer detected, then detected again
+        self.store.update(dict(vcpu=[], trng=[tri_moved]), ("AAA", "BBB"), "daily", "2024-03-05")
+        self.assertEqual(self.store.invalidated(), [vcp_moved])
+
+        new = self.store.update(
+            dict(vcpu=[vcp_moved], trng=[tri_moved]), ("AAA", "BBB"), "daily", "2024-03-06"
+        )
+
+        self.assertEqual(new["vcpu"], [vcp_moved])
+        self.assertEqual(self.store.new(), [vcp_moved])
+        self.assertEqual(self.store.invalidated(), [])
+        self.assertEqual(self.store.last_run(), "2024-03-06")
+
+    def test_scope(self):
+        vcp = make_pattern("AAA", "VCPU", "2024-01-02")
+        tri = make_pattern("AAA", "Symmetric", "2024-01-10")
+        weekly = make_pattern("AAA", "VCPU", "2023-11-06")
+
+        self.store.update(dict(vcpu=[vcp], trng=[tri]), ("AAA",), "daily", "2024-03-01")
+        self.store.update(dict(vcpu=[weekly]), ("AAA",), "weekly", "2024-03-01")
+
+        # Other symbols, keys and timeframes are left as they are
+        self.store.update(dict(vcpu=[]), ("BBB",), "daily", "2024-03-02")
+        self.store.update(dict(vcpu=[]), ("AAA",), "daily", "2024-03-03")
+
+        self.assertEqual(self.store.active(tf="daily"), [tri])
+        self.assertEqual(self.store.active(tf="weekly"), [weekly])
+        self.assertEqual(self.store.invalidated(since="2024-03-01"), [vcp])
+
+    def test_persistence(self):
+        vcp = make_pattern("AAA", "VCPU", "2024-01-02", points=dict(A=["2024-01-02", 1.5]))
+
+        self.store.update(dict(vcpu=[vcp]), ("AAA",), "daily")
+        self.store.close()
+
+        self.store = StateStore(self.store.path)
+
+        self.assertEqual(self.store.active(), [vcp])
+        self.assertEqual(self.store.update(dict(vcpu=[vcp]), ("AAA",), "daily"), dict(vcpu=[]))
+
+    def test_load_active(self):
+        vcp = make_pattern("AAA", "VCPU", "2024-01-02")
+        path = self.store.path
+
+        self.assertIsNone(load_active(path.with_name("missing.db"), "AAA", "daily"))
+
+        self.store.update(dict(vcpu=[vcp]), ("AAA",), "daily", "2024-03-01T10:00:00")
+
+        self.assertEqual(load_active(path, "aaa", "daily"), [vcp])
+        self.assertIsNone(load_active(path, "BBB", "daily"))
+        self.assertIsNone(load_active(path, "AAA", "weekly"))
+
+        # The pattern file is used if a scan without state rewrote it later
+        json_path = Path(self.tmp.name) / "AAA_daily_patterns.json"
+        json_path.write_text(json.dumps(dict(sym="AAA", patterns=[])))
+
+        for at, expected in (("2024-03-01T09:00:00", [vcp]), ("2024-03-01T11:00:00", None)):
+            mtime = datetime.fromisoformat(at).timestamp()
+            os.utime(json_path, (mtime, mtime))
+
+            self.assertEqual(
+                load_active(path, "AAA", "daily", newer_than=json_path.stat().st_mtime),
+                expected,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import pandas as pd
+from context import scanner
+from detector_corpus import make_ohlc
+from loaders.FrameLoader import FrameLoader
+from streaming import StreamScanner, pattern_id
+
+
+def bars(df: pd.DataFrame):
+    for ts, row in df.iterrows():
+        yield ts, row.to_dict()
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.df = make_ohlc(5, 420)
+        self.keys = tuple(scanner.DETECTORS)
+
+    def scan(self, df: pd.DataFrame) -> dict:
+        loader = FrameLoader({}, frames=dict(SYN=df), period=160)
+        found = scanner.scan(("SYN",), self.keys, loader, {}, 3, 3)
+
+        return {key: patterns for key, patterns in found.items() if patterns}
+
+    def test_matches_scan(self):
+        stream = StreamScanner(period=160, bars_left=3, bars_right=3)
+        active = set()
+
+        def apply(events):
+            for event in events:
+                pid = pattern_id(event["key"], event["pattern"])
+
+                if event["event"] == "formed":
+                    self.assertNotIn(pid, active)
+                    active.add(pid)
+                else:
+                    self.assertIn(pid, active)
+                    active.remove(pid)
+
+            return len(events)
+
+        count = apply(stream.seed("SYN", self.df.iloc[:200]))
+
+        for i, (ts, bar) in enumerate(bars(self.df.iloc[200:]), 200):
+            count += apply(stream.update("SYN", ts, bar))
+
+            found = stream.patterns("SYN")
+
+            self.assertEqual(
+                active,
+                {pattern_id(key, p) for key, patterns in found.items() for p in patterns},
+            )
+
+            if i % 40 == 0 or i == len(self.df) - 1:
+                found = {key: patterns for key, patterns in found.items() if patterns}
+                self.assertEqual(found, self.scan(self.df.iloc[: i + 1]))
+
+        self.assertGreater(count, 0)
+
+    def test_forming_and_late_bars(self):
+        stream = StreamScanner(keys=("vcpu",), period=160, bars_left=3, bars_right=3)
+        stream.seed("SYN", self.df.iloc[:300])
+
+        ts, bar = next(bars(self.df.iloc[300:]))
+
+        # A forming bar replaced by later ticks of the same timestamp
+        stream.update("SYN", ts, dict(bar, Close=bar["Open"]))
+        stream.update("SYN", ts, bar)
+
+        pd.testing.assert_frame_equal(
+            stream.frames["SYN"], self.df.iloc[141:301], check_freq=False
+        )
+
+        # Bars older than the last one are ignored
+        self.assertEqual(stream.update("SYN", self.df.index[250], bar), [])
+        self.assertEqual(len(stream.frames["SYN"]), 160)
+
+        # A new seed starts again from the given bars
+        events = stream.seed("SYN", self.df.iloc[:301])
+
+        self.assertTrue(all(e["event"] == "formed" for e in events))
+        self.assertEqual(
+            sum(len(p) for p in stream.patterns("SYN").values()), len(events)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
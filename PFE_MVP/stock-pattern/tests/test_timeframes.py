@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from context import scanner
+from detector_corpus import make_ohlc
+from loaders.EODFileLoader import EODFileLoader
+from loaders.FrameLoader import FrameLoader
+
+TIMEFRAMES = ("daily", "weekly", "monthly", "quarterly")
+
+
+class TestTimeframes(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = {f"SYN{seed}": make_ohlc(seed, 2500) for seed in range(3)}
+
+    def test_eod_loader_timeframes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for sym, df in self.frames.items():
+                df.to_csv(Path(tmp) / f"{sym.lower()}.csv", index_label="Date")
+
+            config = dict(DATA_PATH=tmp)
+
+            for end_date in (None, datetime(2022, 3, 16)):
+                for tfs in (TIMEFRAMES, ("daily", "weekly"), ("weekly",)):
+                    loader = EODFileLoader(config, end_date=end_date)
+
+                    for sym in self.frames:
+                        frames = loader.get_timeframes(sym, tfs)
+
+                        self.assertEqual(tuple(frames), tfs)
+
+                        for tf in tfs:
+                            expected = EODFileLoader(config, tf, end_date).get(sym)
+                            pd.testing.assert_frame_equal(frames[tf], expected)
+
+            with self.assertLogs(level="WARNING"):
+                self.assertEqual(loader.get_timeframes("MISSING", TIMEFRAMES), {})
+
+    def test_frame_loader_timeframes(self):
+        for end_date in (None, datetime(2022, 3, 16)):
+            loader = FrameLoader({}, end_date=end_date, frames=self.frames)
+
+            for sym in self.frames:
+                frames = loader.get_timeframes(sym, TIMEFRAMES)
+
+                for tf in TIMEFRAMES:
+                    expected = FrameLoader(
+                        {}, tf, end_date=end_date, frames=self.frames
+                    ).get(sym)
+                    pd.testing.assert_frame_equal(frames[tf], expected)
+
+    def test_scan_timeframes_matches_scan(self):
+        syms = tuple(self.frames)
+        keys = tuple(scanner.DETECTORS)
+        loader = FrameLoader({}, frames=self.frames, period=120)
+
+        found = scanner.scan_timeframes(syms, keys, loader, TIMEFRAMES, {}, 3, 3)
+
+        self.assertEqual(tuple(found), TIMEFRAMES)
+
+        for tf in TIMEFRAMES:
+            tf_loader = FrameLoader({}, tf, frames=self.frames, period=120)
+            expected = scanner.scan(syms, keys, tf_loader, {}, 3, 3)
+
+            self.assertEqual(found[tf], expected)
+
+    def test_loader_without_timeframes(self):
+        class DailyLoader:
+            tf = "daily"
+
+        with self.assertRaises(ValueError):
+            scanner.scan_timeframes(("A",), ("vcpu",), DailyLoader(), ("daily",))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from stockpred.utils.backtest import BacktestGrid, build_panel, run_backtest_grid
+from stockpred.utils.eval_utils import strategy_stats
+
+
+def test_backtest_grid_matches_strategy_stats_without_costs():
+    rng = np.random.default_rng(11)
+    n = 250
+    dates = pd.bdate_range("2021-01-01", periods=n)
+    close = pd.Series(100 * np.cumprod(1 + rng.normal(0, 0.01, n)), index=dates)
+    probs = pd.Series(rng.random(n), index=dates)
+
+    d, tickers, horizons, proba, ret_next = build_panel({("AAA", "h1"): probs}, {"AAA": close})
+    grid = BacktestGrid(
+        thresholds=(0.4, 0.5, 0.6),
+        positionings=("long_only", "long_short"),
+        holding_periods=(1, 5),
+        costs_bps=(0.0, 10.0),
+    )
+    res = run_backtest_grid(proba, ret_next, grid, dates=d, tickers=tickers, horizons=horizons, top_k=3)
+
+    assert len(res.table) == 3 * 2 * 2 * 2
+    assert res.equity.shape == (n, 3)
+
+    # The last date has no next-day return: the engine keeps it flat.
+    r = ret_next[:-1, 0]
+    for thr in (0.4, 0.5, 0.6):
+        for positioning in ("long_only", "long_short"):
+            ref = strategy_stats(probs.values[:-1], r, thr, positioning)
+            row = res.table[
+                (res.table.threshold == thr)
+                & (res.table.positioning == positioning)
+                & (res.table.holding == 1)
+                & (res.table.cost_bps == 0.0)
+            ].iloc[0]
+            assert np.isclose(row.total_return, ref["total_return"])
+            assert np.isclose(row.max_drawdown, ref["max_drawdown"])
+
+    # Costs can only lower returns.
+    t = res.table.set_index(["threshold", "positioning", "holding", "cost_bps"])["total_return"]
+    with_costs = t.xs(10.0, level="cost_bps").sort_index()
+    no_costs = t.xs(0.0, level="cost_bps").sort_index()
+    assert (with_costs <= no_costs + 1e-12).all()
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import numpy as np
+
+from stockpred.utils.cache import ArtifactCache, file_fingerprint, fingerprint
+
+
+def test_artifact_cache_roundtrip_and_invalidation(tmp_path: Path):
+    cache = ArtifactCache(tmp_path / "cache")
+
+    raw = tmp_path / "AAPL.csv"
+    raw.write_text("Date,Close\n2020-01-01,1\n", encoding="utf-8")
+    key = fingerprint("dataset", file_fingerprint(raw), 60, 1)
+
+    assert cache.load_arrays("dataset", key) is None
+    X = np.arange(12, dtype=np.float32).reshape(3, 4)
+    y = np.array([0.0, 1.0, 1.0], dtype=np.float32)
+    cache.save_arrays("dataset", key, X=X, y=y)
+
+    loaded = cache.load_arrays("dataset", key)
+    np.testing.assert_array_equal(loaded["X"], X)
+    assert set(cache.load_arrays("dataset", key, keys=("y",))) == {"y"}
+
+    # Changing the raw file (or any parameter) yields a new key: stale entries are never read.
+    raw.write_text("Date,Close\n2020-01-01,2\n", encoding="utf-8")
+    assert fingerprint("dataset", file_fingerprint(raw), 60, 1) != key
+    assert fingerprint("dataset", file_fingerprint(raw), 60, 5) != fingerprint("dataset", file_fingerprint(raw), 60, 1)
+
+    disabled = ArtifactCache(tmp_path / "cache", enabled=False)
+    assert disabled.load_arrays("dataset", key) is None
@@ -0,0 +1,47 @@
+import numpy as np
+from sklearn.metrics import balanced_accuracy_score, brier_score_loss, roc_auc_score
+
+from stockpred.utils.eval_utils import (
+    _auc_from_counts,
+    _balanced_accuracy_from_counts,
+    _resample_counts,
+    block_bootstrap_indices,
+    bootstrap_metric_cis,
+    strategy_stats,
+)
+
+
+def test_vectorized_bootstrap_kernels_match_sklearn():
+    rng = np.random.default_rng(7)
+    n = 300
+    probs = np.round(rng.random(n), 2)  # rounding creates ties
+    y = (rng.random(n) < probs).astype(int)
+    y_pred = (probs >= 0.5).astype(int)
+
+    idx = block_bootstrap_indices(n, n_resamples=5, block_size=7, seed=1)
+    assert idx.shape == (5, n)
+    counts = _resample_counts(idx, n)
+    auc = _auc_from_counts(counts, probs, y)
+    bal = _balanced_accuracy_from_counts(counts, y_pred, y)
+
+    for b in range(5):
+        pb, yb = probs[idx[b]], y[idx[b]]
+        assert np.isclose(auc[b], roc_auc_score(yb, pb))
+        assert np.isclose(bal[b], balanced_accuracy_score(yb, (pb >= 0.5).astype(int)))
+
+
+def test_bootstrap_metric_cis_point_estimates():
+    rng = np.random.default_rng(3)
+    n = 400
+    probs = rng.random(n)
+    y = (rng.random(n) < probs).astype(float)
+    returns_next = rng.normal(0, 0.01, n)
+
+    ci = bootstrap_metric_cis(probs, y, returns_next, threshold=0.5, positioning="long_only", n_resamples=200)
+
+    assert np.isclose(ci["roc_auc"]["point"], roc_auc_score(y, probs))
+    assert np.isclose(ci["brier"]["point"], brier_score_loss(y, probs))
+    strat = strategy_stats(probs, returns_next, 0.5, "long_only")
+    assert np.isclose(ci["total_return"]["point"], strat["total_return"])
+    for name in ("roc_auc", "balanced_accuracy", "brier", "total_return"):
+        assert ci[name]["low"] <= ci[name]["high"]
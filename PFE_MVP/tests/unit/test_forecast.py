@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from stockpred.visuals.forecast import build_fan_charts
+
+
+def test_fan_charts_follow_model_probability(synthetic_ohlcv):
+    closes = {"AAA": synthetic_ohlcv["Close"], "BBB": synthetic_ohlcv["Close"] * 2}
+    probs = {"AAA": {"h5": 0.8, "h10": 0.2}, "BBB": {"h5": 0.5}}
+
+    fans = build_fan_charts(closes, probs, n_paths=4000, seed=1)
+
+    assert set(fans) == {"AAA", "BBB"}
+    assert set(fans["BBB"]) == {"h5"}
+    fan = fans["AAA"]["h5"]
+    assert fan.bands.shape == (5, 5)
+    assert len(fan.dates) == 5 and fan.dates[0] > synthetic_ohlcv.index[-1]
+    # percentiles are ordered for every day
+    assert (np.diff(fan.bands, axis=0) >= 0).all()
+    # P(up)=0.8 -> the 25th percentile ends above the last close; P(up)=0.2 -> the 75th ends below.
+    assert fan.bands[1, -1] > fan.last_close
+    assert fans["AAA"]["h10"].bands[3, -1] < fan.last_close
+    assert pd.Timestamp(fan.to_dict()["dates"][-1]) == fan.dates[-1]
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+from stockpred import cli
+
+
+def test_scan_pattern_frames_in_memory(tmp_path: Path, synthetic_ohlcv):
+    cfg_path = tmp_path / "stock-pattern.json"
+    cfg_path.write_text(
+        json.dumps({"DATA_PATH": str(tmp_path), "SAVE_FOLDER": str(tmp_path / "out")}),
+        encoding="utf-8",
+    )
+
+    frames = {"AAA": synthetic_ohlcv, "BBB": synthetic_ohlcv.iloc[:300]}
+    patterns = cli.scan_pattern_frames(frames, tf="daily", config=cfg_path)
+
+    assert isinstance(patterns, list)
+    assert {p["sym"] for p in patterns} <= {"AAA", "BBB"}
+
+    # Same files as the init.py scan: candles and patterns per symbol
+    for sym in frames:
+        payload = json.loads((tmp_path / "out" / "patterns" / f"{sym}_daily_patterns.json").read_text())
+        assert payload["sym"] == sym
+        assert len(payload["patterns"]) == sum(p["sym"] == sym for p in patterns)
+
+        candles = json.loads((tmp_path / "out" / "candles" / f"{sym}_daily.json").read_text())
+        assert candles["df_range"]["rows"] == min(len(frames[sym]), 160)
+
+    # The state store, read by the dashboard, holds the same patterns
+    from statestore import StateStore, load_active
+
+    db = tmp_path / "out" / "state" / "patterns.db"
+
+    with StateStore(db) as store:
+        assert len(store.active(tf="daily")) == len(patterns)
+        assert store.new(tf="daily") == store.active(tf="daily")
+
+    # Recorded after the pattern files, so the dashboard reads the state
+    for sym in frames:
+        mtime = (tmp_path / "out" / "patterns" / f"{sym}_daily_patterns.json").stat().st_mtime
+        active = load_active(db, sym, "daily", newer_than=mtime) or []
+        assert len(active) == sum(p["sym"] == sym for p in patterns)
+
+
+def test_scan_pattern_frames_timeframes(tmp_path: Path, synthetic_ohlcv):
+    cfg_path = tmp_path / "stock-pattern.json"
+    cfg_path.write_text(
+        json.dumps({"DATA_PATH": str(tmp_path), "SAVE_FOLDER": str(tmp_path / "out")}),
+        encoding="utf-8",
+    )
+
+    frames = {"AAA": synthetic_ohlcv}
+    patterns = cli.scan_pattern_frames(frames, tf="daily,weekly", config=cfg_path)
+
+    daily = cli.scan_pattern_frames(frames, tf="daily", config=cfg_path)
+    weekly = cli.scan_pattern_frames(frames, tf="weekly", config=cfg_path)
+    assert patterns == daily + weekly
+
+    for tf in ("daily", "weekly"):
+        assert (tmp_path / "out" / "patterns" / f"AAA_{tf}_patterns.json").exists()
+        assert (tmp_path / "out" / "candles" / f"AAA_{tf}.json").exists()
+
+
+def test_scan_pattern_frames_keys(tmp_path: Path, synthetic_ohlcv):
+    cfg_path = tmp_path / "stock-pattern.json"
+    cfg_path.write_text(
+        json.dumps({"DATA_PATH": str(tmp_path), "SAVE_FOLDER": str(tmp_path / "out")}),
+        encoding="utf-8",
+    )
+
+    frames = {"AAA": synthetic_ohlcv}
+    everything = cli.scan_pattern_frames(frames, tf="daily", config=cfg_path)
+    subset = cli.scan_pattern_frames(frames, tf="daily", config=cfg_path, keys=["vcpu", "crabd"])
+
+    assert subset
+    assert subset == [p for p in everything if p["pattern"] in ("VCPU", "CRABD")]
+
+
+def test_scan_patterns_requires_pattern_without_scan_all():
+    from typer.testing import CliRunner
+
+    result = CliRunner().invoke(cli.app, ["scan-patterns", "--sym", "AAA", "--no-scan-all"])
+
+    assert result.exit_code != 0
+    assert "--pattern" in result.output
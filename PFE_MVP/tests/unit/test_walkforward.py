@@ -0,0 +1,21 @@
+from stockpred.models.walkforward import WalkForwardConfig, make_folds
+
+
+def test_make_folds_expanding_and_rolling_are_leak_free():
+    n, horizon = 1000, 5
+    for cfg in (
+        WalkForwardConfig(n_folds=4, test_size=100),
+        WalkForwardConfig(n_folds=4, test_size=100, mode="rolling", train_size=300),
+    ):
+        folds = make_folds(n, cfg, horizon)
+        assert len(folds) == 4
+        assert folds[-1].test_end == n
+        for prev, cur in zip(folds, folds[1:]):
+            assert cur.test_start == prev.test_end
+        for f in folds:
+            # labels of the last train sample look `horizon` ahead: stay before the test window
+            assert f.train_end + horizon <= f.test_start
+            if cfg.mode == "rolling":
+                assert f.train_end - f.train_start <= cfg.train_size
+            else:
+                assert f.train_start == 0
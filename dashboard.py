@@ -4,6 +4,7 @@ import re
 import glob
 import os
 import hashlib
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
@@ -670,6 +671,8 @@ load_dotenv(BASE_DIR / ".env")
 DATA_ROOT = BASE_DIR / "PFE_MVP" / "data" / "raw"
 CANDLES_ROOT = BASE_DIR / "PFE_MVP" / "stock-pattern" / "src" / "candles"
 PATTERNS_ROOT = BASE_DIR / "PFE_MVP" / "stock-pattern" / "src" / "patterns"
+PATTERN_STATE_DB = BASE_DIR / "PFE_MVP" / "stock-pattern" / "src" / "state" / "patterns.db"
+STOCK_PATTERN_SRC = str(BASE_DIR / "PFE_MVP" / "stock-pattern" / "src")
 PREDICTIONS_ROOT = BASE_DIR / "PFE_MVP" / "reports" / "predictions"
 XAI_ROOT = BASE_DIR / "NLP"
 
@@ -687,10 +690,32 @@ def _ticker_for_pattern_prediction_files(display_ticker: str) -> str:
     return file_sym_map.get(disp, disp.replace("^", "").replace("=", "_"))
 
 
+def load_state_patterns(sym: str, tf: str = "daily", json_path: Optional[Path] = None) -> Optional[dict]:
+    """Patterns actifs de `sym` dans la base d'état de stock-pattern (state/patterns.db),
+    au format des JSON patterns. None si la base est absente, sans pattern pour ce symbole,
+    ou plus ancienne que `json_path` (scan init.py sans SAVE_STATE ou avec --date)."""
+    if not PATTERN_STATE_DB.exists():
+        return None
+    if STOCK_PATTERN_SRC not in sys.path:
+        sys.path.insert(0, STOCK_PATTERN_SRC)
+    from statestore import load_active
+
+    sym = str(sym).upper()
+    newer_than = json_path.stat().st_mtime if json_path is not None and json_path.exists() else None
+    patterns = load_active(PATTERN_STATE_DB, sym, tf, newer_than=newer_than)
+    if patterns is None:
+        return None
+    return {"sym": sym, "timeframe": tf, "patterns": patterns}
+
+
 def load_patterns_for_asset(display_ticker: str) -> Optional[dict]:
-    """Charge le JSON patterns pour l'actif (PFE_MVP/stock-pattern/src/patterns/{sym}_daily_patterns.json)."""
+    """Charge les patterns de l'actif depuis la base d'état, sinon le JSON
+    (PFE_MVP/stock-pattern/src/patterns/{sym}_daily_patterns.json)."""
     sym = _ticker_for_pattern_prediction_files(display_ticker)
     path = PATTERNS_ROOT / f"{sym}_daily_patterns.json"
+    state = load_state_patterns(sym, json_path=path)
+    if state is not None:
+        return state
     if not path.exists():
         return None
     try:
@@ -813,7 +838,8 @@ def load_price_history(sym):
     if cpath.exists():
         try:
             data = json.loads(cpath.read_text())
-            df = pd.DataFrame(data.get("candles", []))
+            # Columnar export, or the older list of candle dicts
+            df = pd.DataFrame(data["columns"] if "columns" in data else data.get("candles", []))
             if not df.empty:
                 df = df.rename(columns={"t":"Date", "close":"Close", "open":"Open", "high":"High", "low":"Low"})
                 df["Date"] = pd.to_datetime(df["Date"])
@@ -841,6 +867,9 @@ def load_price_history(sym):
 @st.cache_data
 def load_patterns(sym):
     path = PATTERNS_ROOT / f"{safe_ticker(sym)}_daily_patterns.json"
+    state = load_state_patterns(safe_ticker(sym), json_path=path)
+    if state is not None:
+        return state
     if path.exists():
         try: return json.loads(path.read_text())
         except: pass
@@ -858,6 +887,27 @@ def load_prediction(sym):
         except: pass
     return None
 
+@st.cache_data
+def load_fan_chart(sym):
+    """Bandes Monte Carlo pré-calculées (reports/predictions/{sym}_fan.json), par horizon."""
+    path = PREDICTIONS_ROOT / f"{safe_ticker(sym)}_fan.json"
+    if path.exists():
+        try: return json.loads(path.read_text())
+        except: pass
+    return None
+
+def add_fan_traces(fig, fan):
+    """Ajoute un éventail p5-p95 / p25-p75 + médiane au graphique de prix."""
+    bands = fan.get("bands", {})
+    x = [pd.to_datetime(fan["last_date"])] + [pd.to_datetime(d) for d in fan.get("dates", [])]
+    def path(k): return [float(fan["last_close"])] + list(bands.get(k, []))
+    for lo, hi, color in (("p5", "p95", "rgba(99,102,241,0.15)"), ("p25", "p75", "rgba(99,102,241,0.30)")):
+        if lo in bands and hi in bands:
+            fig.add_trace(go.Scatter(x=x, y=path(hi), mode="lines", line=dict(width=0), showlegend=False, hoverinfo="skip"))
+            fig.add_trace(go.Scatter(x=x, y=path(lo), mode="lines", line=dict(width=0), fill="tonexty", fillcolor=color, name=f"{lo}-{hi}"))
+    if "p50" in bands:
+        fig.add_trace(go.Scatter(x=x, y=path("p50"), mode="lines", line=dict(color="#6366f1", width=2, dash="dash"), name="Médiane MC"))
+
 @st.cache_data
 def load_xai_analysis(sym):
     files = glob.glob(str(XAI_ROOT / f"xai_{sym}_*.csv"))
@@ -2755,6 +2805,14 @@ def main_app(nav):
                 else:
                     range_opt = st.selectbox("Horizon", ["1M", "3M", "6M"], index=2)
 
+                fan_data = load_fan_chart(tech_ticker) if not (show_pat and plist) else None
+                fan_sel = None
+                if fan_data:
+                    fan_keys = sorted(fan_data.keys(), key=lambda k: int(k[1:]))
+                    fan_choice = st.selectbox("Projection Monte Carlo", ["Aucune"] + [f"J+{k[1:]}" for k in fan_keys], index=0)
+                    if fan_choice != "Aucune":
+                        fan_sel = fan_data.get(f"h{fan_choice[2:]}")
+
                 plot_hist = hist.copy()
                 if not plot_hist.empty:
                     if show_pat and plist:
@@ -2777,6 +2835,8 @@ def main_app(nav):
                                 ys.append(float(pts[k][1]))
                                 labels.append(k)
                         if xs: fig.add_trace(go.Scatter(x=xs, y=ys, mode="lines+markers+text", text=labels, textposition="top center", marker=dict(size=8, color="#6366f1"), line=dict(color="#6366f1", width=2), name=pat.get("pattern")))
+                    elif fan_sel:
+                        add_fan_traces(fig, fan_sel)
 
                     fig.update_layout(height=460, margin=dict(l=10, r=10, t=10, b=10), xaxis_rangeslider_visible=False, template="plotly_white")
                     st.plotly_chart(fig, use_container_width=True)
@@ -2788,6 +2848,15 @@ def main_app(nav):
                     pat = plist[sel_idx]
                     pcode = str(pat.get("pattern", "")).lower().strip()
                     pdata = PATTERN_REGISTRY.get(pcode)
+                    edge = pat.get("edge")
+                    if edge:
+                        scope = "sur cet actif" if edge.get("scope") == "symbol" else "tous actifs confondus"
+                        med20 = edge.get("median_ret_20")
+                        med_txt = f", mouvement médian à 20 séances {med20:+.1%}" if med20 is not None else ""
+                        st.caption(
+                            f"Historique ({edge.get('n')} occurrences {scope}) : "
+                            f"objectif atteint dans {edge.get('hit_rate', 0):.0%} des cas{med_txt}."
+                        )
                     if pdata:
                         bias = pdata.get("bias", "Neutre")
                         bias_color = {"Bullish": "#16a34a", "Bearish": "#dc2626", "Neutre": "#6b7280"}.get(bias, "#6b7280")